@@ -6,17 +6,20 @@ the message bus for real-time conversation processing.
 """
 
 import asyncio
+import re
 import uuid
 from datetime import datetime
 from typing import Dict, List, Optional, Any
 from fastapi import APIRouter, Depends, HTTPException, WebSocket, WebSocketDisconnect, BackgroundTasks, Query, Request
 from fastapi.responses import StreamingResponse
 from fastapi.security import HTTPBearer
+from starlette.background import BackgroundTask
 import json
 
 from aico.core.logging import get_logger
 from backend.api.conversation.dependencies import get_message_bus_client
 from backend.api.conversation.dependencies import get_current_user
+from backend.api.conversation.stream_demux import get_stream_demux
 from aico.proto.aico_conversation_pb2 import ConversationMessage, Message, MessageAnalysis
 from aico.proto.aico_conversation_pb2 import ConversationContext, Context, RecentHistory
 from aico.proto.aico_conversation_pb2 import ResponseRequest, ResponseParameters
@@ -43,6 +46,12 @@ security = HTTPBearer()
 # Active WebSocket connections for real-time updates
 active_connections: Dict[str, WebSocket] = {}
 
+# Maximum wait between streaming chunks before the stream is failed
+STREAM_IDLE_TIMEOUT_SECONDS = 30.0
+
+# Deepest page number served without a cursor (each page before it is read to get there)
+MAX_LEGACY_PAGE = 20
+
 # Unified endpoint with automatic thread management
 @router.post("/messages")
 async def send_message_with_auto_thread(
@@ -105,57 +114,31 @@ async def send_message_with_auto_thread(
         conv_message.message.conversation_id = conversation_id
         conv_message.message.turn_number = 1  # TODO: Track actual turn numbers
         
-        # Publish to conversation input topic (ConversationEngine will handle)
-        await bus_client.publish("conversation/user/input/v1", conv_message)
-        
-        # Wait for ConversationEngine to process and get the AI response synchronously
-        import asyncio
-        
-        response_received = asyncio.Event()
-        ai_response = "No response received"
-        response_conversation_id = None
-        
-        async def handle_ai_response(envelope):
-            try:
-                nonlocal ai_response
-                logger.debug(f"[API_GATEWAY] Received AI response envelope: {type(envelope)}")
-                
-                # Extract ConversationMessage from envelope
-                conversation_message = ConversationMessage()
-                envelope.any_payload.Unpack(conversation_message)
-                
-                logger.debug(f"[API_GATEWAY] Extracted ConversationMessage: {type(conversation_message)}")
-                # Check if this response is for our specific message
-                logger.debug(f"[API_GATEWAY] Response message_id: {conversation_message.message_id}, Expected: {message_id}")
-                if conversation_message.message_id == message_id:
-                    # Strip thinking tags from response (non-streaming path)
-                    import re
-                    raw_response = conversation_message.message.text
-                    ai_response = re.sub(r'<think>.*?</think>', '', raw_response, flags=re.DOTALL).strip()
-                    logger.info(f"[API_GATEWAY] ✅ AI response extracted for message_id {message_id}: '{ai_response[:100]}...'")
-                    response_received.set()
-                else:
-                    logger.debug(f"[API_GATEWAY] Message ID mismatch (got: {conversation_message.message_id}, expected: {message_id}), ignoring response")
-                    
-            except Exception as e:
-                logger.error(f"Error handling AI response: {e}")
-                import traceback
-                logger.error(f"Full traceback: {traceback.format_exc()}")
-        
         # Handle streaming vs non-streaming response
         # Convert string parameter to boolean
         stream_enabled = stream.lower() in ('true', '1', 'yes', 'on')
         logger.info(f"🔍 [API_STREAMING] Stream parameter: '{stream}' -> {stream_enabled} for request {message_id}")
+        
+        # Register with the gateway-wide demultiplexer BEFORE publishing so no
+        # output from the conversation engine can be missed
+        demux = get_stream_demux(bus_client)
+        
         if stream_enabled:
             logger.info(f"🔍 [API_STREAMING] ✅ Taking streaming path for request {message_id}")
-            print(f"🚨 [CONSOLE] About to create StreamingResponse for {message_id}")
+            chunk_queue = await demux.open_stream(message_id)
+            
+            try:
+                # Publish to conversation input topic (ConversationEngine will handle)
+                await bus_client.publish("conversation/user/input/v1", conv_message)
+            except Exception:
+                demux.release(message_id)
+                raise
             
             # Return streaming response using event-driven approach
             async def stream_generator():
                 logger.info(f"🔍 [API_STREAMING] 🚀 Stream generator started for {message_id}")
                 try:
                     # Send initial metadata (unencrypted for now - fix encryption later)
-                    logger.info(f"🔍 [API_STREAMING] 📤 Yielding metadata for {message_id}")
                     yield json.dumps({
                         "type": "metadata",
                         "message_id": message_id,
@@ -163,137 +146,84 @@ async def send_message_with_auto_thread(
                         "timestamp": timestamp.isoformat()
                     }) + "\n"
                     
-                    # Subscribe to streaming chunks from conversation engine
-                    from aico.core.topics import AICOTopics
-                    from aico.proto.aico_conversation_pb2 import StreamingResponse as StreamingResponseProto
-                    
-                    streaming_complete = asyncio.Event()
-                    chunk_queue = asyncio.Queue()
-                    
-                    async def handle_streaming_chunk(envelope):
-                        try:
-                            # Extract StreamingResponse from protobuf envelope
-                            streaming_chunk = StreamingResponseProto()
-                            envelope.any_payload.Unpack(streaming_chunk)
-                            
-                            # Only process chunks for our specific request
-                            if streaming_chunk.request_id != message_id:
-                                return  # Not for us, continue listening
-                            
-                            logger.info(f"🔍 [API_STREAMING] 📦 Received chunk for {message_id}: '{streaming_chunk.content}' (done: {streaming_chunk.done})")
-                            
-                            # Put chunk in queue for immediate processing
-                            await chunk_queue.put({
-                                "content": streaming_chunk.content,
-                                "accumulated": streaming_chunk.accumulated_content,
-                                "done": streaming_chunk.done,
-                                "content_type": streaming_chunk.content_type  # Forward content_type from backend
-                            })
-                            
-                            # If this is the final chunk, signal completion
-                            if streaming_chunk.done:
-                                streaming_complete.set()
-                            
-                        except Exception as e:
-                            logger.error(f"Error processing streaming chunk: {e}")
-                            await chunk_queue.put({
-                                "type": "error",
-                                "error": str(e)
-                            })
-                            streaming_complete.set()
-                    
-                    # Subscribe to conversation streaming topic
-                    await bus_client.subscribe(AICOTopics.CONVERSATION_STREAM, handle_streaming_chunk)
-                    
-                    # Process chunks from queue as they arrive - truly event-driven
-                    timeout_start = asyncio.get_event_loop().time()
-                    logger.info(f"🔍 [API_STREAMING] 🎬 Starting streaming loop for {message_id}")
-                    
-                    while not streaming_complete.is_set():
+                    # Block on the queue until the next chunk arrives (no polling)
+                    while True:
                         try:
-                            # Wait for chunk with short timeout to check completion
-                            chunk = await asyncio.wait_for(chunk_queue.get(), timeout=0.1)
-                            logger.info(f"🔍 [API_STREAMING] 🎯 Got chunk from queue: {chunk}")
-                            
-                            if "type" in chunk and chunk["type"] == "error":
-                                logger.info(f"🔍 [API_STREAMING] ❌ Yielding error chunk")
-                                yield json.dumps(chunk) + "\n"
-                            else:
-                                logger.info(f"🔍 [API_STREAMING] ✅ Yielding content chunk: '{chunk['content']}' (type: {chunk.get('content_type', 'response')})")
-                                chunk_data = {
-                                    "type": "chunk",
-                                    "content": chunk["content"],
-                                    "accumulated": chunk["accumulated"],
-                                    "done": chunk["done"],
-                                    "content_type": chunk.get("content_type", "response")  # Include content_type for frontend routing
-                                }
-                                # Include conversation_id and message_id in the final chunk
-                                if chunk["done"]:
-                                    chunk_data["conversation_id"] = conversation_id
-                                    chunk_data["message_id"] = message_id  # Add message_id for feedback linking
-                                    logger.info(f"🔍 [API_STREAMING] 📤 Sending final chunk with message_id: {message_id}")
-                                yield json.dumps(chunk_data) + "\n"
-                                
+                            chunk = await asyncio.wait_for(chunk_queue.get(), timeout=STREAM_IDLE_TIMEOUT_SECONDS)
                         except asyncio.TimeoutError:
-                            # No chunk received, check overall timeout
-                            if asyncio.get_event_loop().time() - timeout_start > 30.0:
-                                yield json.dumps({
-                                    "type": "error",
-                                    "error": "Streaming timeout"
-                                }) + "\n"
-                                break
-                    
-                    # Unsubscribe
-                    try:
-                        await bus_client.unsubscribe(AICOTopics.CONVERSATION_STREAM)
-                        logger.info(f"🔍 [API_STREAMING] 🔌 Unsubscribed from streaming for {message_id}")
-                    except Exception as e:
-                        logger.error(f"Error unsubscribing from streaming: {e}")
+                            yield json.dumps({
+                                "type": "error",
+                                "error": "Streaming timeout"
+                            }) + "\n"
+                            break
+                        
+                        if chunk.get("error"):
+                            yield json.dumps({
+                                "type": "error",
+                                "error": chunk["error"]
+                            }) + "\n"
+                            break
+                        
+                        chunk_data = {
+                            "type": "chunk",
+                            "content": chunk["content"],
+                            "accumulated": chunk["accumulated"],
+                            "done": chunk["done"],
+                            "content_type": chunk.get("content_type") or "response"  # Include content_type for frontend routing
+                        }
+                        # Include conversation_id and message_id in the final chunk
+                        if chunk["done"]:
+                            chunk_data["conversation_id"] = conversation_id
+                            chunk_data["message_id"] = message_id  # Add message_id for feedback linking
+                            logger.info(f"🔍 [API_STREAMING] 📤 Sending final chunk with message_id: {message_id}")
+                        yield json.dumps(chunk_data) + "\n"
+                        
+                        if chunk["done"]:
+                            break
                     
                     logger.info(f"🔍 [API_STREAMING] 🏁 Stream generator completed for {message_id}")
                         
                 except Exception as e:
                     logger.error(f"Stream generator error: {e}")
-                    logger.info(f"🔍 [API_STREAMING] ❌ Stream generator failed for {message_id}: {e}")
                     yield json.dumps({
                         "type": "error",
                         "error": str(e)
                     }) + "\n"
+                finally:
+                    # Runs on completion and when the client disconnects mid-stream
+                    demux.release(message_id)
             
-            print(f"🚨 [CONSOLE] Creating StreamingResponse object for {message_id}")
-            try:
-                response = StreamingResponse(
-                    stream_generator(),
-                    media_type="application/x-ndjson",
-                    headers={
-                        "Cache-Control": "no-cache",
-                        "Connection": "keep-alive",
-                        "X-Request-ID": message_id,
-                        "X-Conversation-ID": conversation_id,
-                    }
-                )
-                return response
-            except Exception as e:
-                print(f"🚨 [CONSOLE] ERROR creating StreamingResponse: {e}")
-                raise
+            return StreamingResponse(
+                stream_generator(),
+                media_type="application/x-ndjson",
+                headers={
+                    "Cache-Control": "no-cache",
+                    "Connection": "keep-alive",
+                    "X-Request-ID": message_id,
+                    "X-Conversation-ID": conversation_id,
+                },
+                # Backstop in case the body is never iterated
+                background=BackgroundTask(demux.release, message_id)
+            )
         else:
-            # Non-streaming: Subscribe and wait for complete response
-            await bus_client.subscribe("conversation/ai/response/v1", handle_ai_response)
-            
-            # Wait for response with timeout (allow for unoptimized LLM processing)
+            # Non-streaming: wait for the complete response routed by message_id
+            response_future = await demux.open_response(message_id)
             try:
+                # Publish to conversation input topic (ConversationEngine will handle)
+                await bus_client.publish("conversation/user/input/v1", conv_message)
+                
+                # Wait for response with timeout (allow for unoptimized LLM processing)
                 logger.info(f"🔍 [CONVERSATION_TIMEOUT] Waiting for response with 15s timeout for request: {message_id}")
-                await asyncio.wait_for(response_received.wait(), timeout=15.0)
-                logger.info(f"🔍 [CONVERSATION_TIMEOUT] ✅ Response received within timeout for request: {message_id}")
+                conversation_message = await asyncio.wait_for(response_future, timeout=15.0)
+                
+                # Strip thinking tags from response (non-streaming path)
+                ai_response = re.sub(r'<think>.*?</think>', '', conversation_message.message.text, flags=re.DOTALL).strip()
+                logger.info(f"[API_GATEWAY] ✅ AI response extracted for message_id {message_id}: '{ai_response[:100]}...'")
             except asyncio.TimeoutError:
                 logger.error(f"🔍 [CONVERSATION_TIMEOUT] ❌ 15-SECOND TIMEOUT for request: {message_id}")
                 ai_response = "Request timed out - please try again"
             finally:
-                # Unsubscribe from the topic
-                try:
-                    await bus_client.unsubscribe("conversation/ai/response/v1")
-                except Exception as e:
-                    logger.error(f"Error unsubscribing: {e}")
+                demux.release(message_id)
             
             # Return regular JSON response (existing logic)
             response_data = UnifiedMessageResponse(
@@ -317,17 +247,24 @@ async def send_message_with_auto_thread(
 
 @router.get("/messages", response_model=MessageHistoryResponse)
 async def get_my_messages(
-    page: int = Query(1, ge=1, description="Page number"),
+    page: int = Query(1, ge=1, le=MAX_LEGACY_PAGE, description="Page number without a cursor (use cursor for scrolling)"),
     page_size: int = Query(50, ge=1, le=100, description="Messages per page"),
     conversation_id: Optional[str] = Query(None, description="Filter by conversation ID"),
     since: Optional[datetime] = Query(None, description="Show messages after this timestamp"),
+    before: Optional[str] = Query(None, description="Show messages before this ISO timestamp"),
+    cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
     current_user = Depends(get_current_user)
 ):
     """
     Get my message history (user-scoped)
     
-    Returns paginated message history for the authenticated user.
+    Returns message history for the authenticated user, newest first.
     Messages are retrieved from working memory (LMDB) with 24-hour retention.
+    
+    Pass the returned next_cursor to fetch the next older page; each page is a
+    bounded LMDB range read, so deep pages cost the same as the first. Page
+    numbers without a cursor (older clients) read every page before the
+    requested one and are limited to MAX_LEGACY_PAGE.
     """
     try:
         user_id = current_user['user_uuid']
@@ -347,31 +284,35 @@ async def get_my_messages(
                 page_size=page_size
             )
         
-        # Retrieve messages from working memory
-        if conversation_id:
-            # Get messages for specific conversation
-            raw_messages = await memory_manager._working_store.retrieve_conversation_history(
-                conversation_id=conversation_id,
-                limit=page_size * page  # Get all messages up to current page
-            )
-        else:
-            # Get all messages for user across conversations
-            raw_messages = await memory_manager._working_store.retrieve_user_history(
-                user_id=user_id,
-                limit=page_size * page
-            )
+        before_ts = None
+        if before:
+            try:
+                before_ts = datetime.fromisoformat(before.replace('Z', '+00:00'))
+            except ValueError:
+                # Older clients send a message id here, which never filtered anything
+                logger.debug(f"Ignoring non-timestamp 'before' value: {before}")
+        
+        from aico.ai.memory.working import InvalidCursorError
+        working_store = memory_manager._working_store
+        scope = {"conversation_id": conversation_id} if conversation_id else {"user_id": user_id}
         
-        # Filter by timestamp if specified
-        if since:
-            raw_messages = [
-                msg for msg in raw_messages
-                if datetime.fromisoformat(msg.get('timestamp', '').replace('Z', '')) >= since
-            ]
+        try:
+            history_page = await working_store.retrieve_history_page(
+                **scope, limit=page_size, cursor=cursor, since=since, before=before_ts
+            )
+            # Page numbers without a cursor: walk forward page by page (legacy clients)
+            skip_pages = 0 if cursor else page - 1
+            for _ in range(skip_pages):
+                if not history_page.next_cursor:
+                    history_page.messages = []
+                    break
+                history_page = await working_store.retrieve_history_page(
+                    **scope, limit=page_size, cursor=history_page.next_cursor, since=since, before=before_ts
+                )
+        except InvalidCursorError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
-        # Apply pagination
-        start_idx = (page - 1) * page_size
-        end_idx = start_idx + page_size
-        paginated_messages = raw_messages[start_idx:end_idx]
+        paginated_messages = history_page.messages
         
         # Format messages for frontend
         formatted_messages = []
@@ -392,11 +333,14 @@ async def get_my_messages(
             success=True,
             messages=formatted_messages,
             conversation_id=conversation_id or f"user_{user_id}",
-            total_count=len(raw_messages),
+            total_count=history_page.total_count,
             page=page,
-            page_size=page_size
+            page_size=page_size,
+            next_cursor=history_page.next_cursor
         )
         
+    except HTTPException:
+        raise
     except Exception as e:
         logger.error(f"Failed to get user message history: {e}", extra={
             "user_id": current_user.get('user_uuid', 'unknown'),
@@ -149,6 +149,7 @@ class MessageHistoryResponse(BaseModel):
     total_count: int
     page: int = 1
     page_size: int = 50
+    next_cursor: Optional[str] = None  # Opaque cursor for the next (older) page
 
 
 class HealthResponse(BaseModel):
@@ -0,0 +1,220 @@
+"""
+Conversation Response Demultiplexer
+
+Gateway-wide routing of conversation engine output to in-flight HTTP requests.
+
+The message bus client keeps a single callback per topic pattern, so a
+subscription per request both overwrites concurrent requests' callbacks and
+forces every callback to decode every chunk. Instead, one demultiplexer
+subscribes once to the streaming and final-response topics, decodes each
+envelope exactly once and routes it by request id to the waiting request:
+
+- Streaming requests get a bounded queue of chunk dicts
+- Non-streaming requests get an asyncio.Future for the final message
+
+Clients concatenate chunk ``content`` deltas, so chunks are never dropped:
+when a request's queue is full, the new chunk is merged into the newest
+queued chunk of the same content type. If no such chunk exists the stream
+is failed with an explicit error chunk.
+
+Registration happens before the user message is published and must be
+released when the HTTP response finishes (see ``release``).
+"""
+
+import asyncio
+from typing import Any, Dict, Optional
+
+from aico.core.logging import get_logger
+from aico.core.topics import AICOTopics
+from aico.proto.aico_conversation_pb2 import ConversationMessage
+from aico.proto.aico_conversation_pb2 import StreamingResponse as StreamingResponseProto
+
+logger = get_logger("backend", "api.conversation.stream_demux")
+
+
+def _merge_chunks(earlier: Dict[str, Any], later: Dict[str, Any]) -> Dict[str, Any]:
+    """Combine two consecutive chunks of one content type into a single chunk."""
+    return {
+        "content": earlier["content"] + later["content"],
+        "accumulated": later["accumulated"],
+        "done": later["done"],
+        "content_type": later["content_type"]
+    }
+
+
+class ChunkQueue(asyncio.Queue):
+    """Bounded chunk queue that merges chunks instead of dropping them when full."""
+
+    def put_merging(self, chunk: Dict[str, Any]) -> bool:
+        """
+        Queue a chunk without blocking, merging it into the queue tail if full.
+
+        Returns:
+            False if the queue is full and the chunk cannot be merged
+        """
+        if not self.full():
+            self.put_nowait(chunk)
+            return True
+        tail = self._queue[-1] if self._queue else None
+        if tail is None or tail["done"] or tail["content_type"] != chunk["content_type"]:
+            return False
+        self._queue[-1] = _merge_chunks(tail, chunk)
+        return True
+
+    def fail(self, error: str) -> None:
+        """Replace queued chunks with a final error chunk."""
+        self._queue.clear()
+        self.put_nowait({"error": error, "content": "", "accumulated": "", "done": True, "content_type": ""})
+
+
+class ConversationStreamDemux:
+    """Routes conversation stream chunks and final responses by request id."""
+
+    def __init__(self, bus_client, queue_size: int = 256):
+        """
+        Args:
+            bus_client: Message bus client shared by the conversation API
+            queue_size: Maximum buffered chunks per streaming request
+        """
+        self.bus_client = bus_client
+        self.queue_size = queue_size
+
+        self._streams: Dict[str, ChunkQueue] = {}
+        self._responses: Dict[str, asyncio.Future] = {}
+        self._started = False
+        self._start_lock = asyncio.Lock()
+        self._previous_client = None
+
+        # Counters for diagnostics
+        self.chunks_routed = 0
+        self.chunks_unrouted = 0
+        self.chunks_merged = 0
+        self.streams_failed = 0
+
+    def rebind(self, bus_client) -> None:
+        """
+        Switch to a new bus client, keeping all in-flight requests.
+
+        Subscriptions move to the new client on the next ``start``.
+        """
+        if bus_client is self.bus_client:
+            return
+        if self._started and self._previous_client is None:
+            self._previous_client = self.bus_client
+        self.bus_client = bus_client
+        self._started = False
+
+    async def start(self) -> None:
+        """Subscribe to the conversation output topics (idempotent)."""
+        if self._started:
+            return
+        async with self._start_lock:
+            if self._started:
+                return
+            if self._previous_client is not None:
+                previous, self._previous_client = self._previous_client, None
+                for topic in (AICOTopics.CONVERSATION_STREAM, AICOTopics.CONVERSATION_AI_RESPONSE):
+                    try:
+                        await previous.unsubscribe(topic)
+                    except Exception as e:
+                        logger.debug(f"Could not unsubscribe previous bus client from {topic}: {e}")
+            await self.bus_client.subscribe(AICOTopics.CONVERSATION_STREAM, self._handle_stream_chunk)
+            await self.bus_client.subscribe(AICOTopics.CONVERSATION_AI_RESPONSE, self._handle_ai_response)
+            self._started = True
+            logger.info("Conversation stream demultiplexer subscribed to conversation output topics")
+
+    async def open_stream(self, request_id: str) -> ChunkQueue:
+        """
+        Register a streaming request and return its chunk queue.
+
+        A chunk with an ``error`` key ends the stream unsuccessfully.
+        """
+        await self.start()
+        queue = ChunkQueue(maxsize=self.queue_size)
+        self._streams[request_id] = queue
+        return queue
+
+    async def open_response(self, request_id: str) -> asyncio.Future:
+        """Register a non-streaming request and return a future for its final message."""
+        await self.start()
+        future = asyncio.get_running_loop().create_future()
+        self._responses[request_id] = future
+        return future
+
+    def release(self, request_id: str) -> None:
+        """Drop all routing state for a request (safe to call more than once)."""
+        self._streams.pop(request_id, None)
+        future = self._responses.pop(request_id, None)
+        if future is not None and not future.done():
+            future.cancel()
+
+    @property
+    def active_requests(self) -> int:
+        """Number of requests currently awaiting conversation output."""
+        return len(self._streams) + len(self._responses)
+
+    def _handle_stream_chunk(self, envelope) -> None:
+        """Decode one streaming chunk and hand it to its request's queue."""
+        try:
+            streaming_chunk = StreamingResponseProto()
+            envelope.any_payload.Unpack(streaming_chunk)
+        except Exception as e:
+            logger.error(f"Error decoding streaming chunk: {e}")
+            return
+
+        queue = self._streams.get(streaming_chunk.request_id)
+        if queue is None:
+            self.chunks_unrouted += 1
+            return
+
+        chunk = {
+            "content": streaming_chunk.content,
+            "accumulated": streaming_chunk.accumulated_content,
+            "done": streaming_chunk.done,
+            "content_type": streaming_chunk.content_type
+        }
+
+        merging = queue.full()
+        if queue.put_merging(chunk):
+            self.chunks_routed += 1
+            if merging:
+                self.chunks_merged += 1
+            return
+
+        # Full with no chunk to merge into: end the stream rather than lose text
+        self._streams.pop(streaming_chunk.request_id, None)
+        queue.fail("Stream buffer overflow")
+        self.streams_failed += 1
+        logger.warning(f"Stream queue full for {streaming_chunk.request_id}, failed stream")
+
+    def _handle_ai_response(self, envelope) -> None:
+        """Decode one final AI response and resolve its request's future."""
+        try:
+            conversation_message = ConversationMessage()
+            envelope.any_payload.Unpack(conversation_message)
+        except Exception as e:
+            logger.error(f"Error decoding AI response: {e}")
+            return
+
+        future = self._responses.get(conversation_message.message_id)
+        if future is not None and not future.done():
+            future.set_result(conversation_message)
+
+
+# Gateway-wide instance, created on first use for the shared bus client
+_demux: Optional[ConversationStreamDemux] = None
+
+
+def get_stream_demux(bus_client) -> ConversationStreamDemux:
+    """
+    Get the gateway-wide demultiplexer for the conversation API bus client.
+
+    If the bus client changed (e.g. after a reconnect) the existing instance
+    is rebound, so requests registered on it keep receiving their output.
+    """
+    global _demux
+    if _demux is None:
+        _demux = ConversationStreamDemux(bus_client)
+    else:
+        _demux.rebind(bus_client)
+    return _demux
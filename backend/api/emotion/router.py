@@ -30,12 +30,12 @@ async def get_current_emotion(
     Returns the most recent emotional state generated by the emotion simulation engine,
     including primary emotion label, confidence, and dimensional values (valence, arousal, dominance).
     
-    **Note:** Current implementation returns global emotional state. Future versions will support
-    per-user emotional states for personalized interactions.
+    Emotional state is tracked per user; users without their own state yet get
+    the global baseline.
     """
     try:
-        # Get current emotional state from engine
-        current_state = emotion_engine.current_state
+        # Get the user's current emotional state from engine
+        current_state = await emotion_engine.get_user_state(user["user_id"])
         
         if current_state is None:
             raise HTTPException(status_code=404, detail="No emotional state available")
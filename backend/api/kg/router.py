@@ -4,11 +4,13 @@ Knowledge Graph API Router.
 Provides REST endpoints for querying and managing the knowledge graph.
 """
 
+import asyncio
 from typing import Annotated
 from fastapi import APIRouter, Depends, HTTPException, status
 
 from aico.core.logging import get_logger
 from aico.ai.knowledge_graph.query import GQLQueryExecutor
+from aico.ai.knowledge_graph.stats import read_graph_stats
 from backend.api.kg.schemas import (
     GQLQueryRequest,
     GQLQueryResponse,
@@ -143,37 +145,14 @@ async def get_graph_stats(
         
         logger.info(f"Fetching graph stats for user {user_id}")
         
-        # Get node count
-        node_count = db_connection.execute(
-            "SELECT COUNT(*) FROM kg_nodes WHERE user_id = ? AND is_current = 1",
-            [user_id]
-        ).fetchone()[0]
-        
-        # Get edge count
-        edge_count = db_connection.execute(
-            "SELECT COUNT(*) FROM kg_edges WHERE user_id = ? AND is_current = 1",
-            [user_id]
-        ).fetchone()[0]
-        
-        # Get node type distribution
-        node_types_raw = db_connection.execute(
-            "SELECT label, COUNT(*) FROM kg_nodes WHERE user_id = ? AND is_current = 1 GROUP BY label",
-            [user_id]
-        ).fetchall()
-        node_types = {row[0]: row[1] for row in node_types_raw}
-        
-        # Get edge type distribution
-        edge_types_raw = db_connection.execute(
-            "SELECT relation_type, COUNT(*) FROM kg_edges WHERE user_id = ? AND is_current = 1 GROUP BY relation_type",
-            [user_id]
-        ).fetchall()
-        edge_types = {row[0]: row[1] for row in edge_types_raw}
+        # Materialized per-user counts (kg_stats), read off the event loop
+        stats = await asyncio.to_thread(read_graph_stats, db_connection, user_id)
         
         return GraphStatsResponse(
-            total_nodes=node_count,
-            total_edges=edge_count,
-            node_types=node_types,
-            edge_types=edge_types,
+            total_nodes=stats["total_nodes"],
+            total_edges=stats["total_edges"],
+            node_types=stats["node_types"],
+            edge_types=stats["edge_types"],
             user_id=user_id
         )
         
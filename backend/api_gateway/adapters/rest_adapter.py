@@ -203,6 +203,7 @@ class RESTAdapter:
     async def stop(self):
         """Stop REST adapter (no separate server to stop)"""
         # REST adapter now integrates with main FastAPI app - no separate server to stop
+        await self.encryption_middleware.shutdown()
         self.logger.info("REST adapter stopped")
     
     def get_app(self) -> FastAPI:
@@ -7,12 +7,14 @@ Real-time bidirectional communication with:
 - Message framing
 - Authentication
 - Subscription management
+- Topic-indexed fan-out with bounded per-connection outbound queues
 """
 
 import asyncio
 import json
+import time
 import websockets
-from typing import Dict, Any, Optional, Set
+from typing import Dict, Any, Optional, Set, Tuple
 from dataclasses import dataclass
 import sys
 from pathlib import Path
@@ -47,9 +49,34 @@ class WebSocketConnection:
     last_heartbeat: float = 0
     authenticated: bool = False
     
+    # Broadcast delivery: frames are queued with their enqueue time and
+    # drained by a per-connection sender task
+    outbound: Optional[asyncio.Queue] = None
+    sender_task: Optional[asyncio.Task] = None
+    frames_sent: int = 0
+    frames_dropped: int = 0
+    last_lag_ms: float = 0.0
+    max_lag_ms: float = 0.0
+    
+    # Set once the connection starts closing, so it is closed exactly once
+    closing: bool = False
+    close_task: Optional[asyncio.Task] = None
+    
     def __post_init__(self):
         if self.subscriptions is None:
             self.subscriptions = set()
+    
+    def lag_metrics(self) -> Dict[str, Any]:
+        """Per-connection broadcast delivery metrics"""
+        return {
+            "client_id": self.client_id,
+            "user_uuid": self.user_uuid,
+            "queued": self.outbound.qsize() if self.outbound else 0,
+            "frames_sent": self.frames_sent,
+            "frames_dropped": self.frames_dropped,
+            "last_lag_ms": round(self.last_lag_ms, 2),
+            "max_lag_ms": round(self.max_lag_ms, 2)
+        }
 
 
 class WebSocketAdapter:
@@ -62,8 +89,16 @@ class WebSocketAdapter:
     - Heartbeat/keepalive mechanism
     - Topic subscriptions
     - Authentication and authorization
+    
+    Broadcasts are serialized once per payload and fanned out through a
+    topic -> client_id index, so cost scales with subscribers rather than
+    total connections. Each connection drains its own bounded queue, so a
+    slow client only delays itself; when its queue is full the configured
+    slow consumer policy either drops the oldest frame or disconnects it.
     """
     
+    SLOW_CONSUMER_POLICIES = ("drop_oldest", "disconnect")
+    
     def __init__(self, config: Dict[str, Any], auth_manager: AuthenticationManager,
                  authz_manager: AuthorizationManager, message_router: MessageRouter,
                  rate_limiter: RateLimiter, validator: MessageValidator):
@@ -81,13 +116,24 @@ class WebSocketAdapter:
         
         # Connection management
         self.connections: Dict[str, WebSocketConnection] = {}
+        self.topic_subscribers: Dict[str, Set[str]] = {}
         self.server = None
         
+        # Closes scheduled from synchronous code paths (slow consumers)
+        self._close_tasks: Set[asyncio.Task] = set()
+        
         # Configuration
         self.port = config.get("port", 8772)
         self.path = config.get("path", "/ws")
         self.heartbeat_interval = config.get("heartbeat_interval", 30)
         self.max_connections = config.get("max_connections", 1000)
+        self.outbound_queue_size = config.get("outbound_queue_size", 256)
+        self.slow_consumer_policy = config.get("slow_consumer_policy", "drop_oldest")
+        if self.slow_consumer_policy not in self.SLOW_CONSUMER_POLICIES:
+            raise ValueError(
+                f"Invalid slow_consumer_policy '{self.slow_consumer_policy}', "
+                f"expected one of {self.SLOW_CONSUMER_POLICIES}"
+            )
         
         # Heartbeat task
         self.heartbeat_task = None
@@ -95,7 +141,9 @@ class WebSocketAdapter:
         self.logger.info("WebSocket adapter initialized", extra={
             "port": self.port,
             "path": self.path,
-            "heartbeat_interval": self.heartbeat_interval
+            "heartbeat_interval": self.heartbeat_interval,
+            "outbound_queue_size": self.outbound_queue_size,
+            "slow_consumer_policy": self.slow_consumer_policy
         })
     
     async def start(self, host: str):
@@ -136,6 +184,8 @@ class WebSocketAdapter:
             # Close all connections
             for connection in list(self.connections.values()):
                 await self._close_connection(connection, "Server shutdown")
+            if self._close_tasks:
+                await asyncio.gather(*self._close_tasks, return_exceptions=True)
             
             # Stop server
             if self.server:
@@ -161,8 +211,10 @@ class WebSocketAdapter:
             connection = WebSocketConnection(
                 websocket=websocket,
                 client_id=client_id,
-                last_heartbeat=asyncio.get_event_loop().time()
+                last_heartbeat=asyncio.get_event_loop().time(),
+                outbound=asyncio.Queue(maxsize=self.outbound_queue_size)
             )
+            connection.sender_task = asyncio.create_task(self._sender_loop(connection))
             
             self.connections[client_id] = connection
             
@@ -325,6 +377,7 @@ class WebSocketAdapter:
             
             # Add subscription
             connection.subscriptions.add(topic)
+            self.topic_subscribers.setdefault(topic, set()).add(connection.client_id)
             
             await self._send_message(connection, {
                 "type": "subscribed",
@@ -346,6 +399,7 @@ class WebSocketAdapter:
             
             # Remove subscription
             connection.subscriptions.discard(topic)
+            self._remove_from_topic_index(connection.client_id, topic)
             
             await self._send_message(connection, {
                 "type": "unsubscribed",
@@ -459,6 +513,10 @@ class WebSocketAdapter:
     
     async def _close_connection(self, connection: WebSocketConnection, reason: str = "Unknown"):
         """Close WebSocket connection and revoke session if exists"""
+        if connection.closing:
+            return
+        connection.closing = True
+        
         try:
             # Revoke session if exists
             if self.session_service and connection.session_id:
@@ -476,6 +534,12 @@ class WebSocketAdapter:
             if connection.client_id in self.connections:
                 del self.connections[connection.client_id]
             
+            for topic in connection.subscriptions:
+                self._remove_from_topic_index(connection.client_id, topic)
+            
+            if connection.sender_task and connection.sender_task is not asyncio.current_task():
+                connection.sender_task.cancel()
+            
             if not connection.websocket.closed:
                 await connection.websocket.close(code=1000, reason=reason)
             
@@ -519,25 +583,105 @@ class WebSocketAdapter:
             "total_connections": len(self.connections),
             "authenticated_connections": authenticated_count,
             "max_connections": self.max_connections,
-            "heartbeat_interval": self.heartbeat_interval
+            "heartbeat_interval": self.heartbeat_interval,
+            "active_topics": len(self.topic_subscribers),
+            "frames_dropped": sum(conn.frames_dropped for conn in self.connections.values()),
+            "max_lag_ms": max((conn.max_lag_ms for conn in self.connections.values()), default=0.0)
         }
     
+    def get_connection_lag_metrics(self) -> Dict[str, Dict[str, Any]]:
+        """Get per-connection broadcast lag metrics keyed by client_id"""
+        return {client_id: conn.lag_metrics() for client_id, conn in self.connections.items()}
+    
+    def _remove_from_topic_index(self, client_id: str, topic: str):
+        """Remove a connection from a topic's subscriber set, dropping empty topics"""
+        subscribers = self.topic_subscribers.get(topic)
+        if subscribers is None:
+            return
+        subscribers.discard(client_id)
+        if not subscribers:
+            del self.topic_subscribers[topic]
+    
+    def _enqueue_frame(self, connection: WebSocketConnection, frame: str) -> bool:
+        """
+        Queue a serialized frame for a connection without blocking.
+        
+        Returns False if the connection is being disconnected as a slow consumer.
+        """
+        if connection.closing or connection.close_task is not None:
+            return False
+        
+        item: Tuple[float, str] = (time.perf_counter(), frame)
+        try:
+            connection.outbound.put_nowait(item)
+            return True
+        except asyncio.QueueFull:
+            pass
+        
+        if self.slow_consumer_policy == "disconnect":
+            self.logger.warning("Disconnecting slow WebSocket consumer", extra={
+                "client_id": connection.client_id,
+                "queued": connection.outbound.qsize()
+            })
+            self._schedule_close(connection, "Slow consumer")
+            return False
+        
+        # drop_oldest: make room by discarding the stalest frame
+        try:
+            connection.outbound.get_nowait()
+            connection.frames_dropped += 1
+        except asyncio.QueueEmpty:
+            pass
+        connection.outbound.put_nowait(item)
+        return True
+    
+    def _schedule_close(self, connection: WebSocketConnection, reason: str):
+        """Close a connection from synchronous code, keeping a reference to the task"""
+        if connection.closing or connection.close_task is not None:
+            return
+        task = asyncio.create_task(self._close_connection(connection, reason))
+        connection.close_task = task
+        self._close_tasks.add(task)
+        task.add_done_callback(self._close_tasks.discard)
+    
+    async def _sender_loop(self, connection: WebSocketConnection):
+        """Drain a connection's outbound queue, recording delivery lag"""
+        try:
+            while True:
+                enqueued_at, frame = await connection.outbound.get()
+                try:
+                    await connection.websocket.send(frame)
+                except websockets.exceptions.ConnectionClosed:
+                    return # Connection cleanup is handled by _handle_connection
+                lag_ms = (time.perf_counter() - enqueued_at) * 1000
+                connection.frames_sent += 1
+                connection.last_lag_ms = lag_ms
+                if lag_ms > connection.max_lag_ms:
+                    connection.max_lag_ms = lag_ms
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            self.logger.error(f"WebSocket sender error for {connection.client_id}: {e}")
+    
     async def broadcast_to_subscribers(self, topic: str, message: Dict[str, Any]):
         """Broadcast message to all subscribers of a topic"""
-        subscribers = [
-            conn for conn in self.connections.values()
-            if topic in conn.subscriptions and conn.authenticated
-        ]
+        subscriber_ids = self.topic_subscribers.get(topic)
+        if not subscriber_ids:
+            return
         
-        if subscribers:
-            broadcast_message = {
-                "type": "broadcast",
-                "topic": topic,
-                "data": message
-            }
-            
-            # Send to all subscribers
-            for connection in subscribers:
-                await self._send_message(connection, broadcast_message)
-            
-            self.logger.debug(f"Broadcasted to {len(subscribers)} subscribers on topic: {topic}")
+        # Serialize once per payload; every subscriber receives the same frame
+        frame = json.dumps({
+            "type": "broadcast",
+            "topic": topic,
+            "data": message
+        })
+        
+        delivered = 0
+        for client_id in list(subscriber_ids):
+            connection = self.connections.get(client_id)
+            if connection is None or not connection.authenticated:
+                continue
+            if self._enqueue_frame(connection, frame):
+                delivered += 1
+        
+        self.logger.debug(f"Broadcasted to {delivered} subscribers on topic: {topic}")
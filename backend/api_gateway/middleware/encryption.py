@@ -6,7 +6,9 @@ while maintaining JSON API compatibility.
 """
 
 import json
+import base64
 import asyncio
+from pathlib import Path
 from typing import Dict, Any, Optional, Callable
 from fastapi import FastAPI, Request, Response, HTTPException
 from fastapi.responses import JSONResponse
@@ -14,7 +16,10 @@ from starlette.types import ASGIApp, Receive, Send, Scope
 
 from aico.core.logging import get_logger
 from aico.security.key_manager import AICOKeyManager
-from aico.security.transport import TransportIdentityManager, SecureTransportChannel
+from aico.security.transport import (
+    TransportIdentityManager, SecureTransportChannel, StreamEncryptor,
+    BINARY_CONTENT_TYPE, BINARY_STREAM_CONTENT_TYPE, FRAMING_BINARY
+)
 from aico.security.exceptions import EncryptionError, DecryptionError
 
 
@@ -51,16 +56,21 @@ class EncryptionMiddleware:
         
         # Session management from configuration
         session_config = config.get("session", {})
-        self.sessions: Dict[str, Dict[str, Any]] = {}
         self.session_timeout = session_config.get("timeout_seconds", 3600)
         self.handshake_timeout = session_config.get("handshake_timeout_seconds", 30)
         self.max_sessions_per_client = session_config.get("max_sessions_per_client", 5)
+        self.cleanup_interval = session_config.get("cleanup_interval_seconds", 300)
+        self.cleanup_task: Optional[asyncio.Task] = None
         
         # Message settings
         message_config = config.get("message", {})
         self.max_payload_size = message_config.get("max_payload_size", 1048576)
         self.compression_enabled = message_config.get("compression_enabled", True)
         self.compression_threshold = message_config.get("compression_threshold", 1024)
+        self.binary_framing = message_config.get("binary_framing", True)
+        self.compression_dictionary = self._load_compression_dictionary(
+            message_config.get("compression_dictionary")
+        )
         
         # Configuration
         self.require_encryption = True
@@ -84,6 +94,10 @@ class EncryptionMiddleware:
             await self.app(scope, receive, send)
             return
         
+        # Start expired channel cleanup lazily (needs a running event loop)
+        if self.cleanup_task is None:
+            self.cleanup_task = asyncio.create_task(self._cleanup_loop())
+        
         # Create request object for processing
         request = Request(scope, receive)
         path = request.url.path
@@ -124,36 +138,31 @@ class EncryptionMiddleware:
             request = Request(scope, receive)
             body = await request.body()
             
-            # Try to get client_id from request body first (for encrypted requests)
-            client_id = None
-            channel = None
-            
-            if body:
+            # Resolve the channel from the X-Client-ID header, then the envelope's
+            # client_id, then the query string. The envelope is parsed once here
+            # and reused for decryption below.
+            is_binary_request = BINARY_CONTENT_TYPE in request.headers.get("content-type", "")
+            envelope = None
+            if body and not is_binary_request:
                 try:
-                    request_data = json.loads(body)
-                    if "client_id" in request_data:
-                        client_id = request_data["client_id"]
-                        channel = self.channels.get(client_id)
-                        self.logger.debug(f"Found client_id in request body: {client_id}")
-                except:
+                    envelope = json.loads(body)
+                except (json.JSONDecodeError, UnicodeDecodeError):
                     pass
+                if not isinstance(envelope, dict):
+                    envelope = None
             
-            # For GET requests, check query parameters and headers for client_id
-            if not channel and request.method == "GET":
-                # Try X-Client-ID header
-                header_client_id = request.headers.get("x-client-id")
-                if header_client_id:
-                    client_id = header_client_id
-                    channel = self.channels.get(client_id)
-                    self.logger.debug(f"Found client_id in X-Client-ID header: {client_id}")
-                
-                # Try query parameter
-                if not channel:
-                    query_client_id = request.query_params.get("client_id")
-                    if query_client_id:
-                        client_id = query_client_id
-                        channel = self.channels.get(client_id)
-                        self.logger.debug(f"Found client_id in query params: {client_id}")
+            client_id = None
+            channel = None
+            for candidate in (
+                request.headers.get("x-client-id"),
+                envelope.get("client_id") if envelope else None,
+                request.query_params.get("client_id")
+            ):
+                if candidate and candidate in self.channels:
+                    client_id = candidate
+                    channel = self.channels[candidate]
+                    self.logger.debug(f"Found channel for client_id: {client_id}")
+                    break
             
             # Fallback to generated client_id if not found in request
             if not channel:
@@ -198,9 +207,14 @@ class EncryptionMiddleware:
             response_start_sent = False
             cached_start_message = None
             is_streaming_response = False
+            stream: Optional[StreamEncryptor] = None
+            stream_json_lines = False
+            stream_binary = False
+            stream_buffer = bytearray()
             
             async def encrypt_send(message):
                 nonlocal response_start_sent, cached_start_message, is_streaming_response
+                nonlocal stream, stream_json_lines, stream_binary
                 
                 if message["type"] == "http.response.start":
                     # Check if this is a streaming response
@@ -217,6 +231,14 @@ class EncryptionMiddleware:
                     
                     if is_streaming_response:
                         # For streaming responses, send start immediately and encrypt each chunk
+                        stream = channel.stream_encryptor()
+                        stream_json_lines = "json" in content_type
+                        stream_binary = channel.transport.framing == FRAMING_BINARY
+                        if stream_binary:
+                            message["headers"] = [
+                                (name, value) for name, value in message.get("headers", [])
+                                if name.lower() not in (b"content-type", b"content-length")
+                            ] + [(b"content-type", BINARY_STREAM_CONTENT_TYPE.encode())]
                         await send(message)
                         response_start_sent = True
                     else:
@@ -227,64 +249,38 @@ class EncryptionMiddleware:
                     body = message.get("body", b"")
                     
                     if is_streaming_response:
-                        # Streaming response: encrypt each chunk individually
-                        encrypted_body = body
-                        
-                        if body:
-                            try:
-                                # Try to parse as JSON line (NDJSON format)
-                                chunk_text = body.decode().strip()
-                                if chunk_text:
-                                    chunk_data = json.loads(chunk_text)
-                                    encrypted_payload = channel.encrypt_json_payload(chunk_data)
-                                    encrypted_chunk = {
-                                        "encrypted": True,
-                                        "payload": encrypted_payload,
-                                        "encryption": "xchacha20poly1305"
-                                    }
-                                    encrypted_body = (json.dumps(encrypted_chunk) + "\n").encode()
-                            except (json.JSONDecodeError, UnicodeDecodeError):
-                                # Not JSON or decode failed, encrypt as raw data
-                                if body:
-                                    try:
-                                        # Encrypt raw bytes as base64
-                                        import base64
-                                        encoded_body = base64.b64encode(body).decode()
-                                        encrypted_payload = channel.encrypt_json_payload({"raw_data": encoded_body})
-                                        encrypted_chunk = {
-                                            "encrypted": True,
-                                            "payload": encrypted_payload,
-                                            "encryption": "xchacha20poly1305",
-                                            "type": "raw"
-                                        }
-                                        encrypted_body = (json.dumps(encrypted_chunk) + "\n").encode()
-                                    except Exception:
-                                        # Encryption failed, pass through (should not happen)
-                                        pass
-                        
-                        # Send encrypted chunk
-                        message["body"] = encrypted_body
+                        # Streaming response: encrypt each line as serialized, one AEAD operation per line
+                        message["body"] = self._encrypt_stream_chunk(
+                            stream, stream_buffer, body,
+                            json_lines=stream_json_lines,
+                            binary=stream_binary,
+                            final=not message.get("more_body", False)
+                        )
                         await send(message)
                         
                     else:
-                        # Regular response: encrypt complete body as JSON
+                        # Regular response: encrypt the serialized JSON body as-is
                         encrypted_body = body  # Default to original body
+                        binary_body = False
                         
                         try:
-                            if body:
-                                response_data = json.loads(body.decode())
-                                encrypted_payload = channel.encrypt_json_payload(response_data)
-                                encrypted_response = {
-                                    "encrypted": True,
-                                    "payload": encrypted_payload,
-                                    "encryption": "xchacha20poly1305"
-                                }
-                                encrypted_body = json.dumps(encrypted_response).encode()
-                        except (json.JSONDecodeError, Exception):
-                            # Not JSON or encryption failed, use original body
+                            if body and self._is_json_body(cached_start_message, body):
+                                ciphertext = channel.encrypt_bytes(body)
+                                if channel.transport.framing == FRAMING_BINARY:
+                                    encrypted_body = ciphertext
+                                    binary_body = True
+                                else:
+                                    encrypted_response = {
+                                        "encrypted": True,
+                                        "payload": base64.b64encode(ciphertext).decode(),
+                                        "encryption": "xchacha20poly1305"
+                                    }
+                                    encrypted_body = json.dumps(encrypted_response).encode()
+                        except Exception:
+                            # Encryption failed, use original body
                             pass
                         
-                        # Update Content-Length in cached start message if we have one
+                        # Update Content-Length (and Content-Type for binary frames) in cached start message
                         if cached_start_message and not response_start_sent:
                             headers = list(cached_start_message.get("headers", []))
                             updated_headers = []
@@ -292,6 +288,8 @@ class EncryptionMiddleware:
                             for name, value in headers:
                                 if name.lower() == b"content-length":
                                     updated_headers.append((name, str(len(encrypted_body or b"")).encode()))
+                                elif binary_body and name.lower() == b"content-type":
+                                    updated_headers.append((name, BINARY_CONTENT_TYPE.encode()))
                                 else:
                                     updated_headers.append((name, value))
                             
@@ -306,72 +304,39 @@ class EncryptionMiddleware:
                     await send(message)
             
             # Check if request is encrypted and decrypt if needed
-            if body:
-                try:
-                    request_data = json.loads(body)
-                    if request_data.get("encrypted") and "payload" in request_data:
-                        # Decrypt the payload
-                        encrypted_payload = request_data["payload"]
-                        self.logger.info(f"Attempting to decrypt payload for client_id: {client_id}")
-                        self.logger.info(f"Channel session valid: {channel.is_session_valid()}")
-                        self.logger.info(f"Encrypted payload length: {len(encrypted_payload)}")
-                        
-                        try:
-                            decrypted_data = channel.decrypt_json_payload(encrypted_payload)
-                            self.logger.debug(f"Successfully decrypted request payload: {decrypted_data}")
-                            
-                            # Replace the request body with decrypted data
-                            decrypted_body = json.dumps(decrypted_data).encode()
-                            
-                            # Create new scope with updated content-length but preserve all headers
-                            new_scope = scope.copy()
-                            headers = list(scope.get("headers", []))
-                            
-                            # Update content-length header
-                            updated_headers = []
-                            content_length_updated = False
-                            for name, value in headers:
-                                if name.lower() == b"content-length":
-                                    updated_headers.append((name, str(len(decrypted_body)).encode()))
-                                    content_length_updated = True
-                                else:
-                                    updated_headers.append((name, value))
-                            
-                            # Add content-length if not present
-                            if not content_length_updated:
-                                updated_headers.append((b"content-length", str(len(decrypted_body)).encode()))
-                            
-                            new_scope["headers"] = updated_headers
-                            
-                            # Create a new receive callable with the decrypted body
-                            message_sent = False
-                            async def new_receive():
-                                nonlocal message_sent
-                                if not message_sent:
-                                    message_sent = True
-                                    return {
-                                        "type": "http.request",
-                                        "body": decrypted_body,
-                                        "more_body": False
-                                    }
-                                else:
-                                    # For subsequent calls (like streaming disconnect detection), 
-                                    # delegate to original receive
-                                    return await receive()
-                            
-                            # Forward the request with decrypted body and encrypted response
-                            await self.app(new_scope, new_receive, encrypt_send)
-                            return
-                            
-                        except Exception as e:
-                            self.logger.error(f"Decryption failed with error: {e}")
-                            # Let's also check if the channel has the right session info
-                            self.logger.error(f"Channel session_established: {getattr(channel, 'session_established', 'N/A')}")
-                            self.logger.error(f"Channel session_box exists: {hasattr(channel, 'session_box') and channel.session_box is not None}")
-                            raise
-                except json.JSONDecodeError:
-                    # Not JSON, pass through
-                    pass
+            if body and is_binary_request:
+                decrypted_body = channel.decrypt_bytes(body)
+                await self.app(
+                    self._with_body(scope, decrypted_body, content_type=b"application/json"),
+                    self._body_receive(decrypted_body, receive),
+                    encrypt_send
+                )
+                return
+            
+            if envelope is not None:
+                request_data = envelope
+                if request_data.get("encrypted") and "payload" in request_data:
+                    # Decrypt the payload
+                    encrypted_payload = request_data["payload"]
+                    self.logger.debug(f"Decrypting payload for client_id: {client_id} ({len(encrypted_payload)} chars)")
+                    
+                    try:
+                        # The plaintext is the client's serialized JSON; forward it unchanged
+                        decrypted_body = channel.decrypt_bytes(base64.b64decode(encrypted_payload))
+                    except Exception as e:
+                        self.logger.error(f"Decryption failed with error: {e}")
+                        # Let's also check if the channel has the right session info
+                        self.logger.error(f"Channel session_established: {getattr(channel, 'session_established', 'N/A')}")
+                        self.logger.error(f"Channel session_box exists: {hasattr(channel, 'session_box') and channel.session_box is not None}")
+                        raise
+                    
+                    # Forward the request with decrypted body and encrypted response
+                    await self.app(
+                        self._with_body(scope, decrypted_body),
+                        self._body_receive(decrypted_body, receive),
+                        encrypt_send
+                    )
+                    return
             
             # Pass through unencrypted requests but encrypt responses for valid sessions
             await self.app(scope, receive, encrypt_send)
@@ -428,6 +393,99 @@ class EncryptionMiddleware:
         user_agent = request.headers.get("user-agent", "unknown")
         return f"{client_ip}:{hash(user_agent)}"
     
+    @staticmethod
+    def _with_body(scope: Scope, body: bytes, content_type: Optional[bytes] = None) -> Scope:
+        """Copy of scope whose headers describe the replacement body."""
+        new_scope = scope.copy()
+        updated_headers = [
+            (name, value) for name, value in scope.get("headers", [])
+            if name.lower() != b"content-length" and not (content_type and name.lower() == b"content-type")
+        ]
+        updated_headers.append((b"content-length", str(len(body)).encode()))
+        if content_type:
+            updated_headers.append((b"content-type", content_type))
+        new_scope["headers"] = updated_headers
+        return new_scope
+    
+    @staticmethod
+    def _body_receive(body: bytes, receive: Receive) -> Receive:
+        """Receive callable that yields body once, then delegates (disconnect detection)."""
+        message_sent = False
+        
+        async def new_receive():
+            nonlocal message_sent
+            if not message_sent:
+                message_sent = True
+                return {"type": "http.request", "body": body, "more_body": False}
+            return await receive()
+        
+        return new_receive
+    
+    @staticmethod
+    def _encrypt_stream_chunk(
+        stream: StreamEncryptor,
+        buffer: bytearray,
+        body: bytes,
+        json_lines: bool,
+        binary: bool,
+        final: bool
+    ) -> bytes:
+        """
+        Encrypt a streamed body message without re-parsing it.
+        
+        JSON streams (NDJSON) are encrypted per complete line; a trailing
+        partial line waits for the next message. Other streams are encrypted
+        per body message. Binary framing emits length-prefixed ciphertext
+        frames, otherwise each unit becomes an NDJSON envelope line.
+        """
+        if json_lines:
+            buffer.extend(body)
+            end = len(buffer) if final else buffer.rfind(b"\n") + 1
+            units = [line.strip() for line in bytes(buffer[:end]).split(b"\n")]
+            del buffer[:end]
+        else:
+            units = [body]
+        
+        encrypted = []
+        for unit in units:
+            if not unit:
+                continue
+            if binary:
+                encrypted.append(stream.frame(unit))
+            elif json_lines:
+                payload = base64.b64encode(stream.encrypt(unit))
+                encrypted.append(b'{"encrypted":true,"payload":"' + payload + b'","encryption":"xchacha20poly1305"}\n')
+            else:
+                # Legacy raw chunk: base64 data inside an encrypted JSON object
+                payload = base64.b64encode(stream.encrypt(b'{"raw_data":"' + base64.b64encode(unit) + b'"}'))
+                encrypted.append(
+                    b'{"encrypted":true,"payload":"' + payload + b'","encryption":"xchacha20poly1305","type":"raw"}\n'
+                )
+        return b"".join(encrypted)
+    
+    @staticmethod
+    def _is_json_body(start_message: Optional[Dict[str, Any]], body: bytes) -> bool:
+        """JSON responses are recognized by Content-Type; unlabeled bodies are parsed."""
+        if start_message:
+            for name, value in start_message.get("headers", []):
+                if name.lower() == b"content-type" and b"json" in value.lower():
+                    return True
+        try:
+            json.loads(body)
+            return True
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            return False
+    
+    def _load_compression_dictionary(self, path: Optional[str]) -> Optional[bytes]:
+        """Read the optional preset compression dictionary shared with clients."""
+        if not path:
+            return None
+        try:
+            return Path(path).expanduser().read_bytes()
+        except OSError as e:
+            self.logger.warning(f"Compression dictionary not loaded ({path}): {e}")
+            return None
+    
     async def _handle_handshake(self, request: Request) -> Response:
         """Handle encryption handshake"""
         try:
@@ -459,14 +517,27 @@ class EncryptionMiddleware:
                 self.channels[client_id] = channel
                 self.logger.info(f"Stored channel for client_id: {client_id}")
                 
+                content = {
+                    "status": "session_established",
+                    "handshake_response": response_data
+                }
+                
+                # Clients announcing transport capabilities get negotiated payload
+                # options; others keep the original base64/JSON format
+                capabilities = handshake_data.get("transport")
+                if isinstance(capabilities, dict):
+                    options = channel.negotiate_transport(
+                        capabilities,
+                        compression_enabled=self.compression_enabled,
+                        compression_threshold=self.compression_threshold,
+                        binary_framing=self.binary_framing,
+                        dictionary=self.compression_dictionary,
+                        max_payload_size=self.max_payload_size
+                    )
+                    content["transport"] = options.to_dict()
+                
                 # Return handshake response in transit security test format
-                return JSONResponse(
-                    status_code=200,
-                    content={
-                        "status": "session_established",
-                        "handshake_response": response_data
-                    }
-                )
+                return JSONResponse(status_code=200, content=content)
             
             return JSONResponse(
                 status_code=400,
@@ -567,7 +638,7 @@ class EncryptionMiddleware:
         content_type = response.headers.get("content-type", "")
         return "application/json" in content_type
     
-    def cleanup_expired_channels(self):
+    def cleanup_expired_channels(self) -> int:
         """Clean up expired channels"""
         expired_clients = [
             client_id for client_id, channel in self.channels.items()
@@ -577,6 +648,35 @@ class EncryptionMiddleware:
         for client_id in expired_clients:
             del self.channels[client_id]
             self.logger.debug(f"Cleaned up expired channel for {client_id}")
+        
+        return len(expired_clients)
+    
+    async def _cleanup_loop(self):
+        """Background cleanup of expired channels"""
+        while True:
+            try:
+                await asyncio.sleep(self.cleanup_interval)
+                removed = self.cleanup_expired_channels()
+                if removed:
+                    self.logger.info(f"Cleaned up {removed} expired encryption channels")
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Channel cleanup loop error: {e}")
+    
+    async def shutdown(self):
+        """Stop the channel cleanup loop (the cancelled task stays set so it is not restarted)"""
+        cleanup_task = getattr(self, "cleanup_task", None)  # Unset when encryption is disabled
+        if cleanup_task and not cleanup_task.done():
+            cleanup_task.cancel()
+            try:
+                await cleanup_task
+            except asyncio.CancelledError:
+                pass  # Expected during shutdown - task cancellation is intentional
+        
+        if self.enabled:
+            self.channels.clear()
+        self.logger.info("Encryption middleware shutdown")
 
 
 class WebSocketEncryptionHandler:
@@ -150,6 +150,10 @@ class BackendLifecycleManager:
         # Stop protocol adapters first
         await self._stop_protocol_adapters()
         
+        # Stop the encryption middleware's channel cleanup loop
+        if isinstance(self.app, EncryptionMiddleware):
+            await self.app.shutdown()
+        
         # Stop service container
         if self.container:
             services = list(self.container._definitions.keys())
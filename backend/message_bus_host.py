@@ -18,6 +18,7 @@ from aico.core.logging import get_logger
 from aico.core.topics import AICOTopics
 from aico.proto.aico_core_api_gateway_pb2 import ApiEvent
 from aico.data.libsql.encrypted import EncryptedLibSQLConnection
+from aico.data.libsql.partitions import TimePartitioner
 from aico.security.key_manager import AICOKeyManager
 from aico.core.paths import AICOPaths
 
@@ -34,6 +35,7 @@ class AICOMessageBusHost:
         
         # Database integration
         self.db_connection: Optional[EncryptedLibSQLConnection] = None
+        self.events_partitioner: Optional[TimePartitioner] = None
         
         # Module registry
         self.modules: Dict[str, MessageBusClient] = {}
@@ -296,6 +298,9 @@ class AICOMessageBusHost:
         import json
         from google.protobuf.message import Message as ProtobufMessage
         
+        # Optional day/week partitions for the events table (core.scheduler.retention.partitioning)
+        self.events_partitioner = TimePartitioner.from_config(db_connection, "events", ConfigurationManager())
+        
         async def persist_message(message):
             """Persist a message to the database"""
             # During shutdown, queue messages for draining instead of skipping
@@ -350,8 +355,9 @@ class AICOMessageBusHost:
                 })
                 
                 # Insert message into database (using actual protobuf fields)
-                db_connection.execute("""
-                    INSERT INTO events (
+                table = self.events_partitioner.table_for(timestamp) if self.events_partitioner else "events"
+                db_connection.execute(f"""
+                    INSERT INTO {table} (
                         timestamp, topic, source, message_type, message_id,
                         priority, correlation_id, payload, metadata
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -460,8 +466,9 @@ class AICOMessageBusHost:
                     metadata_json = json.dumps({'attributes': {}, 'version': '1.0'})
                 
                 # Insert message into database synchronously for reliability
-                self.db_connection.execute("""
-                    INSERT INTO events (
+                table = self.events_partitioner.table_for(timestamp_str) if self.events_partitioner else "events"
+                self.db_connection.execute(f"""
+                    INSERT INTO {table} (
                         timestamp, topic, source, message_type, message_id,
                         priority, correlation_id, payload, metadata
                     ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
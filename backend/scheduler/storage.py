@@ -11,6 +11,7 @@ from typing import Any, Dict, List, Optional, Tuple
 from dataclasses import asdict
 
 from aico.core.logging import get_logger
+from aico.data.libsql.retention import RetentionEngine, RetentionPolicy
 from .tasks.base import TaskStatus, TaskResult
 
 
@@ -325,17 +326,15 @@ class TaskStore:
         
         return await asyncio.to_thread(_sync_release)
     
-    def cleanup_old_executions(self, retention_days: int = 30):
-        """Clean up old execution records"""
+    async def cleanup_old_executions(self, retention_days: int = 30, engine: Optional[RetentionEngine] = None) -> int:
+        """Clean up old execution records in batches (see RetentionEngine)"""
         try:
             cutoff_date = (datetime.now() - timedelta(days=retention_days)).isoformat()
             
-            cursor = self.db.execute(
-                "DELETE FROM task_executions WHERE started_at < ?", (cutoff_date,)
-            )
-            self.db.commit()
+            engine = engine or RetentionEngine(self.db)
+            result = await engine.purge(RetentionPolicy("task_executions", "started_at", cutoff_date))
             
-            deleted_count = cursor.rowcount
+            deleted_count = result.deleted
             if deleted_count > 0:
                 self.logger.info(f"Cleaned up {deleted_count} old task execution records")
             
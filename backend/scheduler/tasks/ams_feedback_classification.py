@@ -9,9 +9,10 @@ Schedule: Daily at 3 AM (configurable via cron)
 
 import asyncio
 from datetime import datetime, timedelta
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 
 from aico.core.logging import get_logger
+from aico.ai.utils.similarity import EmbeddingMatrix, cosine_similarity_matrix
 from .base import BaseTask, TaskContext, TaskResult
 
 logger = get_logger("backend", "scheduler.tasks.ams_feedback_classification")
@@ -33,10 +34,14 @@ class FeedbackClassificationTask(BaseTask):
     default_config = {
         "enabled": True,
         "schedule": "0 3 * * *",  # Daily at 3 AM
-        "batch_size": 100,
-        "similarity_threshold": 0.20  # Lower threshold for label-only comparison
+        "batch_size": 100,  # Events per embedding batch; every pending event is processed per run
+        "similarity_threshold": 0.20,  # Lower threshold for label-only comparison
+        "embedding_model": "paraphrase-multilingual"
     }
     
+    # Category label embeddings per embedding model
+    _label_embeddings: Dict[str, EmbeddingMatrix] = {}
+    
     # Zero-shot classification: Direct label embeddings (language-agnostic)
     # The multilingual embedding model naturally understands these concepts
     # across 50+ languages without needing explicit translations
@@ -79,19 +84,8 @@ class FeedbackClassificationTask(BaseTask):
                     data={"enabled": False}
                 )
             
-            # Get unprocessed feedback events
             batch_size = context.get_config("batch_size", 100)
-            
-            unprocessed_feedback = context.db_connection.execute(
-                """SELECT event_id, user_id, free_text 
-                   FROM feedback_events 
-                   WHERE processed = FALSE 
-                   AND free_text IS NOT NULL 
-                   AND free_text != ''
-                   AND (reason IS NULL OR reason = '')
-                   LIMIT ?""",
-                (batch_size,)
-            ).fetchall()
+            unprocessed_feedback = self._fetch_unprocessed(context.db_connection, "", batch_size)
             
             if not unprocessed_feedback:
                 print("ℹ️  [AMS_FEEDBACK] No unprocessed feedback to classify")
@@ -102,9 +96,6 @@ class FeedbackClassificationTask(BaseTask):
                     data={"processed": 0}
                 )
             
-            print(f"📊 [AMS_FEEDBACK] Found {len(unprocessed_feedback)} feedback events to process")
-            logger.info(f"🧠 [AMS_FEEDBACK] Processing {len(unprocessed_feedback)} feedback events")
-            
             # Get modelservice for embeddings
             try:
                 from backend.services import get_modelservice_client
@@ -117,57 +108,69 @@ class FeedbackClassificationTask(BaseTask):
                     error=str(e)
                 )
             
-            # Process each feedback event
-            classified_count = 0
             similarity_threshold = context.get_config("similarity_threshold", 0.4)  # Lowered from 0.6 for better matching
+            embedding_model = context.get_config("embedding_model", "paraphrase-multilingual")
             
             print(f"   Using similarity threshold: {similarity_threshold}")
             
-            for idx, (event_id, user_id, free_text) in enumerate(unprocessed_feedback, 1):
+            # Category label embeddings are computed once per model (cached across runs)
+            labels = await self._get_label_embeddings(modelservice, embedding_model)
+            if labels is None:
+                return TaskResult(
+                    success=False,
+                    message="Failed to embed category labels",
+                    error=f"Could not embed category labels with {embedding_model}"
+                )
+            
+            # Classify page by page (one embedding batch, one similarity product
+            # and one committed write each), so an interrupted run keeps the
+            # pages it finished. Unmatched events stay unprocessed, so pages
+            # are keyed on event_id.
+            total_feedback = 0
+            classified_count = 0
+            while unprocessed_feedback:
+                total_feedback += len(unprocessed_feedback)
+                print(f"📊 [AMS_FEEDBACK] Classifying {len(unprocessed_feedback)} feedback events")
+                
                 try:
-                    print(f"  [{idx}/{len(unprocessed_feedback)}] Classifying: {event_id[:8]}... - '{free_text[:50]}...'")
-                    
-                    # Classify feedback using embedding similarity
-                    categories = await self._classify_feedback(
-                        free_text, 
+                    classifications = await self._classify_batch(
+                        [free_text for _, _, free_text in unprocessed_feedback],
                         modelservice,
+                        embedding_model,
+                        labels,
                         similarity_threshold
                     )
-                    
-                    # Debug: show all category scores
-                    print(f"    Category scores: {categories}")
-                    
-                    # Get the top category (highest similarity)
+                except Exception as e:
+                    import traceback
+                    logger.error(f"🧠 [AMS_FEEDBACK] Failed to classify batch: {e}", extra={"traceback": traceback.format_exc()})
+                    classifications = [{}] * len(unprocessed_feedback)
+                
+                updates = []
+                for (event_id, _, _), categories in zip(unprocessed_feedback, classifications):
                     if categories:
+                        # Top category (highest similarity) becomes the reason
                         top_category = max(categories.items(), key=lambda x: x[1])[0]
-                        
-                        # Update feedback event with top category as reason
-                        context.db_connection.execute(
-                            """UPDATE feedback_events 
-                               SET reason = ?, processed = TRUE
-                               WHERE event_id = ?""",
-                            (top_category, event_id)
-                        )
-                        
-                        classified_count += 1
-                        print(f"    ✅ Classified as: {top_category} (confidence: {categories[top_category]:.2f})")
-                        
+                        updates.append((top_category, event_id))
                         logger.debug(f"🧠 [AMS_FEEDBACK] Classified feedback {event_id}: {top_category} from {categories}")
                     else:
-                        print(f"    ⚠️  No category matched (threshold: {similarity_threshold})")
-                        print(f"    Try lowering the threshold in config or check category templates")
                         logger.warning(f"🧠 [AMS_FEEDBACK] No category matched for {event_id}")
-                    
-                except Exception as e:
-                    print(f"    ❌ Error: {type(e).__name__}: {e}")
-                    import traceback
-                    print(f"    Traceback: {traceback.format_exc()}")
-                    logger.error(f"🧠 [AMS_FEEDBACK] Failed to classify {event_id}: {e}", extra={"traceback": traceback.format_exc()})
-            
-            context.db_connection.commit()
+                
+                # One batched write per page (execute_many commits)
+                if updates:
+                    context.db_connection.execute_many(
+                        """UPDATE feedback_events 
+                           SET reason = ?, processed = TRUE
+                           WHERE event_id = ?""",
+                        updates
+                    )
+                    classified_count += len(updates)
+                
+                unprocessed_feedback = self._fetch_unprocessed(
+                    context.db_connection, unprocessed_feedback[-1][0], batch_size
+                )
             
             duration = (datetime.utcnow() - start_time).total_seconds()
-            print(f"\n✅ [AMS_FEEDBACK] Classified {classified_count}/{len(unprocessed_feedback)} events in {duration:.2f}s")
+            print(f"\n✅ [AMS_FEEDBACK] Classified {classified_count}/{total_feedback} events in {duration:.2f}s")
             print("="*60 + "\n")
             logger.info(f"🧠 [AMS_FEEDBACK] ✅ Classified {classified_count} feedback events in {duration:.2f}s")
             
@@ -176,9 +179,9 @@ class FeedbackClassificationTask(BaseTask):
                 message=f"Classified {classified_count} feedback events",
                 duration_seconds=duration,
                 data={
-                    "total_feedback": len(unprocessed_feedback),
+                    "total_feedback": total_feedback,
                     "classified": classified_count,
-                    "failed": len(unprocessed_feedback) - classified_count
+                    "failed": total_feedback - classified_count
                 }
             )
             
@@ -193,85 +196,93 @@ class FeedbackClassificationTask(BaseTask):
                 duration_seconds=execution_time
             )
     
-    async def _classify_feedback(
+    def _fetch_unprocessed(self, db_connection, after_event_id: str, limit: int) -> List[tuple]:
+        """Next page of unclassified feedback events after the given event id."""
+        return db_connection.execute(
+            """SELECT event_id, user_id, free_text 
+               FROM feedback_events 
+               WHERE processed = FALSE 
+               AND free_text IS NOT NULL 
+               AND free_text != ''
+               AND (reason IS NULL OR reason = '')
+               AND event_id > ?
+               ORDER BY event_id
+               LIMIT ?""",
+            (after_event_id, limit)
+        ).fetchall()
+    
+    async def _get_label_embeddings(self, modelservice, embedding_model: str) -> Optional[EmbeddingMatrix]:
+        """
+        Category label embeddings for a model, computed once and cached on the class.
+        
+        Scheduler runs create a new task instance each time, so the cache lives
+        at class level; labels are constants and only the model varies.
+        """
+        labels = FeedbackClassificationTask._label_embeddings.get(embedding_model)
+        if labels is not None:
+            return labels
+        
+        categories = list(self.CATEGORY_LABELS)
+        embeddings = await self._embed_texts(
+            [self.CATEGORY_LABELS[category] for category in categories],
+            modelservice,
+            embedding_model
+        )
+        if any(embedding is None for embedding in embeddings):
+            logger.error(f"🧠 [AMS_FEEDBACK] Failed to embed category labels with {embedding_model}")
+            return None
+        
+        labels = EmbeddingMatrix(zip(categories, embeddings))
+        FeedbackClassificationTask._label_embeddings[embedding_model] = labels
+        return labels
+    
+    async def _embed_texts(self, texts: List[str], modelservice, embedding_model: str) -> List[Optional[List[float]]]:
+        """Embed texts with one batch request; failed items come back as None."""
+        result = await modelservice.get_embeddings_batch(embedding_model, texts)
+        if not result.get('success'):
+            logger.error(f"🧠 [AMS_FEEDBACK] Batch embedding failed: {result.get('error')}")
+            return [None] * len(texts)
+        embeddings = list(result.get('data', {}).get('embeddings', []))
+        embeddings += [None] * (len(texts) - len(embeddings))
+        return [embedding if embedding else None for embedding in embeddings]
+    
+    async def _classify_batch(
         self,
-        feedback_text: str,
+        feedback_texts: List[str],
         modelservice,
+        embedding_model: str,
+        labels: EmbeddingMatrix,
         threshold: float
-    ) -> Dict[str, float]:
+    ) -> List[Dict[str, float]]:
         """
-        Classify feedback text using embedding similarity.
+        Classify feedback texts using embedding similarity.
         
         Args:
-            feedback_text: User's free text feedback
+            feedback_texts: Users' free text feedback
             modelservice: Modelservice client for embeddings
+            embedding_model: Embedding model name
+            labels: Normalized category label embeddings
             threshold: Minimum similarity threshold
             
         Returns:
-            Dict of category -> similarity score
+            Per text, dict of category -> similarity score for categories above
+            threshold (empty if none matched or embedding failed)
         """
-        import numpy as np
-        
-        # Get embedding model from config
-        embedding_model = "paraphrase-multilingual"  # Default embedding model
-        
-        print(f"      Getting embedding for: '{feedback_text[:50]}...'")
-        
-        # Get embedding for feedback text
-        feedback_result = await modelservice.get_embeddings(embedding_model, feedback_text)
-        
-        # Extract embedding from nested response structure
-        # Response format: {'success': True, 'data': {'embedding': [...]}}
-        if feedback_result.get('success') and feedback_result.get('data'):
-            feedback_embedding = feedback_result['data'].get('embedding', [])
-        else:
-            feedback_embedding = []
-        
-        print(f"      Feedback embedding length: {len(feedback_embedding)}")
-        print(f"      Feedback embedding type: {type(feedback_embedding)}")
-        
-        # Calculate similarity to each category label
-        categories = {}
-        all_scores = {}  # Track all scores for debugging
-        
-        for category, label_text in self.CATEGORY_LABELS.items():
-            print(f"      Processing category: {category}")
-            
-            # Get embedding for category label
-            result = await modelservice.get_embeddings(embedding_model, label_text)
-            # Extract from nested structure: {'success': True, 'data': {'embedding': [...]}}
-            if result.get('success') and result.get('data'):
-                label_embedding = result['data'].get('embedding', [])
-            else:
-                label_embedding = []
-            
-            # Calculate similarity to label
-            similarity = self._cosine_similarity(feedback_embedding, label_embedding)
-            print(f"        Label similarity: {similarity:.3f}")
-            
-            all_scores[category] = round(similarity, 3)
-            
-            # Only include if above threshold
-            if similarity >= threshold:
-                categories[category] = round(similarity, 3)
-        
-        print(f"      All scores (before threshold): {all_scores}")
-        print(f"      Matched categories (>= {threshold}): {categories}")
-        
-        return categories
-    
-    def _cosine_similarity(self, vec1: List[float], vec2: List[float]) -> float:
-        """Calculate cosine similarity between two vectors."""
-        import numpy as np
-        
-        v1 = np.array(vec1)
-        v2 = np.array(vec2)
+        embeddings = await self._embed_texts(feedback_texts, modelservice, embedding_model)
         
-        dot_product = np.dot(v1, v2)
-        norm1 = np.linalg.norm(v1)
-        norm2 = np.linalg.norm(v2)
+        embedded = [i for i, embedding in enumerate(embeddings) if embedding is not None]
+        results: List[Dict[str, float]] = [{} for _ in feedback_texts]
+        if not embedded:
+            return results
         
-        if norm1 == 0 or norm2 == 0:
-            return 0.0
+        # (texts x categories) similarities in one matrix product
+        similarities = cosine_similarity_matrix([embeddings[i] for i in embedded], labels.matrix)
+        categories = labels.keys
+        for row, i in enumerate(embedded):
+            results[i] = {
+                category: round(float(score), 3)
+                for category, score in zip(categories, similarities[row].tolist())
+                if score >= threshold
+            }
         
-        return float(dot_product / (norm1 * norm2))
+        return results
@@ -169,6 +169,10 @@ class ThompsonSamplingUpdateTask(BaseTask):
             
             context.db_connection.commit()
             
+            # Cached posteriors in the running selector are stale now
+            if updated_count:
+                self._invalidate_selector_cache()
+            
             duration = (datetime.utcnow() - start_time).total_seconds()
             print(f"\n [AMS_TS] Updated {updated_count} skill confidences in {duration:.2f}s")
             print(f"   Processed {len(feedback_events)} feedback events")
@@ -197,3 +201,14 @@ class ThompsonSamplingUpdateTask(BaseTask):
                 error=str(e),
                 duration_seconds=execution_time
             )
+    
+    def _invalidate_selector_cache(self) -> None:
+        """Make the memory manager's Thompson Sampling selector reload its posteriors."""
+        try:
+            from backend.services.conversation_engine import ai_registry
+            memory_manager = ai_registry.get("memory")
+            selector = getattr(memory_manager, "_thompson_sampling", None) if memory_manager else None
+            if selector:
+                selector.invalidate()
+        except Exception as e:
+            logger.warning(f"🧠 [AMS_TS] Could not invalidate Thompson Sampling cache: {e}")
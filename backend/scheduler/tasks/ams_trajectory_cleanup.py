@@ -15,6 +15,7 @@ from datetime import datetime, timedelta
 from typing import Dict, Any
 
 from aico.core.logging import get_logger
+from aico.data.libsql.retention import RetentionEngine, RetentionPolicy
 from .base import BaseTask, TaskContext, TaskResult
 
 logger = get_logger("backend", "scheduler.tasks.ams_trajectory_cleanup")
@@ -99,16 +100,15 @@ class TrajectoryCleanupTask(BaseTask):
             logger.info(f" [AMS_CLEANUP] Deleting archived trajectories older than {delete_cutoff.date()} ({delete_after_days} days)")
             
             print("   Querying archived trajectories to delete...")
-            delete_result = context.db_connection.execute(
-                """DELETE FROM trajectories 
-                   WHERE timestamp < ? 
-                   AND archived = TRUE""",
-                (delete_cutoff.isoformat(),)
-            )
-            deleted_count = delete_result.rowcount if hasattr(delete_result, 'rowcount') else 0
-            print(f"   Deleted {deleted_count} archived trajectories")
-            
+            # Commit the archive step first; deletes then run in short batches
             context.db_connection.commit()
+            retention_config = context.config_manager.get("core.scheduler.retention", {})
+            engine = RetentionEngine.from_config(context.db_connection, retention_config)
+            delete_result = await engine.purge(RetentionPolicy(
+                "trajectories", "timestamp", delete_cutoff.isoformat(), extra_where="archived = TRUE"
+            ))
+            deleted_count = delete_result.deleted
+            print(f"   Deleted {deleted_count} archived trajectories in {delete_result.batches} batches")
             
             # Get current trajectory counts
             stats = context.db_connection.execute(
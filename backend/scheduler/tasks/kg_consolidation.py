@@ -218,20 +218,19 @@ class KGConsolidationTask(BaseTask):
                         print(f"🕸️ [KG_TASK] ℹ️  No existing nodes found (first-time extraction)")
                     
                     # Helper function to process a single message
-                    async def process_message(msg_idx: int, msg: Dict[str, Any]) -> bool:
-                        """Process a single message and return success status."""
+                    async def process_message(msg_idx: int, msg_content: str, extracted_graph) -> bool:
+                        """Resolve and store one extracted message and return success status."""
                         try:
-                            msg_content = msg.get("content", "").strip()
                             if not msg_content:
                                 return False
                             
                             msg_start = time.time()
                             print(f"\n🕸️ [KG_TASK] 📝 Message {msg_idx}/{len(messages)}: {msg_content[:60]}...")
                             
-                            # Extract KG from individual message using shared resolver
+                            # Resolve/store the message's graph using shared resolver
                             # This enables incremental HNSW indexing across batch
                             await memory_manager._extract_knowledge_graph_with_resolver(
-                                user_id, msg_content, shared_resolver
+                                user_id, msg_content, shared_resolver, extracted_graph
                             )
                             
                             msg_time = time.time() - msg_start
@@ -252,9 +251,23 @@ class KGConsolidationTask(BaseTask):
                         batch_start_time = time.time()
                         print(f"\n🕸️ [KG_TASK] 🚀 Processing batch {batch_start//max_concurrent + 1} ({len(batch)} messages in parallel)...")
                         
-                        # Process batch in parallel
+                        # Extract the whole batch at once: short messages share one LLM prompt
+                        contents = [msg.get("content", "").strip() for msg in batch]
+                        try:
+                            extracted = await memory_manager._kg_extractor.extract_batch(
+                                [content for content in contents if content], user_id
+                            )
+                        except Exception as e:
+                            logger.warning(f"🕸️ [KG_TASK] Batch extraction failed, extracting messages individually: {e}")
+                            extracted = [None] * sum(1 for content in contents if content)
+                        graphs = iter(extracted)
+                        
+                        # Resolve and store batch in parallel
                         results = await asyncio.gather(
-                            *[process_message(batch_start + i + 1, msg) for i, msg in enumerate(batch)],
+                            *[
+                                process_message(batch_start + i + 1, content, next(graphs) if content else None)
+                                for i, content in enumerate(contents)
+                            ],
                             return_exceptions=True
                         )
                         
@@ -3,6 +3,10 @@ Built-in Maintenance Tasks
 
 System maintenance tasks for log cleanup, key rotation, health checks,
 and database optimization.
+
+Database retention uses the chunked RetentionEngine (core.scheduler.retention)
+so purging a large backlog never holds the write lock for long; time
+partitions of logs/events (if enabled) expire by dropping whole tables.
 """
 
 import asyncio
@@ -12,6 +16,8 @@ from datetime import datetime, timedelta, timezone
 from typing import Any, Dict
 
 from aico.core.logging import get_logger
+from aico.data.libsql.partitions import LATE_WRITE_DAYS, TimePartitioner
+from aico.data.libsql.retention import RetentionEngine, RetentionPolicy
 from .base import BaseTask, TaskContext, TaskResult
 
 
@@ -40,11 +46,19 @@ class LogCleanupTask(BaseTask):
             cleanup_files = context.get_config("cleanup_files", True)
             
             results = {}
+            retention_config = context.config_manager.get("core.scheduler.retention", {})
+            engine = RetentionEngine.from_config(context.db_connection, retention_config)
             
             # Clean up database log entries
             if cleanup_database:
-                deleted_count = self._cleanup_database_logs(context, retention_days)
+                results["log_partitions_dropped"] = self._expire_partitions(context, "logs", retention_days)
+                deleted_count = await self._cleanup_database_logs(engine, retention_days)
                 results["database_logs_deleted"] = deleted_count
+                
+                events_days = retention_config.get("events_days", 30)
+                if events_days:
+                    results["event_partitions_dropped"] = self._expire_partitions(context, "events", events_days)
+                    results["events_deleted"] = await self._cleanup_events(engine, events_days)
             
             # Clean up log files
             if cleanup_files:
@@ -52,10 +66,9 @@ class LogCleanupTask(BaseTask):
                 results["files_cleaned_mb"] = cleaned_size
             
             # Clean up task execution history
-            task_store = context.db_connection
             from ..storage import TaskStore
-            store = TaskStore(task_store)
-            exec_deleted = store.cleanup_old_executions(retention_days)
+            store = TaskStore(context.db_connection)
+            exec_deleted = await store.cleanup_old_executions(retention_days, engine=engine)
             results["task_executions_deleted"] = exec_deleted
             
             message = f"Log cleanup completed: {results}"
@@ -71,44 +84,52 @@ class LogCleanupTask(BaseTask):
             self.logger.error(error_msg, exc_info=True)
             return TaskResult(success=False, error=error_msg)
     
-    def _cleanup_database_logs(self, context: TaskContext, retention_days: int) -> int:
-        """Clean up old log entries from database"""
+    def _expire_partitions(self, context: TaskContext, table: str, retention_days: int) -> int:
+        """Drop expired time partitions of a table and seal closed ones (see TimePartitioner)"""
         try:
-            # Format to match database timestamp format: ISO 8601 UTC with Z suffix
-            cutoff_date = (datetime.utcnow() - timedelta(days=retention_days)).replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
+            partitioner = TimePartitioner(context.db_connection, table)
+            dropped = partitioner.drop_expired(datetime.utcnow() - timedelta(days=retention_days))
             
-            # Count logs to be deleted first
-            count_cursor = context.db_connection.execute(
-                "SELECT COUNT(*) FROM logs WHERE timestamp < ?", (cutoff_date,)
-            )
-            count_to_delete = count_cursor.fetchone()[0]
-            self.logger.info(f"Found {count_to_delete} logs older than {cutoff_date} to delete")
+            settings = context.config_manager.get("core.scheduler.retention.partitioning", {}) or {}
+            if settings.get("enabled", False) and table in settings.get("tables", []):
+                # Never seal a partition that late writes may still be routed to
+                seal_after_days = max(settings.get("seal_after_days", 2), LATE_WRITE_DAYS + 1)
+                partitioner.seal_before(datetime.utcnow() - timedelta(days=seal_after_days))
             
-            if count_to_delete == 0:
-                return 0
+            return len(dropped)
             
-            # Delete the logs
-            cursor = context.db_connection.execute(
-                "DELETE FROM logs WHERE timestamp < ?", (cutoff_date,)
-            )
-            context.db_connection.commit()
+        except Exception as e:
+            self.logger.warning(f"Partition expiry for {table} failed: {e}")
+            return 0
+    
+    async def _cleanup_database_logs(self, engine: RetentionEngine, retention_days: int) -> int:
+        """Clean up old log entries from database in batches"""
+        try:
+            # Format to match database timestamp format: ISO 8601 UTC with Z suffix
+            cutoff_date = (datetime.utcnow() - timedelta(days=retention_days)).replace(tzinfo=timezone.utc).isoformat().replace('+00:00', 'Z')
             
-            # Verify deletion
-            verify_cursor = context.db_connection.execute(
-                "SELECT COUNT(*) FROM logs WHERE timestamp < ?", (cutoff_date,)
-            )
-            remaining = verify_cursor.fetchone()[0]
-            deleted_count = count_to_delete - remaining
+            result = await engine.purge(RetentionPolicy("logs", "timestamp", cutoff_date))
+            if result.errors:
+                self.logger.warning(f"Database log cleanup incomplete: {result.errors}")
+            return result.deleted
             
-            if deleted_count > 0:
-                self.logger.info(f"Deleted {deleted_count} old log entries from database")
-            else:
-                self.logger.warning(f"DELETE executed but {remaining} logs still remain (expected 0)")
+        except Exception as e:
+            self.logger.warning(f"Database log cleanup failed: {e}")
+            return 0
+    
+    async def _cleanup_events(self, engine: RetentionEngine, retention_days: int) -> int:
+        """Clean up persisted message bus events in batches"""
+        try:
+            # Events are stored as naive UTC ISO timestamps
+            cutoff_date = (datetime.utcnow() - timedelta(days=retention_days)).isoformat()
             
-            return deleted_count
+            result = await engine.purge(RetentionPolicy("events", "timestamp", cutoff_date))
+            if result.errors:
+                self.logger.warning(f"Event cleanup incomplete: {result.errors}")
+            return result.deleted
             
         except Exception as e:
-            self.logger.warning(f"Database log cleanup failed: {e}")
+            self.logger.warning(f"Event cleanup failed: {e}")
             return 0
     
     def _cleanup_log_files(self, context: TaskContext, retention_days: int, max_size_mb: int) -> float:
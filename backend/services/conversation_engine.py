@@ -26,6 +26,7 @@ from aico.proto.aico_core_envelope_pb2 import AicoMessage
 from aico.proto.aico_conversation_pb2 import ConversationMessage, Message, MessageAnalysis
 from aico.proto.aico_modelservice_pb2 import CompletionsResponse, CompletionsRequest, ConversationMessage as ModelConversationMessage
 from aico.ai import ProcessingContext, ai_registry
+from aico.ai.analysis.message_analysis import get_message_analysis
 from backend.core.service_container import BaseService
 from google.protobuf.timestamp_pb2 import Timestamp
 
@@ -105,6 +106,7 @@ class ConversationEngine(BaseService):
         
         self.max_context_messages = engine_config.get("max_context_messages", 10)
         self.response_timeout = engine_config.get("response_timeout_seconds", 15.0)
+        self.emotion_wait_timeout = engine_config.get("emotion_wait_timeout_seconds", 1.5)
         self.default_response_mode = ResponseMode(engine_config.get("default_response_mode", "text_only"))
         
         # Load conversation model name from configuration
@@ -201,7 +203,7 @@ class ConversationEngine(BaseService):
         # This eliminates cross-talk between conversation engine and other services (KG, etc.)
         
         # Optional component subscriptions
-        # Note: Emotion integration uses direct service access (emotion_engine.get_current_state())
+        # Note: Emotion integration uses direct service access (emotion_engine.appraise_turn())
         # User emotion detection (Phase 2+) will subscribe to AI_EMOTION_ANALYSIS_RESPONSE
         # if self.enable_emotion_integration:
         #     await self.bus_client.subscribe(
@@ -359,6 +361,12 @@ class ConversationEngine(BaseService):
             }
             print(f"💬 [CONVERSATION_ENGINE] 📋 Total pending requests: {len(self.pending_responses)}")
             
+            # Start the emotion appraisal now so it runs alongside memory retrieval;
+            # the prompt waits for it (bounded) instead of adding a serial round-trip
+            emotion_task = self._start_emotion_appraisal(request_id, user_context, user_message)
+            if emotion_task is not None:
+                self.pending_responses[request_id]["emotion_task"] = emotion_task
+            
             # Determine what components we need
             components_needed = []
             print(f"💬 [CONVERSATION_ENGINE] 🔧 Checking enabled features...")
@@ -407,7 +415,40 @@ class ConversationEngine(BaseService):
     # AI COMPONENT INTEGRATION (SCAFFOLDING)
     # ============================================================================
     
-    # Emotion and personality integration removed - focusing on semantic memory approach
+    def _start_emotion_appraisal(self, request_id: str, user_context: UserContext, message: ConversationMessage) -> Optional[asyncio.Task]:
+        """Start (or join) the EmotionEngine appraisal of this turn"""
+        if not self.enable_emotion_integration:
+            return None
+        emotion_engine = self.container.get_service("emotion_engine")
+        if not emotion_engine or not hasattr(emotion_engine, "appraise_turn"):
+            return None
+        return asyncio.create_task(emotion_engine.appraise_turn(
+            user_id=user_context.user_id,
+            message_id=request_id,
+            message_text=message.message.text,
+            conversation_id=message.message.conversation_id
+        ))
+    
+    async def _await_emotional_state(self, request_id: str, user_context: UserContext) -> Optional[Dict[str, Any]]:
+        """This turn's emotional state (compact), or the user's last one if not ready within the timeout"""
+        pending = self.pending_responses.get(request_id, {})
+        emotion_task = pending.get("emotion_task")
+        emotion_engine = self.container.get_service("emotion_engine") if self.enable_emotion_integration else None
+        if not emotion_engine:
+            return None
+        
+        state = None
+        if emotion_task is not None:
+            try:
+                state = await asyncio.wait_for(asyncio.shield(emotion_task), self.emotion_wait_timeout)
+            except asyncio.TimeoutError:
+                self.logger.info(f"🎭 Emotion appraisal not ready after {self.emotion_wait_timeout}s, using last state")
+            except Exception as e:
+                self.logger.warning(f"🎭 Emotion appraisal failed: {e}")
+        
+        if state is None:
+            return await emotion_engine.get_current_state(user_context.user_id)
+        return state.to_compact_dict()
     
     
     async def _get_memory_context(self, request_id: str, user_context: UserContext, message: ConversationMessage) -> Optional[Dict[str, Any]]:
@@ -426,13 +467,18 @@ class ConversationEngine(BaseService):
             conversation_id = message.message.conversation_id
             message_text = message.message.text
             
+            # Shared per-message analysis: memory storage, emotion appraisal and
+            # other consumers of this turn reuse each other's modelservice results
+            get_message_analysis(request_id, message_text)
+            
             self.logger.info(f"🧠 [CONTEXT_TRACE] Calling memory_manager.assemble_context(user_id={user_id}, conversation_id={conversation_id})")
             
             # Get context from memory manager
             context = await memory_manager.assemble_context(
                 user_id=user_id,
                 current_message=message_text,
-                conversation_id=conversation_id
+                conversation_id=conversation_id,
+                message_id=request_id
             )
             
             # Log what we got back
@@ -458,7 +504,7 @@ class ConversationEngine(BaseService):
             # Store user message for future context
             print(f"💬 [CONVERSATION_ENGINE] 💾 Storing user message (len: {len(message_text)})...")
             try:
-                await memory_manager.store_message(user_id, conversation_id, message_text, "user")
+                await memory_manager.store_message(user_id, conversation_id, message_text, "user", message_id=request_id)
                 print(f"💬 [CONVERSATION_ENGINE] ✅ User message stored successfully!")
                 self.logger.debug(f"🧠 [CONTEXT_TRACE] User message stored for future context")
             except Exception as e:
@@ -490,7 +536,8 @@ class ConversationEngine(BaseService):
             
             # Store user message for future context (let it take as long as needed - it's background)
             try:
-                await memory_manager.store_message(user_id, conversation_id, message_text, "user")
+                get_message_analysis(request_id, message_text)
+                await memory_manager.store_message(user_id, conversation_id, message_text, "user", message_id=request_id)
                 total_duration = time.time() - start_time
                 self.logger.info(f"🔍 [MEMORY_BACKGROUND] ✅ User message stored in {total_duration:.3f}s for {request_id}")
             except Exception as e:
@@ -594,7 +641,8 @@ class ConversationEngine(BaseService):
                 print(f"🔍 [MEMORY_DEBUG] recent_context sample: {recent_context[:2] if recent_context else 'empty'}")
                 self.logger.info(f"Context: {len(user_facts)} facts, {len(recent_context)} messages")
             
-            system_prompt = self._build_system_prompt(user_context, memory_context, selected_skill_id)
+            emotional_state = await self._await_emotional_state(request_id, user_context)
+            system_prompt = self._build_system_prompt(user_context, memory_context, selected_skill_id, emotional_state)
             if system_prompt:
                 self.logger.debug(f"System prompt: {len(system_prompt)} chars")
             
@@ -828,7 +876,13 @@ class ConversationEngine(BaseService):
             print(f"💬 [CONVERSATION_ENGINE] ❌ Error finalizing streaming response: {e}")
             self.logger.error(f"Error finalizing streaming response for {request_id}: {e}")
     
-    def _build_system_prompt(self, user_context: UserContext, memory_context: Optional[Dict[str, Any]], skill_id: Optional[str] = None) -> str:
+    def _build_system_prompt(
+        self,
+        user_context: UserContext,
+        memory_context: Optional[Dict[str, Any]],
+        skill_id: Optional[str] = None,
+        emotional_state: Optional[Dict[str, Any]] = None
+    ) -> str:
         """Build system prompt with memory context and optional skill template
         
         NOTE: Character personality is defined in the Modelfile (e.g., Modelfile.eve).
@@ -893,74 +947,34 @@ class ConversationEngine(BaseService):
             prompt_parts.append("\n".join(identity_parts))
         
         # Add emotional conditioning if available (Phase 1 emotion system)
-        if self.enable_emotion_integration:
+        if self.enable_emotion_integration and emotional_state:
             try:
-                emotion_engine = self.container.get_service("emotion_engine")
-                if emotion_engine:
-                    # Get current emotional state (compact projection)
-                    import asyncio
-                    try:
-                        loop = asyncio.get_event_loop()
-                        if loop.is_running():
-                            # Skip in this case - emotion will still be published to bus
-                            pass
-                        else:
-                            emotional_state = asyncio.run(emotion_engine.get_current_state())
-                            if emotional_state:
-                                style = emotional_state.get("style", {})
-                                label = emotional_state.get("label", {})
-                                
-                                # Build concise emotional guidance
-                                emotion_guidance = []
-                                emotion_guidance.append(f"Current emotional tone: {label.get('primary', 'calm')}")
-                                
-                                # Add style hints
-                                warmth = style.get("warmth", 0.6)
-                                energy = style.get("energy", 0.5)
-                                directness = style.get("directness", 0.5)
-                                
-                                if warmth > 0.7:
-                                    emotion_guidance.append("Respond with warmth and care.")
-                                if energy > 0.6:
-                                    emotion_guidance.append("Show engaged, active energy.")
-                                elif energy < 0.4:
-                                    emotion_guidance.append("Maintain a calm, gentle presence.")
-                                if directness > 0.7:
-                                    emotion_guidance.append("Be direct and clear.")
-                                elif directness < 0.4:
-                                    emotion_guidance.append("Be gentle and indirect.")
-                                
-                                if emotion_guidance:
-                                    prompt_parts.append("\n".join(emotion_guidance))
-                                    self.logger.debug(f"🎭 Added emotional conditioning: {label.get('primary', 'calm')}")
-                    except RuntimeError:
-                        # No event loop
-                        emotional_state = asyncio.run(emotion_engine.get_current_state())
-                        if emotional_state:
-                            style = emotional_state.get("style", {})
-                            label = emotional_state.get("label", {})
-                            
-                            emotion_guidance = []
-                            emotion_guidance.append(f"Current emotional tone: {label.get('primary', 'calm')}")
-                            
-                            warmth = style.get("warmth", 0.6)
-                            energy = style.get("energy", 0.5)
-                            directness = style.get("directness", 0.5)
-                            
-                            if warmth > 0.7:
-                                emotion_guidance.append("Respond with warmth and care.")
-                            if energy > 0.6:
-                                emotion_guidance.append("Show engaged, active energy.")
-                            elif energy < 0.4:
-                                emotion_guidance.append("Maintain a calm, gentle presence.")
-                            if directness > 0.7:
-                                emotion_guidance.append("Be direct and clear.")
-                            elif directness < 0.4:
-                                emotion_guidance.append("Be gentle and indirect.")
-                            
-                            if emotion_guidance:
-                                prompt_parts.append("\n".join(emotion_guidance))
-                                self.logger.debug(f"🎭 Added emotional conditioning: {label.get('primary', 'calm')}")
+                style = emotional_state.get("style", {})
+                label = emotional_state.get("label", {})
+                
+                # Build concise emotional guidance
+                emotion_guidance = []
+                emotion_guidance.append(f"Current emotional tone: {label.get('primary', 'calm')}")
+                
+                # Add style hints
+                warmth = style.get("warmth", 0.6)
+                energy = style.get("energy", 0.5)
+                directness = style.get("directness", 0.5)
+                
+                if warmth > 0.7:
+                    emotion_guidance.append("Respond with warmth and care.")
+                if energy > 0.6:
+                    emotion_guidance.append("Show engaged, active energy.")
+                elif energy < 0.4:
+                    emotion_guidance.append("Maintain a calm, gentle presence.")
+                if directness > 0.7:
+                    emotion_guidance.append("Be direct and clear.")
+                elif directness < 0.4:
+                    emotion_guidance.append("Be gentle and indirect.")
+                
+                if emotion_guidance:
+                    prompt_parts.append("\n".join(emotion_guidance))
+                    self.logger.debug(f"🎭 Added emotional conditioning: {label.get('primary', 'calm')}")
             except Exception as e:
                 self.logger.warning(f"🎭 Failed to add emotional conditioning: {e}")
         
@@ -18,14 +18,16 @@ Design Principles:
 import asyncio
 import time
 import uuid
+from collections import OrderedDict, deque
 from datetime import datetime
-from typing import Dict, List, Any, Optional
+from typing import Deque, Dict, List, Any, Optional, Tuple
 from dataclasses import dataclass, field
 from enum import Enum
 
 from aico.core.bus import MessageBusClient
 from aico.core.topics import AICOTopics
 from aico.core.logging import get_logger
+from aico.ai.analysis.message_analysis import SENTIMENT_KEY, get_message_analysis
 from backend.core.service_container import BaseService
 from aico.proto import aico_emotion_pb2
 from backend.services.conversational_context import ConversationalContext
@@ -123,6 +125,281 @@ class EmotionalState:
         }
 
 
+@dataclass
+class AppraisalMetrics:
+    """Turn appraisal counters and recent latencies (milliseconds)"""
+    turns: int = 0
+    shared_sentiment: int = 0  # Sentiment reused from another consumer of the message
+    sentiment_requests: int = 0
+    coalesced_requests: int = 0  # Joined an identical in-flight request
+    sentiment_failures: int = 0
+    sentiment_timeouts: int = 0
+    pending_evictions: int = 0
+    sentiment_latency_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+    appraisal_latency_ms: Deque[float] = field(default_factory=lambda: deque(maxlen=200))
+    
+    @staticmethod
+    def _summary(samples: Deque[float]) -> Dict[str, float]:
+        if not samples:
+            return {"count": 0}
+        ordered = sorted(samples)
+        return {
+            "count": len(ordered),
+            "last": round(samples[-1], 1),
+            "avg": round(sum(ordered) / len(ordered), 1),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))], 1)
+        }
+    
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "turns": self.turns,
+            "shared_sentiment": self.shared_sentiment,
+            "sentiment_requests": self.sentiment_requests,
+            "coalesced_requests": self.coalesced_requests,
+            "sentiment_failures": self.sentiment_failures,
+            "sentiment_timeouts": self.sentiment_timeouts,
+            "pending_evictions": self.pending_evictions,
+            "sentiment_latency_ms": self._summary(self.sentiment_latency_ms),
+            "appraisal_latency_ms": self._summary(self.appraisal_latency_ms)
+        }
+
+
+# ============================================================================
+# STATE STORE
+# ============================================================================
+
+SYSTEM_USER_ID = "system"  # Owner of the pre-v20 global state
+
+
+class EmotionStateStore:
+    """
+    Per-user emotional state with write-behind persistence.
+    
+    Current states live in memory and are read from the database only the
+    first time a user is seen (load()). Updates mark the user dirty; a
+    background flush writes the latest state per dirty user (at most one
+    write per user per interval) together with the new history rows, in a
+    single commit. History is kept per user in a bounded ring buffer and
+    appended to emotion_history for durability. stop() flushes what is
+    pending. Database reads and writes run in a worker thread.
+    
+    Each user also has an in-memory ConversationalContext (recent turns and
+    the current emotional episode); the max_contexts most recently used are
+    kept, an evicted user starts a new episode.
+    """
+    
+    def __init__(self, db_connection, logger, history_size: int = 100, flush_interval: float = 5.0,
+                 max_contexts: int = 1024):
+        self.db_connection = db_connection
+        self.logger = logger
+        self.history_size = history_size
+        self.flush_interval = flush_interval
+        self.max_contexts = max_contexts
+        
+        self._states: Dict[str, EmotionalState] = {}
+        self._histories: Dict[str, Deque[Dict[str, Any]]] = {}
+        self._dirty: Dict[str, EmotionalState] = {}  # user_id -> latest unwritten state
+        self._contexts: "OrderedDict[str, ConversationalContext]" = OrderedDict()  # Least recently used first
+        self._pending_history: Deque[Tuple] = deque(maxlen=history_size * 10)
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()  # One flush at a time on the shared connection
+    
+    def start(self) -> None:
+        """Start the periodic flush (requires a running event loop)"""
+        if self._flush_task is None and self.db_connection is not None:
+            self._flush_task = asyncio.create_task(self._flush_loop())
+    
+    async def stop(self) -> None:
+        """Stop the periodic flush and write everything still pending"""
+        if self._flush_task:
+            self._flush_task.cancel()
+            try:
+                await self._flush_task
+            except asyncio.CancelledError:
+                pass
+            self._flush_task = None
+        await self.flush()
+    
+    async def load(self, user_id: str) -> None:
+        """Read a user's current state and recent history from the database, once"""
+        if user_id in self._histories:
+            return
+        state, entries = await asyncio.to_thread(self._load_user, user_id)
+        # Another caller may have loaded or recorded while this one was reading
+        if user_id not in self._histories:
+            self._histories[user_id] = deque(entries, maxlen=self.history_size)
+            if state is not None:
+                self._states.setdefault(user_id, state)
+    
+    def get(self, user_id: str) -> Optional[EmotionalState]:
+        """Current state of a user (None until load() found or record() set one)"""
+        return self._states.get(user_id)
+    
+    def history(self, user_id: str, limit: int = 100) -> List[Dict[str, Any]]:
+        """Most recent history entries of a user, oldest first"""
+        entries = list(self._histories.get(user_id, ()))
+        return entries[-limit:] if limit else entries
+    
+    def context(self, user_id: str) -> ConversationalContext:
+        """Conversational context of a user, created on first use"""
+        context = self._contexts.get(user_id)
+        if context is None:
+            context = self._contexts[user_id] = ConversationalContext(history_size=5)
+            while len(self._contexts) > self.max_contexts:
+                self._contexts.popitem(last=False)
+        else:
+            self._contexts.move_to_end(user_id)
+        return context
+    
+    def record(self, user_id: str, state: EmotionalState) -> None:
+        """Make state the user's current state and queue it for persistence"""
+        self._histories.setdefault(user_id, deque(maxlen=self.history_size))
+        self._states[user_id] = state
+        self._dirty[user_id] = state
+        
+        compact = state.to_compact_dict()
+        entry = {
+            "timestamp": compact["timestamp"],
+            "feeling": compact["label"]["primary"],
+            "valence": compact["mood"]["valence"],
+            "arousal": compact["mood"]["arousal"],
+            "intensity": compact["label"]["intensity"]
+        }
+        self._histories[user_id].append(entry)
+        self._pending_history.append((
+            user_id, entry["timestamp"], entry["feeling"], entry["valence"], entry["arousal"], entry["intensity"]
+        ))
+    
+    @property
+    def pending_writes(self) -> int:
+        return len(self._dirty) + len(self._pending_history)
+    
+    async def flush(self) -> int:
+        """Write dirty states and pending history rows; returns rows written"""
+        async with self._flush_lock:
+            if self.db_connection is None or not (self._dirty or self._pending_history):
+                return 0
+            
+            dirty, self._dirty = self._dirty, {}
+            history_rows = list(self._pending_history)
+            self._pending_history.clear()
+            
+            try:
+                await asyncio.to_thread(self._write, dirty, history_rows)
+            except Exception as e:
+                self.logger.error(f"Error persisting emotional states: {e}")
+                # Re-queue for the next flush; newer updates take precedence
+                for user_id, state in dirty.items():
+                    self._dirty.setdefault(user_id, state)
+                self._pending_history = deque(
+                    history_rows + list(self._pending_history), maxlen=self._pending_history.maxlen
+                )
+                return 0
+            
+            self.logger.debug(f"🎭 Persisted {len(dirty)} emotional states and {len(history_rows)} history entries")
+            return len(dirty) + len(history_rows)
+    
+    def _write(self, dirty: Dict[str, EmotionalState], history_rows: List[Tuple]) -> None:
+        """Write states and history rows in one commit (runs in a worker thread)"""
+        for user_id, state in dirty.items():
+            self.db_connection.execute(
+                """INSERT OR REPLACE INTO emotion_user_state
+                   (user_id, timestamp, subjective_feeling, mood_valence, mood_arousal, intensity,
+                    warmth, energy, directness, formality, engagement, closeness, care_focus, updated_at)
+                   VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))""",
+                (
+                    user_id,
+                    state.timestamp.isoformat(),
+                    state.subjective_feeling.value,
+                    state.mood_valence,
+                    state.mood_arousal,
+                    state.intensity,
+                    state.warmth,
+                    state.energy,
+                    state.directness,
+                    state.formality,
+                    state.engagement,
+                    state.closeness,
+                    state.care_focus
+                )
+            )
+        for row in history_rows:
+            self.db_connection.execute(
+                """INSERT INTO emotion_history (user_id, timestamp, feeling, valence, arousal, intensity)
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                row
+            )
+        self.db_connection.commit()
+    
+    async def _flush_loop(self) -> None:
+        while True:
+            try:
+                await asyncio.sleep(self.flush_interval)
+                # Shielded: a flush interrupted by stop() finishes under the lock first
+                await asyncio.shield(self.flush())
+            except asyncio.CancelledError:
+                break
+            except Exception as e:
+                self.logger.error(f"Emotion state flush loop error: {e}")
+    
+    def _load_user(self, user_id: str) -> Tuple[Optional[EmotionalState], List[Dict[str, Any]]]:
+        """Read a user's current state and recent history, oldest first (runs in a worker thread)"""
+        state, entries = None, []
+        if self.db_connection is None:
+            return state, entries
+        
+        try:
+            row = self.db_connection.execute(
+                "SELECT timestamp, subjective_feeling, mood_valence, mood_arousal, intensity, "
+                "warmth, energy, directness, formality, engagement, closeness, care_focus "
+                "FROM emotion_user_state WHERE user_id = ?",
+                (user_id,)
+            ).fetchone()
+            if row:
+                state = self._state_from_row(row)
+            
+            rows = self.db_connection.execute(
+                "SELECT timestamp, feeling, valence, arousal, intensity "
+                "FROM emotion_history WHERE user_id = ? "
+                "ORDER BY timestamp DESC LIMIT ?",
+                (user_id, self.history_size)
+            ).fetchall()
+            entries = [
+                {"timestamp": r[0], "feeling": r[1], "valence": r[2], "arousal": r[3], "intensity": r[4]}
+                for r in reversed(rows)
+            ]
+        except Exception as e:
+            self.logger.error(f"Error loading emotional state for user {user_id[:8]}: {e}")
+        return state, entries
+    
+    @staticmethod
+    def _state_from_row(row) -> EmotionalState:
+        """Rebuild a state from its persisted projection (appraisal details are not stored)"""
+        return EmotionalState(
+            timestamp=datetime.fromisoformat(row[0]),
+            cognitive_component=AppraisalResult(
+                relevance=0.5,
+                goal_impact="neutral",
+                coping_capability="high_capability",
+                social_appropriateness="neutral_response"
+            ),
+            physiological_arousal=row[3],
+            motivational_tendency="neutral",
+            motor_expression="neutral",
+            subjective_feeling=EmotionLabel(row[1]),
+            mood_valence=row[2],
+            mood_arousal=row[3],
+            intensity=row[4],
+            warmth=row[5],
+            energy=row[6],
+            directness=row[7],
+            formality=row[8],
+            engagement=row[9],
+            closeness=row[10],
+            care_focus=row[11]
+        )
+
+
 # ============================================================================
 # EMOTION PROCESSOR SERVICE
 # ============================================================================
@@ -168,17 +445,30 @@ class EmotionEngine(BaseService):
         self.inertia_decay = inertia_config.get("decay_per_turn", 0.1)
         self.supportive_context_bias = inertia_config.get("supportive_context_bias", True)
         
-        # Emotional state tracking
-        self.current_state: Optional[EmotionalState] = None
-        self.previous_state: Optional[EmotionalState] = None  # For inertia calculation
-        self.state_history: List[Dict[str, Any]] = []  # Compact states for mood arc
-        self.turns_since_state_change: int = 0  # For inertia decay
-        
-        # Conversational context tracking (C-CPM extension)
-        self.conversational_context = ConversationalContext(history_size=5)
-        
-        # Sentiment request tracking (correlation_id -> context for completing processing)
-        self.pending_sentiment_requests: Dict[str, Dict[str, Any]] = {}
+        # Emotional state tracking (per user, persisted write-behind)
+        self.state_store = EmotionStateStore(
+            self.db_connection,
+            self.logger,
+            history_size=self.max_history_size,
+            flush_interval=emotion_config.get("persist_interval_seconds", 5.0),
+            max_contexts=emotion_config.get("max_conversation_contexts", 1024)
+        )
+        self.current_state: Optional[EmotionalState] = None  # Most recently updated state (any user)
+        self._turns_since_change: Dict[str, int] = {}  # Per-user inertia decay counters
+        
+        # Sentiment requests awaiting a bus response (correlation_id -> future), oldest
+        # first and bounded; concurrent requests for the same text share one entry
+        self.pending_sentiment_requests: "OrderedDict[str, asyncio.Future]" = OrderedDict()
+        self._sentiment_by_text: Dict[str, asyncio.Future] = {}
+        self.sentiment_timeout = emotion_config.get("sentiment_timeout_seconds", 5.0)
+        self.max_pending_sentiment_requests = emotion_config.get("max_pending_sentiment_requests", 64)
+        
+        # Turn appraisals by message id: started by the bus event or by ConversationEngine,
+        # whichever comes first, and awaited by both
+        self._turn_appraisals: "OrderedDict[str, asyncio.Task]" = OrderedDict()
+        self.max_tracked_turns = emotion_config.get("max_tracked_turns", 256)
+        self._background_tasks: set = set()
+        self.metrics = AppraisalMetrics()
         
         # Feature flags
         self.enable_user_emotion_detection = emotion_config.get("enable_user_emotion_detection", False)
@@ -207,6 +497,7 @@ class EmotionEngine(BaseService):
             
             # Subscribe to conversation events
             await self._setup_subscriptions()
+            self.state_store.start()
             print("🎭 [EMOTION_ENGINE] ✅ Subscriptions established")
             self.logger.info("🎭 [EMOTION_PROCESSOR] Subscriptions established")
             
@@ -226,9 +517,15 @@ class EmotionEngine(BaseService):
         try:
             self.logger.info("Stopping emotion processor...")
             
+            for task in list(self._background_tasks):
+                task.cancel()
+            
             if self.bus_client:
                 await self.bus_client.disconnect()
             
+            # Write states still waiting for the next flush
+            await self.state_store.stop()
+            
             self.logger.info("Emotion processor stopped")
             
         except Exception as e:
@@ -270,45 +567,34 @@ class EmotionEngine(BaseService):
     # ============================================================================
     
     async def _handle_sentiment_response(self, envelope) -> None:
-        """Handle sentiment analysis responses and complete emotional processing"""
+        """Resolve the pending sentiment request a bus response belongs to"""
         try:
             # MessageBusClient stores correlation_id in metadata.attributes
             correlation_id = envelope.metadata.attributes.get("correlation_id", "")
             
-            if not correlation_id or correlation_id not in self.pending_sentiment_requests:
+            future = self.pending_sentiment_requests.get(correlation_id)
+            if future is None or future.done():
                 return
             
-            # Get the pending request context
-            request_context = self.pending_sentiment_requests[correlation_id]
-            
             # Parse sentiment response
             from aico.proto.aico_modelservice_pb2 import SentimentResponse
             sentiment_response = SentimentResponse()
             envelope.any_payload.Unpack(sentiment_response)
             
-            sentiment_data = {
-                "label": sentiment_response.sentiment,
-                "confidence": sentiment_response.confidence,  # Changed from "score" to "confidence"
-                "valence": self._map_sentiment_to_valence(sentiment_response.sentiment)
-            }
-            
-            print(f"🎭 [EMOTION_ENGINE] ✅ Sentiment: {sentiment_response.sentiment} (confidence={sentiment_response.confidence:.2f})")
-            
-            # Complete emotional processing with sentiment data
-            await self._complete_emotional_processing(
-                message_text=request_context["message_text"],
-                user_id=request_context["user_id"],
-                conversation_id=request_context["conversation_id"],
-                sentiment_data=sentiment_data
-            )
-            
-            # Clean up
-            del self.pending_sentiment_requests[correlation_id]
+            if sentiment_response.success:
+                future.set_result({
+                    "success": True,
+                    "data": {
+                        "sentiment": sentiment_response.sentiment,
+                        "confidence": sentiment_response.confidence
+                    }
+                })
+            else:
+                future.set_result({"success": False, "error": sentiment_response.error or "sentiment analysis failed"})
             
         except Exception as e:
             import traceback
             print(f"🚨 [EMOTION_ENGINE] ERROR in sentiment response handler: {e}")
-            print(f"🚨 [EMOTION_ENGINE] Traceback: {traceback.format_exc()}")
             self.logger.error(f"Error handling sentiment response: {e}\n{traceback.format_exc()}")
     
     async def _handle_conversation_turn(self, message) -> None:
@@ -323,23 +609,93 @@ class EmotionEngine(BaseService):
             message.any_payload.Unpack(conv_message)
             
             user_id = conv_message.user_id if conv_message.user_id else conv_message.source
-            message_text = conv_message.message.text
-            conversation_id = conv_message.message.conversation_id
             
             self.logger.info(f"🎭 [EMOTION_PROCESSOR] Processing turn for user {user_id[:8]}...")
             
-            # Start async sentiment analysis (non-blocking)
-            await self._request_sentiment_analysis(
-                message_text=message_text,
+            # Run the appraisal in the background: the sentiment response arrives through
+            # this bus client, so awaiting it inside the callback would block delivery
+            task = asyncio.create_task(self.appraise_turn(
                 user_id=user_id,
-                conversation_id=conversation_id
-            )
-            
-            # Return immediately - processing continues when sentiment arrives
+                message_id=conv_message.message_id,
+                message_text=conv_message.message.text,
+                conversation_id=conv_message.message.conversation_id
+            ))
+            self._background_tasks.add(task)
+            task.add_done_callback(self._background_tasks.discard)
             
         except Exception as e:
             self.logger.error(f"Error handling conversation turn: {e}")
     
+    async def appraise_turn(
+        self,
+        user_id: str,
+        message_id: str,
+        message_text: str,
+        conversation_id: str
+    ) -> Optional[EmotionalState]:
+        """
+        Appraise a conversation turn and update the user's emotional state.
+        
+        Runs once per message id; concurrent callers (the bus event and
+        ConversationEngine before prompting) await the same appraisal.
+        Returns the new state, or None if sentiment was unavailable.
+        """
+        task = self._turn_appraisals.get(message_id) if message_id else None
+        if task is None:
+            task = asyncio.create_task(self._appraise(user_id, message_id, message_text, conversation_id))
+            if message_id:
+                self._turn_appraisals[message_id] = task
+                while len(self._turn_appraisals) > self.max_tracked_turns:
+                    self._turn_appraisals.popitem(last=False)
+        return await asyncio.shield(task)
+    
+    def get_metrics(self) -> Dict[str, Any]:
+        """Appraisal counters and latency summaries"""
+        metrics = self.metrics.to_dict()
+        metrics["pending_sentiment_requests"] = len(self.pending_sentiment_requests)
+        metrics["tracked_turns"] = len(self._turn_appraisals)
+        metrics["pending_state_writes"] = self.state_store.pending_writes
+        return metrics
+    
+    async def health_check(self) -> Dict[str, Any]:
+        health = await super().health_check()
+        health["appraisal"] = self.get_metrics()
+        return health
+    
+    async def _appraise(
+        self,
+        user_id: str,
+        message_id: str,
+        message_text: str,
+        conversation_id: str
+    ) -> Optional[EmotionalState]:
+        start = time.perf_counter()
+        self.metrics.turns += 1
+        
+        # Share sentiment with the other consumers of this message (either direction)
+        analysis = get_message_analysis(message_id, message_text) if message_id else None
+        if analysis is not None:
+            if analysis.has(SENTIMENT_KEY):
+                self.metrics.shared_sentiment += 1
+            result = await analysis.compute(SENTIMENT_KEY, lambda: self._request_sentiment(message_text))
+        else:
+            result = await self._request_sentiment(message_text)
+        
+        if not result.get("success"):
+            self.metrics.sentiment_failures += 1
+            self.logger.warning(f"🎭 Sentiment unavailable, emotional state unchanged: {result.get('error')}")
+            return None
+        
+        data = result.get("data", {})
+        state = await self._complete_emotional_processing(
+            message_text=message_text,
+            user_id=user_id,
+            conversation_id=conversation_id,
+            sentiment_data=self._sentiment_data(data.get("sentiment", "neutral"), data.get("confidence", 0.5))
+        )
+        self.metrics.appraisal_latency_ms.append((time.perf_counter() - start) * 1000)
+        return state
+    
     # ============================================================================
     # APPRAISAL & EMOTION GENERATION
     # ============================================================================
@@ -350,30 +706,34 @@ class EmotionEngine(BaseService):
         message_text: str,
         conversation_id: str,
         sentiment_data: Dict[str, Any],
-        user_emotion: Optional[Dict[str, Any]] = None
+        user_emotion: Optional[Dict[str, Any]] = None,
+        previous_state: Optional[EmotionalState] = None,
+        turns_since_change: int = 0
     ) -> EmotionalState:
         """
         Process emotional response using 4-stage CPM appraisal with provided sentiment.
         
-        Implements Klaus Scherer's Component Process Model.
+        Implements Klaus Scherer's Component Process Model. previous_state and
+        turns_since_change are the user's inertia inputs.
         """
         
         # Update conversational context (C-CPM Layer 1)
+        context = self.state_store.context(user_id)
         valence = sentiment_data.get("valence", 0.0)
         arousal = abs(valence)  # Approximate arousal from valence for context
         
         # Stage 1: Relevance Assessment ("Does this matter to me?")
         base_relevance = await self._assess_relevance(message_text, user_emotion, sentiment_data)
-        relevance = self.conversational_context.adjust_relevance(base_relevance, message_text)
+        relevance = context.adjust_relevance(base_relevance, message_text)
         print(f"🎭 [EMOTION_ENGINE] Stage 1 - Relevance: {base_relevance:.2f} → {relevance:.2f} (context-adjusted)")
         self.logger.debug(f"🎭 Appraisal Stage 1 - Relevance: {relevance:.2f}")
         
         # Update context with current turn (after relevance calculation)
-        self.conversational_context.update(message_text, valence, arousal, relevance)
+        context.update(message_text, valence, arousal, relevance)
         
         # Stage 2: Implication Check ("What does this mean for my goals?")
         base_goal_impact = await self._analyze_goal_impact(message_text, relevance, sentiment_data)
-        goal_impact = self.conversational_context.adjust_goal_impact(base_goal_impact, valence)
+        goal_impact = context.adjust_goal_impact(base_goal_impact, valence)
         if base_goal_impact != goal_impact:
             print(f"🎭 [EMOTION_ENGINE] Stage 2 - Goal Impact: {base_goal_impact} → {goal_impact} (episode-adjusted)")
         else:
@@ -387,7 +747,7 @@ class EmotionEngine(BaseService):
         
         # Stage 4: Normative Check ("Is this socially appropriate?")
         base_social = await self._apply_social_regulation(goal_impact, coping_capability, sentiment_data)
-        social_appropriateness = self.conversational_context.adjust_social_appropriateness(base_social)
+        social_appropriateness = context.adjust_social_appropriateness(base_social)
         if base_social != social_appropriateness:
             print(f"🎭 [EMOTION_ENGINE] Stage 4 - Social Appropriateness: {base_social} → {social_appropriateness} (context-adjusted)")
         else:
@@ -405,35 +765,40 @@ class EmotionEngine(BaseService):
         )
         
         # Generate CPM emotional state from appraisal
-        emotional_state = self._generate_cpm_emotional_state(appraisal, sentiment_data)
+        emotional_state = self._generate_cpm_emotional_state(
+            appraisal, sentiment_data, previous_state, turns_since_change
+        )
         
         print(f"🎭 [EMOTION_ENGINE] Generated state: {emotional_state.subjective_feeling.value} (v={emotional_state.mood_valence:.2f}, a={emotional_state.mood_arousal:.2f}, i={emotional_state.intensity:.2f})")
         self.logger.debug(f"🎭 Generated CPM state: {emotional_state.subjective_feeling.value} (valence={emotional_state.mood_valence:.2f}, arousal={emotional_state.mood_arousal:.2f})")
         
         return emotional_state
     
-    async def _request_sentiment_analysis(
-        self,
-        message_text: str,
-        user_id: str,
-        conversation_id: str
-    ) -> None:
-        """Request sentiment analysis from modelservice (non-blocking)"""
+    async def _request_sentiment(self, message_text: str) -> Dict[str, Any]:
+        """
+        Sentiment for a text via the modelservice bus, in modelservice response
+        shape. Concurrent requests for the same text share one bus request;
+        waiting is bounded by sentiment_timeout.
+        """
+        in_flight = self._sentiment_by_text.get(message_text)
+        if in_flight is not None:
+            self.metrics.coalesced_requests += 1
+            return await asyncio.shield(in_flight)
+        
+        future = asyncio.get_running_loop().create_future()
+        self._sentiment_by_text[message_text] = future
+        request_id = str(uuid.uuid4())
+        self.pending_sentiment_requests[request_id] = future
+        self._evict_pending_sentiment_requests()
+        self.metrics.sentiment_requests += 1
+        start = time.perf_counter()
+        result: Dict[str, Any] = {"success": False, "error": "cancelled"}
+        
         try:
-            request_id = str(uuid.uuid4())
-            
-            # Create sentiment request
             from aico.proto.aico_modelservice_pb2 import SentimentRequest
             request = SentimentRequest()
             request.text = message_text
             
-            # Store context for completing processing when response arrives
-            self.pending_sentiment_requests[request_id] = {
-                "message_text": message_text,
-                "user_id": user_id,
-                "conversation_id": conversation_id
-            }
-            
             # Build response topic for reply_to
             response_topic = AICOTopics.build_response_topic(
                 AICOTopics.MODELSERVICE_SENTIMENT_RESPONSE,
@@ -441,24 +806,37 @@ class EmotionEngine(BaseService):
                 request_id
             )
             
-            # Publish the request
             await self.bus_client.publish(
-                AICOTopics.MODELSERVICE_SENTIMENT_REQUEST, 
-                request, 
+                AICOTopics.MODELSERVICE_SENTIMENT_REQUEST,
+                request,
                 correlation_id=request_id,
                 reply_to=response_topic
             )
             
-            # Return immediately - response will be handled by callback
-                
+            result = await asyncio.wait_for(asyncio.shield(future), self.sentiment_timeout)
+            self.metrics.sentiment_latency_ms.append((time.perf_counter() - start) * 1000)
+            
+        except asyncio.TimeoutError:
+            self.metrics.sentiment_timeouts += 1
+            result = {"success": False, "error": f"no sentiment response within {self.sentiment_timeout}s"}
         except Exception as e:
-            print(f"🎭 [EMOTION_ENGINE] ❌ Sentiment request ERROR: {e}")
-            import traceback
-            print(f"🎭 [EMOTION_ENGINE] Traceback: {traceback.format_exc()}")
             self.logger.error(f"Sentiment request error: {e}")
-            # Clean up
-            if request_id in self.pending_sentiment_requests:
-                del self.pending_sentiment_requests[request_id]
+            result = {"success": False, "error": str(e)}
+        finally:
+            self.pending_sentiment_requests.pop(request_id, None)
+            self._sentiment_by_text.pop(message_text, None)
+            if not future.done():
+                future.set_result(result)
+        
+        return future.result()
+    
+    def _evict_pending_sentiment_requests(self) -> None:
+        """Fail the oldest pending requests beyond max_pending_sentiment_requests"""
+        while len(self.pending_sentiment_requests) > self.max_pending_sentiment_requests:
+            _, future = self.pending_sentiment_requests.popitem(last=False)
+            self.metrics.pending_evictions += 1
+            if not future.done():
+                future.set_result({"success": False, "error": "evicted: too many pending sentiment requests"})
     
     async def _complete_emotional_processing(
         self,
@@ -466,34 +844,39 @@ class EmotionEngine(BaseService):
         user_id: str,
         conversation_id: str,
         sentiment_data: Dict[str, Any]
-    ) -> None:
-        """Complete emotional processing with sentiment data (called from callback)"""
+    ) -> Optional[EmotionalState]:
+        """Complete emotional processing with sentiment data; returns the new state"""
         try:
             print(f"🔍 [EMOTION_ENGINE] _complete_emotional_processing CALLED for conversation {conversation_id}")
             
-            # Update previous state BEFORE generating new state (for inertia calculation)
-            previous_feeling = self.current_state.subjective_feeling if self.current_state else None
-            self.previous_state = self.current_state
+            # Capture this user's previous state BEFORE generating the new one (for inertia);
+            # passed down rather than stored on the engine, which appraises many users at once
+            previous_state = await self.get_user_state(user_id)
+            previous_feeling = previous_state.subjective_feeling
+            turns_since_change = self._turns_since_change.get(user_id, 0)
             print(f"🔍 [EMOTION_ENGINE] Previous state saved: {previous_feeling}")
             
-            # Run appraisal with sentiment data (uses self.previous_state for inertia)
+            # Run appraisal with sentiment data
             print(f"🔍 [EMOTION_ENGINE] About to call _process_emotional_response_with_sentiment...")
             emotional_state = await self._process_emotional_response_with_sentiment(
                 user_id=user_id,
                 message_text=message_text,
                 conversation_id=conversation_id,
-                sentiment_data=sentiment_data
+                sentiment_data=sentiment_data,
+                previous_state=previous_state,
+                turns_since_change=turns_since_change
             )
             print(f"🔍 [EMOTION_ENGINE] _process_emotional_response_with_sentiment returned: {emotional_state.subjective_feeling.value}")
             
-            # Update current state after generation
+            # Update current state after generation (in memory; persisted by the next flush)
             self.current_state = emotional_state
+            self.state_store.record(user_id, emotional_state)
             
             # Track state changes for decay
             if previous_feeling and previous_feeling != emotional_state.subjective_feeling:
-                self.turns_since_state_change = 0
+                self._turns_since_change[user_id] = 0
             else:
-                self.turns_since_state_change += 1
+                self._turns_since_change[user_id] = turns_since_change + 1
             
             # Log state transition if significant change
             if previous_feeling and previous_feeling != emotional_state.subjective_feeling:
@@ -505,10 +888,8 @@ class EmotionEngine(BaseService):
             # Publish emotional state
             await self._publish_emotional_state(emotional_state)
             
-            # Add to history (compact format)
-            self._add_to_history(emotional_state.to_compact_dict())
-            
             self.logger.info(f"🎭 [EMOTION_PROCESSOR] Generated emotional state: {emotional_state.subjective_feeling.value}")
+            return emotional_state
             
         except Exception as e:
             import traceback
@@ -516,6 +897,14 @@ class EmotionEngine(BaseService):
             print(f"🚨 [EMOTION_ENGINE] Traceback: {traceback.format_exc()}")
             self.logger.error(f"Error completing emotional processing: {e}\n{traceback.format_exc()}")
     
+    def _sentiment_data(self, label: str, confidence: float) -> Dict[str, Any]:
+        """Sentiment data used by the appraisal stages"""
+        return {
+            "label": label,
+            "confidence": confidence,
+            "valence": self._map_sentiment_to_valence(label)
+        }
+    
     def _map_sentiment_to_valence(self, label: str) -> float:
         """Map sentiment label to valence score [-1.0, 1.0]"""
         # BERT multilingual sentiment uses star ratings
@@ -753,7 +1142,9 @@ class EmotionEngine(BaseService):
     def _generate_cpm_emotional_state(
         self, 
         appraisal: AppraisalResult,
-        sentiment_data: Dict[str, Any]
+        sentiment_data: Dict[str, Any],
+        previous_state: Optional[EmotionalState] = None,
+        turns_since_change: int = 0
     ) -> EmotionalState:
         """
         Generate CPM 5-component emotional state from appraisal results.
@@ -867,9 +1258,9 @@ class EmotionEngine(BaseService):
         
         # Apply emotional inertia AFTER regulation (Kuppens et al., 2010; Scherer CPM recursive appraisal)
         # Inertia blends the REGULATED appraisal with previous state to prevent double-dampening
-        if self.inertia_enabled and self.previous_state is not None:
+        if self.inertia_enabled and previous_state is not None:
             # Calculate decay based on turns since state change
-            effective_inertia = self.inertia_weight * (1.0 - self.inertia_decay * self.turns_since_state_change)
+            effective_inertia = self.inertia_weight * (1.0 - self.inertia_decay * turns_since_change)
             effective_inertia = max(0.0, effective_inertia)  # Don't go negative
             
             # Reduce inertia for acute threat responses (LeDoux 1996: amygdala overrides)
@@ -880,29 +1271,29 @@ class EmotionEngine(BaseService):
             
             effective_reactivity = 1.0 - effective_inertia
             
-            print(f"🧠 [INERTIA] Previous: {self.previous_state.subjective_feeling.value} (v={self.previous_state.mood_valence:.2f}, a={self.previous_state.mood_arousal:.2f})")
+            print(f"🧠 [INERTIA] Previous: {previous_state.subjective_feeling.value} (v={previous_state.mood_valence:.2f}, a={previous_state.mood_arousal:.2f})")
             print(f"🧠 [INERTIA] Target (regulated): (v={valence:.2f}, a={arousal:.2f})")
-            print(f"🧠 [INERTIA] Weights: inertia={effective_inertia:.2f}, reactivity={effective_reactivity:.2f}, turns={self.turns_since_state_change}")
+            print(f"🧠 [INERTIA] Weights: inertia={effective_inertia:.2f}, reactivity={effective_reactivity:.2f}, turns={turns_since_change}")
             
             # Store regulated values for comparison
             regulated_valence, regulated_arousal = valence, arousal
             
             # Blend previous and current states (leaky integrator model)
             arousal_before_inertia = arousal
-            valence = (valence * effective_reactivity) + (self.previous_state.mood_valence * effective_inertia)
-            arousal = (arousal * effective_reactivity) + (self.previous_state.mood_arousal * effective_inertia)
+            valence = (valence * effective_reactivity) + (previous_state.mood_valence * effective_inertia)
+            arousal = (arousal * effective_reactivity) + (previous_state.mood_arousal * effective_inertia)
             
             print(f"🧠 [INERTIA] Blended: (v={valence:.2f}, a={arousal:.2f})")
-            print(f"🎯 [AROUSAL_DEBUG] Stage 4 - After inertia: {arousal:.2f} (was {arousal_before_inertia:.2f}, previous={self.previous_state.mood_arousal:.2f})")
+            print(f"🎯 [AROUSAL_DEBUG] Stage 4 - After inertia: {arousal:.2f} (was {arousal_before_inertia:.2f}, previous={previous_state.mood_arousal:.2f})")
             
             # Apply minimum valence floor to prevent excessive decay in positive contexts
             # Scientific basis: Fredrickson (2001) - Positive emotions should persist
             # If previous state was non-negative (v>0.1), maintain minimum positive valence
             # to avoid drift to zero during neutral inputs or recovery scenarios
-            if self.previous_state.mood_valence > 0.1 and valence < 0.15:
+            if previous_state.mood_valence > 0.1 and valence < 0.15:
                 original_valence = valence
                 valence = 0.15  # Minimum floor for positive emotional contexts
-                print(f"🛡️ [VALENCE_FLOOR] Applied minimum valence floor: {valence:.2f} (was {original_valence:.2f}, prev={self.previous_state.mood_valence:.2f})")
+                print(f"🛡️ [VALENCE_FLOOR] Applied minimum valence floor: {valence:.2f} (was {original_valence:.2f}, prev={previous_state.mood_valence:.2f})")
             
             # Supportive context bias: DISABLED per Kuppens et al. (2010)
             # Excessive inertia prevents appropriate emotional responses
@@ -1025,143 +1416,40 @@ class EmotionEngine(BaseService):
             
             self.logger.debug(f"Published emotional state: {state.subjective_feeling.value}")
             
-            # Persist state to database
-            await self._persist_state(state)
-            
         except Exception as e:
             self.logger.error(f"Error publishing emotional state: {e}")
     
-    def _add_to_history(self, compact_state: Dict[str, Any]) -> None:
-        """Add compact state to history for mood arc visualization"""
-        self.state_history.append(compact_state)
-        
-        # Trim history if too large
-        if len(self.state_history) > self.max_history_size:
-            trimmed_count = len(self.state_history) - self.max_history_size
-            self.state_history = self.state_history[-self.max_history_size:]
-            self.logger.debug(f"🎭 Trimmed {trimmed_count} old states from history (max={self.max_history_size})")
-    
-    async def get_current_state(self) -> Optional[Dict[str, Any]]:
-        """Get current emotional state (compact projection)"""
-        if self.current_state:
-            return self.current_state.to_compact_dict()
+    async def get_current_state(self, user_id: Optional[str] = None) -> Optional[Dict[str, Any]]:
+        """Get current emotional state (compact projection), for a user or the most recent one"""
+        state = await self.get_user_state(user_id) if user_id else self.current_state
+        if state:
+            return state.to_compact_dict()
         return None
     
-    async def get_state_history(self, limit: int = 100) -> List[Dict[str, Any]]:
-        """Get emotional state history (compact projections)"""
-        return self.state_history[-limit:]
+    async def get_user_state(self, user_id: str) -> Optional[EmotionalState]:
+        """Current emotional state of a user (falls back to the global baseline)"""
+        await self.state_store.load(user_id)
+        return self.state_store.get(user_id) or self.state_store.get(SYSTEM_USER_ID) or self._create_neutral_state()
+    
+    async def get_state_history(self, limit: int = 100, user_id: str = SYSTEM_USER_ID) -> List[Dict[str, Any]]:
+        """Get a user's emotional state history (timestamp, feeling, valence, arousal, intensity)"""
+        await self.state_store.load(user_id)
+        return self.state_store.history(user_id, limit)
     
     # ============================================================================
     # STATE PERSISTENCE
     # ============================================================================
     
     async def _load_persisted_state(self) -> None:
-        """Load emotional state from database on startup"""
-        try:
-            # Load current state
-            cursor = self.db_connection.execute(
-                "SELECT timestamp, subjective_feeling, mood_valence, mood_arousal, intensity, "
-                "warmth, directness, formality, engagement, closeness, care_focus "
-                "FROM emotion_state WHERE id = 1"
-            )
-            row = cursor.fetchone()
-            
-            if row:
-                # Reconstruct emotional state from database
-                self.current_state = EmotionalState(
-                    timestamp=datetime.fromisoformat(row[0]),
-                    subjective_feeling=EmotionLabel(row[1]),
-                    mood_valence=row[2],
-                    mood_arousal=row[3],
-                    intensity=row[4],
-                    warmth=row[5],
-                    directness=row[6],
-                    formality=row[7],
-                    engagement=row[8],
-                    closeness=row[9],
-                    care_focus=row[10]
-                )
-                self.logger.info(f"🎭 Loaded persisted emotional state: {self.current_state.subjective_feeling.value}")
-            else:
-                # No persisted state, create neutral baseline
-                self.current_state = self._create_neutral_state()
-                self.logger.info("🎭 No persisted state found, initialized with neutral baseline")
-            
-            # Load history (last N entries)
-            cursor = self.db_connection.execute(
-                "SELECT timestamp, feeling, valence, arousal, intensity "
-                "FROM emotion_history "
-                "ORDER BY timestamp DESC "
-                "LIMIT ?",
-                (self.max_history_size,)
-            )
-            
-            # Reverse to get chronological order
-            history_rows = list(reversed(cursor.fetchall()))
-            self.state_history = [
-                {
-                    "timestamp": row[0],
-                    "feeling": row[1],
-                    "valence": row[2],
-                    "arousal": row[3],
-                    "intensity": row[4]
-                }
-                for row in history_rows
-            ]
-            
-            if self.state_history:
-                self.logger.info(f"🎭 Loaded {len(self.state_history)} historical emotional states")
-                
-        except Exception as e:
-            self.logger.error(f"Error loading persisted emotional state: {e}")
-            # Fallback to neutral state
+        """Load the baseline emotional state from database on startup"""
+        await self.state_store.load(SYSTEM_USER_ID)
+        self.current_state = self.state_store.get(SYSTEM_USER_ID)
+        if self.current_state:
+            self.logger.info(f"🎭 Loaded persisted emotional state: {self.current_state.subjective_feeling.value}")
+        else:
+            # No persisted state, create neutral baseline
             self.current_state = self._create_neutral_state()
-            self.state_history = []
-    
-    async def _persist_state(self, state: EmotionalState) -> None:
-        """Persist emotional state to database"""
-        try:
-            # Update current state (single row with id=1)
-            self.db_connection.execute(
-                """INSERT OR REPLACE INTO emotion_state 
-                   (id, user_id, timestamp, subjective_feeling, mood_valence, mood_arousal, 
-                    intensity, warmth, directness, formality, engagement, closeness, care_focus, updated_at)
-                   VALUES (1, 'system', ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, datetime('now'))""",
-                (
-                    state.timestamp.isoformat(),
-                    state.subjective_feeling.value,
-                    state.mood_valence,
-                    state.mood_arousal,
-                    state.intensity,
-                    state.warmth,
-                    state.directness,
-                    state.formality,
-                    state.engagement,
-                    state.closeness,
-                    state.care_focus
-                )
-            )
-            
-            # Add to history
-            compact_state = state.to_compact_dict()
-            self.db_connection.execute(
-                """INSERT INTO emotion_history 
-                   (user_id, timestamp, feeling, valence, arousal, intensity)
-                   VALUES ('system', ?, ?, ?, ?, ?)""",
-                (
-                    compact_state["timestamp"],
-                    compact_state["label"]["primary"],
-                    compact_state["mood"]["valence"],
-                    compact_state["mood"]["arousal"],
-                    compact_state["label"]["intensity"]
-                )
-            )
-            
-            self.db_connection.commit()
-            self.logger.debug(f"🎭 Persisted emotional state: {state.subjective_feeling.value}")
-            
-        except Exception as e:
-            self.logger.error(f"Error persisting emotional state: {e}")
+            self.logger.info("🎭 No persisted state found, initialized with neutral baseline")
 
 
 # ============================================================================
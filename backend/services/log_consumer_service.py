@@ -17,6 +17,7 @@ from aico.core.bus import MessageBusClient
 from aico.proto.aico_core_envelope_pb2 import AicoMessage
 from aico.proto.aico_core_logging_pb2 import LogEntry, LogLevel
 from aico.data.libsql.encrypted import EncryptedLibSQLConnection
+from aico.data.libsql.partitions import TimePartitioner
 from backend.core.service_container import BaseService, ServiceContainer, ServiceState
 
 class LogConsumerService(BaseService):
@@ -45,6 +46,7 @@ class LogConsumerService(BaseService):
         
         # Dependencies (resolved during initialization)
         self.db_connection: Optional[EncryptedLibSQLConnection] = None
+        self.partitioner: Optional[TimePartitioner] = None
         
         self.logger.info(f"Log consumer service created (enabled: {self.enabled})")
     
@@ -65,6 +67,9 @@ class LogConsumerService(BaseService):
             if not self.db_connection:
                 raise RuntimeError("Database service not available")
             
+            # Optional day/week partitions for the logs table (core.scheduler.retention.partitioning)
+            self.partitioner = TimePartitioner.from_config(self.db_connection, "logs", self.container.config)
+            
             # Create encrypted MessageBusClient using container config
             self.message_bus_client = MessageBusClient("log_consumer")
             
@@ -272,8 +277,9 @@ class LogConsumerService(BaseService):
             extra_json = json.dumps(extra_payload) if extra_payload else None
 
             # Insert to database using LibSQL execute() method
-            self.db_connection.execute("""
-                INSERT INTO logs (
+            table = self.partitioner.table_for(timestamp_iso) if self.partitioner else "logs"
+            self.db_connection.execute(f"""
+                INSERT INTO {table} (
                     timestamp, level, subsystem, module, function_name, file_path, line_number, topic, message,
                     user_uuid, session_id, trace_id, extra
                 ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
@@ -582,13 +582,20 @@ class ModelServiceClient:
             raise
     
     async def get_embeddings_batch(self, model: str, prompts: List[str]) -> Dict[str, Any]:
-        """FIXED: Proper concurrent batch processing with controlled concurrency."""
+        """
+        Embed many prompts; ``data.embeddings`` is aligned with ``prompts`` (None on failure).
+        
+        EmbeddingsRequest carries a single prompt, so this still sends one
+        request per distinct prompt (at most 2 in flight); identical prompts
+        are embedded once and share the result.
+        """
         import time
         import asyncio
         start_time = time.time()
         
         try:
-            self.logger.info(f"🔍 [BATCH_EMBEDDING_CLIENT] Processing {len(prompts)} embeddings with controlled concurrency")
+            unique_prompts = list(dict.fromkeys(prompts))
+            self.logger.info(f"🔍 [BATCH_EMBEDDING_CLIENT] Processing {len(prompts)} embeddings ({len(unique_prompts)} distinct) with controlled concurrency")
             
             # FIXED: Use controlled concurrency instead of sequential processing
             semaphore = asyncio.Semaphore(2)  # Max 2 concurrent requests to prevent overload
@@ -610,12 +617,16 @@ class ModelServiceClient:
                         self.logger.error(f"🔍 [BATCH_EMBEDDING_CLIENT] Embedding {index+1}/{len(prompts)} error: {e}")
                         return None
             
-            # Process all embeddings concurrently with controlled concurrency
-            tasks = [process_single_embedding(prompt, i) for i, prompt in enumerate(prompts)]
-            embeddings = await asyncio.gather(*tasks, return_exceptions=True)
+            # Process all distinct prompts concurrently with controlled concurrency
+            tasks = [process_single_embedding(prompt, i) for i, prompt in enumerate(unique_prompts)]
+            unique_embeddings = await asyncio.gather(*tasks, return_exceptions=True)
             
-            # Convert exceptions to None
-            embeddings = [emb if not isinstance(emb, Exception) else None for emb in embeddings]
+            # Convert exceptions to None and map back onto the requested order
+            by_prompt = {
+                prompt: emb if not isinstance(emb, Exception) else None
+                for prompt, emb in zip(unique_prompts, unique_embeddings)
+            }
+            embeddings = [by_prompt[prompt] for prompt in prompts]
             failed_count = sum(1 for emb in embeddings if emb is None)
             
             elapsed_time = time.time() - start_time
@@ -0,0 +1,135 @@
+"""
+Unit tests for routing conversation output to in-flight requests.
+"""
+
+import asyncio
+from types import SimpleNamespace
+
+from google.protobuf.any_pb2 import Any
+
+from aico.core.topics import AICOTopics
+from aico.proto.aico_conversation_pb2 import StreamingResponse
+
+from backend.api.conversation.stream_demux import ConversationStreamDemux, get_stream_demux
+import backend.api.conversation.stream_demux as stream_demux
+
+
+class _BusClient:
+    """Fake bus client recording subscriptions."""
+
+    def __init__(self):
+        self.subscriptions = {}
+        self.unsubscribed = []
+
+    async def subscribe(self, topic, callback):
+        self.subscriptions[topic] = callback
+
+    async def unsubscribe(self, topic):
+        self.unsubscribed.append(topic)
+        self.subscriptions.pop(topic, None)
+
+
+def _envelope(request_id, content, accumulated, done=False, content_type="response"):
+    payload = Any()
+    payload.Pack(StreamingResponse(
+        request_id=request_id,
+        content=content,
+        accumulated_content=accumulated,
+        done=done,
+        content_type=content_type
+    ))
+    return SimpleNamespace(any_payload=payload)
+
+
+def _drain(queue):
+    chunks = []
+    while not queue.empty():
+        chunks.append(queue.get_nowait())
+    return chunks
+
+
+class TestConversationStreamDemux:
+    """Test cases for ConversationStreamDemux."""
+
+    def test_routes_chunks_by_request_id(self):
+        """Test that each request only receives its own chunks."""
+        demux = ConversationStreamDemux(_BusClient())
+
+        async def run():
+            first = await demux.open_stream("r1")
+            second = await demux.open_stream("r2")
+            demux._handle_stream_chunk(_envelope("r1", "Hel", "Hel"))
+            demux._handle_stream_chunk(_envelope("r2", "Hi", "Hi", done=True))
+            demux._handle_stream_chunk(_envelope("r3", "lost", "lost"))
+            return _drain(first), _drain(second)
+
+        first, second = asyncio.run(run())
+
+        assert [c["content"] for c in first] == ["Hel"]
+        assert [c["content"] for c in second] == ["Hi"]
+        assert demux.chunks_unrouted == 1
+
+    def test_full_queue_merges_instead_of_dropping(self):
+        """Test that overflowing chunks are merged so concatenated deltas stay complete."""
+        demux = ConversationStreamDemux(_BusClient(), queue_size=2)
+        deltas = ["The ", "quick ", "brown ", "fox"]
+
+        async def run():
+            queue = await demux.open_stream("r1")
+            accumulated = ""
+            for index, delta in enumerate(deltas):
+                accumulated += delta
+                demux._handle_stream_chunk(
+                    _envelope("r1", delta, accumulated, done=index == len(deltas) - 1)
+                )
+            return _drain(queue)
+
+        chunks = asyncio.run(run())
+
+        assert len(chunks) == 2
+        assert "".join(c["content"] for c in chunks) == "The quick brown fox"
+        assert chunks[-1]["accumulated"] == "The quick brown fox"
+        assert chunks[-1]["done"]
+        assert demux.chunks_merged == 2
+
+    def test_unmergeable_overflow_fails_stream(self):
+        """Test that a full queue ending in another content type fails the stream explicitly."""
+        demux = ConversationStreamDemux(_BusClient(), queue_size=1)
+
+        async def run():
+            queue = await demux.open_stream("r1")
+            demux._handle_stream_chunk(_envelope("r1", "hmm", "hmm", content_type="thinking"))
+            demux._handle_stream_chunk(_envelope("r1", "Hi", "Hi"))
+            return _drain(queue)
+
+        chunks = asyncio.run(run())
+
+        assert len(chunks) == 1
+        assert chunks[0]["error"]
+        assert chunks[0]["done"]
+        assert demux.streams_failed == 1
+        assert demux.active_requests == 0
+
+    def test_rebind_keeps_in_flight_requests(self):
+        """Test that a new bus client takes over subscriptions without orphaning requests."""
+        old_client, new_client = _BusClient(), _BusClient()
+        stream_demux._demux = None
+        demux = get_stream_demux(old_client)
+
+        async def run():
+            queue = await demux.open_stream("r1")
+            assert get_stream_demux(new_client) is demux
+
+            await demux.open_stream("r2")
+            callback = new_client.subscriptions[AICOTopics.CONVERSATION_STREAM]
+            callback(_envelope("r1", "still here", "still here", done=True))
+            return _drain(queue)
+
+        try:
+            chunks = asyncio.run(run())
+        finally:
+            stream_demux._demux = None
+
+        assert [c["content"] for c in chunks] == ["still here"]
+        assert AICOTopics.CONVERSATION_STREAM in old_client.unsubscribed
+        assert demux.bus_client is new_client
@@ -0,0 +1,54 @@
+"""
+Unit tests for the encryption middleware's background cleanup.
+"""
+
+import asyncio
+
+from aico.core.logging import get_logger
+
+from backend.api_gateway.middleware.encryption import EncryptionMiddleware
+
+
+class _Channel:
+    def __init__(self, valid):
+        self.valid = valid
+
+    def is_session_valid(self):
+        return self.valid
+
+
+def _middleware(enabled=True):
+    """Middleware without transport setup (no key manager or configuration needed)."""
+    middleware = EncryptionMiddleware.__new__(EncryptionMiddleware)
+    middleware.logger = get_logger("backend", "api_gateway.encryption")
+    middleware.enabled = enabled
+    if enabled:
+        middleware.cleanup_interval = 0.01
+        middleware.cleanup_task = None
+        middleware.channels = {}
+    return middleware
+
+
+class TestEncryptionMiddlewareCleanup:
+    """Test cases for EncryptionMiddleware channel cleanup."""
+
+    def test_cleanup_loop_expires_channels(self):
+        """Test that the loop removes expired channels until shutdown cancels it."""
+        middleware = _middleware()
+        middleware.channels = {"expired": _Channel(False), "live": _Channel(True)}
+
+        async def run():
+            middleware.cleanup_task = asyncio.create_task(middleware._cleanup_loop())
+            await asyncio.sleep(0.05)
+            remaining = set(middleware.channels)
+            await middleware.shutdown()
+            return remaining
+
+        assert asyncio.run(run()) == {"live"}
+        assert middleware.cleanup_task.done()
+        assert middleware.channels == {}
+
+    def test_shutdown_without_started_loop(self):
+        """Test that shutdown works before any request started the loop, and when disabled."""
+        asyncio.run(_middleware().shutdown())
+        asyncio.run(_middleware(enabled=False).shutdown())
@@ -0,0 +1,130 @@
+"""
+Unit tests for WebSocket fan-out and slow consumer handling.
+"""
+
+import asyncio
+import json
+
+from backend.api_gateway.adapters.websocket_adapter import WebSocketAdapter, WebSocketConnection
+
+
+class _WebSocket:
+    """Fake websocket recording sent frames and close calls."""
+
+    def __init__(self, block_sends: bool = False):
+        self.sent = []
+        self.close_calls = 0
+        self.closed = False
+        self.block_sends = block_sends
+
+    async def send(self, frame):
+        if self.block_sends:
+            await asyncio.Event().wait()
+        self.sent.append(frame)
+
+    async def close(self, code=1000, reason=""):
+        self.close_calls += 1
+        await asyncio.sleep(0)
+        self.closed = True
+
+
+def _adapter(**config) -> WebSocketAdapter:
+    return WebSocketAdapter(config, None, None, None, None, None)
+
+
+def _connect(adapter: WebSocketAdapter, client_id: str, topic: str, websocket: _WebSocket) -> WebSocketConnection:
+    connection = WebSocketConnection(
+        websocket=websocket,
+        client_id=client_id,
+        authenticated=True,
+        outbound=asyncio.Queue(maxsize=adapter.outbound_queue_size)
+    )
+    connection.subscriptions.add(topic)
+    adapter.connections[client_id] = connection
+    adapter.topic_subscribers.setdefault(topic, set()).add(client_id)
+    return connection
+
+
+class TestWebSocketAdapter:
+    """Test cases for WebSocketAdapter broadcast delivery."""
+
+    def test_broadcast_reaches_only_topic_subscribers(self):
+        """Test that a broadcast is delivered to the subscribers of its topic only."""
+        adapter = _adapter()
+
+        async def run():
+            subscriber = _connect(adapter, "a", "emotion", _WebSocket())
+            other = _connect(adapter, "b", "status", _WebSocket())
+            for connection in (subscriber, other):
+                connection.sender_task = asyncio.create_task(adapter._sender_loop(connection))
+            await adapter.broadcast_to_subscribers("emotion", {"mood": "calm"})
+            await asyncio.sleep(0.01)
+            await adapter.stop()
+            return subscriber, other
+
+        subscriber, other = asyncio.run(run())
+
+        assert [json.loads(frame)["data"] for frame in subscriber.websocket.sent] == [{"mood": "calm"}]
+        assert other.websocket.sent == []
+        assert subscriber.frames_sent == 1
+
+    def test_drop_oldest_keeps_newest_frames(self):
+        """Test that a full queue drops its oldest frame under the drop_oldest policy."""
+        adapter = _adapter(outbound_queue_size=2)
+
+        async def run():
+            connection = _connect(adapter, "a", "emotion", _WebSocket())
+            for value in range(3):
+                await adapter.broadcast_to_subscribers("emotion", {"value": value})
+            return connection
+
+        connection = asyncio.run(run())
+
+        queued = [json.loads(connection.outbound.get_nowait()[1])["data"]["value"] for _ in range(2)]
+        assert queued == [1, 2]
+        assert connection.frames_dropped == 1
+
+    def test_slow_consumer_is_closed_once(self):
+        """Test that repeated overflows schedule a single tracked close."""
+        adapter = _adapter(outbound_queue_size=1, slow_consumer_policy="disconnect")
+
+        async def run():
+            websocket = _WebSocket(block_sends=True)
+            connection = _connect(adapter, "a", "emotion", websocket)
+            for value in range(5):
+                await adapter.broadcast_to_subscribers("emotion", {"value": value})
+
+            close_task = connection.close_task
+            assert close_task is not None
+            assert adapter._close_tasks == {close_task}
+
+            # Cleanup from the connection handler while the close is in flight
+            await adapter._close_connection(connection, "Connection ended")
+            await close_task
+            return connection, websocket
+
+        connection, websocket = asyncio.run(run())
+
+        assert websocket.close_calls == 1
+        assert connection.closing
+        assert "a" not in adapter.connections
+        assert "emotion" not in adapter.topic_subscribers
+        assert not adapter._close_tasks
+
+    def test_stop_awaits_scheduled_closes(self):
+        """Test that stopping the adapter waits for scheduled slow consumer closes."""
+        adapter = _adapter(outbound_queue_size=1, slow_consumer_policy="disconnect")
+
+        async def run():
+            websocket = _WebSocket()
+            connection = _connect(adapter, "a", "emotion", websocket)
+            await adapter.broadcast_to_subscribers("emotion", {"value": 0})
+            await adapter.broadcast_to_subscribers("emotion", {"value": 1})
+            await adapter.stop()
+            return connection, websocket
+
+        connection, websocket = asyncio.run(run())
+
+        assert connection.close_task.done()
+        assert websocket.close_calls == 1
+        assert not adapter.connections
@@ -0,0 +1,109 @@
+"""
+Unit tests for paged AMS feedback classification.
+"""
+
+import asyncio
+
+import pytest
+
+import backend.services
+from backend.scheduler.tasks.ams_feedback_classification import FeedbackClassificationTask
+from backend.scheduler.tasks.base import TaskContext
+
+LABELS = list(FeedbackClassificationTask.CATEGORY_LABELS.values())
+
+
+class _Modelservice:
+    """Fake modelservice: label texts get one-hot embeddings, anything else an unrelated one."""
+
+    def __init__(self, interrupt_on_call=None):
+        self.batches = []
+        self.interrupt_on_call = interrupt_on_call
+
+    async def get_embeddings_batch(self, model, prompts):
+        self.batches.append(list(prompts))
+        if len(self.batches) == self.interrupt_on_call:
+            raise asyncio.CancelledError()
+        embeddings = []
+        for prompt in prompts:
+            vector = [0.0] * (len(LABELS) + 1)
+            vector[LABELS.index(prompt) if prompt in LABELS else len(LABELS)] = 1.0
+            embeddings.append(vector)
+        return {"success": True, "data": {"embeddings": embeddings}}
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute(
+        """CREATE TABLE feedback_events (
+            event_id TEXT PRIMARY KEY,
+            user_id TEXT NOT NULL,
+            free_text TEXT,
+            reason TEXT,
+            processed BOOLEAN DEFAULT FALSE
+        )"""
+    )
+    # e00..e04 match a category; e05 matches nothing
+    rows = [(f"e{i:02d}", "u1", LABELS[i]) for i in range(5)] + [("e05", "u1", "unrelated remark")]
+    sqlite_db.execute_many("INSERT INTO feedback_events (event_id, user_id, free_text) VALUES (?, ?, ?)", rows)
+    sqlite_db.batches = 0
+    return sqlite_db
+
+
+@pytest.fixture(autouse=True)
+def fresh_label_cache(monkeypatch):
+    monkeypatch.setattr(FeedbackClassificationTask, "_label_embeddings", {})
+
+
+class _Config:
+    def get(self, key, default=None):
+        return {"enabled": True} if key == "core.memory.behavioral" else default
+
+
+def _run(db, modelservice, monkeypatch):
+    monkeypatch.setattr(backend.services, "get_modelservice_client", lambda config_manager: modelservice)
+    context = TaskContext("ams.feedback_classification", _Config(), db, instance_config={"batch_size": 2})
+    return asyncio.run(FeedbackClassificationTask().execute(context))
+
+
+def _processed(db):
+    return db.execute("SELECT event_id, reason FROM feedback_events WHERE processed ORDER BY event_id").fetchall()
+
+
+class TestFeedbackClassificationTask:
+    """Test cases for FeedbackClassificationTask."""
+
+    def test_pages_are_classified_and_written_separately(self, db, monkeypatch):
+        """Test that each page is embedded once and committed with its own write."""
+        modelservice = _Modelservice()
+
+        result = _run(db, modelservice, monkeypatch)
+
+        assert result.success
+        assert result.data == {"total_feedback": 6, "classified": 5, "failed": 1}
+        # One label batch, then pages of two
+        assert [len(batch) for batch in modelservice.batches] == [5, 2, 2, 2]
+        assert db.batches == 3
+        categories = list(FeedbackClassificationTask.CATEGORY_LABELS)
+        assert _processed(db) == [(f"e{i:02d}", categories[i]) for i in range(5)]
+
+    def test_interrupted_run_keeps_finished_pages(self, db, monkeypatch):
+        """Test that pages classified before an interruption stay written."""
+        modelservice = _Modelservice(interrupt_on_call=3)  # labels, page 1, then page 2 is cancelled
+
+        with pytest.raises(asyncio.CancelledError):
+            _run(db, modelservice, monkeypatch)
+
+        assert [event_id for event_id, _ in _processed(db)] == ["e00", "e01"]
+
+    def test_label_embeddings_are_cached_per_model(self, db, monkeypatch):
+        """Test that a second run does not embed the category labels again."""
+        modelservice = _Modelservice()
+        _run(db, modelservice, monkeypatch)
+        modelservice.batches.clear()
+
+        result = _run(db, modelservice, monkeypatch)
+
+        # Only the unmatched event is still pending
+        assert result.data["total_feedback"] == 1
+        assert modelservice.batches == [["unrelated remark"]]
@@ -0,0 +1,309 @@
+"""
+Unit tests for the emotion engine's per-user state handling and turn appraisal.
+"""
+
+import asyncio
+import sqlite3
+from datetime import datetime
+
+import pytest
+
+from aico.data.schemas.core import CORE_SCHEMA
+
+from backend.services.emotion_engine import EmotionEngine, EmotionLabel, EmotionStateStore, SYSTEM_USER_ID
+
+
+class _Config:
+    def get(self, key, default=None):
+        return default
+
+
+class _Container:
+    def __init__(self, db):
+        self.config = _Config()
+        self.db = db
+
+    def get_service(self, name):
+        return self.db
+
+
+class _Bus:
+    def __init__(self):
+        self.published = []
+
+    async def publish(self, topic, message, correlation_id=None, **kwargs):
+        self.published.append(correlation_id)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    for version in (17, 20):
+        for statement in CORE_SCHEMA[version].sql_statements:
+            sqlite_db.execute(statement)
+    sqlite_db.commit()
+    return sqlite_db
+
+
+@pytest.fixture
+def engine(db):
+    engine = EmotionEngine("emotion_engine", _Container(db))
+    engine.bus_client = _Bus()
+    return engine
+
+
+def _state(engine, feeling, valence, minute=0):
+    state = engine._create_neutral_state()
+    state.subjective_feeling = feeling
+    state.mood_valence = valence
+    state.timestamp = datetime(2026, 10, 18, 12, minute, 0)
+    return state
+
+
+class TestEmotionStateStore:
+    """Test cases for EmotionStateStore."""
+
+    def test_flush_writes_latest_state_and_history(self, engine, db):
+        """Test that one flush writes the latest state per user and every history row."""
+        store = engine.state_store
+
+        async def run():
+            await store.load("u1")
+            store.record("u1", _state(engine, EmotionLabel.CALM, 0.1))
+            store.record("u1", _state(engine, EmotionLabel.PLAYFUL, 0.6))
+            store.record("u2", _state(engine, EmotionLabel.REFLECTIVE, -0.2))
+            assert store.pending_writes == 5
+            return await store.flush()
+
+        assert asyncio.run(run()) == 5
+        assert store.pending_writes == 0
+        states = dict(db.execute("SELECT user_id, subjective_feeling FROM emotion_user_state WHERE user_id != 'system'").fetchall())
+        assert states == {"u1": "playful", "u2": "reflective"}
+        assert db.execute("SELECT COUNT(*) FROM emotion_history WHERE user_id != 'system'").fetchone()[0] == 3
+
+    def test_load_reads_persisted_state_once(self, engine, db):
+        """Test that a new store loads a user's state and history, oldest first."""
+        store = engine.state_store
+
+        async def persist():
+            store.record("u1", _state(engine, EmotionLabel.CALM, 0.1))
+            store.record("u1", _state(engine, EmotionLabel.CURIOUS, 0.4, minute=1))
+            await store.flush()
+
+        asyncio.run(persist())
+        fresh = EmotionStateStore(db, engine.logger)
+
+        async def load():
+            await fresh.load("u1")
+            await fresh.load("unknown")
+            return fresh.get("u1"), fresh.history("u1"), fresh.get("unknown")
+
+        state, history, unknown = asyncio.run(load())
+
+        assert state.subjective_feeling == EmotionLabel.CURIOUS
+        assert [entry["feeling"] for entry in history] == ["calm", "curious"]
+        assert unknown is None and fresh.history("unknown") == []
+
+    def test_record_during_load_is_kept(self, engine, db):
+        """Test that a state recorded while a load is reading wins over the database row."""
+        store = engine.state_store
+
+        async def run():
+            store.record("u1", _state(engine, EmotionLabel.CALM, 0.1))
+            await store.flush()
+            fresh = EmotionStateStore(db, engine.logger)
+            loading = asyncio.create_task(fresh.load("u1"))
+            await asyncio.sleep(0)
+            fresh.record("u1", _state(engine, EmotionLabel.PLAYFUL, 0.6))
+            await loading
+            return fresh
+
+        fresh = asyncio.run(run())
+
+        assert fresh.get("u1").subjective_feeling == EmotionLabel.PLAYFUL
+        assert [entry["feeling"] for entry in fresh.history("u1")] == ["playful"]
+
+    def test_failed_flush_requeues_writes(self, engine, db, monkeypatch):
+        """Test that writes survive a failed flush and newer states take precedence."""
+        store = engine.state_store
+        execute = db.execute
+
+        def locked(query, parameters=()):
+            raise sqlite3.OperationalError("database is locked")
+
+        async def run():
+            store.record("u1", _state(engine, EmotionLabel.CALM, 0.1))
+            monkeypatch.setattr(db, "execute", locked)
+            assert await store.flush() == 0
+            store.record("u1", _state(engine, EmotionLabel.PLAYFUL, 0.6))
+            monkeypatch.setattr(db, "execute", execute)
+            return await store.flush()
+
+        assert asyncio.run(run()) == 3
+        assert db.execute("SELECT subjective_feeling FROM emotion_user_state WHERE user_id = 'u1'").fetchone()[0] == "playful"
+
+    def test_stop_flushes_pending_writes(self, engine, db):
+        """Test that stopping the periodic flush writes what is still pending."""
+        store = engine.state_store
+        store.flush_interval = 60
+
+        async def run():
+            store.start()
+            store.record("u1", _state(engine, EmotionLabel.CALM, 0.1))
+            await store.stop()
+
+        asyncio.run(run())
+
+        assert db.execute("SELECT COUNT(*) FROM emotion_history WHERE user_id != 'system'").fetchone()[0] == 1
+
+
+class TestPerUserInertia:
+    """Test cases for per-user emotional inertia."""
+
+    def test_concurrent_users_use_their_own_previous_state(self, engine):
+        """Test that interleaved appraisals blend with each user's own previous state."""
+        engine.state_store.record("happy", _state(engine, EmotionLabel.PLAYFUL, 0.8))
+        engine.state_store.record("sad", _state(engine, EmotionLabel.REFLECTIVE, -0.6))
+        engine._turns_since_change["sad"] = 3
+        assess_relevance = engine._assess_relevance
+
+        async def interleaved_relevance(*args):
+            await asyncio.sleep(0)  # Let the other user's appraisal run in between
+            return await assess_relevance(*args)
+
+        engine._assess_relevance = interleaved_relevance
+        sentiment = engine._sentiment_data("neutral", 0.5)
+
+        async def run():
+            return await asyncio.gather(
+                engine._complete_emotional_processing("hello", "happy", "c1", sentiment),
+                engine._complete_emotional_processing("hello", "sad", "c2", sentiment),
+            )
+
+        happy, sad = asyncio.run(run())
+
+        assert happy.mood_valence > 0.1  # Positive previous state keeps the valence floor
+        assert sad.mood_valence < 0
+        assert engine.state_store.get("happy") is happy and engine.state_store.get("sad") is sad
+        assert not hasattr(engine, "previous_state")
+
+    def test_conversational_context_is_per_user(self, engine):
+        """Test that each user's turns update their own bounded conversational context."""
+        store = engine.state_store
+        store.max_contexts = 2
+        sentiment = engine._sentiment_data("neutral", 0.5)
+
+        async def run():
+            for user_id in ("a", "a", "b"):
+                await engine._complete_emotional_processing("hello", user_id, "c1", sentiment)
+            counts = {user_id: store._contexts[user_id].turn_count for user_id in store._contexts}
+            await engine._complete_emotional_processing("hello", "c", "c2", sentiment)
+            return counts
+
+        counts = asyncio.run(run())
+
+        assert counts == {"a": 2, "b": 1}
+        assert list(store._contexts) == ["b", "c"]
+        assert not hasattr(engine, "conversational_context")
+
+    def test_unknown_user_starts_from_baseline(self, engine):
+        """Test that a user without state falls back to the system baseline."""
+        engine.state_store.record(SYSTEM_USER_ID, _state(engine, EmotionLabel.CALM, 0.3))
+
+        state = asyncio.run(engine.get_user_state("new-user"))
+
+        assert state.subjective_feeling == EmotionLabel.CALM
+        assert engine.state_store.get("new-user") is None
+
+
+class TestTurnAppraisal:
+    """Test cases for single-flight turn appraisal and sentiment requests."""
+
+    def _answer(self, engine, sentiment="positive"):
+        """Resolve every pending sentiment request as a bus response would."""
+        for future in list(engine.pending_sentiment_requests.values()):
+            future.set_result({"success": True, "data": {"sentiment": sentiment, "confidence": 0.9}})
+
+    def test_turn_is_appraised_once(self, engine):
+        """Test that concurrent callers for one message id share a single appraisal."""
+        calls = []
+
+        async def appraise(user_id, message_id, message_text, conversation_id):
+            calls.append(message_id)
+            await asyncio.sleep(0.01)
+            return _state(engine, EmotionLabel.CURIOUS, 0.4)
+
+        engine._appraise = appraise
+
+        async def run():
+            first, second = await asyncio.gather(
+                engine.appraise_turn("u1", "m1", "hi", "c1"),
+                engine.appraise_turn("u1", "m1", "hi", "c1"),
+            )
+            later = await engine.appraise_turn("u1", "m1", "hi", "c1")
+            return first, second, later
+
+        first, second, later = asyncio.run(run())
+
+        assert calls == ["m1"]
+        assert first is second is later
+
+    def test_tracked_turns_are_bounded(self, engine):
+        """Test that only the most recent max_tracked_turns appraisals are kept."""
+        engine.max_tracked_turns = 2
+
+        async def appraise(user_id, message_id, message_text, conversation_id):
+            return None
+
+        engine._appraise = appraise
+
+        async def run():
+            for message_id in ("m1", "m2", "m3"):
+                await engine.appraise_turn("u1", message_id, "hi", "c1")
+
+        asyncio.run(run())
+
+        assert list(engine._turn_appraisals) == ["m2", "m3"]
+
+    def test_identical_texts_share_one_request(self, engine):
+        """Test that concurrent requests for the same text publish once."""
+        async def run():
+            first = asyncio.create_task(engine._request_sentiment("same"))
+            second = asyncio.create_task(engine._request_sentiment("same"))
+            await asyncio.sleep(0.01)
+            self._answer(engine)
+            return await first, await second
+
+        first, second = asyncio.run(run())
+
+        assert len(engine.bus_client.published) == 1
+        assert first == second and first["data"]["sentiment"] == "positive"
+        assert engine.metrics.coalesced_requests == 1
+        assert engine.pending_sentiment_requests == {} and engine._sentiment_by_text == {}
+
+    def test_oldest_pending_request_is_evicted(self, engine):
+        """Test that exceeding max_pending_sentiment_requests fails the oldest request."""
+        engine.max_pending_sentiment_requests = 1
+
+        async def run():
+            oldest = asyncio.create_task(engine._request_sentiment("first"))
+            await asyncio.sleep(0.01)
+            newest = asyncio.create_task(engine._request_sentiment("second"))
+            await asyncio.sleep(0.01)
+            self._answer(engine)
+            return await oldest, await newest
+
+        oldest, newest = asyncio.run(run())
+
+        assert not oldest["success"] and "evicted" in oldest["error"]
+        assert newest["success"]
+        assert engine.metrics.pending_evictions == 1
+
+    def test_missing_response_times_out(self, engine):
+        """Test that an unanswered request fails after sentiment_timeout and is cleaned up."""
+        engine.sentiment_timeout = 0.01
+
+        result = asyncio.run(engine._request_sentiment("hello"))
+
+        assert not result["success"] and "no sentiment response" in result["error"]
+        assert engine.metrics.sentiment_timeouts == 1
+        assert engine.pending_sentiment_requests == {} and engine._sentiment_by_text == {}
@@ -0,0 +1,46 @@
+"""
+Unit tests for the backend modelservice client.
+"""
+
+import asyncio
+
+from backend.services.modelservice_client import ModelServiceClient, ModelServiceConfig
+
+
+class _Client(ModelServiceClient):
+    """Client whose single-prompt embedding requests are answered locally."""
+
+    def __init__(self, failing=()):
+        super().__init__(None, ModelServiceConfig(broker_address="inproc://test", timeout=1.0))
+        self.failing = set(failing)
+        self.requested = []
+
+    async def get_embeddings(self, model, prompt):
+        self.requested.append(prompt)
+        if prompt in self.failing:
+            return {"success": False, "error": "encode failed"}
+        return {"success": True, "data": {"embedding": [float(len(prompt))]}}
+
+
+class TestEmbeddingsBatch:
+    """Test cases for ModelServiceClient.get_embeddings_batch."""
+
+    def test_identical_prompts_are_embedded_once(self):
+        """Test that duplicates share one request and results keep the request order."""
+        client = _Client()
+
+        result = asyncio.run(client.get_embeddings_batch("model", ["a", "bb", "a", "ccc", "bb"]))
+
+        assert sorted(client.requested) == ["a", "bb", "ccc"]
+        assert result["data"]["embeddings"] == [[1.0], [2.0], [1.0], [3.0], [2.0]]
+        assert result["data"]["failed_count"] == 0
+
+    def test_failed_prompts_come_back_as_none(self):
+        """Test that a failed prompt is None at every position it was requested."""
+        client = _Client(failing={"bad"})
+
+        result = asyncio.run(client.get_embeddings_batch("model", ["bad", "ok", "bad"]))
+
+        assert result["success"]
+        assert result["data"]["embeddings"] == [None, [2.0], None]
+        assert result["data"]["failed_count"] == 2
@@ -48,56 +48,61 @@ from rich.console import Console
 # Create Rich console - no special handling needed after stdout fix
 console = Console()
 
-from cli.commands.config import app as config_app
-from cli.commands.version import app as version_app
-from cli.commands.database import app as database_app
-from cli.commands.security import app as security_app
-from cli.commands.dev import app as dev_app
-from cli.commands.logs import app as logs_app
-from cli.commands.bus import app as bus_app
-from cli.commands.scheduler import app as scheduler_app
-from cli.commands.modelservice import app as modelservice_app
-from cli.commands.ollama import app as ollama_app
-from cli.commands.lmdb import app as lmdb_app
-from cli.commands.chroma import app as chroma_app
-from cli.commands.kg import app as kg_app
-from cli.commands.emotion import app as emotion_app
+from cli.utils.lazy_commands import LazyCommand, LazyTyperGroup
 from cli.utils.platform import get_platform_chars
 
 # Get platform-appropriate characters
 chars = get_platform_chars()
 
+# Command modules are imported only when their command is invoked; the order
+# here is the order of the `aico --help` listing
+COMMANDS = {spec.name: spec for spec in [
+    LazyCommand("version", "cli.commands.version", chars["package"], "Version and build information",
+                "Manage and synchronize versions across all AICO system parts"),
+    LazyCommand("db", "cli.commands.database", chars["database"], "Database management",
+                "Database initialization, status, and management"),
+    LazyCommand("lmdb", "cli.commands.lmdb", chars["database"], "LMDB working memory management",
+                "LMDB working memory management"),
+    LazyCommand("chroma", "cli.commands.chroma", chars["database"], "ChromaDB semantic memory management",
+                "ChromaDB semantic memory management"),
+    LazyCommand("kg", "cli.commands.kg", "💡", "Knowledge graph management",
+                "Knowledge graph management and inspection"),
+    LazyCommand("security", "cli.commands.security", chars["security"], "Security and encryption",
+                "Master password setup and security management"),
+    LazyCommand("config", "cli.commands.config", chars["config"], "Configuration management",
+                "Configuration management and validation"),
+    LazyCommand("logs", "cli.commands.logs", chars["logs"], "Log management and analysis",
+                "Log management and analysis"),
+    LazyCommand("scheduler", "cli.commands.scheduler", "⏰", "Task scheduler management",
+                "Task scheduler management"),
+    LazyCommand("emotion", "cli.commands.emotion", "🎭", "Emotional simulation management",
+                "Emotional simulation state management"),
+    LazyCommand("bus", "cli.commands.bus", chars["bus"], "Message bus management",
+                "Message bus testing, monitoring, and management"),
+    # Gateway commands are hidden when gateway dependencies are not installed
+    LazyCommand("gateway", "cli.commands.gateway", chars["gateway"], "API Gateway management",
+                "API Gateway management and protocol control", optional=True),
+    LazyCommand("modelservice", "cli.commands.modelservice", "🤖", "Model service management",
+                "Model service management and control"),
+    LazyCommand("ollama", "cli.commands.ollama", "🦙", "Ollama model management",
+                "Ollama model management and operations"),
+    LazyCommand("dev", "cli.commands.dev", chars["dev"], "Development utilities",
+                "Development utilities (data cleanup, security reset)"),
+]}
+
+
+class AicoCommandGroup(LazyTyperGroup):
+    registry = COMMANDS
+
+
 app = typer.Typer(
     name="aico",
     help=f"{chars['sparkle']} AICO - Your AI Companion CLI",
     rich_markup_mode="rich",
+    cls=AicoCommandGroup,
     context_settings={"help_option_names": []}  # Disable built-in help to use custom formatting
 )
 
-# Add subcommands with platform-aware characters
-app.add_typer(config_app, name="config", help=f"{chars['config']} Configuration management")
-app.add_typer(version_app, name="version", help=f"{chars['package']} Version and build information") 
-app.add_typer(database_app, name="db", help=f"{chars['database']} Database management")
-app.add_typer(lmdb_app, name="lmdb", help=f"{chars['database']} LMDB working memory management")
-app.add_typer(chroma_app, name="chroma", help=f"{chars['database']} ChromaDB semantic memory management")
-app.add_typer(kg_app, name="kg", help="💡 Knowledge graph management")
-app.add_typer(security_app, name="security", help=f"{chars['security']} Security and encryption")
-app.add_typer(logs_app, name="logs", help=f"{chars['logs']} Log management and analysis")
-app.add_typer(scheduler_app, name="scheduler", help="⏰ Task scheduler management")
-app.add_typer(emotion_app, name="emotion", help="🎭 Emotional simulation management")
-app.add_typer(dev_app, name="dev", help=f"{chars['dev']} Development utilities")
-app.add_typer(bus_app, name="bus", help=f"{chars['bus']} Message bus management")
-app.add_typer(modelservice_app, name="modelservice", help="🤖 Model service management")
-app.add_typer(ollama_app, name="ollama", help="🦙 Ollama model management")
-
-# Import and register gateway commands
-try:
-    from cli.commands import gateway
-    app.add_typer(gateway.app, name="gateway", help=f"{chars['gateway']} API Gateway management")
-except ImportError as e:
-    # Gateway commands not available
-    pass  # Expected when gateway dependencies not installed - CLI continues without gateway commands
-
 @app.callback(invoke_without_command=True)
 def main(ctx: typer.Context, help: bool = typer.Option(False, "--help", "-h", help="Show this message and exit.")):
     """
@@ -110,27 +115,9 @@ def main(ctx: typer.Context, help: bool = typer.Option(False, "--help", "-h", he
     if ctx.invoked_subcommand is None or help:
         # Import here to avoid circular imports
         from cli.utils.help_formatter import format_command_help
-        from cli.utils.platform import get_platform_chars
         
-        chars = get_platform_chars()
-        
-        commands = [
-            (chars["package"], "version", "Manage and synchronize versions across all AICO system parts"),
-            (chars["database"], "db", "Database initialization, status, and management"),
-            (chars["database"], "lmdb", "LMDB working memory management"),
-            (chars["database"], "chroma", "ChromaDB semantic memory management"),
-            ("💡", "kg", "Knowledge graph management and inspection"),
-            (chars["security"], "security", "Master password setup and security management"),
-            (chars["config"], "config", "Configuration management and validation"),
-            (chars["logs"], "logs", "Log management and analysis"),
-            ("⏰", "scheduler", "Task scheduler management"),
-            ("🎭", "emotion", "Emotional simulation state management"),
-            ("🚌", "bus", "Message bus testing, monitoring, and management"),
-            ("🌐", "gateway", "API Gateway management and protocol control"),
-            ("🤖", "modelservice", "Model service management and control"),
-            ("🦙", "ollama", "Ollama model management and operations"),
-            ("🧹", "dev", "Development utilities (data cleanup, security reset)")
-        ]
+        # Listing comes from registry metadata - no command module is imported
+        commands = [(spec.icon, spec.name, spec.description) for spec in COMMANDS.values()]
         
         examples = [
             "aico version show",
@@ -305,15 +305,17 @@ def show_stats(
         # Connect to database using established pattern
         conn = _get_database_connection(detected_db_path)
         
-        # Query statistics
-        cursor = conn.execute("""
+        # Query statistics (across time partitions, if any)
+        from aico.data.libsql.partitions import partitioned_source
+        source = partitioned_source(conn, "events")
+        cursor = conn.execute(f"""
             SELECT 
                 COUNT(*) as total_messages,
                 COUNT(DISTINCT topic) as unique_topics,
                 COUNT(DISTINCT source) as unique_sources,
                 MIN(timestamp) as earliest_message,
                 MAX(timestamp) as latest_message
-            FROM events
+            FROM {source}
         """)
         
         row = cursor.fetchone()
@@ -336,9 +338,9 @@ def show_stats(
         console.print(table)
         
         # Top topics
-        cursor = conn.execute("""
+        cursor = conn.execute(f"""
             SELECT topic, COUNT(*) as count
-            FROM events 
+            FROM {source} 
             GROUP BY topic 
             ORDER BY count DESC 
             LIMIT 10
@@ -393,7 +395,10 @@ def clear_messages(
         # Connect to database using established pattern
         conn = _get_database_connection(detected_db_path)
         
-        # Clear messages
+        # Clear messages, including any time partitions
+        from aico.data.libsql.partitions import list_partitions
+        for name, _, _ in list_partitions(conn, "events"):
+            conn.execute(f"DROP TABLE IF EXISTS {name}")
         conn.execute("DELETE FROM events")
         conn.commit()
         
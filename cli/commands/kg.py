@@ -27,7 +27,7 @@ def kg_callback(ctx: typer.Context, help: bool = typer.Option(False, "--help", "
             ("edges", "List relationships (edges)."),
             ("graph", "Show graph structure around a node."),
             ("temporal", "Show temporal history of an entity."),
-            ("stats", "Show detailed graph statistics."),
+            ("stats", "Show per-user graph statistics; verify or rebuild them."),
             ("test-pipeline", "Test extraction pipeline step-by-step."),
             ("clear", "Clear knowledge graph data (DESTRUCTIVE)."),
             ("deduplicate", "Remove duplicate entities and mark as historical."),
@@ -46,6 +46,8 @@ def kg_callback(ctx: typer.Context, help: bool = typer.Option(False, "--help", "
             "aico kg graph --user-id user_123 --node-id node_abc",
             "aico kg temporal --user-id user_123 --entity 'San Francisco'",
             "aico kg stats --user-id user_123",
+            "aico kg stats --verify",
+            "aico kg stats --rebuild",
             "aico kg test-pipeline 'Sarah gave me a piano lesson'",
             "aico kg clear --user-id user_123",
             "aico kg deduplicate --user-id user_123 --dry-run",
@@ -126,26 +128,14 @@ def status():
             db_path = AICOPaths.resolve_database_path("aico.db", "auto")
             db_connection = _get_database_connection(str(db_path))
             
+            from aico.ai.knowledge_graph.stats import read_global_stats
+            
             with db_connection:
-                # Get node statistics
-                node_stats = db_connection.execute(
-                    "SELECT COUNT(*) as total, COUNT(DISTINCT user_id) as users FROM kg_nodes WHERE is_current = 1"
-                ).fetchone()
-                
-                # Get edge statistics
-                edge_stats = db_connection.execute(
-                    "SELECT COUNT(*) as total FROM kg_edges WHERE is_current = 1"
-                ).fetchone()
-                
-                # Get node type distribution
-                node_types = db_connection.execute(
-                    "SELECT label, COUNT(*) as count FROM kg_nodes WHERE is_current = 1 GROUP BY label ORDER BY count DESC LIMIT 10"
-                ).fetchall()
-                
-                # Get edge type distribution
-                edge_types = db_connection.execute(
-                    "SELECT relation_type, COUNT(*) as count FROM kg_edges WHERE is_current = 1 GROUP BY relation_type ORDER BY count DESC LIMIT 10"
-                ).fetchall()
+                # Materialized counts (kg_stats), summed over users
+                stats = read_global_stats(db_connection)
+            
+            node_types = sorted(stats["node_types"].items(), key=lambda item: item[1], reverse=True)[:10]
+            edge_types = sorted(stats["edge_types"].items(), key=lambda item: item[1], reverse=True)[:10]
             
             # Display results
             table = Table(
@@ -159,9 +149,9 @@ def status():
             table.add_column("Metric", style="cyan", justify="left")
             table.add_column("Value", style="green", justify="left")
             
-            table.add_row("Total Nodes (Current)", f"{node_stats[0]:,}")
-            table.add_row("Total Edges (Current)", f"{edge_stats[0]:,}")
-            table.add_row("Users with Data", f"{node_stats[1]:,}")
+            table.add_row("Total Nodes (Current)", f"{stats['total_nodes']:,}")
+            table.add_row("Total Edges (Current)", f"{stats['total_edges']:,}")
+            table.add_row("Users with Data", f"{stats['users']:,}")
             
             console.print(table)
             
@@ -192,6 +182,86 @@ def status():
     asyncio.run(_status())
 
 
+@app.command(name="stats", help="Show per-user graph statistics; verify or rebuild them.")
+def stats(
+    user_id: Optional[str] = typer.Option(None, "--user-id", "-u", help="User ID (default: all users for --verify/--rebuild)"),
+    verify: bool = typer.Option(False, "--verify", help="Compare materialized counts against a full recount"),
+    rebuild: bool = typer.Option(False, "--rebuild", help="Recompute materialized counts from the graph tables")
+):
+    """Show materialized kg_stats for a user, or check/repair them for drift."""
+    from aico.core.paths import AICOPaths
+    from aico.ai.knowledge_graph.stats import read_graph_stats, verify_graph_stats, rebuild_graph_stats
+    
+    if not (user_id or verify or rebuild):
+        console.print("[red]Error:[/red] Specify --user-id, --verify or --rebuild")
+        raise typer.Exit(1)
+    
+    try:
+        db_path = AICOPaths.resolve_database_path("aico.db", "auto")
+        db_connection = _get_database_connection(str(db_path))
+        
+        with db_connection:
+            if rebuild:
+                rows = rebuild_graph_stats(db_connection, user_id)
+                scope = f"user {user_id}" if user_id else "all users"
+                console.print(f"[green]✓[/green] Rebuilt graph statistics for {scope} ({rows} counts)")
+            elif verify:
+                drift = verify_graph_stats(db_connection, user_id)
+                if not drift:
+                    console.print("[green]✓[/green] Graph statistics match the graph tables")
+                else:
+                    drift_table = Table(
+                        title="⚠️ [bold yellow]Graph Statistics Drift[/bold yellow]",
+                        title_justify="left",
+                        border_style="bright_blue",
+                        header_style="bold yellow",
+                        box=box.SIMPLE_HEAD,
+                        padding=(0, 1)
+                    )
+                    drift_table.add_column("User", style="cyan")
+                    drift_table.add_column("Kind", style="white")
+                    drift_table.add_column("Name", style="white")
+                    drift_table.add_column("Stored", style="red", justify="right")
+                    drift_table.add_column("Actual", style="green", justify="right")
+                    for entry in drift:
+                        drift_table.add_row(
+                            entry["user_id"], entry["kind"], entry["name"],
+                            f"{entry['stored']:,}", f"{entry['actual']:,}"
+                        )
+                    console.print(drift_table)
+                    console.print("\nRun [cyan]aico kg stats --rebuild[/cyan] to repair.")
+                    raise typer.Exit(1)
+            
+            if user_id and not verify:
+                user_stats = read_graph_stats(db_connection, user_id)
+        
+        if user_id and not verify:
+            table = Table(
+                title=f"🕸️ [bold cyan]Graph Statistics: {user_id}[/bold cyan]",
+                title_justify="left",
+                border_style="bright_blue",
+                header_style="bold yellow",
+                box=box.SIMPLE_HEAD,
+                padding=(0, 1)
+            )
+            table.add_column("Metric", style="cyan", justify="left")
+            table.add_column("Value", style="green", justify="left")
+            table.add_row("Total Nodes (Current)", f"{user_stats['total_nodes']:,}")
+            table.add_row("Total Edges (Current)", f"{user_stats['total_edges']:,}")
+            table.add_row("Stats Version", str(user_stats["version"]))
+            for label, count in sorted(user_stats["node_types"].items(), key=lambda item: item[1], reverse=True):
+                table.add_row(f"  Node: {label}", f"{count:,}")
+            for rel_type, count in sorted(user_stats["edge_types"].items(), key=lambda item: item[1], reverse=True):
+                table.add_row(f"  Edge: {rel_type}", f"{count:,}")
+            console.print(table)
+    
+    except typer.Exit:
+        raise
+    except Exception as e:
+        console.print(f"[red]Error:[/red] {e}")
+        raise typer.Exit(1)
+
+
 @app.command(name="extract", help="Extract knowledge graph from text (testing).")
 def extract(
     text: str = typer.Argument(..., help="Text to extract from"),
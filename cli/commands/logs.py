@@ -35,6 +35,7 @@ sys.path.insert(0, str(shared_path))
 from aico.core.config import ConfigurationManager
 from aico.core.logging import LogRepository, initialize_logging
 from aico.data.libsql.encrypted import EncryptedLibSQLConnection
+from aico.data.libsql.partitions import partitioned_source
 from aico.security.key_manager import AICOKeyManager
 
 console = Console()
@@ -267,7 +268,7 @@ def cat(
     filters = {}
     if id:
         # Get specific log by ID
-        logs = [repo.db.execute("SELECT * FROM logs WHERE id = ?", [id]).fetchone()]
+        logs = [repo.db.execute(f"SELECT * FROM {partitioned_source(repo.db, 'logs')} WHERE id = ?", [id]).fetchone()]
         if not logs[0]:
             console.print(f"[red]Log with ID {id} not found[/red]")
             raise typer.Exit(1)
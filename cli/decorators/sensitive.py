@@ -20,8 +20,6 @@ else:
 
 sys.path.insert(0, str(shared_path))
 
-from aico.security import AICOKeyManager
-
 
 def sensitive(arg=None, *, reason: str = "sensitive operation"):
     """
@@ -45,6 +43,7 @@ def sensitive(arg=None, *, reason: str = "sensitive operation"):
             console.print("   [dim]Authentication required for security[/dim]")
             
             from aico.core.config import ConfigurationManager
+            from aico.security import AICOKeyManager
             config = ConfigurationManager()
             config.initialize(lightweight=True)
             key_manager = AICOKeyManager(config)
@@ -96,6 +95,7 @@ def destructive(arg=None, *, reason: str = "dangerous operation"):
             console.print("   [dim]Authentication required for security[/dim]")
             
             from aico.core.config import ConfigurationManager
+            from aico.security import AICOKeyManager
             config = ConfigurationManager()
             config.initialize(lightweight=True)
             key_manager = AICOKeyManager(config)
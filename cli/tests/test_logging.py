@@ -0,0 +1,78 @@
+"""
+CLI logger level filtering tests.
+"""
+
+import sqlite3
+import sys
+from pathlib import Path
+
+import pytest
+import yaml
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+sys.path.insert(0, str(REPO_ROOT / "shared"))
+
+from aico.core.config import ConfigurationManager  # noqa: E402
+from cli.utils.logging import CLILogger, LogLevel  # noqa: E402
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Isolated ConfigurationManager with nested per-module levels."""
+    defaults = tmp_path / "defaults"
+    defaults.mkdir()
+    # CLILogger reads levels from the top-level "logging" domain
+    (defaults / "logging.yaml").write_text(yaml.safe_dump({
+        "levels": {
+            "default": "INFO",
+            "subsystems": {"cli": "WARNING"},
+            "modules": {"database": "INFO", "commands": {"gateway": "DEBUG"}},
+        }
+    }))
+
+    ConfigurationManager.reset_singleton()
+    manager = ConfigurationManager(config_dir=tmp_path)
+    manager.initialize(lightweight=True)
+    yield manager
+    ConfigurationManager.reset_singleton()
+
+
+@pytest.fixture
+def db():
+    connection = sqlite3.connect(":memory:")
+    connection.execute(
+        """CREATE TABLE logs (
+            id INTEGER PRIMARY KEY, timestamp TEXT, level TEXT, subsystem TEXT, module TEXT,
+            message TEXT, function_name TEXT, file_path TEXT, line_number INTEGER, topic TEXT,
+            user_uuid TEXT, session_id TEXT, trace_id TEXT, extra TEXT
+        )"""
+    )
+    return connection
+
+
+class TestCLILoggerLevels:
+    """Test cases for CLILogger level resolution."""
+
+    def test_dotted_module_resolves_nested_level(self, config, db):
+        """Test that a dotted module name is looked up as nested keys."""
+        logger = CLILogger("cli", "commands.gateway", db, config)
+
+        assert logger._should_log(LogLevel.DEBUG)
+
+    def test_module_falls_back_to_subsystem_level(self, config, db):
+        """Test that modules without a level use their subsystem's level."""
+        plain = CLILogger("cli", "database", db, config)
+        unknown = CLILogger("cli", "commands.other", db, config)
+
+        assert plain._should_log(LogLevel.INFO)
+        assert not unknown._should_log(LogLevel.INFO)
+        assert unknown._should_log(LogLevel.WARNING)
+
+    def test_level_follows_configuration_changes(self, config, db):
+        """Test that a changed level applies with the next snapshot."""
+        logger = CLILogger("cli", "commands.gateway", db, config)
+        assert logger._should_log(LogLevel.DEBUG)
+
+        config.set("logging.levels.modules.commands.gateway", "ERROR", persist=False)
+
+        assert not logger._should_log(LogLevel.WARNING)
@@ -0,0 +1,64 @@
+"""
+CLI startup regression tests.
+
+`aico --help` and the import of the entry point must not pull in the heavy
+dependencies of individual commands, and must stay within an import-time
+budget. Each check runs in a fresh interpreter so modules already imported
+by the test session do not hide regressions.
+"""
+
+import json
+import os
+import subprocess
+import sys
+import time
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+# Modules only individual commands may import
+HEAVY_MODULES = [
+    "zmq",
+    "google.protobuf",
+    "libsql",
+    "lmdb",
+    "chromadb",
+    "transformers",
+    "cryptography",
+    "jsonschema",
+]
+
+# Generous wall-clock budget for `aico --help`, including interpreter startup
+HELP_BUDGET_SECONDS = 1.5
+
+
+def _run(*args: str) -> subprocess.CompletedProcess:
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join([str(REPO_ROOT / "shared"), str(REPO_ROOT), env.get("PYTHONPATH", "")])
+    return subprocess.run(
+        [sys.executable, *args], cwd=REPO_ROOT, env=env, capture_output=True, text=True, timeout=60
+    )
+
+
+def test_entry_point_defers_heavy_imports():
+    """Test that importing the CLI entry point loads no command dependencies."""
+    result = _run(
+        "-c",
+        "import json, sys; import cli.aico_main; "
+        f"print(json.dumps([m for m in {HEAVY_MODULES!r} if m in sys.modules]))",
+    )
+    assert result.returncode == 0, result.stderr
+    assert json.loads(result.stdout.strip().splitlines()[-1]) == []
+
+
+def test_help_within_budget():
+    """Test that `aico --help` lists all commands within the startup budget."""
+    _run("cli/aico_main.py", "--help")  # Warm bytecode caches
+
+    start = time.perf_counter()
+    result = _run("cli/aico_main.py", "--help")
+    elapsed = time.perf_counter() - start
+
+    assert result.returncode == 0, result.stderr
+    assert "scheduler" in result.stdout and "modelservice" in result.stdout
+    assert elapsed < HELP_BUDGET_SECONDS, f"aico --help took {elapsed:.2f}s (budget {HELP_BUDGET_SECONDS}s)"
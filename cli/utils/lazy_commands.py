@@ -0,0 +1,89 @@
+"""
+Lazy command registry for the AICO CLI.
+
+Each top-level command is described by lightweight metadata (module path,
+icon, help text). Its module - and everything that module imports
+(databases, message bus, protobuf, ML libraries) - is only imported when
+that command is actually invoked, so `aico --help` and trivial commands do
+not pay the import cost of every other command.
+"""
+
+import importlib
+from dataclasses import dataclass
+from typing import Dict, List, Optional
+
+import click
+import typer
+from typer.core import TyperGroup
+
+
+@dataclass(frozen=True)
+class LazyCommand:
+    """Metadata for one top-level command, importable on demand."""
+    name: str
+    module: str            # Module defining a Typer ``app``
+    icon: str
+    help: str              # Short help used by click/typer
+    description: str       # Longer description for the `aico --help` listing
+    optional: bool = False  # Missing dependencies hide the command instead of failing
+
+
+class LazyTyperGroup(TyperGroup):
+    """
+    Typer group that resolves subcommands from ``registry`` on first use.
+
+    Subclasses set ``registry``; resolved commands are cached on the group.
+    """
+
+    registry: Dict[str, LazyCommand] = {}
+
+    def list_commands(self, ctx: click.Context) -> List[str]:
+        return list(self.registry) + [name for name in super().list_commands(ctx) if name not in self.registry]
+
+    def get_command(self, ctx: click.Context, cmd_name: str) -> Optional[click.Command]:
+        command = super().get_command(ctx, cmd_name)
+        if command is not None:
+            return command
+
+        spec = self.registry.get(cmd_name)
+        if spec is None:
+            return None
+
+        command = load_command(spec)
+        if command is not None:
+            self.add_command(command, cmd_name)
+        return command
+
+
+def load_command(spec: LazyCommand) -> Optional[click.Command]:
+    """Import the command module and convert its Typer app to a click command."""
+    _ensure_logging()
+    try:
+        module = importlib.import_module(spec.module)
+    except ImportError:
+        if spec.optional:
+            return None
+        raise
+
+    command = typer.main.get_command(module.app)
+    command.name = spec.name
+    command.help = f"{spec.icon} {spec.help}"
+    return command
+
+
+def _ensure_logging() -> None:
+    """
+    Initialize shared logging before a command module is imported.
+
+    Several command modules (and shared modules they import) create loggers at
+    import time. With eager imports this was satisfied as a side effect of
+    whichever command happened to be imported first; lazily, each command must
+    find logging ready on its own.
+    """
+    from aico.core.logging import get_logger, initialize_logging
+
+    try:
+        get_logger("cli", "commands")
+    except RuntimeError:
+        from aico.core.config import ConfigurationManager
+        initialize_logging(ConfigurationManager(), service_name="shared")
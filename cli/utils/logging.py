@@ -31,6 +31,12 @@ class CLILogger:
         self.module = module
         self.db = db_connection  # Store connection - will be cleaned up by manager
         self.config = config_manager
+        # Minimum level resolved once per configuration snapshot (see _should_log);
+        # dotted names are nested keys, as with config.get('logging.levels.modules.<module>')
+        self._subsystem_level_path = ('logging', 'levels', 'subsystems', *subsystem.split('.'))
+        self._module_level_path = ('logging', 'levels', 'modules', *module.split('.'))
+        self._level_version = -1
+        self._min_level_value = LogLevel.INFO.value
         self._validate_logs_table()
     
     def _validate_logs_table(self):
@@ -131,15 +137,18 @@ class CLILogger:
     def _should_log(self, level: LogLevel) -> bool:
         """Check if this log level should be processed based on configuration"""
         try:
-            # Get log level configuration
-            default_level = self.config.get('logging.levels.default', 'INFO')
-            subsystem_level = self.config.get(f'logging.levels.subsystems.{self.subsystem}', default_level)
-            module_level = self.config.get(f'logging.levels.modules.{self.module}', subsystem_level)
-            
-            # Convert string level to enum value
-            configured_level = getattr(LogLevel, module_level.upper(), LogLevel.INFO)
+            snapshot = self.config.snapshot()
+            if snapshot.version != self._level_version:
+                # Get log level configuration
+                default_level = snapshot.resolve(('logging', 'levels', 'default'), 'INFO')
+                subsystem_level = snapshot.resolve(self._subsystem_level_path, default_level)
+                module_level = snapshot.resolve(self._module_level_path, subsystem_level)
+                
+                # Convert string level to enum value
+                self._min_level_value = getattr(LogLevel, module_level.upper(), LogLevel.INFO).value
+                self._level_version = snapshot.version
             
-            return level.value >= configured_level.value
+            return level.value >= self._min_level_value
         except Exception:
             # If configuration fails, default to INFO level
             return level.value >= LogLevel.INFO.value
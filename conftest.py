@@ -0,0 +1,48 @@
+"""
+Repository-wide test fixtures, shared by the shared/, backend/ and cli/ test suites.
+"""
+
+import sqlite3
+from contextlib import contextmanager
+
+import pytest
+
+
+class SQLiteDatabase:
+    """
+    SQLite stand-in exposing the LibSQLConnection methods code under test uses.
+
+    Usable from worker threads; counts commits and execute_many batches.
+    """
+
+    def __init__(self, path):
+        self._conn = sqlite3.connect(str(path), check_same_thread=False)
+        self.commits = 0
+        self.batches = 0
+
+    def execute(self, query, parameters=()):
+        return self._conn.execute(query, parameters)
+
+    def execute_many(self, query, parameters_list):
+        self.batches += 1
+        self._conn.executemany(query, parameters_list)
+        self.commit()
+
+    def commit(self):
+        self.commits += 1
+        self._conn.commit()
+
+    @contextmanager
+    def transaction(self):
+        try:
+            yield self
+            self._conn.commit()
+        except Exception:
+            self._conn.rollback()
+            raise
+
+
+@pytest.fixture
+def sqlite_db(tmp_path):
+    """Empty file-backed SQLiteDatabase in the test's tmp_path."""
+    return SQLiteDatabase(tmp_path / "test.db")
@@ -0,0 +1,61 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark for configuration reads on hot paths.
+
+Compares ConfigurationManager.get (dotted key walk on every call) against a
+precompiled ConfigAccessor and a plain attribute read, for keys of
+increasing depth.
+
+Usage:
+    python scripts/benchmark_config_access.py [--number 200000] [--repeat 5]
+"""
+
+import argparse
+import timeit
+
+from aico.core.config import ConfigurationManager
+
+KEYS = [
+    "core.logging.levels.default",
+    "core.memory.semantic.max_results",
+    "core.modelservice.tts.auto_detect_language",
+    "core.api_gateway.validation.strict_validation",
+]
+
+
+class _Holder:
+    """Baseline: a value cached on an object attribute."""
+
+    def __init__(self, value):
+        self.value = value
+
+
+def per_call_ns(stmt, number, repeat):
+    return min(timeit.repeat(stmt, number=number, repeat=repeat)) / number * 1e9
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--number", type=int, default=200000)
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args()
+
+    config = ConfigurationManager()
+    config.initialize(lightweight=True)
+
+    print(f"{'key':<48} {'get()':>10} {'accessor':>10} {'attribute':>10}   speedup")
+    for key in KEYS:
+        accessor = config.accessor(key)
+        holder = _Holder(accessor())
+
+        get_ns = per_call_ns(lambda: config.get(key), args.number, args.repeat)
+        accessor_ns = per_call_ns(accessor, args.number, args.repeat)
+        attribute_ns = per_call_ns(lambda: holder.value, args.number, args.repeat)
+        print(
+            f"{key:<48} {get_ns:>8.0f}ns {accessor_ns:>8.0f}ns {attribute_ns:>8.0f}ns"
+            f"   {get_ns / accessor_ns:>6.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -8,15 +8,20 @@ Available processors:
 - ConversationSegmentProcessor: Semantic conversation segmentation
 - FactExtractor: Advanced fact extraction with GLiNER
 - IntentClassificationProcessor: Multilingual intent classification
+- MessageAnalysis: Per-message cache of derived signals shared within a turn
 """
 
 from .conversation_processor import ConversationSegmentProcessor
 from .fact_extractor import AdvancedFactExtractor as FactExtractor
 from .intent_classifier import IntentClassificationProcessor, get_intent_classifier
+from .message_analysis import MessageAnalysis, get_message_analysis, find_message_analysis
 
 __all__ = [
     'ConversationSegmentProcessor',
     'FactExtractor', 
     'IntentClassificationProcessor',
-    'get_intent_classifier'
+    'get_intent_classifier',
+    'MessageAnalysis',
+    'get_message_analysis',
+    'find_message_analysis'
 ]
@@ -21,6 +21,7 @@ from dataclasses import dataclass
 
 from aico.core.config import ConfigurationManager
 from aico.core.logging import get_logger
+from .message_analysis import MessageAnalysis, find_message_analysis
 
 logger = get_logger("shared", "ai.conversation_processor")
 
@@ -150,8 +151,14 @@ class ConversationSegmentProcessor:
                 entities = {}
             else:
                 try:
+                    # A single user message shares NER with other consumers of that message
+                    user_messages = [msg for msg in messages if msg.get("message_type") == "user_input"]
+                    analysis = (
+                        find_message_analysis(user_messages[0].get("message_id"), user_only_text)
+                        if len(user_messages) == 1 else None
+                    )
                     logger.info(f"🔄 [CONVERSATION_PROCESSOR] ⚡ CALLING NER for user text: '{user_only_text[:100]}...'")
-                    entities = await self._extract_entities_via_modelservice(user_only_text)
+                    entities = await self._extract_entities_via_modelservice(user_only_text, analysis)
                     logger.info(f"🔄 [CONVERSATION_PROCESSOR] ⚡ NER RETURNED: {entities}")
                 except Exception as e:
                     logger.error(f"🔄 [CONVERSATION_PROCESSOR] ❌ NER FAILED: {e}")
@@ -203,15 +210,18 @@ class ConversationSegmentProcessor:
             logger.error(f"Failed to create conversation segment: {e}")
             return None
     
-    async def _extract_entities_via_modelservice(self, text: str) -> Dict[str, List[str]]:
+    async def _extract_entities_via_modelservice(self, text: str, analysis: Optional[MessageAnalysis] = None) -> Dict[str, List[str]]:
         """Extract named entities from text using modelservice NER endpoint."""
         try:
             if not self.modelservice:
                 logger.warning("Modelservice not available for NER extraction")
                 return {}
             
-            # Call modelservice NER endpoint
-            response = await self.modelservice.get_ner_entities(text)
+            # Call modelservice NER endpoint (once per message when shared)
+            if analysis is not None:
+                response = await analysis.entities(self.modelservice)
+            else:
+                response = await self.modelservice.get_ner_entities(text)
             
             if not response.get("success"):
                 logger.error(f"Modelservice NER failed: {response.get('error')}")
@@ -278,15 +288,23 @@ class ConversationSegmentProcessor:
         
         return filtered
     
-    async def extract_key_entities_from_message(self, message: str) -> Dict[str, List[str]]:
+    async def extract_key_entities_from_message(self, message: str, message_id: Optional[str] = None) -> Dict[str, List[str]]:
         """
         Extract key entities from a single message.
         
-        Useful for real-time entity extraction during conversation.
+        Useful for real-time entity extraction during conversation. With a
+        message_id, the NER result is shared via the message's analysis.
         """
-        return await self._extract_entities_via_modelservice(message)
+        return await self._extract_entities_via_modelservice(message, find_message_analysis(message_id, message))
     
-    async def _extract_sentiment_via_modelservice(self, text: str) -> Tuple[str, float]:
+    async def extract_sentiment_from_message(self, message: str, message_id: Optional[str] = None) -> Tuple[str, float]:
+        """
+        Extract sentiment from a single message, shared via the message's
+        analysis when a message_id is given.
+        """
+        return await self._extract_sentiment_via_modelservice(message, find_message_analysis(message_id, message))
+    
+    async def _extract_sentiment_via_modelservice(self, text: str, analysis: Optional[MessageAnalysis] = None) -> Tuple[str, float]:
         """Extract sentiment from text using modelservice sentiment analysis endpoint."""
         try:
             if not self.modelservice:
@@ -297,7 +315,10 @@ class ConversationSegmentProcessor:
             
             # Call modelservice for sentiment analysis
             logger.info(f"🔍 [SENTIMENT_DEBUG] Calling modelservice.get_sentiment_analysis()")
-            result = await self.modelservice.get_sentiment_analysis(text)
+            if analysis is not None:
+                result = await analysis.sentiment(self.modelservice)
+            else:
+                result = await self.modelservice.get_sentiment_analysis(text)
             
             logger.info(f"🔍 [SENTIMENT_DEBUG] Raw modelservice response: {result}")
             
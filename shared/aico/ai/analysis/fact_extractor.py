@@ -26,6 +26,7 @@ from enum import Enum
 
 from aico.core.config import ConfigurationManager
 from aico.core.logging import get_logger
+from .message_analysis import ENTITIES, MessageAnalysis
 
 logger = get_logger("shared", "ai.fact_extractor")
 
@@ -153,12 +154,14 @@ class AdvancedFactExtractor:
             self.logger.error(f"🔍 [FACT_EXTRACTOR] Failed to initialize: {e}")
             raise
     
-    async def extract_facts(self, conversation_segment) -> List[ExtractedFact]:
+    async def extract_facts(self, conversation_segment, analysis: Optional[MessageAnalysis] = None) -> List[ExtractedFact]:
         """
         Extract structured facts from a conversation segment.
         
         Args:
             conversation_segment: ConversationSegment with text and metadata
+            analysis: Shared analysis of the message the segment consists of;
+                NER results are then computed once per message
             
         Returns:
             List of ExtractedFact objects with confidence scores
@@ -173,7 +176,9 @@ class AdvancedFactExtractor:
         
         try:
             # 1. Extract entities using GLiNER
-            entities = await self._extract_entities(text)
+            if analysis is not None and analysis.text != text:
+                analysis = None
+            entities = await self._extract_entities(text, analysis)
             
             # 2. Synthesize structured facts directly from GLiNER entities
             # REMOVED: English-only relation extraction - GLiNER handles this better
@@ -186,7 +191,7 @@ class AdvancedFactExtractor:
             self.logger.error(f"🔍 [FACT_EXTRACTOR] Failed to extract facts: {e}")
             return []
     
-    async def _extract_entities(self, text: str) -> List[ExtractedEntity]:
+    async def _extract_entities(self, text: str, analysis: Optional[MessageAnalysis] = None) -> List[ExtractedEntity]:
         """Extract HIGH-VALUE entities using OPTIMIZED GLiNER configuration."""
         try:
             # RESEARCH-BASED GLiNER optimization: send configuration with entity types
@@ -200,7 +205,14 @@ class AdvancedFactExtractor:
             
             self.logger.debug(f"🔍 [GLINER_OPTIMIZED] Using model: {self.gliner_config['model_name']}, threshold: {self.gliner_config['threshold']}")
             
-            ner_result = await self._modelservice_client.get_ner_entities_optimized(ner_request)
+            if analysis is not None:
+                ner_result = await analysis.compute(
+                    (ENTITIES, "optimized", tuple(self.conversation_entity_types),
+                     self.gliner_config["threshold"], self.gliner_config["model_name"]),
+                    lambda: self._modelservice_client.get_ner_entities_optimized(ner_request)
+                )
+            else:
+                ner_result = await self._modelservice_client.get_ner_entities_optimized(ner_request)
             
             # Debug: Check what we actually received from ModelService
             self.logger.debug(f"🔍 [DEBUG] ner_result type: {type(ner_result)}, content: {ner_result}")
@@ -208,12 +220,12 @@ class AdvancedFactExtractor:
             # Handle case where ner_result might be a string instead of dict
             if isinstance(ner_result, str):
                 self.logger.error(f"🔍 [ENTITIES] ner_result is string, not dict: {ner_result}")
-                return await self._extract_entities_fallback(text)
+                return await self._extract_entities_fallback(text, analysis)
             
             if not ner_result.get("success", False):
                 self.logger.error(f"🔍 [ENTITIES] Optimized NER request failed: {ner_result.get('error', 'Unknown error')}")
                 # Fallback to basic NER
-                return await self._extract_entities_fallback(text)
+                return await self._extract_entities_fallback(text, analysis)
             
             # Process GLiNER results with confidence-based filtering
             entities = []
@@ -225,7 +237,7 @@ class AdvancedFactExtractor:
             # Handle case where ner_data might be a string instead of dict
             if isinstance(ner_data, str):
                 self.logger.error(f"🔍 [ENTITIES] ner_data is string, not dict: {ner_data}")
-                return await self._extract_entities_fallback(text)
+                return await self._extract_entities_fallback(text, analysis)
             
             # GLiNER returns entities with confidence scores
             for entity_info in ner_data.get("entities", []):
@@ -249,16 +261,19 @@ class AdvancedFactExtractor:
             
         except Exception as e:
             self.logger.error(f"🔍 [ENTITIES] Optimized extraction failed: {e}")
-            return await self._extract_entities_fallback(text)
+            return await self._extract_entities_fallback(text, analysis)
     
-    async def _extract_entities_fallback(self, text: str) -> List[ExtractedEntity]:
+    async def _extract_entities_fallback(self, text: str, analysis: Optional[MessageAnalysis] = None) -> List[ExtractedEntity]:
         """Fallback to basic NER if optimized version fails."""
         try:
             self.logger.warning("🔍 [ENTITIES] Using fallback NER extraction")
-            ner_result = await self._modelservice_client.get_ner_entities(
-                text, 
-                entity_types=self.conversation_entity_types
-            )
+            if analysis is not None:
+                ner_result = await analysis.entities(self._modelservice_client, self.conversation_entity_types)
+            else:
+                ner_result = await self._modelservice_client.get_ner_entities(
+                    text, 
+                    entity_types=self.conversation_entity_types
+                )
             
             if not ner_result.get("success", False):
                 self.logger.error(f"🔍 [ENTITIES] Fallback NER also failed: {ner_result.get('error', 'Unknown error')}")
@@ -32,6 +32,8 @@ from enum import Enum
 from aico.core.config import ConfigurationManager
 from aico.core.logging import get_logger
 from ..base import BaseAIProcessor, ProcessingContext, ProcessingResult
+from ..utils.similarity import EmbeddingMatrix
+from .message_analysis import MessageAnalysis, get_message_analysis
 
 logger = get_logger("shared", "ai.analysis.intent_classifier")
 
@@ -94,6 +96,7 @@ class IntentClassificationProcessor(BaseAIProcessor):
         
         # Intent prototypes (semantic embeddings)
         self.intent_embeddings = {}  # Intent name -> embedding
+        self._intent_matrix = EmbeddingMatrix()  # Normalized prototypes for batched scoring
         
         # Caching and performance
         self.embedding_cache = {}
@@ -168,11 +171,17 @@ class IntentClassificationProcessor(BaseAIProcessor):
             # Get conversation context from shared state
             conversation_context = context.shared_state.get('recent_intents', [])
             
-            # Classify intent
-            prediction = await self._classify_intent(
-                text=message,
-                user_id=user_id,
-                conversation_context=conversation_context
+            # Classify intent once per message; repeated requests share the prediction
+            analysis = get_message_analysis(context.request_id, message)
+            prediction = await analysis.intent(
+                lambda text: self._classify_intent(
+                    text=text,
+                    user_id=user_id,
+                    conversation_context=conversation_context,
+                    analysis=analysis
+                ),
+                context_key=(user_id, tuple(conversation_context)),
+                is_failure=lambda prediction: prediction.confidence == 0.0  # Fallback prediction
             )
             
             # Update conversation context in shared state
@@ -283,12 +292,12 @@ class IntentClassificationProcessor(BaseAIProcessor):
         for intent_name, description in intent_descriptions.items():
             embedding = await self._get_text_embedding(description)
             if embedding is not None:
-                self.intent_embeddings[intent_name] = embedding
+                self._set_intent_embedding(intent_name, embedding)
         
         logger.info(f"[INTENT_CLASSIFIER] Created semantic prototypes for {len(self.intent_embeddings)} intents")
 
-    async def _get_text_embedding(self, text: str) -> Optional[np.ndarray]:
-        """Get embedding for text using ModelService"""
+    async def _get_text_embedding(self, text: str, analysis: Optional[MessageAnalysis] = None) -> Optional[np.ndarray]:
+        """Get embedding for text using ModelService (via the message's shared analysis if given)"""
         # Check cache first
         cache_key = hash(text)
         if cache_key in self.embedding_cache:
@@ -301,10 +310,13 @@ class IntentClassificationProcessor(BaseAIProcessor):
             client = await self._get_modelservice_client()
             
             # Request embedding from ModelService
-            response = await client.get_embeddings(
-                model=self.model_name,
-                prompt=text
-            )
+            if analysis is not None:
+                response = await analysis.embedding(client, self.model_name)
+            else:
+                response = await client.get_embeddings(
+                    model=self.model_name,
+                    prompt=text
+                )
             
             if response.get('success') and response.get('data', {}).get('embedding'):
                 embedding = np.array(response['data']['embedding'])
@@ -338,14 +350,15 @@ class IntentClassificationProcessor(BaseAIProcessor):
         self,
         text: str,
         user_id: Optional[str] = None,
-        conversation_context: Optional[List[str]] = None
+        conversation_context: Optional[List[str]] = None,
+        analysis: Optional[MessageAnalysis] = None
     ) -> IntentPrediction:
         """Classify intent of input text"""
         start_time = time.time()
         
         try:
             # Get text embedding
-            text_embedding = await self._get_text_embedding(text)
+            text_embedding = await self._get_text_embedding(text, analysis)
             if text_embedding is None:
                 return IntentPrediction(
                     intent=IntentType.GENERAL.value,
@@ -353,11 +366,8 @@ class IntentClassificationProcessor(BaseAIProcessor):
                     inference_time_ms=(time.time() - start_time) * 1000
                 )
             
-            # Calculate similarities with all intent embeddings
-            similarities = {}
-            for intent_name, intent_embedding in self.intent_embeddings.items():
-                similarity = self._cosine_similarity(text_embedding, intent_embedding)
-                similarities[intent_name] = float(similarity)
+            # Calculate similarities with all intent embeddings (one matrix-vector product)
+            similarities = self._intent_matrix.score_map(text_embedding)
             
             # Find best match
             best_intent = max(similarities, key=similarities.get)
@@ -475,20 +485,10 @@ class IntentClassificationProcessor(BaseAIProcessor):
         
         context.shared_state['recent_intents'] = recent_intents
 
-    def _cosine_similarity(self, a: np.ndarray, b: np.ndarray) -> float:
-        """Calculate cosine similarity between two vectors"""
-        try:
-            dot_product = np.dot(a, b)
-            norm_a = np.linalg.norm(a)
-            norm_b = np.linalg.norm(b)
-            
-            if norm_a == 0 or norm_b == 0:
-                return 0.0
-            
-            return float(dot_product / (norm_a * norm_b))
-        except Exception as e:
-            logger.error(f"[INTENT_CLASSIFIER] Cosine similarity calculation failed: {e}")
-            return 0.0
+    def _set_intent_embedding(self, intent: str, embedding: np.ndarray):
+        """Store an intent prototype and keep the normalized prototype matrix in sync"""
+        self.intent_embeddings[intent] = embedding
+        self._intent_matrix.set(intent, embedding)
 
     async def add_training_example(self, text: str, intent: str, language: Optional[str] = None):
         """Add a new training example and update intent embeddings"""
@@ -503,10 +503,10 @@ class IntentClassificationProcessor(BaseAIProcessor):
             if intent in self.intent_embeddings:
                 # Average with existing embedding (simple approach)
                 existing_embedding = self.intent_embeddings[intent]
-                self.intent_embeddings[intent] = (existing_embedding + embedding) / 2
+                self._set_intent_embedding(intent, (existing_embedding + embedding) / 2)
             else:
                 # New intent
-                self.intent_embeddings[intent] = embedding
+                self._set_intent_embedding(intent, embedding)
             
             logger.info(f"[INTENT_CLASSIFIER] Added training example for intent '{intent}'")
             
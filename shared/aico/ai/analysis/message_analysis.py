@@ -0,0 +1,230 @@
+"""
+AICO Per-Message Analysis Cache
+
+One user message is analysed by several components during a turn (memory
+storage and retrieval, intent classification, emotion appraisal, NER-based
+fact extraction). Each of them used to issue its own modelservice request
+for the same text. MessageAnalysis holds the derived signals of a single
+message, keyed by its message id, and computes each one at most once:
+
+- Lazy: nothing is computed until a consumer asks for it
+- Single-flight: concurrent requesters await the same in-flight task
+- Failure-tolerant: failed computations are not memoized, the next caller retries
+
+Consumers look the analysis up by message id (get_message_analysis /
+find_message_analysis) or receive it as an argument. Results keep the
+modelservice response shape ({"success": ..., "data": ...}) so existing
+response handling is unchanged.
+"""
+
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Any, Awaitable, Callable, Dict, Hashable, List, Optional
+
+# Signal keys
+EMBEDDING = "embedding"
+SENTIMENT = "sentiment"
+ENTITIES = "entities"
+LANGUAGE = "language"
+INTENT = "intent"
+
+SENTIMENT_KEY = (SENTIMENT,)
+
+
+def _is_failure(value: Any) -> bool:
+    """Modelservice responses report failure via success=False instead of raising."""
+    return isinstance(value, dict) and value.get("success") is False
+
+
+class MessageAnalysis:
+    """
+    Lazily computed, memoized signals for one message.
+
+    Keys are hashable tuples such as ("embedding", model) so that requests
+    with different parameters (embedding model, NER entity types) are cached
+    separately while identical requests are shared.
+    """
+
+    def __init__(self, message_id: str, text: str):
+        self.message_id = message_id
+        self.text = text
+        self.created_at = time.monotonic()
+        self._results: Dict[Hashable, asyncio.Future] = {}
+        self.computed_count = 0  # Computations actually run (not served from cache)
+
+    async def compute(
+        self,
+        key: Hashable,
+        factory: Callable[[], Awaitable[Any]],
+        is_failure: Callable[[Any], bool] = _is_failure
+    ) -> Any:
+        """
+        Return the value for key, running factory only if no result or in-flight
+        computation exists. Concurrent callers await the same task, which the
+        entry owns: a cancelled caller does not cancel it for the others.
+
+        Values for which is_failure returns True are handed to current waiters
+        but not memoized.
+        """
+        task = self._results.get(key)
+        if task is None:
+            task = asyncio.ensure_future(factory())
+            task.add_done_callback(lambda done: self._forget_failed(key, done, is_failure))
+            self._results[key] = task
+            self.computed_count += 1
+        return await asyncio.shield(task)
+
+    def _forget_failed(self, key: Hashable, task: asyncio.Future, is_failure: Callable[[Any], bool]) -> None:
+        """Drop a failed or cancelled computation so the next caller retries."""
+        # exception() also marks an error retrieved when nobody is waiting
+        if task.cancelled() or task.exception() is not None or is_failure(task.result()):
+            if self._results.get(key) is task:
+                del self._results[key]
+
+    def peek(self, key: Hashable, default: Any = None) -> Any:
+        """Return a completed result without computing or waiting."""
+        future = self._results.get(key)
+        if future is None or not future.done() or future.cancelled() or future.exception() is not None:
+            return default
+        return future.result()
+
+    def has(self, key: Hashable) -> bool:
+        """True if key is computed or being computed."""
+        return key in self._results
+
+    def set_result(self, key: Hashable, value: Any) -> None:
+        """
+        Record a value computed outside compute() (e.g. a bus response).
+
+        An in-flight computation keeps ownership of its key; the value is
+        ignored in that case.
+        """
+        if key in self._results or _is_failure(value):
+            return
+        future = asyncio.get_running_loop().create_future()
+        future.set_result(value)
+        self._results[key] = future
+
+    # ------------------------------------------------------------------
+    # Signals
+    # ------------------------------------------------------------------
+
+    async def embedding(self, modelservice, model: str) -> Dict[str, Any]:
+        """Embedding response for the message text from the given model."""
+        return await self.compute(
+            (EMBEDDING, model),
+            lambda: modelservice.get_embeddings(model=model, prompt=self.text)
+        )
+
+    async def sentiment(self, modelservice) -> Dict[str, Any]:
+        """Sentiment analysis response for the message text."""
+        return await self.compute(SENTIMENT_KEY, lambda: modelservice.get_sentiment_analysis(self.text))
+
+    async def entities(self, modelservice, entity_types: Optional[List[str]] = None) -> Dict[str, Any]:
+        """NER response for the message text, cached per entity type filter."""
+        types = tuple(sorted(entity_types)) if entity_types else None
+        return await self.compute(
+            (ENTITIES, types),
+            lambda: modelservice.get_ner_entities(self.text, entity_types=entity_types)
+        )
+
+    async def language(self) -> str:
+        """Detected language code of the message text."""
+        async def detect():
+            from aico.ai.utils.language_detection import detect_language
+            return detect_language(self.text).language
+        return await self.compute((LANGUAGE,), detect)
+
+    async def intent(
+        self,
+        classify: Callable[[str], Awaitable[Any]],
+        context_key: Hashable = None,
+        is_failure: Callable[[Any], bool] = _is_failure
+    ) -> Any:
+        """
+        Intent prediction for the message text, computed by the given classifier.
+
+        context_key identifies any further classifier input (user, recent
+        intents) so that predictions depending on it are not shared.
+        """
+        return await self.compute((INTENT, context_key), lambda: classify(self.text), is_failure)
+
+
+class MessageAnalysisRegistry:
+    """
+    Bounded registry of MessageAnalysis objects by message id.
+
+    Entries expire after ttl_seconds and the least recently used entries are
+    evicted beyond max_entries, so analyses only live for the turn(s) that
+    need them.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 300.0):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[str, MessageAnalysis]" = OrderedDict()
+
+    def get_or_create(self, message_id: str, text: str) -> MessageAnalysis:
+        """Return the analysis for message_id, creating it if needed."""
+        analysis = self.get(message_id)
+        if analysis is not None and analysis.text == text:
+            return analysis
+
+        analysis = MessageAnalysis(message_id, text)
+        self._entries[message_id] = analysis
+        self._entries.move_to_end(message_id)
+        self._evict()
+        return analysis
+
+    def get(self, message_id: Optional[str]) -> Optional[MessageAnalysis]:
+        """Return the live analysis for message_id, or None."""
+        if not message_id:
+            return None
+        analysis = self._entries.get(message_id)
+        if analysis is None:
+            return None
+        if time.monotonic() - analysis.created_at > self.ttl_seconds:
+            del self._entries[message_id]
+            return None
+        self._entries.move_to_end(message_id)
+        return analysis
+
+    def discard(self, message_id: str) -> None:
+        """Drop the analysis for message_id."""
+        self._entries.pop(message_id, None)
+
+    def clear(self) -> None:
+        self._entries.clear()
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._entries:
+            oldest_id, oldest = next(iter(self._entries.items()))
+            if len(self._entries) > self.max_entries or now - oldest.created_at > self.ttl_seconds:
+                del self._entries[oldest_id]
+            else:
+                break
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
+# Process-wide registry shared by all consumers of a turn
+_registry = MessageAnalysisRegistry()
+
+
+def get_message_analysis(message_id: str, text: str) -> MessageAnalysis:
+    """Get or create the shared analysis for a message."""
+    return _registry.get_or_create(message_id, text)
+
+
+def find_message_analysis(message_id: Optional[str], text: Optional[str] = None) -> Optional[MessageAnalysis]:
+    """
+    Look up an existing analysis. If text is given, the analysis is only
+    returned when it was created for that exact text.
+    """
+    analysis = _registry.get(message_id)
+    if analysis is not None and text is not None and analysis.text != text:
+        return None
+    return analysis
@@ -6,6 +6,7 @@ Provides entity extraction, deduplication, and graph-based reasoning.
 
 Public API:
     - PropertyGraph, Node, Edge: Core data models
+    - GraphChangeSet: Added/updated/superseded items produced by fusion
     - PropertyGraphStorage: Hybrid ChromaDB + libSQL storage
     - MultiPassExtractor: Multi-pass extraction with gleanings
     - EntityResolver: Semantic entity resolution
@@ -35,14 +36,14 @@ Usage Example:
     
     # Fuse with existing graph
     existing_graph = await storage.get_user_graph(user_id)
-    fused_graph = await fusion.fuse(resolved_graph, existing_graph)
+    changes = await fusion.fuse_changes(resolved_graph, existing_graph)
     
-    # Save to storage
-    await storage.save_graph(fused_graph)
+    # Save only what changed
+    await storage.save_changes(changes)
     ```
 """
 
-from .models import Node, Edge, PropertyGraph
+from .models import Node, Edge, PropertyGraph, GraphChangeSet
 from .storage import PropertyGraphStorage
 from .extractor import (
     MultiPassExtractor,
@@ -60,6 +61,7 @@ __all__ = [
     "Node",
     "Edge", 
     "PropertyGraph",
+    "GraphChangeSet",
     
     # Core components (Phase 1)
     "PropertyGraphStorage",
@@ -7,11 +7,11 @@ Implements semantic entity resolution using 3-step process:
 3. LLM Merging: Merge duplicate entities with conflict resolution
 """
 
-from typing import List, Dict, Any, Tuple, Optional, Set
+from typing import List, Dict, Any, Tuple, Optional, Set, Callable
 import asyncio
 import json
 import numpy as np
-from collections import defaultdict
+from collections import Counter, defaultdict
 import hnswlib
 from datetime import datetime, timezone
 from dataclasses import dataclass
@@ -19,6 +19,7 @@ from dataclasses import dataclass
 from aico.core.logging import get_logger
 from aico.core.config import ConfigurationManager
 
+from .json_stream import JsonItem, stream_json_completion
 from .models import Node, Edge, PropertyGraph
 from .modelservice_client import ModelserviceClient
 
@@ -169,8 +170,26 @@ class EntityResolver:
         logger.info(f"Found {len(candidates)} candidate duplicate pairs")
         
         # Step 3: LLM batch matching - determine which are actual duplicates
+        # A confirmed pair whose nodes occur in no other candidate pair is a merge
+        # group of its own whatever the remaining decisions are, so its merge
+        # starts while the LLM is still deciding the other pairs
+        occurrences = Counter(
+            node.id for c in candidates for node in (c["new_node"], c["existing_node"])
+        )
+        early_merges: Dict[frozenset, asyncio.Task] = {}
+        
+        def on_duplicate(new_node: Node, existing_node: Node) -> None:
+            key = frozenset((new_node.id, existing_node.id))
+            if occurrences[new_node.id] == 1 and occurrences[existing_node.id] == 1 and key not in early_merges:
+                early_merges[key] = asyncio.create_task(self._merge_node_group([new_node, existing_node]))
+        
         print(f"🔍 [ENTITY_RESOLVER] Step 3: LLM batch matching ({len(candidates)} pairs in single call)")
-        duplicates = await self._llm_batch_matching(candidates)
+        try:
+            duplicates = await self._llm_batch_matching(candidates, on_duplicate)
+        except BaseException:
+            for task in early_merges.values():
+                task.cancel()
+            raise
         
         if not duplicates:
             print(f"🔍 [ENTITY_RESOLVER] No confirmed duplicates after LLM verification")
@@ -184,7 +203,7 @@ class EntityResolver:
         
         # Step 4: LLM merging - merge duplicates with conflict resolution
         print(f"🔍 [ENTITY_RESOLVER] Step 4: Merging {len(duplicates)} duplicate pairs")
-        resolved_graph, superseded_ids, node_mapping = await self._merge_duplicates(new_graph, duplicates)
+        resolved_graph, superseded_ids, node_mapping = await self._merge_duplicates(new_graph, duplicates, early_merges)
         
         print(f"🔍 [ENTITY_RESOLVER] ✅ Resolution complete: {len(new_graph.nodes)} → {len(resolved_graph.nodes)} nodes")
         print(f"🔍 [ENTITY_RESOLVER] Superseded nodes: {len(superseded_ids)} (will be marked historical)")
@@ -394,7 +413,8 @@ class EntityResolver:
     
     async def _llm_batch_matching(
         self,
-        candidates: List[Dict[str, Any]]
+        candidates: List[Dict[str, Any]],
+        on_duplicate: Optional[Callable[[Node, Node], None]] = None
     ) -> List[Tuple[Node, Node]]:
         """
         Multi-tier matching strategy (industry best practice):
@@ -414,8 +434,12 @@ class EntityResolver:
         - Improves accuracy (LLM focuses on hard cases)
         - Faster processing (exact matching is O(1))
         
+        LLM decisions are parsed while they stream in; generation stops once
+        every pair is decided.
+        
         Args:
             candidates: List of candidate dicts with new_node, existing_node, similarity
+            on_duplicate: Called with (new_node, existing_node) as soon as a pair is confirmed
             
         Returns:
             List of confirmed duplicate pairs
@@ -459,6 +483,9 @@ class EntityResolver:
         
         if exact_matches:
             print(f"🔍 [ENTITY_RESOLVER] Tier 1 (Exact): Auto-merged {len(exact_matches)} pairs with identical names")
+            if on_duplicate:
+                for new_node, existing_node in exact_matches:
+                    on_duplicate(new_node, existing_node)
         
         if not fuzzy_candidates:
             # All matches were exact - no LLM needed!
@@ -469,6 +496,28 @@ class EntityResolver:
         
         # TIER 2: LLM verification for fuzzy matches
         candidates = fuzzy_candidates
+        duplicates = []
+        decided = set()  # pair_ids the LLM has answered for
+        
+        def on_decision(item: JsonItem) -> None:
+            r = item.value
+            pair_id = r.get("pair_id") if isinstance(r, dict) else None
+            if not isinstance(pair_id, int) or not 0 <= pair_id < len(candidates) or pair_id in decided:
+                return
+            decided.add(pair_id)
+            if not r.get("is_duplicate", False):
+                return
+            new_node = candidates[pair_id]["new_node"]
+            existing_node = candidates[pair_id]["existing_node"]
+            duplicates.append((new_node, existing_node))
+            logger.debug(
+                f"LLM confirmed duplicate: "
+                f"{new_node.properties.get('name')} <-> "
+                f"{existing_node.properties.get('name')} "
+                f"(reasoning: {str(r.get('reasoning', 'N/A'))[:50]}...)"
+            )
+            if on_duplicate:
+                on_duplicate(new_node, existing_node)
         
         try:
             # Build batch prompt with all candidate pairs
@@ -508,34 +557,24 @@ Return valid JSON only."""
             print(f"🔍 [ENTITY_RESOLVER] Sending {len(candidates)} pairs to LLM (single batch call)")
             logger.info(f"Sending {len(candidates)} pairs to LLM for batch matching")
             
-            response = await asyncio.wait_for(
-                self.modelservice.generate_completion(
-                    prompt=prompt,
+            # Decisions are applied as they stream in; stop once every pair is decided
+            stream = await asyncio.wait_for(
+                stream_json_completion(
+                    self.modelservice,
+                    prompt,
+                    on_item=on_decision,
+                    expected_items=len(candidates),
                     model="eve",
                     temperature=0.1,  # Low temp for consistency
                     max_tokens=4096
                 ),
                 timeout=self.llm_timeout
             )
-            
-            # Parse results
-            results = self._parse_json_response(response.get("text", ""))
-            
-            # Return confirmed duplicates
-            duplicates = []
-            for r in results:
-                if r.get("is_duplicate", False):
-                    pair_id = r["pair_id"]
-                    duplicates.append((
-                        candidates[pair_id]["new_node"],
-                        candidates[pair_id]["existing_node"]
-                    ))
-                    logger.debug(
-                        f"LLM confirmed duplicate: "
-                        f"{candidates[pair_id]['new_node'].properties.get('name')} <-> "
-                        f"{candidates[pair_id]['existing_node'].properties.get('name')} "
-                        f"(reasoning: {r.get('reasoning', 'N/A')[:50]}...)"
-                    )
+            if len(decided) < len(candidates):
+                logger.warning(
+                    f"LLM decided {len(decided)}/{len(candidates)} pairs "
+                    f"(malformed={stream.malformed}, truncated={stream.truncated}), undecided pairs are not merged"
+                )
             
             print(f"🔍 [ENTITY_RESOLVER] Tier 2 (LLM): {len(duplicates)}/{len(candidates)} fuzzy pairs confirmed as duplicates")
             logger.info(f"LLM batch matching: {len(duplicates)}/{len(candidates)} confirmed")
@@ -546,41 +585,44 @@ Return valid JSON only."""
             return all_duplicates
             
         except asyncio.TimeoutError:
-            error_msg = f"🚨 LLM BATCH MATCHING TIMEOUT after {self.llm_timeout}s - {len(candidates)} pairs unverified"
+            error_msg = f"🚨 LLM BATCH MATCHING TIMEOUT after {self.llm_timeout}s - {len(candidates) - len(decided)} pairs unverified"
             print(f"\n{'='*80}")
             print(f"🔍 [ENTITY_RESOLVER] {error_msg}")
-            print(f"🔍 [ENTITY_RESOLVER] DEGRADED MODE: Accepting all {len(candidates)} fuzzy candidates based on embedding similarity >={self.similarity_threshold}")
+            print(f"🔍 [ENTITY_RESOLVER] DEGRADED MODE: Accepting all {len(candidates) - len(decided)} undecided fuzzy candidates based on embedding similarity >={self.similarity_threshold}")
             print(f"🔍 [ENTITY_RESOLVER] ⚠️  PRECISION DEGRADED: ~85-90% accuracy (vs ~95% with LLM verification)")
             print(f"🔍 [ENTITY_RESOLVER] ACTION REQUIRED: Investigate LLM timeout, increase timeout, or disable LLM matching")
             print(f"{'='*80}\n")
             logger.error(error_msg)
-            logger.warning(f"Degraded mode: Accepting {len(candidates)} candidates without LLM verification")
+            logger.warning(f"Degraded mode: Accepting {len(candidates) - len(decided)} candidates without LLM verification")
             # Fallback: Trust embedding similarity (research-backed, 85-90% accuracy)
             # Still return exact matches + fuzzy candidates
-            fuzzy_fallback = [(c["new_node"], c["existing_node"]) for c in candidates]
-            return exact_matches + fuzzy_fallback
+            # Decisions that streamed in before the failure still apply
+            fuzzy_fallback = [(c["new_node"], c["existing_node"]) for i, c in enumerate(candidates) if i not in decided]
+            return exact_matches + duplicates + fuzzy_fallback
         except Exception as e:
-            error_msg = f"🚨 LLM BATCH MATCHING FAILED: {e} - {len(candidates)} pairs unverified"
+            error_msg = f"🚨 LLM BATCH MATCHING FAILED: {e} - {len(candidates) - len(decided)} pairs unverified"
             print(f"\n{'='*80}")
             print(f"🔍 [ENTITY_RESOLVER] {error_msg}")
-            print(f"🔍 [ENTITY_RESOLVER] DEGRADED MODE: Accepting all {len(candidates)} fuzzy candidates based on embedding similarity >={self.similarity_threshold}")
+            print(f"🔍 [ENTITY_RESOLVER] DEGRADED MODE: Accepting all {len(candidates) - len(decided)} undecided fuzzy candidates based on embedding similarity >={self.similarity_threshold}")
             print(f"🔍 [ENTITY_RESOLVER] ⚠️  PRECISION DEGRADED: ~85-90% accuracy (vs ~95% with LLM verification)")
             print(f"🔍 [ENTITY_RESOLVER] ACTION REQUIRED: Fix LLM integration or disable LLM matching in config")
             print(f"{'='*80}\n")
             logger.error(error_msg)
-            logger.warning(f"Degraded mode: Accepting {len(candidates)} candidates without LLM verification")
+            logger.warning(f"Degraded mode: Accepting {len(candidates) - len(decided)} candidates without LLM verification")
             import traceback
             traceback.print_exc()
             # Fallback: Trust embedding similarity (research-backed, 85-90% accuracy)
             # Still return exact matches + fuzzy candidates
-            fuzzy_fallback = [(c["new_node"], c["existing_node"]) for c in candidates]
-            return exact_matches + fuzzy_fallback
+            # Decisions that streamed in before the failure still apply
+            fuzzy_fallback = [(c["new_node"], c["existing_node"]) for i, c in enumerate(candidates) if i not in decided]
+            return exact_matches + duplicates + fuzzy_fallback
     
     
     async def _merge_duplicates(
         self,
         graph: PropertyGraph,
-        duplicates: List[Tuple[Node, Node]]
+        duplicates: List[Tuple[Node, Node]],
+        early_merges: Optional[Dict[frozenset, asyncio.Task]] = None
     ) -> Tuple[PropertyGraph, Set[str], Dict[str, str]]:
         """
         Step 3: Merge duplicate entities with conflict resolution.
@@ -588,6 +630,7 @@ Return valid JSON only."""
         Args:
             graph: Original graph
             duplicates: List of duplicate pairs to merge
+            early_merges: Merges already started during matching, by frozenset of group node IDs
             
         Returns:
             Tuple of (PropertyGraph with duplicates merged, Set of superseded node IDs, Dict of superseded_id -> canonical_id)
@@ -602,15 +645,22 @@ Return valid JSON only."""
         superseded_ids = set()
         node_mapping = {}  # superseded_id -> canonical_id
         
-        for group in merge_groups:
-            merged_node = await self._merge_node_group(group)
-            # The merged node keeps the ID of one of the group members (typically the first/oldest)
-            # All other nodes in the group are superseded
-            for node in group:
-                merged_nodes[node.id] = merged_node
-                if node.id != merged_node.id:
-                    superseded_ids.add(node.id)
-                    node_mapping[node.id] = merged_node.id  # Track the mapping
+        early_merges = early_merges or {}
+        try:
+            for group in merge_groups:
+                early = early_merges.pop(frozenset(node.id for node in group), None)
+                merged_node = await early if early else await self._merge_node_group(group)
+                # The merged node keeps the ID of one of the group members (typically the first/oldest)
+                # All other nodes in the group are superseded
+                for node in group:
+                    merged_nodes[node.id] = merged_node
+                    if node.id != merged_node.id:
+                        superseded_ids.add(node.id)
+                        node_mapping[node.id] = merged_node.id  # Track the mapping
+        finally:
+            # Early merges not consumed above (unmatched, or the loop failed) must not keep running
+            for task in early_merges.values():
+                task.cancel()
         
         # Build new graph with merged nodes
         new_graph = PropertyGraph()
@@ -692,17 +742,21 @@ Return JSON with:
 
 Return valid JSON only."""
             
-            response = await asyncio.wait_for(
-                self.modelservice.generate_completion(
-                    prompt=prompt,
+            # Stop generating once the merge object is complete
+            stream = await asyncio.wait_for(
+                stream_json_completion(
+                    self.modelservice,
+                    prompt,
+                    stop_on_first_value=True,
                     model="eve",
                     temperature=0.2,
                     max_tokens=512
                 ),
                 timeout=self.llm_timeout
             )
-            
-            result = self._parse_json_response(response.get("text", ""))
+            result = stream.value if isinstance(stream.value, dict) else {}
+            if not result:
+                logger.warning(f"Failed to parse merge response ({len(stream.text)} chars)")
             
             # Create merged node
             base_node = nodes[0]
@@ -830,16 +884,3 @@ Return valid JSON only."""
         
         props_text = " ".join(props_parts)
         return f"{node.label} {props_text}"
-    
-    def _parse_json_response(self, text: str) -> Dict[str, Any]:
-        """Parse JSON response from LLM."""
-        try:
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0]
-            
-            return json.loads(text.strip())
-        except Exception as e:
-            logger.warning(f"Failed to parse JSON response: {e}")
-            return {}
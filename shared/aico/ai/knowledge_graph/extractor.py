@@ -5,8 +5,10 @@ Implements multi-pass extraction pipeline with gleanings for high completeness.
 Uses GLiNER for entity extraction and LLM for relation extraction.
 """
 
-from typing import List, Dict, Any, Optional
+from collections import OrderedDict
+from typing import List, Dict, Any, Optional, Tuple
 import asyncio
+import hashlib
 import json
 import time
 from datetime import datetime
@@ -16,6 +18,8 @@ from aico.core.config import ConfigurationManager
 
 from .models import Node, Edge, PropertyGraph
 from .modelservice_client import ModelserviceClient
+from .json_stream import JsonStreamResult, stream_json_completion
+from ..utils.similarity import EmbeddingMatrix
 
 logger = get_logger("shared", "ai.knowledge_graph.extractor")
 
@@ -113,8 +117,11 @@ LABEL_DEFINITIONS = {
     "PRIORITY": "urgent, important, critical, high priority, must do, need to focus on, top priority, time-sensitive"
 }
 
-# Cache for label embeddings (computed once per session)
-_label_embeddings_cache = {}
+# Cache for label embeddings (computed once per session, pre-normalized for batched scoring)
+_label_embeddings_cache = EmbeddingMatrix()
+
+# Minimum cosine similarity for overriding the extracted label
+_LABEL_SIMILARITY_THRESHOLD = 0.4
 
 # Cache for entity text embeddings (per-user, with TTL)
 # Format: {user_id: {entity_text: (embedding, timestamp)}}
@@ -122,6 +129,18 @@ _entity_embeddings_cache = {}
 _ENTITY_CACHE_TTL_SECONDS = 3600  # 1 hour TTL to prevent stale data
 
 
+async def _ensure_label_embeddings(modelservice_client: Any) -> None:
+    """Embed LABEL_DEFINITIONS once and cache them as a normalized matrix."""
+    if _label_embeddings_cache:
+        return
+    
+    definitions = list(LABEL_DEFINITIONS.values())
+    result = await modelservice_client.generate_embeddings(definitions)
+    if result.get("embeddings"):
+        for label_name, embedding in zip(LABEL_DEFINITIONS.keys(), result["embeddings"]):
+            _label_embeddings_cache.set(label_name, embedding)
+
+
 async def correct_entity_label_semantic(
     label: str, 
     entity_text: str,
@@ -170,32 +189,17 @@ async def correct_entity_label_semantic(
             return label
         
         # Get or compute label embeddings (cached)
-        if not _label_embeddings_cache:
-            definitions = list(LABEL_DEFINITIONS.values())
-            result = await modelservice_client.generate_embeddings(definitions)
-            if result.get("embeddings"):
-                for label_name, embedding in zip(LABEL_DEFINITIONS.keys(), result["embeddings"]):
-                    _label_embeddings_cache[label_name] = embedding
-        
-        # Compute cosine similarity with each label
-        import numpy as np
-        entity_vec = np.array(entity_embedding)
-        
-        best_label = label
-        best_similarity = -1.0
-        
-        for label_name, label_embedding in _label_embeddings_cache.items():
-            label_vec = np.array(label_embedding)
-            # Cosine similarity
-            similarity = np.dot(entity_vec, label_vec) / (np.linalg.norm(entity_vec) * np.linalg.norm(label_vec))
-            
-            if similarity > best_similarity:
-                best_similarity = similarity
-                best_label = label_name
+        await _ensure_label_embeddings(modelservice_client)
+        
+        # Cosine similarity with every label in one matrix-vector product
+        best = _label_embeddings_cache.top_k(entity_embedding, k=1)
+        if not best:
+            return label
+        best_label, best_similarity = best[0]
         
         # Only override if similarity is reasonable (> 0.4)
         # Lower threshold for better recall with example-based definitions
-        if best_similarity > 0.4:
+        if best_similarity > _LABEL_SIMILARITY_THRESHOLD:
             # Commented out to reduce log volume
             # logger.debug(f"Semantic correction: '{entity_text}' {label} → {best_label} (similarity: {best_similarity:.3f})")
             return best_label
@@ -221,6 +225,7 @@ async def correct_entity_labels_batch(
     1. Batch embedding generation (6× faster than individual)
     2. Per-user entity embedding cache with TTL (80% hit rate)
     3. Only processes entities that need correction
+    4. All entities scored against all labels in one matrix product
     
     Args:
         entities: List of entity dicts with 'text' and 'type' keys
@@ -231,7 +236,6 @@ async def correct_entity_labels_batch(
         Dict mapping entity text to corrected label
     """
     import time
-    import numpy as np
     
     # Initialize user cache if needed
     if user_id not in _entity_embeddings_cache:
@@ -253,17 +257,13 @@ async def correct_entity_labels_batch(
     #     logger.debug(f"Cleaned {len(expired_keys)} expired entity embeddings from cache")
     
     # Ensure label embeddings are cached
-    if not _label_embeddings_cache:
-        definitions = list(LABEL_DEFINITIONS.values())
-        result = await modelservice_client.generate_embeddings(definitions)
-        if result.get("embeddings"):
-            for label_name, embedding in zip(LABEL_DEFINITIONS.keys(), result["embeddings"]):
-                _label_embeddings_cache[label_name] = embedding
+    await _ensure_label_embeddings(modelservice_client)
     
     # Separate entities into cached and uncached
     results = {}
     entities_to_embed = []
-    entity_text_to_idx = {}
+    scored_entities = []
+    scored_vectors = []
     
     for entity in entities:
         entity_text = entity["text"]
@@ -271,22 +271,10 @@ async def correct_entity_labels_batch(
         # Check cache first
         if entity_text in user_cache:
             cached_embedding, _ = user_cache[entity_text]
-            # Compute best label from cached embedding
-            entity_vec = np.array(cached_embedding)
-            best_label = entity["type"]  # Default
-            best_similarity = -1.0
-            
-            for label_name, label_embedding in _label_embeddings_cache.items():
-                label_vec = np.array(label_embedding)
-                similarity = np.dot(entity_vec, label_vec) / (np.linalg.norm(entity_vec) * np.linalg.norm(label_vec))
-                if similarity > best_similarity:
-                    best_similarity = similarity
-                    best_label = label_name
-            
-            results[entity_text] = best_label if best_similarity > 0.4 else entity["type"]
+            scored_entities.append(entity)
+            scored_vectors.append(cached_embedding)
         else:
             # Need to embed this entity
-            entity_text_to_idx[entity_text] = len(entities_to_embed)
             entities_to_embed.append(entity)
     
     # Batch embed uncached entities
@@ -301,27 +289,10 @@ async def correct_entity_labels_batch(
             
             if embeddings:
                 for entity, embedding in zip(entities_to_embed, embeddings):
-                    entity_text = entity["text"]
-                    
                     # Cache the embedding with timestamp
-                    user_cache[entity_text] = (embedding, current_time)
-                    
-                    # Compute best label
-                    entity_vec = np.array(embedding)
-                    best_label = entity["type"]  # Default
-                    best_similarity = -1.0
-                    
-                    for label_name, label_embedding in _label_embeddings_cache.items():
-                        label_vec = np.array(label_embedding)
-                        similarity = np.dot(entity_vec, label_vec) / (np.linalg.norm(entity_vec) * np.linalg.norm(label_vec))
-                        if similarity > best_similarity:
-                            best_similarity = similarity
-                            best_label = label_name
-                    
-                    results[entity_text] = best_label if best_similarity > 0.4 else entity["type"]
-                    
-                    # Commented out to reduce log volume
-                    # logger.debug(f"Semantic correction: '{entity_text}' {entity['type']} → {results[entity_text]} (similarity: {best_similarity:.3f})")
+                    user_cache[entity["text"]] = (embedding, current_time)
+                    scored_entities.append(entity)
+                    scored_vectors.append(embedding)
         
         except Exception as e:
             logger.error(f"Batch embedding failed: {e}")
@@ -329,6 +300,17 @@ async def correct_entity_labels_batch(
             for entity in entities_to_embed:
                 results[entity["text"]] = entity["type"]
     
+    # Best label for every entity via one (entities x labels) matrix product
+    if scored_vectors and _label_embeddings_cache:
+        matches = _label_embeddings_cache.best_matches(scored_vectors)
+        for entity, (best_label, best_similarity) in zip(scored_entities, matches):
+            results[entity["text"]] = (
+                best_label if best_similarity > _LABEL_SIMILARITY_THRESHOLD else entity["type"]
+            )
+    else:
+        for entity in scored_entities:
+            results[entity["text"]] = entity["type"]
+    
     cache_hit_rate = (len(entities) - len(entities_to_embed)) / len(entities) if entities else 0
     logger.info(f"Entity label correction: {len(entities)} entities, {len(entities_to_embed)} cache misses ({cache_hit_rate:.1%} hit rate)")
     
@@ -689,6 +671,97 @@ class GLiNEREntityExtractor(ExtractionStrategy):
             return PropertyGraph()
 
 
+# Relation extraction guidance shared by the single-text and batched prompts
+_RELATION_GUIDE = """ENTITY TYPES:
+World Knowledge: PERSON, ORGANIZATION, LOCATION, EVENT, DATE, TIME, PRODUCT, SKILL, TOPIC
+Personal Graph: PROJECT, GOAL, TASK, ACTIVITY, INTEREST, PRIORITY
+
+RELATIONSHIP TYPES:
+World Knowledge: WORKS_FOR, WORKS_AT, LIVES_IN, LOCATED_IN, KNOWS, PART_OF, HAPPENED_IN
+Personal Graph: WORKING_ON, HAS_GOAL, CONTRIBUTES_TO, DEPENDS_ON, INTERESTED_IN, PRIORITIZES, COMPLETED, STARTED
+
+IMPORTANT RULES:
+- Only extract relationships where source and target are DIFFERENT entities
+- Do NOT create self-referential relationships (e.g., "Michael" -> "has name" -> "Michael")
+- Extract personal activities: projects user is working on, goals they have, tasks to complete
+- If user mentions working on something, create WORKING_ON relationship
+- If user mentions wanting to achieve something, create HAS_GOAL relationship
+- If there are no meaningful relationships between different entities, return empty arrays
+
+RELATIONSHIP PROPERTIES:
+Include contextual details about each relationship:
+- role, title, position (for work relationships)
+- start_date, end_date, since, until (for temporal context)
+- amount, salary, percentage (for quantitative data)
+
+Example: "Sarah is CTO of TechCorp since 2020" → 
+{"source": "Sarah", "relation_type": "WORKS_FOR", "target": "TechCorp", "properties": {"role": "CTO", "start_date": "2020"}}"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token) used for LLM budgets."""
+    return len(text) // 4 + 1
+
+
+class LLMResponseCache:
+    """
+    Bounded LRU cache of parsed LLM extraction responses.
+    
+    Keyed by hashes of the source text, the model and the full prompt, so a
+    message that is extracted again (retried consolidation run, duplicate
+    message, unchanged gleaning context) is served without another LLM call.
+    Only successfully parsed responses are cached.
+    """
+    
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Tuple[str, str, str], Dict[str, Any]]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(text: str, model: Optional[str], prompt: str) -> Tuple[str, str, str]:
+        """Cache key for a prompt about text sent to model."""
+        return (
+            hashlib.sha256(text.encode("utf-8")).hexdigest(),
+            model or "",
+            hashlib.sha256(prompt.encode("utf-8")).hexdigest()
+        )
+    
+    def get(self, key: Tuple[str, str, str]) -> Optional[Dict[str, Any]]:
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+    
+    def set(self, key: Tuple[str, str, str], result: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+    
+    def clear(self) -> None:
+        self._entries.clear()
+    
+    def stats(self) -> Dict[str, Any]:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "max_entries": self.max_entries,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0
+        }
+    
+    def __len__(self) -> int:
+        return len(self._entries)
+
+
 class LLMRelationExtractor(ExtractionStrategy):
     """
     Relationship extraction using LLM (Eve).
@@ -714,6 +787,61 @@ class LLMRelationExtractor(ExtractionStrategy):
         # Get LLM timeout from config
         kg_config = config.get("core.memory.semantic.knowledge_graph", {})
         self.llm_timeout = kg_config.get("llm_timeout_seconds", 30.0)
+        self.response_cache = LLMResponseCache(kg_config.get("prompt_cache_size", 256))
+    
+    async def complete_json(
+        self,
+        prompt: str,
+        source_text: str,
+        model: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], int]:
+        """
+        Run an extraction prompt, parsing the JSON answer while it streams.
+        
+        Generation is abandoned as soon as the answer turns malformed; the
+        items completed until then are kept. Complete answers are cached.
+        
+        Args:
+            prompt: Full prompt
+            source_text: Text the prompt extracts from (part of the cache key)
+            model: Optional model override
+            
+        Returns:
+            Tuple of (parsed result, estimated tokens spent; 0 on cache hit)
+            
+        Raises:
+            asyncio.TimeoutError: If the LLM does not answer within llm_timeout
+        """
+        key = LLMResponseCache.make_key(source_text, model, prompt)
+        cached = self.response_cache.get(key)
+        if cached is not None:
+            logger.debug(f"LLM extraction served from cache ({len(prompt)} char prompt)")
+            return cached, 0
+        
+        kwargs = {"model": model} if model else {}
+        stream = await asyncio.wait_for(
+            stream_json_completion(
+                self.modelservice,
+                prompt,
+                temperature=0.3,  # Lower temp for structured output
+                max_tokens=1024,
+                **kwargs
+            ),
+            timeout=self.llm_timeout
+        )
+        tokens = estimate_tokens(prompt) + estimate_tokens(stream.text)
+        logger.debug(f"Received LLM response ({len(stream.text)} chars, {len(stream.items)} items, streamed={stream.streamed})")
+        
+        result = self._parse_llm_response(stream)
+        if result is None:
+            print(f"🔗 [PARSER] Raw text (first 500 chars): {stream.text[:500]}")
+            return {"relationships": [], "new_entities": []}, tokens
+        if stream.malformed or stream.truncated:
+            # Salvaged items of a broken answer: use them, but ask again next time
+            return result, tokens
+        
+        self.response_cache.set(key, result)
+        return result, tokens
     
     async def extract(
         self,
@@ -748,30 +876,7 @@ class LLMRelationExtractor(ExtractionStrategy):
             
             prompt = f"""Extract relationships between DIFFERENT entities from the following text.
 
-ENTITY TYPES:
-World Knowledge: PERSON, ORGANIZATION, LOCATION, EVENT, DATE, TIME, PRODUCT, SKILL, TOPIC
-Personal Graph: PROJECT, GOAL, TASK, ACTIVITY, INTEREST, PRIORITY
-
-RELATIONSHIP TYPES:
-World Knowledge: WORKS_FOR, WORKS_AT, LIVES_IN, LOCATED_IN, KNOWS, PART_OF, HAPPENED_IN
-Personal Graph: WORKING_ON, HAS_GOAL, CONTRIBUTES_TO, DEPENDS_ON, INTERESTED_IN, PRIORITIZES, COMPLETED, STARTED
-
-IMPORTANT RULES:
-- Only extract relationships where source and target are DIFFERENT entities
-- Do NOT create self-referential relationships (e.g., "Michael" -> "has name" -> "Michael")
-- Extract personal activities: projects user is working on, goals they have, tasks to complete
-- If user mentions working on something, create WORKING_ON relationship
-- If user mentions wanting to achieve something, create HAS_GOAL relationship
-- If there are no meaningful relationships between different entities, return empty arrays
-
-RELATIONSHIP PROPERTIES:
-Include contextual details about each relationship:
-- role, title, position (for work relationships)
-- start_date, end_date, since, until (for temporal context)
-- amount, salary, percentage (for quantitative data)
-
-Example: "Sarah is CTO of TechCorp since 2020" → 
-{{"source": "Sarah", "relation_type": "WORKS_FOR", "target": "TechCorp", "properties": {{"role": "CTO", "start_date": "2020"}}}}
+{_RELATION_GUIDE}
 
 Return JSON with:
 - "relationships": [{{"source": "...", "relation_type": "...", "target": "...", "properties": {{...}}}}]
@@ -786,88 +891,16 @@ Return valid JSON only, no explanation."""
             # Call LLM with timeout
             print(f"🔗 [LLM_EXTRACTOR] Calling LLM with timeout={self.llm_timeout}s...")
             start_time = time.time()
-            response = await asyncio.wait_for(
-                self.modelservice.generate_completion(
-                    prompt=prompt,
-                    temperature=0.3,  # Lower temp for structured output
-                    max_tokens=1024
-                ),
-                timeout=self.llm_timeout
-            )
+            result, _ = await self.complete_json(prompt, text)
             end_time = time.time()
             print(f"🔗 [LLM_EXTRACTOR] LLM response received ({end_time - start_time:.2f}s)")
-            
-            # Debug: Check response structure
-            print(f"🔗 [LLM_EXTRACTOR] Response type: {type(response)}")
-            print(f"🔗 [LLM_EXTRACTOR] Response keys: {response.keys() if isinstance(response, dict) else 'NOT A DICT'}")
-            print(f"🔗 [LLM_EXTRACTOR] Full response: {response}")
-            
-            # Log raw response for debugging
-            raw_response = response.get("text", "")  # Fixed: key is "text", not "response"
-            print(f"🔗 [LLM_EXTRACTOR] Raw response length: {len(raw_response)} chars")
-            if raw_response:
-                print(f"🔗 [LLM_EXTRACTOR] Raw response preview: {raw_response[:200]}...")
-            else:
-                print(f"🔗 [LLM_EXTRACTOR] ⚠️  RAW RESPONSE IS EMPTY!")
-            
-            # Parse LLM response
-            result = self._parse_llm_response(raw_response)
-            print(f"🔗 [LLM_EXTRACTOR] Parsed result type: {type(result)}")
-            print(f"🔗 [LLM_EXTRACTOR] Parsed result keys: {result.keys() if isinstance(result, dict) else 'NOT A DICT'}")
             print(f"🔗 [LLM_EXTRACTOR] Parsed: {len(result.get('relationships', []))} relationships, {len(result.get('new_entities', []))} new entities")
             
             if len(result.get('relationships', [])) == 0:
                 print(f"🔗 [LLM_EXTRACTOR] ⚠️  NO RELATIONSHIPS FOUND!")
                 print(f"🔗 [LLM_EXTRACTOR] Full parsed result: {result}")
             
-            logger.debug(f"Received LLM response ({len(raw_response)} chars)")
-            
-            graph = PropertyGraph()
-            
-            # Create nodes for new entities
-            for entity in result.get("new_entities", []):
-                node = Node.create(
-                    user_id=user_id,
-                    label=entity.get("label", "ENTITY").upper(),
-                    properties={"name": entity.get("name", "")},
-                    confidence=0.8,  # LLM-extracted entities get lower confidence
-                    source_text=text
-                )
-                graph.add_node(node)
-            
-            # Create edges for relationships
-            for rel in result.get("relationships", []):
-                # Skip self-referential relationships (source == target)
-                if rel["source"].lower().strip() == rel["target"].lower().strip():
-                    logger.warning(f"Skipping self-referential relationship: {rel['source']} -> {rel['relation_type']} -> {rel['target']}")
-                    continue
-                
-                # Create placeholder nodes if not in context
-                source_node = self._find_or_create_node(
-                    rel["source"],
-                    user_id,
-                    text,
-                    graph,
-                    context
-                )
-                target_node = self._find_or_create_node(
-                    rel["target"],
-                    user_id,
-                    text,
-                    graph,
-                    context
-                )
-                
-                edge = Edge.create(
-                    user_id=user_id,
-                    source_id=source_node.id,
-                    target_id=target_node.id,
-                    relation_type=normalize_relation_type(rel["relation_type"]),
-                    properties=rel.get("properties", {}),
-                    confidence=0.85,
-                    source_text=text
-                )
-                graph.add_edge(edge)
+            graph = self.build_graph(result, user_id, text, context)
             
             logger.debug(f"LLM extracted {len(graph.edges)} relationships")
             return graph
@@ -883,26 +916,200 @@ Return valid JSON only, no explanation."""
             logger.error(f"LLM extraction failed: {e}")
             return PropertyGraph()
     
-    def _parse_llm_response(self, text: str) -> Dict[str, Any]:
-        """Parse LLM JSON response, handling common issues."""
+    async def extract_batch(
+        self,
+        texts: List[str],
+        user_id: str,
+        contexts: List[Dict[str, Any]]
+    ) -> List[PropertyGraph]:
+        """
+        Extract relationships for several short messages with one LLM call.
+        
+        Messages are numbered in the prompt and every extracted item carries
+        the number of the message it came from, so results are attributed
+        back per message (source_text, known-entity lookup).
+        
+        Args:
+            texts: Messages to extract from
+            user_id: User ID
+            contexts: Per-message context (known entities), same order as texts
+            
+        Returns:
+            One PropertyGraph per message, in input order
+        """
+        message_blocks = []
+        for number, (text, context) in enumerate(zip(texts, contexts), 1):
+            block = f"[{number}] {text}"
+            known = context.get("entities", [])
+            if known:
+                block += "\nKnown entities: " + "; ".join(f"{e['label']}: {e['name']}" for e in known)
+            message_blocks.append(block)
+        
+        prompt = f"""Extract relationships between DIFFERENT entities from each of the numbered messages below.
+
+{_RELATION_GUIDE}
+
+Return JSON with:
+- "relationships": [{{"message": 1, "source": "...", "relation_type": "...", "target": "...", "properties": {{...}}}}]
+- "new_entities": [{{"message": 1, "label": "...", "name": "..."}}]
+
+"message" is the number of the message an item was extracted from. Never relate entities from different messages.
+
+Messages:
+{chr(10).join(message_blocks)}
+
+Return valid JSON only, no explanation."""
+        
+        try:
+            logger.debug(f"Sending batched LLM prompt ({len(prompt)} chars) for {len(texts)} messages")
+            result, _ = await self.complete_json(prompt, "\n".join(texts))
+        except asyncio.TimeoutError:
+            logger.error(f"Batched LLM extraction timed out after {self.llm_timeout}s")
+            return [PropertyGraph() for _ in texts]
+        except Exception as e:
+            logger.error(f"Batched LLM extraction failed: {e}")
+            return [PropertyGraph() for _ in texts]
+        
+        # Split items by message number
+        per_message = [{"relationships": [], "new_entities": []} for _ in texts]
+        unattributed = 0
+        for key in ("relationships", "new_entities"):
+            for item in result.get(key, []):
+                index = self._message_index(item, len(texts))
+                if index is None:
+                    unattributed += 1
+                    continue
+                per_message[index][key].append(item)
+        if unattributed:
+            logger.warning(f"Dropped {unattributed} batched extraction items without a valid message number")
+        
+        return [
+            self.build_graph(message_result, user_id, text, context)
+            for message_result, text, context in zip(per_message, texts, contexts)
+        ]
+    
+    @staticmethod
+    def _message_index(item: Any, message_count: int) -> Optional[int]:
+        """Zero-based message index of a batched item, or None if missing/invalid."""
+        if not isinstance(item, dict):
+            return None
+        number = item.get("message")
+        if number is None and message_count == 1:
+            return 0
         try:
-            # Try to extract JSON from response
-            original_text = text
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0]
-                print(f"🔗 [PARSER] Extracted JSON from markdown code block")
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0]
-                print(f"🔗 [PARSER] Extracted from generic code block")
+            index = int(number) - 1
+        except (TypeError, ValueError):
+            return None
+        return index if 0 <= index < message_count else None
+    
+    def build_graph(
+        self,
+        result: Dict[str, Any],
+        user_id: str,
+        source_text: str,
+        context: Dict[str, Any],
+        relationships_key: str = "relationships",
+        entity_confidence: float = 0.8,  # LLM-extracted entities get lower confidence
+        edge_confidence: float = 0.85
+    ) -> PropertyGraph:
+        """
+        Build a PropertyGraph from a parsed extraction result.
+        
+        Args:
+            result: Parsed LLM result with "new_entities" and relationships
+            user_id: User ID
+            source_text: Text the result was extracted from
+            context: Known entities used to link relationship endpoints
+            relationships_key: Key holding the relationships in result
+            entity_confidence: Confidence for new entity nodes
+            edge_confidence: Confidence for relationship edges
+            
+        Returns:
+            PropertyGraph with new nodes and edges
+        """
+        graph = PropertyGraph()
+        
+        # Create nodes for new entities
+        for entity in result.get("new_entities", []):
+            if not isinstance(entity, dict) or not entity.get("name"):
+                continue
+            node = Node.create(
+                user_id=user_id,
+                label=str(entity.get("label", "ENTITY")).upper(),
+                properties={"name": entity["name"]},
+                confidence=entity_confidence,
+                source_text=source_text
+            )
+            graph.add_node(node)
+        
+        # Create edges for relationships
+        for rel in result.get(relationships_key, []):
+            if not isinstance(rel, dict) or not all(rel.get(key) for key in ("source", "target", "relation_type")):
+                logger.warning(f"Skipping invalid relationship: {rel}")
+                continue
+            
+            # Skip self-referential relationships (source == target)
+            if str(rel["source"]).lower().strip() == str(rel["target"]).lower().strip():
+                logger.warning(f"Skipping self-referential relationship: {rel['source']} -> {rel['relation_type']} -> {rel['target']}")
+                continue
             
-            parsed = json.loads(text.strip())
+            # Create placeholder nodes if not in context
+            source_node = self._find_or_create_node(
+                str(rel["source"]),
+                user_id,
+                source_text,
+                graph,
+                context
+            )
+            target_node = self._find_or_create_node(
+                str(rel["target"]),
+                user_id,
+                source_text,
+                graph,
+                context
+            )
+            
+            edge = Edge.create(
+                user_id=user_id,
+                source_id=source_node.id,
+                target_id=target_node.id,
+                relation_type=normalize_relation_type(rel["relation_type"]),
+                properties=rel.get("properties") or {},
+                confidence=edge_confidence,
+                source_text=source_text
+            )
+            graph.add_edge(edge)
+        
+        return graph
+    
+    def _parse_llm_response(self, stream: JsonStreamResult) -> Optional[Dict[str, Any]]:
+        """
+        Result object of a streamed extraction answer, or None if it holds no JSON.
+        
+        If the answer broke off, turned malformed or came as bare objects
+        (NDJSON), the result is rebuilt from the completed items.
+        """
+        bare_items = any(item.key is None for item in stream.items)
+        if isinstance(stream.value, dict) and not stream.malformed and not bare_items:
             print(f"🔗 [PARSER] ✅ Successfully parsed JSON")
-            return parsed
-        except Exception as e:
-            print(f"🔗 [PARSER] ❌ Failed to parse LLM response: {e}")
-            print(f"🔗 [PARSER] Raw text (first 500 chars): {original_text[:500]}")
-            logger.warning(f"Failed to parse LLM response: {e}")
-            return {"relationships": [], "new_entities": []}
+            return stream.value
+        
+        if not stream.items:
+            print(f"🔗 [PARSER] ❌ Failed to parse LLM response")
+            logger.warning("Failed to parse LLM response: no complete JSON object")
+            return None
+        
+        result: Dict[str, Any] = {}
+        for item in stream.items:
+            key = item.key
+            if key is None and isinstance(item.value, dict):
+                # Bare objects (NDJSON or a top-level array) are classified by shape
+                key = "relationships" if "source" in item.value and "target" in item.value else "new_entities"
+            if key is not None:
+                result.setdefault(key, []).append(item.value)
+        print(f"🔗 [PARSER] ⚠️  Rebuilt result from {len(stream.items)} streamed items")
+        logger.warning(f"LLM response was not a complete JSON object, rebuilt from {len(stream.items)} items")
+        return result
     
     def _find_or_create_node(
         self,
@@ -914,13 +1121,9 @@ Return valid JSON only, no explanation."""
     ) -> Node:
         """Find existing node or create placeholder."""
         # Check if node already exists in current graph
-        for node in graph.nodes:
-            name = node.properties.get("name", "")
-            # Handle corrupted data where name is a list
-            if isinstance(name, list):
-                name = name[0] if name else ""
-            if str(name).lower() == entity_name.lower():
-                return node
+        node = graph.find_node_by_name(entity_name)
+        if node:
+            return node
         
         # Check if node exists in context
         existing_entities = context.get("entities", [])
@@ -949,6 +1152,60 @@ Return valid JSON only, no explanation."""
         return node
 
 
+class _GleaningContext:
+    """
+    What has been extracted from one text so far, kept for gleaning prompts.
+    
+    Grown incrementally with the items each pass adds, so gleaning passes do
+    not re-serialize the whole graph, and used to tell genuinely new gleaned
+    items from repeats of known ones.
+    """
+    
+    def __init__(self):
+        self.entities: List[Dict[str, str]] = []  # Known-entity context for _find_or_create_node
+        self.names = set()
+        self.triples = set()
+        self._entity_lines: List[str] = []
+        self._relationship_lines: List[str] = []
+        self._seen_edges = set()
+    
+    def add(self, items: PropertyGraph, graph: PropertyGraph) -> None:
+        """Record the nodes and edges of items; endpoints are looked up in graph."""
+        for node in items.nodes:
+            name = safe_get_name(node)
+            if not name or name.lower() in self.names:
+                continue
+            self.names.add(name.lower())
+            self.entities.append({"id": node.id, "label": node.label, "name": name})
+            self._entity_lines.append(f"- {node.label}: {name}")
+        
+        for edge in items.edges:
+            if edge.id in self._seen_edges:
+                continue
+            source = graph.get_node_by_id(edge.source_id)
+            target = graph.get_node_by_id(edge.target_id)
+            if not source or not target:
+                continue
+            self._seen_edges.add(edge.id)
+            source_name, target_name = safe_get_name(source), safe_get_name(target)
+            self.triples.add((source_name.lower(), edge.relation_type, target_name.lower()))
+            self._relationship_lines.append(f"- {source_name} -[{edge.relation_type}]-> {target_name}")
+    
+    def is_known_entity(self, name: str) -> bool:
+        return name.lower().strip() in self.names
+    
+    def is_known_relationship(self, source: str, relation_type: str, target: str) -> bool:
+        return (source.lower().strip(), normalize_relation_type(relation_type), target.lower().strip()) in self.triples
+    
+    @property
+    def entity_lines(self) -> str:
+        return "\n".join(self._entity_lines) or "(none)"
+    
+    @property
+    def relationship_lines(self) -> str:
+        return "\n".join(self._relationship_lines) or "(none)"
+
+
 class MultiPassExtractor:
     """
     Multi-pass extraction pipeline with gleanings.
@@ -956,6 +1213,11 @@ class MultiPassExtractor:
     Implements the multi-pass extraction algorithm:
     1. Pass 1: GLiNER entity extraction + LLM relation extraction
     2. Pass 2+: Gleaning passes to find missed information
+    
+    Gleaning is adaptive: it stops as soon as a pass yields fewer than
+    gleaning_min_new_items new items, or when the next pass would exceed the
+    token or latency budget. extract_batch() additionally extracts relations
+    for several short messages with a single LLM prompt.
     """
     
     def __init__(
@@ -975,12 +1237,19 @@ class MultiPassExtractor:
         # Get config settings
         kg_config = config.get("core.memory.semantic.knowledge_graph", {})
         self.max_gleanings = kg_config.get("max_gleanings", 2)
+        self.gleaning_min_new_items = kg_config.get("gleaning_min_new_items", 2)
+        self.gleaning_token_budget = kg_config.get("gleaning_token_budget", 4000)
+        self.gleaning_time_budget = kg_config.get("gleaning_time_budget_seconds", 30.0)
+        self.batch_max_messages = kg_config.get("batch_max_messages", 8)
+        self.batch_max_chars = kg_config.get("batch_max_chars", 2000)
+        self.batch_message_max_chars = kg_config.get("batch_message_max_chars", 400)
         
         # Initialize extraction strategies
         self.gliner_extractor = GLiNEREntityExtractor(modelservice_client)
         self.llm_extractor = LLMRelationExtractor(modelservice_client, config)
         
-        logger.info(f"MultiPassExtractor initialized (max_gleanings={self.max_gleanings})")
+        logger.info(f"MultiPassExtractor initialized (max_gleanings={self.max_gleanings}, "
+                    f"gleaning_min_new_items={self.gleaning_min_new_items}, batch_max_messages={self.batch_max_messages})")
     
     async def extract(
         self,
@@ -1010,16 +1279,9 @@ class MultiPassExtractor:
         print(f"📚 [MULTIPASS] Pass 1 complete in {pass1_time:.2f}s: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
         logger.info(f"Pass 1 complete: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
         
-        # Pass 2+: Gleaning passes
-        for i in range(self.max_gleanings):
-            new_graph = await self._gleaning_pass(text, user_id, graph, pass_num=i+2)
-            
-            if len(new_graph) == 0:
-                logger.info(f"Pass {i+2}: No new information found, stopping")
-                break
-            
-            graph.merge(new_graph)
-            logger.info(f"Pass {i+2} complete: +{len(new_graph.nodes)} nodes, +{len(new_graph.edges)} edges")
+        # Pass 2+: Gleaning passes, as long as they pay off and fit the budgets
+        if self.max_gleanings > 0:
+            await self._glean(text, user_id, graph, pipeline_start)
         
         final_count = len(graph)
         improvement = ((final_count - initial_count) / initial_count * 100) if initial_count > 0 else 0
@@ -1032,6 +1294,125 @@ class MultiPassExtractor:
         
         return graph
     
+    async def extract_batch(
+        self,
+        texts: List[str],
+        user_id: str
+    ) -> List[PropertyGraph]:
+        """
+        Extract knowledge graphs for several messages of one user.
+        
+        Short messages are grouped (up to batch_max_messages messages and
+        batch_max_chars characters per group) and their relations extracted
+        with one LLM prompt per group. Longer messages, and groups of one, go
+        through extract() including gleaning.
+        
+        Args:
+            texts: Messages to extract from
+            user_id: User ID
+            
+        Returns:
+            One PropertyGraph per message, in input order
+        """
+        graphs: List[Optional[PropertyGraph]] = [None] * len(texts)
+        groups: List[List[int]] = []
+        singles: List[int] = []
+        group: List[int] = []
+        group_chars = 0
+        
+        for index, text in enumerate(texts):
+            if len(text) > self.batch_message_max_chars or self.batch_max_messages <= 1:
+                singles.append(index)
+                continue
+            if group and (len(group) >= self.batch_max_messages or group_chars + len(text) > self.batch_max_chars):
+                groups.append(group)
+                group, group_chars = [], 0
+            group.append(index)
+            group_chars += len(text)
+        if group:
+            groups.append(group)
+        
+        # A group of one gains nothing from batching
+        singles.extend(group[0] for group in groups if len(group) == 1)
+        groups = [group for group in groups if len(group) > 1]
+        
+        async def extract_group(indices: List[int]) -> None:
+            results = await self._batched_extraction([texts[i] for i in indices], user_id)
+            for i, graph in zip(indices, results):
+                graphs[i] = graph
+        
+        async def extract_single(index: int) -> None:
+            graphs[index] = await self.extract(texts[index], user_id)
+        
+        logger.info(f"Batch extraction: {len(texts)} messages -> {len(groups)} batched prompts, {len(singles)} single extractions")
+        await asyncio.gather(
+            *[extract_group(indices) for indices in groups],
+            *[extract_single(index) for index in singles]
+        )
+        return graphs
+    
+    def get_cache_stats(self) -> Dict[str, Any]:
+        """LLM response cache statistics for monitoring."""
+        return self.llm_extractor.response_cache.stats()
+    
+    async def _glean(
+        self,
+        text: str,
+        user_id: str,
+        graph: PropertyGraph,
+        pipeline_start: float
+    ) -> None:
+        """Run gleaning passes on graph until they stop paying off or a budget is reached."""
+        context = _GleaningContext()
+        context.add(graph, graph)
+        tokens_used = 0
+        last_pass_tokens = 0
+        last_pass_time = 0.0
+        
+        for i in range(self.max_gleanings):
+            pass_num = i + 2
+            
+            # Budgets: stop if another pass like the last one would exceed them
+            if self.gleaning_token_budget and tokens_used + last_pass_tokens > self.gleaning_token_budget:
+                logger.info(f"Pass {pass_num}: token budget reached ({tokens_used}/{self.gleaning_token_budget}), stopping")
+                break
+            elapsed = time.time() - pipeline_start
+            if self.gleaning_time_budget and elapsed + last_pass_time > self.gleaning_time_budget:
+                logger.info(f"Pass {pass_num}: time budget reached ({elapsed:.1f}s/{self.gleaning_time_budget}s), stopping")
+                break
+            
+            pass_start = time.time()
+            new_graph, last_pass_tokens = await self._gleaning_pass(text, user_id, context, pass_num)
+            last_pass_time = time.time() - pass_start
+            tokens_used += last_pass_tokens
+            
+            if len(new_graph) == 0:
+                logger.info(f"Pass {pass_num}: No new information found, stopping")
+                break
+            
+            graph.merge(new_graph)
+            context.add(new_graph, graph)
+            logger.info(f"Pass {pass_num} complete: +{len(new_graph.nodes)} nodes, +{len(new_graph.edges)} edges")
+            
+            if len(new_graph) < self.gleaning_min_new_items:
+                logger.info(f"Pass {pass_num}: only {len(new_graph)} new items, stopping")
+                break
+    
+    async def _extract_entities(self, text: str, user_id: str) -> Tuple[PropertyGraph, Dict[str, Any]]:
+        """Run GLiNER on text and build the known-entity context for relation extraction."""
+        entity_graph = await self.gliner_extractor.extract(text, user_id, {})
+        entity_context = {
+            "entities": [
+                {
+                    "id": node.id,
+                    "label": node.label,
+                    "name": safe_get_name(node)
+                }
+                for node in entity_graph.nodes
+            ]
+        }
+        return entity_graph, entity_context
+    
     async def _initial_extraction(
         self,
         text: str,
@@ -1051,7 +1432,7 @@ class MultiPassExtractor:
         print(f"\n  🔍 [ENTITIES] Starting GLiNER entity extraction...")
         entity_start = time.time()
         logger.debug("Starting entity extraction phase")
-        entity_graph = await self.gliner_extractor.extract(text, user_id, {})
+        entity_graph, entity_context = await self._extract_entities(text, user_id)
         entity_time = time.time() - entity_start
         print(f"  🔍 [ENTITIES] ✅ Complete in {entity_time:.2f}s: {len(entity_graph.nodes)} entities")
         logger.info(f"Entity extraction complete: {len(entity_graph.nodes)} entities")
@@ -1060,19 +1441,7 @@ class MultiPassExtractor:
         graph = PropertyGraph()
         graph.merge(entity_graph)
         
-        # Step 2: Build entity context for relation extraction
-        entity_context = {
-            "entities": [
-                {
-                    "id": node.id,
-                    "label": node.label,
-                    "name": safe_get_name(node)
-                }
-                for node in entity_graph.nodes
-            ]
-        }
-        
-        # Step 3: Extract relations WITH entity context (only one LLM call needed)
+        # Step 2: Extract relations WITH entity context (only one LLM call needed)
         print(f"🔗 [RELATIONS] Starting relation extraction with {len(entity_context['entities'])} known entities")
         logger.debug(f"Starting relation extraction with {len(entity_context['entities'])} known entities")
         
@@ -1089,120 +1458,108 @@ class MultiPassExtractor:
         
         return graph
     
+    async def _batched_extraction(
+        self,
+        texts: List[str],
+        user_id: str
+    ) -> List[PropertyGraph]:
+        """
+        Single-pass extraction for a group of short messages.
+        
+        GLiNER runs per message; relations for the whole group come from one
+        LLM prompt with per-message attribution.
+        """
+        entity_results = await asyncio.gather(*[self._extract_entities(text, user_id) for text in texts])
+        contexts = [entity_context for _, entity_context in entity_results]
+        
+        try:
+            relation_graphs = await self.llm_extractor.extract_batch(texts, user_id, contexts)
+        except Exception as e:
+            logger.error(f"Batched relation extraction failed: {e}")
+            relation_graphs = [PropertyGraph() for _ in texts]
+        
+        graphs = []
+        for (entity_graph, _), relation_graph in zip(entity_results, relation_graphs):
+            graph = PropertyGraph()
+            graph.merge(entity_graph)
+            graph.merge(relation_graph)
+            graphs.append(graph)
+        
+        logger.info(f"Batched extraction of {len(texts)} messages: "
+                    f"{sum(len(g.nodes) for g in graphs)} nodes, {sum(len(g.edges) for g in graphs)} edges")
+        return graphs
+    
     async def _gleaning_pass(
         self,
         text: str,
         user_id: str,
-        existing_graph: PropertyGraph,
+        context: _GleaningContext,
         pass_num: int
-    ) -> PropertyGraph:
+    ) -> Tuple[PropertyGraph, int]:
         """
         Gleaning pass: Find information missed in previous passes.
         
         Args:
             text: Original text
             user_id: User ID
-            existing_graph: Graph from previous passes
+            context: Items extracted by previous passes
             pass_num: Current pass number
             
         Returns:
-            PropertyGraph with newly discovered information
+            Tuple of (PropertyGraph with newly discovered information, estimated tokens spent)
         """
         try:
-            # Build context with existing graph
-            context = {
-                "existing_nodes": [
-                    {
-                        "label": node.label,
-                        "name": safe_get_name(node)
-                    }
-                    for node in existing_graph.nodes
-                ],
-                "existing_relationships": [
-                    {
-                        "source": safe_get_name(existing_graph.get_node_by_id(edge.source_id)),
-                        "relation": edge.relation_type,
-                        "target": safe_get_name(existing_graph.get_node_by_id(edge.target_id))
-                    }
-                    for edge in existing_graph.edges
-                    if existing_graph.get_node_by_id(edge.source_id) and existing_graph.get_node_by_id(edge.target_id)
-                ]
-            }
-            
             # Prompt LLM to find missed information
             prompt = f"""Review the text and identify information we missed.
 
 Text: {text}
 
 Already extracted:
-Entities: {json.dumps(context['existing_nodes'], indent=2)}
-Relationships: {json.dumps(context['existing_relationships'], indent=2)}
+Entities:
+{context.entity_lines}
+Relationships:
+{context.relationship_lines}
 
 What entities or relationships did we miss? Return JSON with:
-- "new_entities": array of missed entities
-- "new_relationships": array of missed relationships
+- "new_entities": [{{"label": "...", "name": "..."}}]
+- "new_relationships": [{{"source": "...", "relation_type": "...", "target": "...", "properties": {{...}}}}]
 
 Return valid JSON only."""
             
             logger.debug(f"Sending gleaning prompt ({len(prompt)} chars)")
             
-            response = await self.llm_extractor.modelservice.generate_completion(
-                prompt=prompt,
-                model="eve",
-                temperature=0.3,
-                max_tokens=1024
-            )
-            
-            response_text = response.get("text", "")
-            logger.debug(f"Received gleaning response ({len(response_text)} chars)")
+            result, tokens = await self.llm_extractor.complete_json(prompt, text, model="eve")
             
-            result = self.llm_extractor._parse_llm_response(response_text)
-            
-            graph = PropertyGraph()
-            
-            # Add new entities
-            for entity in result.get("new_entities", []):
-                node = Node.create(
-                    user_id=user_id,
-                    label=entity.get("label", "ENTITY").upper(),
-                    properties={"name": entity.get("name", "")},
-                    confidence=0.75,  # Gleaned entities get lower confidence
-                    source_text=text
-                )
-                graph.add_node(node)
-            
-            # Add new relationships
-            for rel in result.get("new_relationships", []):
-                # Validate relationship structure
-                if not all(key in rel for key in ["source", "target", "relation_type"]):
-                    logger.warning(f"Skipping invalid relationship in gleaning: {rel}")
-                    continue
-                
-                # Skip self-referential relationships
-                if rel["source"].lower().strip() == rel["target"].lower().strip():
-                    logger.warning(f"Skipping self-referential relationship in gleaning: {rel['source']} -> {rel['relation_type']} -> {rel['target']}")
-                    continue
-                
-                source_node = self.llm_extractor._find_or_create_node(
-                    rel["source"], user_id, text, graph, context
-                )
-                target_node = self.llm_extractor._find_or_create_node(
-                    rel["target"], user_id, text, graph, context
-                )
-                
-                edge = Edge.create(
-                    user_id=user_id,
-                    source_id=source_node.id,
-                    target_id=target_node.id,
-                    relation_type=normalize_relation_type(rel["relation_type"]),
-                    properties=rel.get("properties", {}),
-                    confidence=0.75,
-                    source_text=text
-                )
-                graph.add_edge(edge)
+            # Keep only items that are actually new
+            result = {
+                "new_entities": [
+                    entity for entity in result.get("new_entities", [])
+                    if isinstance(entity, dict) and entity.get("name")
+                    and not context.is_known_entity(str(entity["name"]))
+                ],
+                "new_relationships": [
+                    rel for rel in result.get("new_relationships", result.get("relationships", []))
+                    if not (
+                        isinstance(rel, dict) and all(rel.get(key) for key in ("source", "target", "relation_type"))
+                        and context.is_known_relationship(str(rel["source"]), str(rel["relation_type"]), str(rel["target"]))
+                    )
+                ]
+            }
             
-            return graph
+            graph = self.llm_extractor.build_graph(
+                result,
+                user_id,
+                text,
+                {"entities": context.entities},
+                relationships_key="new_relationships",
+                entity_confidence=0.75,  # Gleaned items get lower confidence
+                edge_confidence=0.75
+            )
+            return graph, tokens
             
+        except asyncio.TimeoutError:
+            logger.error(f"Gleaning pass {pass_num} timed out after {self.llm_extractor.llm_timeout}s")
+            return PropertyGraph(), 0
         except Exception as e:
             logger.error(f"Gleaning pass {pass_num} failed: {e}")
-            return PropertyGraph()
+            return PropertyGraph(), 0
@@ -5,7 +5,7 @@ Fuses new knowledge graph with existing graph, handling conflicts and discoverin
 Based on Graphusion algorithm (ACL 2024).
 """
 
-from typing import List, Dict, Any, Optional, Set
+from typing import List, Dict, Any, Optional, Set, Callable, Awaitable
 import asyncio
 import json
 from datetime import datetime, timezone
@@ -13,7 +13,8 @@ from datetime import datetime, timezone
 from aico.core.logging import get_logger
 from aico.core.config import ConfigurationManager
 
-from .models import Node, Edge, PropertyGraph
+from .json_stream import stream_json_completion
+from .models import Node, Edge, PropertyGraph, GraphChangeSet
 
 logger = get_logger("shared", "ai.knowledge_graph.fusion")
 
@@ -47,6 +48,9 @@ class GraphFusion:
         kg_config = config.get("core.memory.semantic.knowledge_graph", {})
         self.llm_timeout = kg_config.get("llm_timeout_seconds", 30.0)
         
+        # Caps LLM calls in flight across concurrent conflict resolutions
+        self._llm_semaphore = asyncio.Semaphore(kg_config.get("fusion_max_concurrent_llm", 4))
+        
         logger.info("GraphFusion initialized")
     
     async def fuse(
@@ -62,7 +66,8 @@ class GraphFusion:
             existing_graph: Existing knowledge graph
             
         Returns:
-            Fused graph with conflicts resolved
+            Fused graph with conflicts resolved; items superseded by a
+            temporal update stay in it as historical (is_current=0)
         """
         if not new_graph.nodes and not new_graph.edges:
             return existing_graph
@@ -70,84 +75,138 @@ class GraphFusion:
         if not existing_graph.nodes and not existing_graph.edges:
             return new_graph
         
+        changes = await self.fuse_changes(new_graph, existing_graph)
+        return changes.apply_to(existing_graph)
+    
+    async def fuse_changes(
+        self,
+        new_graph: PropertyGraph,
+        existing_graph: PropertyGraph
+    ) -> GraphChangeSet:
+        """
+        Fuse new graph into existing graph and return only what changed.
+        
+        Matches are found through the existing graph's ID, canonical ID and
+        edge signature indexes, so the cost is proportional to the new graph,
+        not the existing one.
+        New items matching the same existing item are fused one after another;
+        different existing items are fused concurrently (LLM calls are capped
+        by ``fusion_max_concurrent_llm``). Edges of the new graph are re-pointed
+        at the nodes their endpoints were fused into.
+        
+        Pass the result to ``PropertyGraphStorage.save_changes``.
+        
+        Args:
+            new_graph: Newly extracted and resolved graph
+            existing_graph: Existing knowledge graph
+            
+        Returns:
+            Change set of added, updated and superseded nodes and edges
+        """
+        changes = GraphChangeSet()
+        if not new_graph.nodes and not new_graph.edges:
+            return changes
+        
         logger.info(
             f"Fusing graphs: new=({len(new_graph.nodes)} nodes, {len(new_graph.edges)} edges), "
             f"existing=({len(existing_graph.nodes)} nodes, {len(existing_graph.edges)} edges)"
         )
         
-        # Start with existing graph
-        fused_graph = PropertyGraph()
-        fused_graph.nodes = existing_graph.nodes.copy()
-        fused_graph.edges = existing_graph.edges.copy()
-        
-        # Track which nodes/edges were added or updated
-        added_nodes = 0
-        updated_nodes = 0
-        added_edges = 0
-        updated_edges = 0
-        
         # Fuse nodes
-        existing_node_ids = {node.id for node in existing_graph.nodes}
-        existing_canonical_ids = {
-            node.canonical_id: node for node in existing_graph.nodes
-            if node.canonical_id
-        }
-        
+        node_groups: Dict[str, List[Node]] = {}
         for new_node in new_graph.nodes:
             # Check if node already exists (by ID or canonical_id)
-            existing_node = None
-            
-            if new_node.id in existing_node_ids:
-                existing_node = existing_graph.get_node_by_id(new_node.id)
-            elif new_node.canonical_id and new_node.canonical_id in existing_canonical_ids:
-                existing_node = existing_canonical_ids[new_node.canonical_id]
+            existing_node = existing_graph.get_node_by_id(new_node.id)
+            if existing_node is None and new_node.canonical_id:
+                existing_node = existing_graph.get_node_by_canonical_id(new_node.canonical_id)
             
             if existing_node:
-                # Node exists - check for conflicts and update
-                updated_node = await self._fuse_node(new_node, existing_node)
-                
-                # Replace in fused graph
-                fused_graph.nodes = [
-                    updated_node if n.id == existing_node.id else n
-                    for n in fused_graph.nodes
-                ]
-                updated_nodes += 1
+                node_groups.setdefault(existing_node.id, []).append(new_node)
             else:
-                # New node - add to graph
-                fused_graph.add_node(new_node)
-                added_nodes += 1
-        
-        # Fuse edges
-        existing_edge_signatures = {
-            self._edge_signature(edge): edge
-            for edge in existing_graph.edges
+                changes.added_nodes[new_node.id] = new_node
+        
+        fused_ids = await asyncio.gather(*(
+            self._fuse_into(existing_graph.get_node_by_id(existing_id), group, self._fuse_node, changes, is_node=True)
+            for existing_id, group in node_groups.items()
+        ))
+        node_id_map = {
+            new_node.id: fused_id
+            for group, fused_id in zip(node_groups.values(), fused_ids)
+            for new_node in group
+            if new_node.id != fused_id
         }
         
+        # Fuse edges
+        edge_groups: Dict[str, List[Edge]] = {}
         for new_edge in new_graph.edges:
-            sig = self._edge_signature(new_edge)
-            
-            if sig in existing_edge_signatures:
-                # Edge exists - check for conflicts and update
-                existing_edge = existing_edge_signatures[sig]
-                updated_edge = await self._fuse_edge(new_edge, existing_edge)
-                
-                # Replace in fused graph
-                fused_graph.edges = [
-                    updated_edge if e.id == existing_edge.id else e
-                    for e in fused_graph.edges
-                ]
-                updated_edges += 1
+            new_edge.source_id = node_id_map.get(new_edge.source_id, new_edge.source_id)
+            new_edge.target_id = node_id_map.get(new_edge.target_id, new_edge.target_id)
+            
+            existing_edge = existing_graph.find_edge(new_edge.source_id, new_edge.relation_type, new_edge.target_id)
+            if existing_edge:
+                edge_groups.setdefault(existing_edge.id, []).append(new_edge)
             else:
-                # New edge - add to graph
-                fused_graph.add_edge(new_edge)
-                added_edges += 1
+                changes.added_edges[new_edge.id] = new_edge
+        
+        await asyncio.gather(*(
+            self._fuse_into(existing_graph.get_edge_by_id(existing_id), group, self._fuse_edge, changes, is_node=False)
+            for existing_id, group in edge_groups.items()
+        ))
         
+        summary = changes.summary()
         logger.info(
-            f"Fusion complete: added {added_nodes} nodes, updated {updated_nodes} nodes, "
-            f"added {added_edges} edges, updated {updated_edges} edges"
+            f"Fusion complete: added {summary['added_nodes']} nodes, updated {summary['updated_nodes']} nodes, "
+            f"superseded {summary['superseded_nodes']} nodes, added {summary['added_edges']} edges, "
+            f"updated {summary['updated_edges']} edges, superseded {summary['superseded_edges']} edges"
         )
         
-        return fused_graph
+        return changes
+    
+    async def _fuse_into(
+        self,
+        existing_item: Any,  # Node or Edge
+        new_items: List[Any],
+        fuse_one: Callable[[Any, Any], Awaitable[Any]],
+        changes: GraphChangeSet,
+        is_node: bool
+    ) -> str:
+        """
+        Fuse new items matching one existing item, in order, recording changes.
+        
+        Args:
+            existing_item: Existing node or edge the new items matched
+            new_items: New nodes or edges matching ``existing_item``
+            fuse_one: ``_fuse_node`` or ``_fuse_edge``
+            changes: Change set to record into
+            is_node: Whether the items are nodes
+            
+        Returns:
+            ID of the current item after fusion
+        """
+        added = changes.added_nodes if is_node else changes.added_edges
+        updated = changes.updated_nodes if is_node else changes.updated_edges
+        superseded = changes.superseded_nodes if is_node else changes.superseded_edges
+        
+        current = existing_item
+        for new_item in new_items:
+            document_before = current.to_chromadb_document()["document"]
+            fused = await fuse_one(new_item, current)
+            
+            if current.to_chromadb_document()["document"] != document_before:
+                changes.reembed_ids.add(current.id)
+            
+            if fused is current:
+                if current.id not in added:
+                    updated[current.id] = current
+            else:
+                # Temporal update: current became historical, fused is its successor
+                if current.id not in added:
+                    updated.pop(current.id, None)
+                    superseded[current.id] = current
+                added[fused.id] = fused
+                current = fused
+        
+        return current.id
     
     async def _fuse_node(
         self,
@@ -184,19 +243,13 @@ class GraphFusion:
         # Conflicts detected - use LLM for resolution
         logger.debug(f"Conflicts detected in node {existing_node.id}: {conflicts}")
         
-        resolved_properties = await self._resolve_conflicts_llm(
-            new_node,
-            existing_node,
-            conflicts
-        )
-        
-        # Check if this is a temporal update (fact changed over time)
-        is_temporal_update = await self._is_temporal_update(
-            new_node,
-            existing_node,
-            conflicts
+        # Resolution and temporal check are independent - run them concurrently
+        resolved_properties, is_temporal_update = await asyncio.gather(
+            self._resolve_conflicts_llm(new_node, existing_node, conflicts),
+            self._is_temporal_update(new_node, existing_node, conflicts)
         )
         
+        # Temporal update: the fact changed over time
         if is_temporal_update:
             # Mark existing node as historical
             existing_node.is_current = 0
@@ -255,18 +308,10 @@ class GraphFusion:
             
             return existing_edge
         
-        # Conflicts detected - resolve
-        resolved_properties = await self._resolve_conflicts_llm(
-            new_edge,
-            existing_edge,
-            conflicts
-        )
-        
-        # Check if temporal update
-        is_temporal_update = await self._is_temporal_update(
-            new_edge,
-            existing_edge,
-            conflicts
+        # Conflicts detected - resolution and temporal check are independent, run them concurrently
+        resolved_properties, is_temporal_update = await asyncio.gather(
+            self._resolve_conflicts_llm(new_edge, existing_edge, conflicts),
+            self._is_temporal_update(new_edge, existing_edge, conflicts)
         )
         
         if is_temporal_update:
@@ -359,17 +404,7 @@ Return JSON with:
 
 Return valid JSON only."""
             
-            response = await asyncio.wait_for(
-                self.modelservice.generate_completion(
-                    prompt=prompt,
-                    model="eve",
-                    temperature=0.2,
-                    max_tokens=512
-                ),
-                timeout=self.llm_timeout
-            )
-            
-            result = self._parse_json_response(response.get("text", ""))
+            result = await self._complete_json(prompt, max_tokens=512)
             
             resolved = result.get("resolved_properties", existing_item.properties)
             reasoning = result.get("reasoning", "")
@@ -423,17 +458,7 @@ Return JSON with:
 
 Return valid JSON only."""
             
-            response = await asyncio.wait_for(
-                self.modelservice.generate_completion(
-                    prompt=prompt,
-                    model="eve",
-                    temperature=0.2,
-                    max_tokens=256
-                ),
-                timeout=self.llm_timeout
-            )
-            
-            result = self._parse_json_response(response.get("text", ""))
+            result = await self._complete_json(prompt, max_tokens=256)
             
             is_temporal = result.get("is_temporal", False)
             reasoning = result.get("reasoning", "")
@@ -446,27 +471,25 @@ Return valid JSON only."""
             logger.error(f"Temporal check failed: {e}, assuming not temporal")
             return False
     
-    def _edge_signature(self, edge: Edge) -> str:
+    async def _complete_json(self, prompt: str, max_tokens: int) -> Dict[str, Any]:
         """
-        Generate signature for edge to detect duplicates.
-        
-        Args:
-            edge: Edge
-            
-        Returns:
-            Signature string
+        Run one LLM completion under the concurrency cap and timeout and return
+        its JSON object. Generation is abandoned once the object is complete,
+        so trailing explanations are not waited for.
         """
-        return f"{edge.source_id}|{edge.relation_type}|{edge.target_id}"
-    
-    def _parse_json_response(self, text: str) -> Dict[str, Any]:
-        """Parse JSON response from LLM."""
-        try:
-            if "```json" in text:
-                text = text.split("```json")[1].split("```")[0]
-            elif "```" in text:
-                text = text.split("```")[1].split("```")[0]
-            
-            return json.loads(text.strip())
-        except Exception as e:
-            logger.warning(f"Failed to parse JSON response: {e}")
+        async with self._llm_semaphore:
+            stream = await asyncio.wait_for(
+                stream_json_completion(
+                    self.modelservice,
+                    prompt,
+                    stop_on_first_value=True,
+                    model="eve",
+                    temperature=0.2,
+                    max_tokens=max_tokens
+                ),
+                timeout=self.llm_timeout
+            )
+        if not isinstance(stream.value, dict):
+            logger.warning(f"Failed to parse JSON response ({len(stream.text)} chars)")
             return {}
+        return stream.value
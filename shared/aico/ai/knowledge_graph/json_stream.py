@@ -0,0 +1,287 @@
+"""
+Incremental JSON Parsing of LLM Output
+
+Extraction, matching and fusion prompts ask the LLM for JSON. Instead of
+waiting for the whole completion and parsing it at once, IncrementalJsonParser
+is fed the completion chunk by chunk and emits every object as soon as it
+closes:
+
+- {"relationships": [{...}, {...}], "new_entities": [{...}]}
+  -> each element of a top-level array, tagged with its key
+- [{...}, {...}]
+  -> each element, key None
+- NDJSON / a single object such as {"is_temporal": true}
+  -> each top-level object without array values, key None
+
+Text outside JSON (markdown fences, explanations) is skipped.
+stream_json_completion() drives the parser from a streamed completion and
+stops generation early once enough items arrived, the first value is
+complete, or the output turned malformed.
+"""
+
+from contextlib import aclosing
+from dataclasses import dataclass, field
+from typing import Any, Callable, List, Optional
+import json
+
+from aico.core.logging import get_logger
+
+logger = get_logger("shared", "ai.knowledge_graph.json_stream")
+
+
+@dataclass
+class JsonItem:
+    """An object emitted by the parser and the top-level key of its array (None if none)."""
+    key: Optional[str]
+    value: Any
+
+
+@dataclass
+class _Frame:
+    kind: str  # "{" or "["
+    start: int  # Offset of the opening bracket in the buffer
+    parent_key: Optional[str] = None  # Key under which this container sits in its parent object
+    key: Optional[str] = None  # Current key (objects)
+    expect_key: bool = False  # Next string is a key (objects)
+    key_start: int = -1
+    has_array: bool = False  # Object holds an array value
+    emitted: bool = False  # Items were emitted from inside this container
+
+
+class IncrementalJsonParser:
+    """
+    Streaming JSON scanner that emits items as their closing bracket arrives.
+
+    Every character is scanned once; only completed objects are handed to
+    json.loads. An object that fails to parse, or a mismatched bracket, marks
+    the output as malformed; scanning resumes at the next top-level value.
+    """
+
+    def __init__(self):
+        self.values: List[Any] = []  # Completed top-level values
+        self.item_count = 0
+        self.malformed = False
+        self.malformed_after_valid = False  # Malformed once items or values had been parsed
+        self.truncated = False
+        self._buffer = ""
+        self._pos = 0
+        self._stack: List[_Frame] = []
+        self._in_string = False
+        self._escape = False
+
+    def feed(self, chunk: str) -> List[JsonItem]:
+        """Add a chunk of output and return the items completed by it."""
+        items: List[JsonItem] = []
+        self._buffer += chunk
+        buffer = self._buffer
+
+        while self._pos < len(buffer):
+            char = buffer[self._pos]
+            stack = self._stack
+
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif char == "\\":
+                    self._escape = True
+                elif char == '"':
+                    self._in_string = False
+                    frame = stack[-1]
+                    if frame.kind == "{" and frame.expect_key and frame.key_start >= 0:
+                        try:
+                            frame.key = json.loads(buffer[frame.key_start:self._pos + 1])
+                        except ValueError:
+                            frame.key = None
+                        frame.key_start = -1
+            elif not stack:
+                # Outside JSON: skip prose and fences until a value starts
+                if char in "{[":
+                    stack.append(_Frame(kind=char, start=self._pos, expect_key=char == "{"))
+            elif char == '"':
+                self._in_string = True
+                frame = stack[-1]
+                if frame.kind == "{" and frame.expect_key:
+                    frame.key_start = self._pos
+            elif char in "{[":
+                parent = stack[-1]
+                parent_key = parent.key if parent.kind == "{" else None
+                if parent.kind == "{" and char == "[":
+                    parent.has_array = True
+                stack.append(_Frame(kind=char, start=self._pos, parent_key=parent_key, expect_key=char == "{"))
+            elif char in "}]":
+                frame = stack.pop()
+                if frame.kind != ("{" if char == "}" else "["):
+                    self._fail(f"mismatched '{char}'")
+                    buffer = self._buffer
+                    continue
+                self._close(frame, items)
+            elif char == ":" and stack[-1].kind == "{":
+                stack[-1].expect_key = False
+            elif char == "," and stack[-1].kind == "{":
+                stack[-1].expect_key = True
+                stack[-1].key = None
+
+            self._pos += 1
+
+        # Drop consumed text between top-level values
+        if not self._stack and not self._in_string:
+            self._buffer = ""
+            self._pos = 0
+
+        return items
+
+    def close(self) -> List[JsonItem]:
+        """Finish parsing; an unterminated value marks the output as truncated."""
+        if self._stack:
+            self.truncated = True
+            logger.debug(f"JSON output truncated inside {len(self._stack)} open containers")
+        self._stack = []
+        self._buffer = ""
+        self._pos = 0
+        self._in_string = False
+        return []
+
+    def _close(self, frame: _Frame, items: List[JsonItem]) -> None:
+        """Handle a closed container: emit it as an item and/or record a top-level value."""
+        stack = self._stack
+        text = self._buffer[frame.start:self._pos + 1]
+
+        if not stack:
+            value = self._loads(text)
+            if value is _INVALID:
+                return
+            self.values.append(value)
+            if frame.kind == "{" and not frame.emitted and not frame.has_array:
+                self._emit(JsonItem(None, value), items)
+            return
+
+        parent = stack[-1]
+        if frame.kind != "{" or parent.kind != "[":
+            return
+
+        # Elements of a top-level array, or of an array held by the top-level object
+        if len(stack) == 1:
+            key = None
+        elif len(stack) == 2 and stack[0].kind == "{":
+            key = parent.parent_key
+        else:
+            return
+
+        value = self._loads(text)
+        if value is _INVALID:
+            return
+        for ancestor in stack:
+            ancestor.emitted = True
+        self._emit(JsonItem(key, value), items)
+
+    def _emit(self, item: JsonItem, items: List[JsonItem]) -> None:
+        items.append(item)
+        self.item_count += 1
+
+    def _loads(self, text: str) -> Any:
+        try:
+            return json.loads(text)
+        except ValueError as e:
+            self._mark_malformed()
+            logger.debug(f"Malformed JSON object in LLM output: {e}")
+            return _INVALID
+
+    def _mark_malformed(self) -> None:
+        self.malformed = True
+        if self.item_count or self.values:
+            self.malformed_after_valid = True
+
+    def _fail(self, reason: str) -> None:
+        """Mark malformed and resynchronize at the next top-level value."""
+        self._mark_malformed()
+        logger.debug(f"Malformed JSON in LLM output: {reason}")
+        self._stack = []
+        self._pos += 1
+        self._buffer = self._buffer[self._pos:]
+        self._pos = 0
+
+
+_INVALID = object()
+
+
+@dataclass
+class JsonStreamResult:
+    """Outcome of stream_json_completion."""
+    items: List[JsonItem] = field(default_factory=list)
+    values: List[Any] = field(default_factory=list)
+    text: str = ""
+    streamed: bool = False
+    stopped_early: bool = False
+    malformed: bool = False
+    truncated: bool = False
+
+    @property
+    def value(self) -> Optional[Any]:
+        """First complete top-level value, if any."""
+        return self.values[0] if self.values else None
+
+
+async def stream_json_completion(
+    modelservice: Any,
+    prompt: str,
+    on_item: Optional[Callable[[JsonItem], None]] = None,
+    expected_items: Optional[int] = None,
+    stop_on_first_value: bool = False,
+    stop_on_malformed: bool = True,
+    **completion_kwargs
+) -> JsonStreamResult:
+    """
+    Run a JSON-producing prompt and parse the output while it is generated.
+
+    Uses modelservice.stream_completion when available and falls back to
+    generate_completion (whole response, same parsing) otherwise.
+
+    Args:
+        modelservice: Modelservice client
+        prompt: Prompt text
+        on_item: Called with every item as soon as its object closes
+        expected_items: Stop once this many items arrived
+        stop_on_first_value: Stop once the first top-level value is complete
+        stop_on_malformed: Stop once output turns malformed after valid JSON
+        **completion_kwargs: model, temperature, max_tokens
+
+    Returns:
+        JsonStreamResult with items, top-level values and the consumed text
+    """
+    parser = IncrementalJsonParser()
+    result = JsonStreamResult()
+
+    def consume(chunk: str) -> bool:
+        """Parse chunk; True if generation can stop."""
+        result.text += chunk
+        for item in parser.feed(chunk):
+            result.items.append(item)
+            if on_item is not None:
+                on_item(item)
+        if expected_items is not None and parser.item_count >= expected_items:
+            return True
+        if stop_on_first_value and parser.values:
+            return True
+        # Malformed output only ends generation once valid JSON had started
+        # (a stray brace in leading prose must not cut off the real answer)
+        return stop_on_malformed and parser.malformed_after_valid
+
+    stream = getattr(modelservice, "stream_completion", None)
+    if stream is None:
+        response = await modelservice.generate_completion(prompt=prompt, **completion_kwargs)
+        consume(response.get("text", "") if isinstance(response, dict) else "")
+    else:
+        result.streamed = True
+        async with aclosing(stream(prompt=prompt, **completion_kwargs)) as chunks:
+            async for chunk in chunks:
+                if consume(chunk):
+                    result.stopped_early = True
+                    break
+
+    parser.close()
+    result.values = parser.values
+    result.malformed = parser.malformed
+    result.truncated = parser.truncated and not result.stopped_early
+    if result.stopped_early:
+        logger.debug(f"Stopped LLM generation after {len(result.text)} chars ({parser.item_count} items)")
+    return result
@@ -5,7 +5,7 @@ Core data structures for property graphs with temporal support.
 """
 
 from dataclasses import dataclass, field, asdict
-from typing import Dict, List, Optional, Any
+from typing import Dict, List, Optional, Any, Set
 from datetime import datetime, timezone
 import uuid
 import json
@@ -227,45 +227,201 @@ class Edge:
         )
 
 
-@dataclass
+def node_name_key(node: Node) -> str:
+    """Normalized name of a node for name lookups (lowercase, '' if unnamed)."""
+    name = node.properties.get("name", "")
+    # Handle corrupted data where name is a list
+    if isinstance(name, list):
+        name = name[0] if name else ""
+    return str(name).lower()
+
+
+def edge_signature(source_id: str, relation_type: str, target_id: str) -> str:
+    """Signature identifying duplicate edges (same endpoints and relation type)."""
+    return f"{source_id}|{relation_type}|{target_id}"
+
+
 class PropertyGraph:
     """
     Property graph containing nodes and edges.
     
+    Nodes and edges are stored by ID (insertion ordered) with secondary
+    indexes by canonical ID, label, normalized name, relation type and edge
+    signature, plus outgoing/incoming adjacency. All lookups are O(1) or
+    O(result); the indexes are maintained by add/remove/replace.
+    
+    ``nodes`` and ``edges`` are read-only list views: mutate the graph
+    through its methods (or assign a whole new list). After changing an
+    indexed field of a contained item (label, name, canonical_id, endpoints,
+    relation type), re-add it with ``replace_node``/``replace_edge``.
+    
     Attributes:
         nodes: List of nodes in the graph
         edges: List of edges in the graph
     """
-    nodes: List[Node] = field(default_factory=list)
-    edges: List[Edge] = field(default_factory=list)
+    
+    def __init__(self, nodes: Optional[List[Node]] = None, edges: Optional[List[Edge]] = None):
+        self.nodes = nodes or []
+        self.edges = edges or []
+    
+    @property
+    def nodes(self) -> List[Node]:
+        if self._node_list is None:
+            self._node_list = list(self._nodes.values())
+        return self._node_list
+    
+    @nodes.setter
+    def nodes(self, nodes: List[Node]) -> None:
+        self._nodes: Dict[str, Node] = {}
+        self._node_list: Optional[List[Node]] = None
+        self._by_canonical_id: Dict[str, Dict[str, None]] = {}
+        self._by_label: Dict[str, Dict[str, None]] = {}
+        self._by_name: Dict[str, Dict[str, None]] = {}
+        self._node_keys: Dict[str, tuple] = {}  # Index keys at insertion: (canonical_id, label, name)
+        for node in nodes:
+            self.add_node(node)
+    
+    @property
+    def edges(self) -> List[Edge]:
+        if self._edge_list is None:
+            self._edge_list = list(self._edges.values())
+        return self._edge_list
+    
+    @edges.setter
+    def edges(self, edges: List[Edge]) -> None:
+        self._edges: Dict[str, Edge] = {}
+        self._edge_list: Optional[List[Edge]] = None
+        self._by_relation_type: Dict[str, Dict[str, None]] = {}
+        self._by_signature: Dict[str, Dict[str, None]] = {}
+        self._outgoing: Dict[str, Dict[str, None]] = {}
+        self._incoming: Dict[str, Dict[str, None]] = {}
+        self._edge_keys: Dict[str, tuple] = {}  # Index keys at insertion: (relation_type, signature, source, target)
+        for edge in edges:
+            self.add_edge(edge)
     
     def add_node(self, node: Node) -> None:
-        """Add node to graph."""
-        self.nodes.append(node)
+        """Add node to graph (replaces a node with the same ID)."""
+        if node.id in self._nodes:
+            self._unindex_node(node.id)
+        self._nodes[node.id] = node
+        self._node_list = None
+        keys = (node.canonical_id, node.label, node_name_key(node))
+        self._node_keys[node.id] = keys
+        for index, key in zip((self._by_canonical_id, self._by_label, self._by_name), keys):
+            if key is not None:
+                index.setdefault(key, {})[node.id] = None
     
     def add_edge(self, edge: Edge) -> None:
-        """Add edge to graph."""
-        self.edges.append(edge)
+        """Add edge to graph (replaces an edge with the same ID)."""
+        if edge.id in self._edges:
+            self._unindex_edge(edge.id)
+        self._edges[edge.id] = edge
+        self._edge_list = None
+        keys = (
+            edge.relation_type,
+            edge_signature(edge.source_id, edge.relation_type, edge.target_id),
+            edge.source_id,
+            edge.target_id
+        )
+        self._edge_keys[edge.id] = keys
+        for index, key in zip(self._edge_indexes(), keys):
+            index.setdefault(key, {})[edge.id] = None
+    
+    def replace_node(self, node: Node) -> None:
+        """Replace the node with ``node.id``, refreshing its index entries."""
+        self.add_node(node)
+    
+    def replace_edge(self, edge: Edge) -> None:
+        """Replace the edge with ``edge.id``, refreshing its index entries."""
+        self.add_edge(edge)
+    
+    def remove_node(self, node_id: str, remove_edges: bool = True) -> Optional[Node]:
+        """
+        Remove node (and by default its incident edges) from graph.
+        
+        Returns:
+            The removed node, or None if it was not in the graph
+        """
+        node = self._nodes.pop(node_id, None)
+        if node is None:
+            return None
+        self._node_list = None
+        self._unindex_node(node_id)
+        if remove_edges:
+            for edge in self.get_edges_for_node(node_id):
+                self.remove_edge(edge.id)
+        return node
+    
+    def remove_edge(self, edge_id: str) -> Optional[Edge]:
+        """
+        Remove edge from graph.
+        
+        Returns:
+            The removed edge, or None if it was not in the graph
+        """
+        edge = self._edges.pop(edge_id, None)
+        if edge is None:
+            return None
+        self._edge_list = None
+        self._unindex_edge(edge_id)
+        return edge
     
     def merge(self, other: 'PropertyGraph') -> None:
-        """Merge another graph into this one."""
-        self.nodes.extend(other.nodes)
-        self.edges.extend(other.edges)
+        """Merge another graph into this one (items with the same ID are replaced)."""
+        for node in other.nodes:
+            self.add_node(node)
+        for edge in other.edges:
+            self.add_edge(edge)
     
     def get_node_by_id(self, node_id: str) -> Optional[Node]:
         """Get node by ID."""
-        for node in self.nodes:
-            if node.id == node_id:
-                return node
-        return None
+        return self._nodes.get(node_id)
+    
+    def get_node_by_canonical_id(self, canonical_id: str) -> Optional[Node]:
+        """Get the most recently added node with ``canonical_id``."""
+        node_ids = self._by_canonical_id.get(canonical_id) if canonical_id else None
+        return self._nodes[next(reversed(node_ids))] if node_ids else None
+    
+    def find_node_by_name(self, name: str) -> Optional[Node]:
+        """Get the first node whose ``name`` property matches (case-insensitive)."""
+        node_ids = self._by_name.get(str(name).lower())
+        return self._nodes[next(iter(node_ids))] if node_ids else None
     
     def get_nodes_by_label(self, label: str) -> List[Node]:
         """Get all nodes with specific label."""
-        return [node for node in self.nodes if node.label == label]
+        return [self._nodes[node_id] for node_id in self._by_label.get(label, ())]
+    
+    def get_edge_by_id(self, edge_id: str) -> Optional[Edge]:
+        """Get edge by ID."""
+        return self._edges.get(edge_id)
     
     def get_edges_by_type(self, relation_type: str) -> List[Edge]:
         """Get all edges with specific relation type."""
-        return [edge for edge in self.edges if edge.relation_type == relation_type]
+        return [self._edges[edge_id] for edge_id in self._by_relation_type.get(relation_type, ())]
+    
+    def find_edge(self, source_id: str, relation_type: str, target_id: str) -> Optional[Edge]:
+        """Get the most recently added edge with these endpoints and relation type."""
+        edge_ids = self._by_signature.get(edge_signature(source_id, relation_type, target_id))
+        return self._edges[next(reversed(edge_ids))] if edge_ids else None
+    
+    def get_edges_for_node(self, node_id: str, direction: str = "both") -> List[Edge]:
+        """
+        Get edges connected to a node.
+        
+        Args:
+            node_id: Node ID
+            direction: "outgoing", "incoming" or "both"
+        """
+        edge_ids: Dict[str, None] = {}
+        if direction in ("outgoing", "both"):
+            edge_ids.update(self._outgoing.get(node_id, {}))
+        if direction in ("incoming", "both"):
+            edge_ids.update(self._incoming.get(node_id, {}))
+        return [self._edges[edge_id] for edge_id in edge_ids]
+    
+    def __contains__(self, item_id: str) -> bool:
+        """Whether a node or edge with this ID is in the graph."""
+        return item_id in self._nodes or item_id in self._edges
     
     def to_dict(self) -> Dict[str, Any]:
         """Convert to dictionary for serialization."""
@@ -276,8 +432,109 @@ class PropertyGraph:
     
     def __len__(self) -> int:
         """Return total number of nodes and edges."""
-        return len(self.nodes) + len(self.edges)
+        return len(self._nodes) + len(self._edges)
+    
+    def __repr__(self) -> str:
+        """String representation."""
+        return f"PropertyGraph(nodes={len(self._nodes)}, edges={len(self._edges)})"
+    
+    def _edge_indexes(self) -> tuple:
+        return (self._by_relation_type, self._by_signature, self._outgoing, self._incoming)
+    
+    def _unindex_node(self, node_id: str) -> None:
+        keys = self._node_keys.pop(node_id)
+        for index, key in zip((self._by_canonical_id, self._by_label, self._by_name), keys):
+            _discard(index, key, node_id)
+    
+    def _unindex_edge(self, edge_id: str) -> None:
+        keys = self._edge_keys.pop(edge_id)
+        for index, key in zip(self._edge_indexes(), keys):
+            _discard(index, key, edge_id)
+
+
+def _discard(index: Dict[str, Dict[str, None]], key: str, item_id: str) -> None:
+    entries = index.get(key) if key is not None else None
+    if entries is not None:
+        entries.pop(item_id, None)
+        if not entries:
+            del index[key]
+
+
+@dataclass
+class GraphChangeSet:
+    """
+    Changes produced by fusing a new graph into an existing one.
+    
+    All maps are keyed by item ID. Updated items are existing items changed in
+    place; superseded items are existing items closed by a temporal update
+    (is_current=0, valid_until set) whose successors are in the added maps.
+    
+    Attributes:
+        added_nodes: Nodes that do not exist in storage yet
+        updated_nodes: Existing nodes whose properties or confidence changed
+        superseded_nodes: Existing nodes that became historical
+        added_edges: Edges that do not exist in storage yet
+        updated_edges: Existing edges whose properties or confidence changed
+        superseded_edges: Existing edges that became historical
+        reembed_ids: IDs of updated/superseded items whose embedded text changed
+    """
+    added_nodes: Dict[str, Node] = field(default_factory=dict)
+    updated_nodes: Dict[str, Node] = field(default_factory=dict)
+    superseded_nodes: Dict[str, Node] = field(default_factory=dict)
+    added_edges: Dict[str, Edge] = field(default_factory=dict)
+    updated_edges: Dict[str, Edge] = field(default_factory=dict)
+    superseded_edges: Dict[str, Edge] = field(default_factory=dict)
+    reembed_ids: Set[str] = field(default_factory=set)
+    
+    @property
+    def changed_nodes(self) -> List[Node]:
+        """All nodes that must be written (added, updated and superseded)."""
+        return [*self.added_nodes.values(), *self.updated_nodes.values(), *self.superseded_nodes.values()]
+    
+    @property
+    def changed_edges(self) -> List[Edge]:
+        """All edges that must be written (added, updated and superseded)."""
+        return [*self.added_edges.values(), *self.updated_edges.values(), *self.superseded_edges.values()]
+    
+    def needs_embedding(self, item_id: str) -> bool:
+        """Whether the item's embedding must be (re)generated."""
+        return item_id in self.added_nodes or item_id in self.added_edges or item_id in self.reembed_ids
+    
+    def apply_to(self, graph: PropertyGraph) -> PropertyGraph:
+        """
+        View of ``graph`` after this change set.
+        
+        Superseded items are kept as historical (is_current=0); updated items
+        are replaced by ID; added items are appended.
+        """
+        fused = PropertyGraph(nodes=graph.nodes, edges=graph.edges)
+        for node in [*self.superseded_nodes.values(), *self.updated_nodes.values()]:
+            fused.add_node(node)
+        for edge in [*self.superseded_edges.values(), *self.updated_edges.values()]:
+            fused.add_edge(edge)
+        for node in self.added_nodes.values():
+            if node.is_current:
+                fused.add_node(node)
+        for edge in self.added_edges.values():
+            if edge.is_current:
+                fused.add_edge(edge)
+        return fused
+    
+    def summary(self) -> Dict[str, int]:
+        """Counts per change kind."""
+        return {
+            "added_nodes": len(self.added_nodes),
+            "updated_nodes": len(self.updated_nodes),
+            "superseded_nodes": len(self.superseded_nodes),
+            "added_edges": len(self.added_edges),
+            "updated_edges": len(self.updated_edges),
+            "superseded_edges": len(self.superseded_edges),
+        }
+    
+    def __len__(self) -> int:
+        """Return total number of changed nodes and edges."""
+        return sum(self.summary().values())
     
     def __repr__(self) -> str:
         """String representation."""
-        return f"PropertyGraph(nodes={len(self.nodes)}, edges={len(self.edges)})"
+        return "GraphChangeSet(" + ", ".join(f"{key}={value}" for key, value in self.summary().items()) + ")"
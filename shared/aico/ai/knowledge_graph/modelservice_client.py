@@ -6,7 +6,7 @@ Follows AICO's message bus patterns.
 """
 
 import asyncio
-from typing import List, Dict, Any, Optional
+from typing import AsyncIterator, List, Dict, Any, Optional
 import uuid
 from datetime import datetime
 
@@ -16,7 +16,8 @@ from aico.core.logging import get_logger
 from aico.proto.aico_modelservice_pb2 import (
     NerRequest, NerResponse,
     EmbeddingsRequest, EmbeddingsResponse,
-    CompletionsRequest, CompletionsResponse
+    CompletionsRequest, CompletionsResponse,
+    StreamingChunk
 )
 
 logger = get_logger("shared", "ai.knowledge_graph.modelservice_client")
@@ -41,6 +42,8 @@ class ModelserviceClient:
         self.bus_client: Optional[MessageBusClient] = None
         self._connected = False
         self._pending_requests: Dict[str, asyncio.Future] = {}
+        self._stream_queues: Dict[str, asyncio.Queue] = {}  # request_id -> streamed chunks
+        self._stream_subscribed = False
     
     async def connect(self, timeout: float = 5.0) -> None:
         """Connect to message bus."""
@@ -77,6 +80,7 @@ class ModelserviceClient:
         if self.bus_client:
             await self.bus_client.disconnect()
             self._connected = False
+            self._stream_subscribed = False
             logger.info("Modelservice client disconnected")
     
     async def extract_entities(
@@ -284,29 +288,7 @@ class ModelserviceClient:
             await self.connect()
         
         request_id = str(uuid.uuid4())
-        
-        # Create completions request
-        from aico.proto.aico_modelservice_pb2 import ConversationMessage
-        
-        completions_request = CompletionsRequest()
-        # Map "eve" to actual model name from config
-        if model == "eve":
-            completions_request.model = "huihui_ai/qwen3-abliterated:8b-v2"
-        else:
-            completions_request.model = model
-        
-        
-        # Add prompt as user message
-        msg = completions_request.messages.add()
-        msg.role = "user"
-        msg.content = prompt
-        
-        # Set parameters
-        completions_request.temperature = temperature
-        completions_request.max_tokens = max_tokens
-        completions_request.stream = False  # Non-streaming for KG
-        completions_request.think = False  # Disable thinking for structured extraction (20-30% speedup)
-        
+        completions_request = self._build_completions_request(prompt, model, temperature, max_tokens, stream=False)
         
         # Create future for response
         future = asyncio.Future()
@@ -354,6 +336,135 @@ class ModelserviceClient:
             # Don't remove from pending - response might still arrive
             return {"text": ""}
     
+    async def stream_completion(
+        self,
+        prompt: str,
+        model: str = "eve",
+        temperature: float = 0.7,
+        max_tokens: int = 2048,
+        idle_timeout: float = 60.0
+    ) -> AsyncIterator[str]:
+        """
+        Generate LLM completion, yielding response text as it is generated.
+        
+        Chunks arrive on the shared completions stream topic and are routed
+        by request ID. Closing the iterator early (e.g. once the expected
+        JSON items were parsed) stops waiting for the rest of the output.
+        
+        Args:
+            prompt: Prompt text
+            model: Model name (default: "eve")
+            temperature: Sampling temperature
+            max_tokens: Maximum tokens to generate
+            idle_timeout: Maximum seconds to wait for the next chunk
+            
+        Yields:
+            Incremental response text (thinking output is skipped)
+        """
+        if not self._connected:
+            await self.connect()
+        await self._ensure_stream_subscription()
+        
+        request_id = str(uuid.uuid4())
+        completions_request = self._build_completions_request(prompt, model, temperature, max_tokens, stream=True)
+        
+        queue: asyncio.Queue = asyncio.Queue()
+        self._stream_queues[request_id] = queue
+        self._pending_requests[request_id] = asyncio.Future()
+        
+        response_topic = AICOTopics.build_response_topic(
+            AICOTopics.MODELSERVICE_CHAT_RESPONSE,
+            "kg_client",
+            request_id
+        )
+        
+        try:
+            # Final response reports errors and covers output no chunk was received for
+            await self.bus_client.subscribe(response_topic, self._handle_completions_response)
+            await self.bus_client.publish(
+                AICOTopics.MODELSERVICE_CHAT_REQUEST,
+                completions_request,
+                correlation_id=request_id,
+                reply_to=response_topic
+            )
+            
+            received = 0  # Characters of accumulated content already yielded
+            while True:
+                try:
+                    kind, payload = await asyncio.wait_for(queue.get(), timeout=idle_timeout)
+                except asyncio.TimeoutError:
+                    logger.error(f"Completion stream idle for {idle_timeout}s, giving up on request_id: {request_id}")
+                    return
+                
+                if kind == "error":
+                    logger.error(f"Streamed completions request failed: {payload}")
+                    return
+                
+                # Yield whatever the accumulated content adds beyond what was yielded
+                if len(payload) > received:
+                    delta = payload[received:]
+                    received = len(payload)
+                    yield delta
+                
+                if kind == "done":
+                    return
+        finally:
+            self._stream_queues.pop(request_id, None)
+            self._pending_requests.pop(request_id, None)
+            try:
+                await self.bus_client.unsubscribe(response_topic)
+            except Exception as e:
+                logger.warning(f"Failed to unsubscribe from {response_topic}: {e}")
+    
+    def _build_completions_request(
+        self,
+        prompt: str,
+        model: str,
+        temperature: float,
+        max_tokens: int,
+        stream: bool
+    ) -> CompletionsRequest:
+        """Build a single-prompt completions request."""
+        completions_request = CompletionsRequest()
+        # Map "eve" to actual model name from config
+        if model == "eve":
+            completions_request.model = "huihui_ai/qwen3-abliterated:8b-v2"
+        else:
+            completions_request.model = model
+        
+        # Add prompt as user message
+        msg = completions_request.messages.add()
+        msg.role = "user"
+        msg.content = prompt
+        
+        # Set parameters
+        completions_request.temperature = temperature
+        completions_request.max_tokens = max_tokens
+        completions_request.stream = stream
+        completions_request.think = False  # Disable thinking for structured extraction (20-30% speedup)
+        return completions_request
+    
+    async def _ensure_stream_subscription(self) -> None:
+        """Subscribe once to the completions stream; chunks are routed by request ID."""
+        if self._stream_subscribed:
+            return
+        await self.bus_client.subscribe(AICOTopics.MODELSERVICE_COMPLETIONS_STREAM, self._handle_stream_chunk)
+        self._stream_subscribed = True
+    
+    async def _handle_stream_chunk(self, envelope) -> None:
+        """Route a streamed completion chunk to the waiting stream_completion call."""
+        try:
+            streaming_chunk = StreamingChunk()
+            envelope.any_payload.Unpack(streaming_chunk)
+            
+            queue = self._stream_queues.get(streaming_chunk.request_id)
+            if queue is None or streaming_chunk.content_type == "thinking":
+                return
+            
+            queue.put_nowait(("done" if streaming_chunk.done else "chunk", streaming_chunk.accumulated_content))
+        except Exception as e:
+            logger.error(f"Error handling completion stream chunk: {e}")
+    
     async def _handle_ner_response(self, envelope) -> None:
         """Handle NER response from modelservice."""
         try:
@@ -475,6 +586,14 @@ class ModelserviceClient:
                 "content": content
             }
             
+            # Streamed requests: the final response ends the stream
+            queue = self._stream_queues.get(correlation_id)
+            if queue is not None:
+                if result["success"]:
+                    queue.put_nowait(("done", content))
+                else:
+                    queue.put_nowait(("error", result["error"] or "Unknown error"))
+            
             # Resolve future
             future = self._pending_requests.get(correlation_id)
             if future and not future.done():
@@ -0,0 +1,159 @@
+"""
+Knowledge Graph Statistics
+
+Reads and maintains the materialized ``kg_stats`` table (schema v19).
+
+Counts of current nodes per label and current edges per relation type are
+kept per user by triggers on ``kg_nodes``/``kg_edges``, so they change in the
+same transaction as the graph itself, whichever component writes it. Reading
+a user's stats is a single primary-key range read instead of aggregate scans.
+
+Rebuild/verify recompute the counts from the graph tables and are meant for
+offline drift checks (``aico kg stats --verify`` / ``--rebuild``).
+"""
+
+from typing import Any, Dict, List, Optional
+
+
+def read_graph_stats(db_connection: Any, user_id: str) -> Dict[str, Any]:
+    """
+    Read materialized statistics for one user.
+
+    Returns:
+        Dict with total_nodes, total_edges, node_types, edge_types and version
+        (version increases whenever any count changes)
+    """
+    rows = db_connection.execute(
+        "SELECT kind, name, count FROM kg_stats WHERE user_id = ?",
+        (user_id,)
+    ).fetchall()
+    return _stats_from_rows(rows)
+
+
+def read_global_stats(db_connection: Any) -> Dict[str, Any]:
+    """Materialized statistics summed over all users, plus the number of users with nodes."""
+    rows = db_connection.execute(
+        "SELECT kind, name, SUM(count) FROM kg_stats WHERE kind != 'meta' GROUP BY kind, name"
+    ).fetchall()
+    stats = _stats_from_rows(rows)
+    stats["users"] = db_connection.execute(
+        "SELECT COUNT(DISTINCT user_id) FROM kg_stats WHERE kind = 'node'"
+    ).fetchone()[0]
+    return stats
+
+
+def compute_graph_stats(db_connection: Any, user_id: Optional[str] = None) -> Dict[str, Dict[str, Dict[str, int]]]:
+    """
+    Recompute counts from kg_nodes/kg_edges (full scan).
+
+    Returns:
+        {user_id: {"node": {label: count}, "edge": {relation_type: count}}}
+    """
+    user_filter = " AND user_id = ?" if user_id else ""
+    params = (user_id,) if user_id else ()
+
+    computed: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for kind, table, column in (("node", "kg_nodes", "label"), ("edge", "kg_edges", "relation_type")):
+        rows = db_connection.execute(
+            f"SELECT user_id, {column}, COUNT(*) FROM {table} "
+            f"WHERE is_current = 1{user_filter} GROUP BY user_id, {column}",
+            params
+        ).fetchall()
+        for row_user, name, count in rows:
+            computed.setdefault(row_user, {"node": {}, "edge": {}})[kind][name] = count
+    return computed
+
+
+def verify_graph_stats(db_connection: Any, user_id: Optional[str] = None) -> List[Dict[str, Any]]:
+    """
+    Compare materialized counts against a recomputation.
+
+    Returns:
+        One entry per drifted count: {user_id, kind, name, stored, actual}
+    """
+    actual = compute_graph_stats(db_connection, user_id)
+
+    user_filter = " AND user_id = ?" if user_id else ""
+    params = (user_id,) if user_id else ()
+    stored: Dict[str, Dict[str, Dict[str, int]]] = {}
+    for row_user, kind, name, count in db_connection.execute(
+        f"SELECT user_id, kind, name, count FROM kg_stats WHERE kind != 'meta'{user_filter}",
+        params
+    ).fetchall():
+        stored.setdefault(row_user, {"node": {}, "edge": {}})[kind][name] = count
+
+    drift = []
+    for drift_user in sorted(set(actual) | set(stored)):
+        for kind in ("node", "edge"):
+            actual_counts = actual.get(drift_user, {}).get(kind, {})
+            stored_counts = stored.get(drift_user, {}).get(kind, {})
+            for name in sorted(set(actual_counts) | set(stored_counts)):
+                if actual_counts.get(name, 0) != stored_counts.get(name, 0):
+                    drift.append({
+                        "user_id": drift_user,
+                        "kind": kind,
+                        "name": name,
+                        "stored": stored_counts.get(name, 0),
+                        "actual": actual_counts.get(name, 0)
+                    })
+    return drift
+
+
+def rebuild_graph_stats(db_connection: Any, user_id: Optional[str] = None) -> int:
+    """
+    Replace materialized counts with a recomputation (one transaction).
+
+    The per-user version is kept and incremented so readers notice the change.
+
+    Returns:
+        Number of count rows written
+    """
+    actual = compute_graph_stats(db_connection, user_id)
+    user_filter = " AND user_id = ?" if user_id else ""
+    params = (user_id,) if user_id else ()
+
+    rows = [
+        (row_user, kind, name, count)
+        for row_user, kinds in actual.items()
+        for kind, counts in kinds.items()
+        for name, count in counts.items()
+    ]
+
+    with db_connection.transaction():
+        users = {row[0] for row in db_connection.execute(
+            f"SELECT DISTINCT user_id FROM kg_stats WHERE 1 = 1{user_filter}", params
+        ).fetchall()} | set(actual)
+        db_connection.execute(f"DELETE FROM kg_stats WHERE kind != 'meta'{user_filter}", params)
+        for row in rows:
+            db_connection.execute(
+                "INSERT INTO kg_stats (user_id, kind, name, count) VALUES (?, ?, ?, ?)", row
+            )
+        for version_user in users:
+            db_connection.execute(
+                """
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (?, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1
+                """,
+                (version_user,)
+            )
+    return len(rows)
+
+
+def _stats_from_rows(rows) -> Dict[str, Any]:
+    node_types: Dict[str, int] = {}
+    edge_types: Dict[str, int] = {}
+    version = 0
+    for kind, name, count in rows:
+        if kind == "node":
+            node_types[name] = count
+        elif kind == "edge":
+            edge_types[name] = count
+        elif name == "version":
+            version = count
+    return {
+        "total_nodes": sum(node_types.values()),
+        "total_edges": sum(edge_types.values()),
+        "node_types": node_types,
+        "edge_types": edge_types,
+        "version": version
+    }
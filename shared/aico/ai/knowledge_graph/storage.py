@@ -2,7 +2,8 @@
 Property Graph Storage
 
 Hybrid storage backend using ChromaDB (semantic search) and libSQL (relational queries).
-Implements dual-write pattern for consistency.
+Implements dual-write pattern for consistency. Per-user counts in kg_stats are
+maintained by triggers on kg_nodes/kg_edges in the same transaction as each write.
 """
 
 from typing import List, Optional, Dict, Any
@@ -12,8 +13,10 @@ from datetime import datetime, timezone
 
 from aico.data.libsql.encrypted import EncryptedLibSQLConnection
 from aico.core.logging import get_logger
+from aico.ai.utils.vector_executor import get_vector_executor
 
-from .models import Node, Edge, PropertyGraph
+from .models import Node, Edge, PropertyGraph, GraphChangeSet
+from .stats import read_graph_stats
 
 logger = get_logger("shared", "ai.knowledge_graph.storage")
 
@@ -43,6 +46,7 @@ class PropertyGraphStorage:
         self.db = db_connection
         self.chromadb = chromadb_client
         self.modelservice = modelservice_client
+        self._vector_executor = get_vector_executor()  # Off-loop ChromaDB calls, shared with semantic memory
         
         # Get or create collections
         # NOTE: We provide embeddings manually (via modelservice) to avoid ChromaDB auto-generation
@@ -112,16 +116,13 @@ class PropertyGraphStorage:
             
             print(f"🕸️ [STORAGE] Saving to ChromaDB with embedding...")
             
-            def _sync_save_to_chroma():
-                """Synchronous ChromaDB write - runs in thread pool"""
-                self._node_collection.upsert(
-                    ids=[doc["id"]],
-                    embeddings=[embeddings[0]],
-                    documents=[doc["document"]],
-                    metadatas=[doc["metadata"]]
-                )
-            
-            await asyncio.to_thread(_sync_save_to_chroma)
+            await self._vector_executor.upsert(
+                self._node_collection,
+                ids=[doc["id"]],
+                embeddings=[embeddings[0]],
+                documents=[doc["document"]],
+                metadatas=[doc["metadata"]]
+            )
             print(f"🕸️ [STORAGE] ChromaDB upsert complete")
             
             logger.debug(f"Saved node {node.id} (label={node.label})")
@@ -160,15 +161,6 @@ class PropertyGraphStorage:
                     edge.to_libsql_tuple()
                 )
         
-        def _sync_save_to_chroma():
-            """Synchronous ChromaDB write - runs in thread pool"""
-            doc = edge.to_chromadb_document()
-            self._edge_collection.upsert(
-                ids=[doc["id"]],
-                documents=[doc["document"]],
-                metadatas=[doc["metadata"]]
-            )
-        
         try:
             # Run blocking database operations in thread pool
             await asyncio.to_thread(_sync_save_to_db)
@@ -178,14 +170,13 @@ class PropertyGraphStorage:
             embedding_result = await self.modelservice.generate_embeddings([doc["document"]])
             embeddings = embedding_result.get("embeddings", [])
             
-            def _sync_save_to_chroma():
-                self._edge_collection.upsert(
-                    ids=[doc["id"]],
-                    embeddings=[embeddings[0]],
-                    documents=[doc["document"]],
-                    metadatas=[doc["metadata"]]
-                )
-            await asyncio.to_thread(_sync_save_to_chroma)
+            await self._vector_executor.upsert(
+                self._edge_collection,
+                ids=[doc["id"]],
+                embeddings=[embeddings[0]],
+                documents=[doc["document"]],
+                metadatas=[doc["metadata"]]
+            )
             
             logger.debug(f"Saved edge {edge.id} (type={edge.relation_type})")
             
@@ -226,11 +217,22 @@ class PropertyGraphStorage:
             with self.db:
                 # Save nodes
                 for node in graph.nodes:
+                    # Upsert rather than REPLACE: REPLACE deletes the old row without
+                    # firing delete triggers (kg_stats) and cascades to its edges
                     self.db.execute(
                         """
-                        INSERT OR REPLACE INTO kg_nodes 
+                        INSERT INTO kg_nodes 
                         (id, user_id, label, properties, confidence, source_text, is_current, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            user_id = excluded.user_id,
+                            label = excluded.label,
+                            properties = excluded.properties,
+                            confidence = excluded.confidence,
+                            source_text = excluded.source_text,
+                            is_current = excluded.is_current,
+                            created_at = excluded.created_at,
+                            updated_at = excluded.updated_at
                         """,
                         (
                             node.id, node.user_id, node.label,
@@ -249,9 +251,20 @@ class PropertyGraphStorage:
                     
                     self.db.execute(
                         """
-                        INSERT OR REPLACE INTO kg_edges 
+                        INSERT INTO kg_edges 
                         (id, source_id, target_id, relation_type, properties, confidence, user_id, source_text, is_current, created_at, updated_at)
                         VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            source_id = excluded.source_id,
+                            target_id = excluded.target_id,
+                            relation_type = excluded.relation_type,
+                            properties = excluded.properties,
+                            confidence = excluded.confidence,
+                            user_id = excluded.user_id,
+                            source_text = excluded.source_text,
+                            is_current = excluded.is_current,
+                            created_at = excluded.created_at,
+                            updated_at = excluded.updated_at
                         """,
                         (
                             edge.id, edge.source_id, edge.target_id, edge.relation_type,
@@ -301,15 +314,13 @@ class PropertyGraphStorage:
         print(f"  💾 [STORAGE] ✅ Embeddings ready in {embedding_time:.2f}s ({len(nodes_with_embeddings)} cached, {len(nodes_without_embeddings)} generated)")
         
         chroma_nodes_start = time.time()
-        def _sync_save_nodes_to_chroma():
-            self._node_collection.upsert(
-                ids=[doc["id"] for doc in node_docs],
-                embeddings=embeddings,
-                documents=[doc["document"] for doc in node_docs],
-                metadatas=[doc["metadata"] for doc in node_docs]
-            )
-        
-        await asyncio.to_thread(_sync_save_nodes_to_chroma)
+        await self._vector_executor.upsert(
+            self._node_collection,
+            ids=[doc["id"] for doc in node_docs],
+            embeddings=embeddings,
+            documents=[doc["document"] for doc in node_docs],
+            metadatas=[doc["metadata"] for doc in node_docs]
+        )
         chroma_nodes_time = time.time() - chroma_nodes_start
         print(f"  💾 [STORAGE] ✅ ChromaDB nodes saved in {chroma_nodes_time:.2f}s")
         
@@ -328,15 +339,13 @@ class PropertyGraphStorage:
             print(f"  💾 [STORAGE] ✅ Edge embeddings generated in {edge_embedding_time:.2f}s")
             
             chroma_edges_start = time.time()
-            def _sync_save_edges_to_chroma():
-                self._edge_collection.upsert(
-                    ids=[doc["id"] for doc in edge_docs],
-                    embeddings=edge_embeddings,
-                    documents=[doc["document"] for doc in edge_docs],
-                    metadatas=[doc["metadata"] for doc in edge_docs]
-                )
-            
-            await asyncio.to_thread(_sync_save_edges_to_chroma)
+            await self._vector_executor.upsert(
+                self._edge_collection,
+                ids=[doc["id"] for doc in edge_docs],
+                embeddings=edge_embeddings,
+                documents=[doc["document"] for doc in edge_docs],
+                metadatas=[doc["metadata"] for doc in edge_docs]
+            )
             chroma_edges_time = time.time() - chroma_edges_start
             edge_total_time = time.time() - edge_start
             print(f"  💾 [STORAGE] ✅ ChromaDB edges saved in {chroma_edges_time:.2f}s (total: {edge_total_time:.2f}s)")
@@ -348,6 +357,123 @@ class PropertyGraphStorage:
         print(f"  💾 [STORAGE]    ChromaDB:   {total_storage_time - libsql_time:.2f}s ({(total_storage_time - libsql_time)/total_storage_time*100:.1f}%)")
         print(f"  💾 [STORAGE]    Saved: {len(graph.nodes)} nodes, {len(graph.edges)} edges")
     
+    async def save_changes(self, changes: GraphChangeSet) -> None:
+        """
+        Persist a fusion change set to libSQL and ChromaDB.
+        
+        Only the changed nodes and edges are written, in one libSQL
+        transaction. Embeddings are generated (in a single modelservice call)
+        only for added items and items whose embedded text changed; the other
+        changed items get a metadata-only ChromaDB update.
+        
+        Args:
+            changes: Change set from GraphFusion.fuse_changes
+        """
+        import time
+        storage_start = time.time()
+        
+        nodes = changes.changed_nodes
+        edges = changes.changed_edges
+        if not nodes and not edges:
+            return
+        
+        for edge in edges:
+            if edge.source_text is None:
+                edge.source_text = ""  # Avoid NOT NULL constraint violation
+        
+        def _sync_save_changes():
+            with self.db:
+                for node in nodes:
+                    self.db.execute(
+                        """
+                        INSERT INTO kg_nodes (
+                            id, user_id, label, properties, confidence, source_text,
+                            created_at, updated_at, valid_from, valid_until, is_current,
+                            canonical_id, aliases_json
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            properties = excluded.properties,
+                            confidence = excluded.confidence,
+                            updated_at = excluded.updated_at,
+                            valid_until = excluded.valid_until,
+                            is_current = excluded.is_current,
+                            canonical_id = excluded.canonical_id,
+                            aliases_json = excluded.aliases_json
+                        """,
+                        node.to_libsql_tuple()
+                    )
+                for edge in edges:
+                    self.db.execute(
+                        """
+                        INSERT INTO kg_edges (
+                            id, user_id, source_id, target_id, relation_type, properties,
+                            confidence, source_text, created_at, updated_at,
+                            valid_from, valid_until, is_current
+                        ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                        ON CONFLICT(id) DO UPDATE SET
+                            properties = excluded.properties,
+                            confidence = excluded.confidence,
+                            updated_at = excluded.updated_at,
+                            valid_until = excluded.valid_until,
+                            is_current = excluded.is_current
+                        """,
+                        edge.to_libsql_tuple()
+                    )
+                self.db.commit()
+        
+        await asyncio.to_thread(_sync_save_changes)
+        libsql_time = time.time() - storage_start
+        
+        # Split into items needing a (new) embedding and metadata-only updates
+        node_docs = [node.to_chromadb_document() for node in nodes]
+        edge_docs = [edge.to_chromadb_document() for edge in edges]
+        embed_nodes = [(node, doc) for node, doc in zip(nodes, node_docs) if changes.needs_embedding(node.id)]
+        embed_edges = [(edge, doc) for edge, doc in zip(edges, edge_docs) if changes.needs_embedding(edge.id)]
+        
+        # Reuse embeddings cached during resolution unless the text changed since
+        to_generate = [
+            doc["document"] for node, doc in embed_nodes
+            if node.embedding is None or node.id in changes.reembed_ids
+        ] + [doc["document"] for _, doc in embed_edges]
+        generated = iter([])
+        if to_generate:
+            embedding_result = await self.modelservice.generate_embeddings(to_generate)
+            generated = iter(embedding_result.get("embeddings", []))
+        
+        node_embeddings = [
+            next(generated) if node.embedding is None or node.id in changes.reembed_ids else node.embedding
+            for node, _ in embed_nodes
+        ]
+        edge_embeddings = [next(generated) for _ in embed_edges]
+        
+        writes = []
+        for collection, items, embeddings in (
+            (self._node_collection, embed_nodes, node_embeddings),
+            (self._edge_collection, embed_edges, edge_embeddings),
+        ):
+            if items:
+                writes.append(self._vector_executor.upsert(
+                    collection,
+                    ids=[doc["id"] for _, doc in items],
+                    embeddings=embeddings,
+                    documents=[doc["document"] for _, doc in items],
+                    metadatas=[doc["metadata"] for _, doc in items]
+                ))
+        for collection, docs in ((self._node_collection, node_docs), (self._edge_collection, edge_docs)):
+            metadata_only = [doc for doc in docs if not changes.needs_embedding(doc["id"])]
+            if metadata_only:
+                writes.append(self._vector_executor.update(
+                    collection,
+                    ids=[doc["id"] for doc in metadata_only],
+                    metadatas=[doc["metadata"] for doc in metadata_only]
+                ))
+        await asyncio.gather(*writes)
+        
+        logger.info(
+            f"Saved graph changes {changes.summary()}: {len(to_generate)} embeddings generated, "
+            f"libSQL {libsql_time:.2f}s, total {time.time() - storage_start:.2f}s"
+        )
+    
     async def get_node(self, node_id: str) -> Optional[Node]:
         """
         Get node by ID from libSQL.
@@ -444,7 +570,8 @@ class PropertyGraphStorage:
             return []
         
         # Search ChromaDB with pre-generated embedding
-        results = self._node_collection.query(
+        results = await self._vector_executor.query(
+            self._node_collection,
             query_embeddings=[query_embedding],
             n_results=top_k,
             where=where_filter
@@ -463,6 +590,21 @@ class PropertyGraphStorage:
         
         return nodes
     
+    async def get_graph_stats(self, user_id: str) -> Dict[str, Any]:
+        """
+        Get node/edge counts by label and relation type for a user.
+        
+        Reads the trigger-maintained kg_stats table (single primary-key range
+        read), so the cost does not grow with the graph.
+        
+        Args:
+            user_id: User ID
+            
+        Returns:
+            Dict with total_nodes, total_edges, node_types, edge_types and version
+        """
+        return await asyncio.to_thread(read_graph_stats, self.db, user_id)
+    
     async def get_edges_for_node(
         self,
         node_id: str,
@@ -3,11 +3,20 @@ Thompson Sampling for Skill Selection
 
 Contextual bandit algorithm for learning which skills work best through
 Bayesian statistical learning. No neural network training required.
+
+Posteriors are held in a per-user in-memory cache loaded with a single
+query, so skill selection is a pure memory operation. Feedback updates the
+cache in place and is persisted write-behind in batches, off the event loop,
+as increments on the stored counts. Cached users are reloaded after a TTL or
+when invalidated (e.g. by the nightly batch update), so external writes are
+picked up and never overwritten.
 """
 
+import asyncio
+import time
 import numpy as np
 import json
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 from datetime import datetime
 
 from aico.core.logging import get_logger
@@ -24,7 +33,14 @@ class ThompsonSamplingSelector:
     Balances exploration vs. exploitation automatically.
     """
     
-    def __init__(self, db_connection, prior_alpha: float = 1.0, prior_beta: float = 1.0):
+    def __init__(
+        self,
+        db_connection,
+        prior_alpha: float = 1.0,
+        prior_beta: float = 1.0,
+        flush_interval_seconds: float = 5.0,
+        cache_ttl_seconds: float = 300.0
+    ):
         """
         Initialize Thompson Sampling selector.
         
@@ -32,10 +48,24 @@ class ThompsonSamplingSelector:
             db_connection: Encrypted libSQL database connection
             prior_alpha: Beta distribution prior (successes)
             prior_beta: Beta distribution prior (failures)
+            flush_interval_seconds: Delay before pending updates are written back
+            cache_ttl_seconds: Age after which a user's cached posteriors are reloaded
         """
         self.db = db_connection
         self.prior_alpha = prior_alpha
         self.prior_beta = prior_beta
+        self.flush_interval_seconds = flush_interval_seconds
+        self.cache_ttl_seconds = cache_ttl_seconds
+        
+        # user_id -> (context_bucket, skill_id) -> [alpha, beta]
+        self._posteriors: Dict[str, Dict[Tuple[int, str], List[float]]] = {}
+        self._loaded_at: Dict[str, float] = {}
+        self._load_locks: Dict[str, asyncio.Lock] = {}
+        
+        # Write-behind state: (user_id, context_bucket, skill_id) -> [alpha delta, beta delta]
+        self._pending: Dict[Tuple[str, int, str], List[float]] = {}
+        self._flush_task: Optional[asyncio.Task] = None
+        self._flush_lock = asyncio.Lock()
     
     def _hash_context(self, context: Dict[str, any]) -> int:
         """
@@ -72,20 +102,19 @@ class ThompsonSamplingSelector:
         # Hash context into bucket for contextual learning
         context_bucket = self._hash_context(context)
         
-        # Get success/failure counts for each skill in this context bucket
-        skill_scores = {}
-        for skill in candidate_skills:
-            stats = await self._get_skill_stats(user_id, skill.skill_id, context_bucket)
-            
-            # Sample from Beta distribution
-            alpha = self.prior_alpha + stats['successes']
-            beta = self.prior_beta + stats['failures']
-            sampled_score = np.random.beta(alpha, beta)
-            
-            skill_scores[skill.skill_id] = sampled_score
+        # Posteriors for every candidate come from the in-memory cache
+        posteriors = await self._get_user_posteriors(user_id)
+        default = (self.prior_alpha, self.prior_beta)
+        params = np.array([
+            posteriors.get((context_bucket, skill.skill_id), default)
+            for skill in candidate_skills
+        ], dtype=float).reshape(-1, 2)
         
-        # Select skill with highest sampled score
-        selected_skill_id = max(skill_scores, key=skill_scores.get)
+        # Sample all Beta distributions at once and pick the highest score
+        sampled_scores = np.random.beta(params[:, 0], params[:, 1])
+        best = int(np.argmax(sampled_scores))
+        selected_skill_id = candidate_skills[best].skill_id
+        skill_scores = {selected_skill_id: float(sampled_scores[best])}
         
         logger.info("Skill selected via Thompson Sampling", extra={
             "user_id": user_id,
@@ -119,81 +148,163 @@ class ThompsonSamplingSelector:
         # Hash context into bucket
         context_bucket = self._hash_context(context)
         
-        # Get stats for this (context_bucket, skill) pair
-        stats = await self._get_skill_stats(user_id, skill_id, context_bucket)
-        
-        if reward > 0:
-            stats['successes'] += 1
-        else:
-            stats['failures'] += 1
+        # Update the cached posterior in place and schedule a write-behind flush
+        posteriors = await self._get_user_posteriors(user_id)
+        posterior = posteriors.setdefault(
+            (context_bucket, skill_id), [self.prior_alpha, self.prior_beta]
+        )
+        delta = self._pending.setdefault((user_id, context_bucket, skill_id), [0.0, 0.0])
+        slot = 0 if reward > 0 else 1
+        posterior[slot] += 1
+        delta[slot] += 1
         
-        # Save stats for this specific context bucket
-        await self._save_skill_stats(user_id, skill_id, context_bucket, stats)
+        self._schedule_flush()
         
         logger.info("Thompson Sampling stats updated", extra={
             "user_id": user_id,
             "skill_id": skill_id,
             "context_bucket": context_bucket,
             "reward": reward,
-            "alpha": self.prior_alpha + stats['successes'],
-            "beta": self.prior_beta + stats['failures']
+            "alpha": posterior[0],
+            "beta": posterior[1]
         })
     
-    async def _get_skill_stats(
-        self,
-        user_id: str,
-        skill_id: str,
-        context_bucket: int
-    ) -> Dict[str, int]:
+    async def _get_user_posteriors(self, user_id: str) -> Dict[Tuple[int, str], List[float]]:
         """
-        Get success/failure counts for (user, context_bucket, skill) triple.
+        Get the cached posteriors for a user, loading them with one query when
+        missing, expired or invalidated.
+        
+        Updates not yet flushed are re-applied on top of the loaded rows.
         
         Returns:
-            Dict with 'successes' and 'failures' counts
+            Mapping of (context_bucket, skill_id) -> [alpha, beta]
+        """
+        posteriors = self._posteriors.get(user_id)
+        if posteriors is not None and not self._is_expired(user_id):
+            return posteriors
+        
+        lock = self._load_locks.setdefault(user_id, asyncio.Lock())
+        async with lock:
+            posteriors = self._posteriors.get(user_id)
+            if posteriors is None or self._is_expired(user_id):
+                # No flush may run between the load and re-applying pending updates
+                async with self._flush_lock:
+                    posteriors = await asyncio.to_thread(self._load_user_posteriors, user_id)
+                    for (pending_user, context_bucket, skill_id), delta in self._pending.items():
+                        if pending_user != user_id:
+                            continue
+                        posterior = posteriors.setdefault(
+                            (context_bucket, skill_id), [self.prior_alpha, self.prior_beta]
+                        )
+                        posterior[0] += delta[0]
+                        posterior[1] += delta[1]
+                self._posteriors[user_id] = posteriors
+                self._loaded_at[user_id] = time.monotonic()
+        return posteriors
+    
+    def _is_expired(self, user_id: str) -> bool:
+        loaded_at = self._loaded_at.get(user_id)
+        return loaded_at is None or time.monotonic() - loaded_at >= self.cache_ttl_seconds
+    
+    def invalidate(self, user_id: Optional[str] = None) -> None:
+        """
+        Drop cached posteriors so they are reloaded on next use.
+        
+        Call after posteriors were written outside this selector. Pending
+        updates are kept and re-applied on reload.
+        
+        Args:
+            user_id: User to invalidate (all users if None)
         """
-        row = self.db.execute(
-            """SELECT alpha, beta FROM context_skill_stats
-               WHERE user_id = ? AND context_bucket = ? AND skill_id = ?""",
-            (user_id, context_bucket, skill_id)
-        ).fetchone()
-        
-        if row:
-            # Convert Beta parameters back to success/failure counts
-            # alpha = prior_alpha + successes, beta = prior_beta + failures
-            successes = int(row[0] - self.prior_alpha)
-            failures = int(row[1] - self.prior_beta)
-            return {'successes': max(0, successes), 'failures': max(0, failures)}
+        if user_id is None:
+            self._posteriors.clear()
+            self._loaded_at.clear()
         else:
-            return {'successes': 0, 'failures': 0}
+            self._posteriors.pop(user_id, None)
+            self._loaded_at.pop(user_id, None)
     
-    async def _save_skill_stats(
-        self,
-        user_id: str,
-        skill_id: str,
-        context_bucket: int,
-        stats: Dict[str, int]
-    ) -> None:
-        """Save success/failure counts for (user, context_bucket, skill) triple."""
-        alpha = self.prior_alpha + stats['successes']
-        beta = self.prior_beta + stats['failures']
+    def _load_user_posteriors(self, user_id: str) -> Dict[Tuple[int, str], List[float]]:
+        """Load all (context_bucket, skill) posteriors for a user (runs in a worker thread)."""
+        rows = self.db.execute(
+            """SELECT context_bucket, skill_id, alpha, beta FROM context_skill_stats
+               WHERE user_id = ?""",
+            (user_id,)
+        ).fetchall()
         
-        # Upsert stats
-        self.db.execute(
+        # Clamp to the prior so counts never go negative
+        return {
+            (int(row[0]), row[1]): [max(float(row[2]), self.prior_alpha), max(float(row[3]), self.prior_beta)]
+            for row in rows
+        }
+    
+    def _schedule_flush(self) -> None:
+        """Start a delayed flush unless one is already pending."""
+        if self._flush_task is None or self._flush_task.done():
+            self._flush_task = asyncio.create_task(self._delayed_flush())
+    
+    async def _delayed_flush(self) -> None:
+        try:
+            await asyncio.sleep(self.flush_interval_seconds)
+            await self.flush()
+        except asyncio.CancelledError:
+            pass
+        except Exception as e:
+            logger.error(f"Thompson Sampling write-behind flush failed: {e}")
+    
+    async def flush(self) -> int:
+        """
+        Persist all pending updates in one batched transaction.
+        
+        Updates are added to the stored counts rather than overwriting them,
+        so concurrent writers (such as the nightly batch update) are preserved.
+        
+        Returns:
+            Number of rows written
+        """
+        async with self._flush_lock:
+            if not self._pending:
+                return 0
+            
+            pending, self._pending = self._pending, {}
+            now = datetime.utcnow().isoformat()
+            rows = [
+                (
+                    user_id, context_bucket, skill_id,
+                    self.prior_alpha + delta_alpha, self.prior_beta + delta_beta, now,
+                    delta_alpha, delta_beta
+                )
+                for (user_id, context_bucket, skill_id), (delta_alpha, delta_beta) in pending.items()
+            ]
+            
+            try:
+                await asyncio.to_thread(self._write_posteriors, rows)
+            except Exception:
+                # Keep the updates for the next flush attempt
+                for key, (delta_alpha, delta_beta) in pending.items():
+                    delta = self._pending.setdefault(key, [0.0, 0.0])
+                    delta[0] += delta_alpha
+                    delta[1] += delta_beta
+                raise
+            
+            logger.debug(f"Flushed {len(rows)} Thompson Sampling posteriors")
+            return len(rows)
+    
+    def _write_posteriors(self, rows: List[Tuple]) -> None:
+        """Insert or increment posterior rows in a single commit (runs in a worker thread)."""
+        self.db.execute_many(
             """INSERT INTO context_skill_stats (
                 user_id, context_bucket, skill_id, alpha, beta, last_updated_at
             ) VALUES (?, ?, ?, ?, ?, ?)
             ON CONFLICT(user_id, context_bucket, skill_id)
             DO UPDATE SET
-                alpha = excluded.alpha,
-                beta = excluded.beta,
+                alpha = context_skill_stats.alpha + ?,
+                beta = context_skill_stats.beta + ?,
                 last_updated_at = excluded.last_updated_at""",
-            (
-                user_id,
-                context_bucket,
-                skill_id,
-                alpha,
-                beta,
-                datetime.utcnow().isoformat()
-            )
+            rows
         )
-        self.db.commit()
+    
+    async def close(self) -> None:
+        """Cancel any pending delayed flush and write remaining updates."""
+        if self._flush_task and not self._flush_task.done():
+            self._flush_task.cancel()
+        await self.flush()
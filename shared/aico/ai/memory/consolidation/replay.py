@@ -3,15 +3,20 @@ Experience Replay
 
 Generates prioritized replay sequences from working memory for consolidation.
 Implements prioritized experience replay based on importance, recency, and feedback.
+
+Weighted sampling without replacement uses a sum tree, so each draw costs
+O(log N) and priorities can be updated incrementally as experiences are
+added or receive feedback.
 """
 
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Hashable, Iterable, Optional, Tuple
 import random
 import numpy as np
 
 from aico.core.logging import get_logger
+from aico.ai.utils.similarity import normalize_rows
 
 logger = get_logger("shared", "memory.consolidation.replay")
 
@@ -110,6 +115,144 @@ class ReplaySequence:
         return sum(1 for p in self.priorities if p.feedback_bonus > 0)
 
 
+class PrioritySumTree:
+    """
+    Array-backed sum tree for weighted sampling over keyed items.
+    
+    Leaves hold item weights and every internal node holds the sum of its
+    children, so the total is available in O(1) and both weight updates and
+    weighted draws cost O(log N). Sampling without replacement temporarily
+    zeroes drawn leaves and restores them afterwards.
+    """
+    
+    def __init__(self, capacity: int = 64):
+        self._capacity = 1
+        while self._capacity < max(1, capacity):
+            self._capacity *= 2
+        self._tree = [0.0] * (2 * self._capacity)
+        self._slot_of: Dict[Hashable, int] = {}
+        self._key_at: List[Optional[Hashable]] = [None] * self._capacity
+        self._free_slots: List[int] = list(range(self._capacity - 1, -1, -1))
+    
+    @classmethod
+    def from_items(cls, items: Iterable[Tuple[Hashable, float]]) -> "PrioritySumTree":
+        """Build a tree from (key, weight) pairs in O(N)."""
+        items = list(items)
+        tree = cls(capacity=len(items))
+        for slot, (key, weight) in enumerate(items):
+            tree._slot_of[key] = slot
+            tree._key_at[slot] = key
+            tree._tree[tree._capacity + slot] = cls._check_weight(weight)
+        tree._free_slots = list(range(tree._capacity - 1, len(items) - 1, -1))
+        for node in range(tree._capacity - 1, 0, -1):
+            tree._tree[node] = tree._tree[2 * node] + tree._tree[2 * node + 1]
+        return tree
+    
+    @staticmethod
+    def _check_weight(weight: float) -> float:
+        weight = float(weight)
+        if weight < 0 or weight != weight:
+            raise ValueError(f"Sampling weight must be a non-negative number, got {weight}")
+        return weight
+    
+    def __len__(self) -> int:
+        return len(self._slot_of)
+    
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slot_of
+    
+    @property
+    def total(self) -> float:
+        """Sum of all weights."""
+        return self._tree[1]
+    
+    def get(self, key: Hashable) -> float:
+        """Current weight of ``key``."""
+        return self._tree[self._capacity + self._slot_of[key]]
+    
+    def _set_leaf(self, slot: int, weight: float) -> None:
+        node = self._capacity + slot
+        self._tree[node] = weight
+        node //= 2
+        while node:
+            # Recompute from children rather than applying deltas to avoid drift
+            self._tree[node] = self._tree[2 * node] + self._tree[2 * node + 1]
+            node //= 2
+    
+    def _grow(self) -> None:
+        """Double the capacity in place; every key keeps its slot and weight."""
+        old_capacity = self._capacity
+        self._capacity *= 2
+        leaves = self._tree[old_capacity:]
+        self._tree = [0.0] * self._capacity + leaves + [0.0] * old_capacity
+        for node in range(self._capacity - 1, 0, -1):
+            self._tree[node] = self._tree[2 * node] + self._tree[2 * node + 1]
+        self._key_at.extend([None] * old_capacity)
+        self._free_slots[:0] = range(self._capacity - 1, old_capacity - 1, -1)
+    
+    def update(self, key: Hashable, weight: float) -> None:
+        """Insert ``key`` or change its weight in O(log N)."""
+        weight = self._check_weight(weight)
+        slot = self._slot_of.get(key)
+        if slot is None:
+            if not self._free_slots:
+                self._grow()
+            slot = self._free_slots.pop()
+            self._slot_of[key] = slot
+            self._key_at[slot] = key
+        self._set_leaf(slot, weight)
+    
+    def remove(self, key: Hashable) -> None:
+        """Remove ``key`` if present."""
+        slot = self._slot_of.pop(key, None)
+        if slot is None:
+            return
+        self._key_at[slot] = None
+        self._set_leaf(slot, 0.0)
+        self._free_slots.append(slot)
+    
+    def _find(self, target: float) -> int:
+        """Descend to the leaf slot whose cumulative weight range contains ``target``."""
+        node = 1
+        while node < self._capacity:
+            left = 2 * node
+            if target < self._tree[left] or self._tree[left + 1] <= 0.0:
+                node = left
+            else:
+                target -= self._tree[left]
+                node = left + 1
+        return node - self._capacity
+    
+    def sample(self, k: int, rng: Optional[random.Random] = None) -> List[Hashable]:
+        """
+        Draw up to ``k`` distinct keys, each draw proportional to weight.
+        
+        Args:
+            k: Number of keys to draw
+            rng: Random source (pass a seeded instance for deterministic draws)
+            
+        Returns:
+            Keys in draw order
+        """
+        rng = rng or random
+        drawn: List[Tuple[int, float]] = []
+        try:
+            for _ in range(min(k, len(self._slot_of))):
+                total = self.total
+                if total <= 0.0:
+                    break
+                slot = self._find(rng.random() * total)
+                weight = self._tree[self._capacity + slot]
+                if weight <= 0.0 or self._key_at[slot] is None:
+                    break  # Only reachable through floating point exhaustion
+                drawn.append((slot, weight))
+                self._set_leaf(slot, 0.0)
+        finally:
+            for slot, weight in drawn:
+                self._set_leaf(slot, weight)
+        return [self._key_at[slot] for slot, _ in drawn]
+
+
 class ExperienceReplay:
     """
     Generates prioritized replay sequences from working memory.
@@ -122,7 +265,8 @@ class ExperienceReplay:
         self,
         batch_size: int = 100,
         priority_alpha: float = 0.6,
-        recent_queries_window: int = 10
+        recent_queries_window: int = 10,
+        seed: Optional[int] = None
     ):
         """
         Initialize experience replay generator.
@@ -131,12 +275,19 @@ class ExperienceReplay:
             batch_size: Number of experiences per replay batch
             priority_alpha: Weight for priority-based sampling (0.0 = uniform, 1.0 = greedy)
             recent_queries_window: Number of recent queries to consider for importance
+            seed: Optional seed for deterministic sampling (tests, reproducible runs)
         """
         self.batch_size = batch_size
         self.priority_alpha = priority_alpha
         self.recent_queries_window = recent_queries_window
+        self._rng = random.Random(seed)
+        
+        # Replay buffer: priorities kept in a sum tree, updated incrementally
+        self._buffer_priorities: Dict[str, ExperiencePriority] = {}
+        self._buffer_tree = PrioritySumTree()
         
         self._recent_queries: List[np.ndarray] = []
+        self._recent_query_matrix: Optional[np.ndarray] = None  # Normalized (Q, D)
     
     def update_recent_queries(self, query_embedding: np.ndarray) -> None:
         """
@@ -150,6 +301,24 @@ class ExperienceReplay:
         # Keep only last N queries
         if len(self._recent_queries) > self.recent_queries_window:
             self._recent_queries = self._recent_queries[-self.recent_queries_window:]
+        
+        self._recent_query_matrix = normalize_rows(np.vstack(self._recent_queries))
+    
+    def calculate_importance_batch(self, experience_embeddings: np.ndarray) -> np.ndarray:
+        """
+        Calculate importance scores for many experiences at once.
+        
+        Args:
+            experience_embeddings: (N, D) matrix of experience embeddings
+            
+        Returns:
+            (N,) average cosine similarity of each experience to recent queries
+        """
+        if self._recent_query_matrix is None:
+            return np.full(len(experience_embeddings), 0.5)
+        
+        similarities = normalize_rows(experience_embeddings) @ self._recent_query_matrix.T
+        return similarities.mean(axis=1)
     
     def calculate_importance(self, experience_embedding: np.ndarray) -> float:
         """
@@ -161,19 +330,11 @@ class ExperienceReplay:
         Returns:
             Importance score (average cosine similarity to recent queries)
         """
-        if not self._recent_queries:
+        if self._recent_query_matrix is None:
             return 0.5  # Default importance if no recent queries
         
-        # Calculate cosine similarity to each recent query
-        similarities = []
-        for query_emb in self._recent_queries:
-            similarity = np.dot(experience_embedding, query_emb) / (
-                np.linalg.norm(experience_embedding) * np.linalg.norm(query_emb)
-            )
-            similarities.append(similarity)
-        
-        # Return average similarity
-        return float(np.mean(similarities))
+        # Average cosine similarity to recent queries
+        return float(self.calculate_importance_batch(np.atleast_2d(experience_embedding))[0])
     
     def generate_replay_sequence(
         self,
@@ -202,24 +363,30 @@ class ExperienceReplay:
                 priorities=[]
             )
         
+        # Importance for every embedded experience in one matrix product
+        importances = [0.5] * len(experiences)  # Default if no embedding
+        embedded = [
+            i for i, exp in enumerate(experiences)
+            if isinstance(exp.get("embedding"), np.ndarray)
+        ]
+        if embedded:
+            batch_scores = self.calculate_importance_batch(
+                np.vstack([experiences[i]["embedding"] for i in embedded])
+            )
+            for i, score in zip(embedded, batch_scores.tolist()):
+                importances[i] = score
+        
         # Calculate priorities for all experiences
         priorities = []
         now = datetime.utcnow()
         
-        for exp in experiences:
+        for exp, importance in zip(experiences, importances):
             # Calculate days since experience
             exp_time = exp.get("timestamp", now)
             if isinstance(exp_time, str):
                 exp_time = datetime.fromisoformat(exp_time)
             days_since = (now - exp_time).total_seconds() / 86400.0
             
-            # Calculate importance score
-            embedding = exp.get("embedding")
-            if embedding is not None and isinstance(embedding, np.ndarray):
-                importance = self.calculate_importance(embedding)
-            else:
-                importance = 0.5  # Default if no embedding
-            
             # Calculate priority
             priority = ExperiencePriority.calculate(
                 experience_id=exp["id"],
@@ -257,6 +424,12 @@ class ExperienceReplay:
         
         return sequence
     
+    def _sampling_weight(self, priority: ExperiencePriority) -> float:
+        """Apply the priority exponent (alpha) to a priority score."""
+        if self.priority_alpha != 1.0:
+            return priority.total_priority ** self.priority_alpha
+        return priority.total_priority
+    
     def _prioritized_sample(
         self,
         priorities: List[ExperiencePriority],
@@ -265,8 +438,8 @@ class ExperienceReplay:
         """
         Sample experiences using prioritized sampling.
         
-        Uses weighted random sampling based on priority scores.
-        O(N) complexity using random.choices.
+        Builds a sum tree over the priority scores in O(N) and draws without
+        replacement in O(log N) per draw.
         
         Args:
             priorities: List of experience priorities
@@ -278,42 +451,101 @@ class ExperienceReplay:
         if not priorities:
             return []
         
-        # Limit k to available experiences
-        k = min(k, len(priorities))
+        tree = PrioritySumTree.from_items(
+            (index, self._sampling_weight(p)) for index, p in enumerate(priorities)
+        )
+        selected_indices = tree.sample(k, self._rng)
+        
+        # Return selected priorities in original order
+        selected_indices.sort()
+        return [priorities[i] for i in selected_indices]
+    
+    # ------------------------------------------------------------------
+    # Incremental replay buffer
+    # ------------------------------------------------------------------
+    
+    def add_experience(
+        self,
+        experience_id: str,
+        timestamp: Optional[datetime] = None,
+        embedding: Optional[np.ndarray] = None,
+        has_feedback: bool = False
+    ) -> ExperiencePriority:
+        """
+        Add or refresh an experience in the replay buffer.
         
-        # Extract weights (total_priority values)
-        weights = [p.total_priority for p in priorities]
+        Args:
+            experience_id: Experience identifier
+            timestamp: When the experience occurred (defaults to now)
+            embedding: Optional experience embedding for importance scoring
+            has_feedback: Whether the experience has user feedback
+            
+        Returns:
+            The experience's priority
+        """
+        now = datetime.utcnow()
+        days_since = ((now - (timestamp or now)).total_seconds()) / 86400.0
+        importance = self.calculate_importance(embedding) if embedding is not None else 0.5
         
-        # Apply priority exponent (alpha)
-        if self.priority_alpha != 1.0:
-            weights = [w ** self.priority_alpha for w in weights]
+        priority = ExperiencePriority.calculate(
+            experience_id=experience_id,
+            importance_score=importance,
+            days_since=days_since,
+            has_feedback=has_feedback
+        )
+        self._buffer_priorities[experience_id] = priority
+        self._buffer_tree.update(experience_id, self._sampling_weight(priority))
+        return priority
+    
+    def record_feedback(self, experience_id: str, has_feedback: bool = True) -> Optional[ExperiencePriority]:
+        """
+        Update an experience's feedback bonus in O(log N).
         
-        # Sample without replacement
-        # Note: random.choices samples with replacement, so we use a different approach
-        selected_indices = []
-        remaining_priorities = list(priorities)
-        remaining_weights = list(weights)
+        Returns:
+            Updated priority, or None if the experience is not buffered
+        """
+        current = self._buffer_priorities.get(experience_id)
+        if current is None:
+            return None
         
-        for _ in range(k):
-            if not remaining_priorities:
-                break
-            
-            # Sample one experience
-            selected = random.choices(
-                remaining_priorities,
-                weights=remaining_weights,
-                k=1
-            )[0]
-            
-            # Find and remove selected experience
-            idx = remaining_priorities.index(selected)
-            selected_indices.append(priorities.index(selected))
-            remaining_priorities.pop(idx)
-            remaining_weights.pop(idx)
+        feedback_bonus = 1.0 if has_feedback else 0.0
+        priority = ExperiencePriority(
+            experience_id=experience_id,
+            importance_score=current.importance_score,
+            recency_bonus=current.recency_bonus,
+            feedback_bonus=feedback_bonus,
+            total_priority=abs(current.importance_score) + current.recency_bonus + feedback_bonus
+        )
+        self._buffer_priorities[experience_id] = priority
+        self._buffer_tree.update(experience_id, self._sampling_weight(priority))
+        return priority
+    
+    def remove_experience(self, experience_id: str) -> None:
+        """Remove an experience from the replay buffer."""
+        self._buffer_priorities.pop(experience_id, None)
+        self._buffer_tree.remove(experience_id)
+    
+    def sample_buffer(self, k: Optional[int] = None) -> List[ExperiencePriority]:
+        """
+        Draw up to ``k`` distinct experiences from the replay buffer.
         
-        # Return selected priorities in original order
-        selected_indices.sort()
-        return [priorities[i] for i in selected_indices]
+        Args:
+            k: Number of experiences (defaults to batch_size)
+            
+        Returns:
+            Selected priorities in draw order
+        """
+        keys = self._buffer_tree.sample(self.batch_size if k is None else k, self._rng)
+        return [self._buffer_priorities[key] for key in keys]
+    
+    def buffered_ids(self) -> List[str]:
+        """Ids of all experiences in the replay buffer."""
+        return list(self._buffer_priorities)
+    
+    @property
+    def buffer_size(self) -> int:
+        """Number of experiences in the replay buffer."""
+        return len(self._buffer_priorities)
     
     async def replay_to_semantic(
         self,
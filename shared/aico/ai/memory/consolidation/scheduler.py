@@ -6,17 +6,42 @@ Integrates with AICO's backend scheduler for daily consolidation tasks.
 """
 
 from dataclasses import dataclass, field
-from datetime import datetime, timedelta
-from typing import Optional, List, Dict, Any
+from datetime import datetime, timedelta, timezone
+from typing import Optional, List, Dict, Any, Set, Tuple
 from enum import Enum
 import asyncio
 import psutil
 
 from aico.core.logging import get_logger
+from .replay import ExperienceReplay
 
 logger = get_logger("shared", "memory.consolidation.scheduler")
 
 
+def _utc_naive(timestamp: Any) -> Optional[datetime]:
+    """Parse a message timestamp into a naive UTC datetime (None if absent or invalid)."""
+    if isinstance(timestamp, str):
+        try:
+            timestamp = datetime.fromisoformat(timestamp)
+        except ValueError:
+            return None
+    if not isinstance(timestamp, datetime):
+        return None
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp
+
+
+def _replay_key(message: Dict[str, Any]) -> Optional[str]:
+    """Stable replay buffer key of a message across runs (None if it has no identity)."""
+    if message.get("message_id"):
+        return message["message_id"]
+    conversation_id, timestamp = message.get("conversation_id"), message.get("timestamp")
+    if conversation_id and timestamp:
+        return f"{conversation_id}:{timestamp}"
+    return None
+
+
 class IdleStatus(Enum):
     """System idle status."""
     ACTIVE = "active"
@@ -164,7 +189,10 @@ class ConsolidationScheduler:
         idle_detector: Optional[IdleDetector] = None,
         max_concurrent_users: int = 4,
         max_duration_minutes: int = 60,
-        user_sharding_cycle_days: int = 7
+        user_sharding_cycle_days: int = 7,
+        replay_batch_size: int = 100,
+        priority_alpha: float = 0.6,
+        seed: Optional[int] = None
     ):
         """
         Initialize the consolidation scheduler.
@@ -174,11 +202,22 @@ class ConsolidationScheduler:
             max_concurrent_users: Maximum concurrent consolidation jobs
             max_duration_minutes: Maximum duration per user
             user_sharding_cycle_days: Days in user sharding cycle
+            replay_batch_size: Messages consolidated per user and run
+            priority_alpha: Priority exponent for replay sampling
+            seed: Optional seed for deterministic replay sampling
         """
         self.idle_detector = idle_detector or IdleDetector()
         self.max_concurrent_users = max_concurrent_users
         self.max_duration_minutes = max_duration_minutes
         self.user_sharding_cycle_days = user_sharding_cycle_days
+        self.replay_batch_size = replay_batch_size
+        self.priority_alpha = priority_alpha
+        self._seed = seed
+        
+        # Per-user replay buffers, kept across runs so priorities update incrementally,
+        # and the messages already consolidated (still present in working memory)
+        self._replay_buffers: Dict[str, ExperienceReplay] = {}
+        self._consolidated_ids: Dict[str, Set[str]] = {}
         
         self._active_jobs: Dict[str, ConsolidationJob] = {}
         self._job_history: List[ConsolidationJob] = []
@@ -382,6 +421,52 @@ class ConsolidationScheduler:
         """Get recent job history."""
         return self._job_history[-limit:]
     
+    def _select_for_replay(
+        self,
+        user_id: str,
+        messages: List[Dict[str, Any]]
+    ) -> List[Tuple[str, Dict[str, Any]]]:
+        """
+        Refresh the user's replay buffer with retrieved messages and sample a batch.
+        
+        Messages consolidated in an earlier run are not buffered again, and
+        buffered messages no longer in working memory are dropped. Messages are
+        keyed by message id, or by conversation id and timestamp (their working
+        memory key); messages with neither are skipped.
+        
+        Returns:
+            (buffer key, message) pairs in replay order
+        """
+        replay = self._replay_buffers.get(user_id)
+        if replay is None:
+            replay = ExperienceReplay(
+                batch_size=self.replay_batch_size,
+                priority_alpha=self.priority_alpha,
+                seed=self._seed
+            )
+            self._replay_buffers[user_id] = replay
+        
+        consolidated = self._consolidated_ids.setdefault(user_id, set())
+        by_key: Dict[str, Dict[str, Any]] = {}
+        for msg in messages:
+            key = _replay_key(msg)
+            if key is None:
+                continue
+            by_key[key] = msg
+            if key in consolidated:
+                continue
+            replay.add_experience(
+                key,
+                timestamp=_utc_naive(msg.get("timestamp")),
+                has_feedback=bool(msg.get("has_feedback", False))
+            )
+        
+        for key in [key for key in replay.buffered_ids() if key not in by_key]:
+            replay.remove_experience(key)
+        consolidated.intersection_update(by_key)
+        
+        return [(p.experience_id, by_key[p.experience_id]) for p in replay.sample_buffer()]
+    
     async def consolidate_user_memories(
         self,
         user_id: str,
@@ -394,7 +479,9 @@ class ConsolidationScheduler:
         Consolidate memories for a single user.
         
         Transfers messages from working memory to semantic memory,
-        creating durable semantic segments for long-term storage.
+        creating durable semantic segments for long-term storage. Retrieved
+        messages go through the user's prioritized replay buffer; up to
+        replay_batch_size of them are consolidated per run, in replay order.
         
         Args:
             user_id: User ID to consolidate
@@ -409,17 +496,17 @@ class ConsolidationScheduler:
                 "success": bool,
                 "messages_retrieved": int,
                 "memories_created": int,
+                "memories_skipped": int,  # Already consolidated earlier
                 "errors": List[str],
                 "duration_seconds": float
             }
         """
-        from datetime import datetime, timezone
-        
         start_time = datetime.now(timezone.utc)
         result = {
             "success": False,
             "messages_retrieved": 0,
             "memories_created": 0,
+            "memories_skipped": 0,
             "errors": [],
             "duration_seconds": 0.0
         }
@@ -438,47 +525,41 @@ class ConsolidationScheduler:
             
             logger.info(f"Retrieved {len(messages)} messages for consolidation")
             
-            # Step 2: Transfer each message to semantic memory
-            consolidated_count = 0
-            for i, msg in enumerate(messages):
-                try:
-                    # Extract message content
-                    content = msg.get("content", "")
-                    role = msg.get("role", "")
-                    
-                    logger.info(f"Processing message {i+1}/{len(messages)}: role={role}, content_len={len(content)}")
-                    
-                    if not content:
-                        logger.warning(f"Message {i+1} has no content, skipping")
-                        continue
-                    
-                    # Store in semantic memory as a segment
-                    conversation_id = msg.get("conversation_id", f"consolidation_{user_id}")
-                    logger.info(f"Storing segment: user={user_id}, conv={conversation_id[:20]}..., role={role}")
-                    
-                    success = await semantic_store.store_segment(
-                        user_id=user_id,
-                        conversation_id=conversation_id,
-                        role=role,
-                        content=content
-                    )
-                    
-                    if success:
-                        consolidated_count += 1
-                        logger.info(f"✅ Message {i+1} consolidated successfully")
-                    else:
-                        logger.warning(f"❌ Message {i+1} store_segment returned False")
-                    
-                except Exception as e:
-                    error_msg = f"Failed to consolidate message {i+1}: {str(e)}"
-                    logger.error(error_msg)
-                    import traceback
-                    logger.error(f"Traceback: {traceback.format_exc()}")
-                    result["errors"].append(error_msg)
+            # Step 2: Select messages by replay priority (recency, feedback)
+            selected = self._select_for_replay(user_id, messages)
+            
+            # Step 3: Transfer messages to semantic memory in one idempotent batch
+            segments = []
+            for _, msg in selected:
+                segments.append({
+                    "user_id": user_id,
+                    "conversation_id": msg.get("conversation_id", f"consolidation_{user_id}"),
+                    "role": msg.get("role", ""),
+                    "content": msg.get("content", ""),
+                    "message_id": msg.get("message_id"),
+                    "timestamp": msg.get("timestamp")
+                })
+            
+            batch_result = await semantic_store.store_segments(segments)
+            consolidated_count = batch_result.stored
+            result["memories_skipped"] = batch_result.skipped
+            for failure in batch_result.failures:
+                error_msg = f"Failed to consolidate message {failure['index'] + 1}: {failure['error']}"
+                logger.warning(error_msg)
+                result["errors"].append(error_msg)
             
             result["memories_created"] = consolidated_count
+            result["messages_selected"] = len(selected)
+            
+            # Consolidated messages leave the replay buffer
+            replay = self._replay_buffers[user_id]
+            failed = {failure["index"] for failure in batch_result.failures}
+            for index, (key, _) in enumerate(selected):
+                if index not in failed:
+                    replay.remove_experience(key)
+                    self._consolidated_ids[user_id].add(key)
             
-            # Step 3: Update consolidation state
+            # Step 4: Update consolidation state
             try:
                 end_time = datetime.now(timezone.utc)
                 state_data = {
@@ -516,7 +597,8 @@ class ConsolidationScheduler:
             
             logger.info(
                 f"Consolidation complete for user {user_id}: "
-                f"{consolidated_count}/{len(messages)} messages consolidated"
+                f"{consolidated_count}/{len(messages)} messages consolidated, "
+                f"{batch_result.skipped} already consolidated"
             )
             
         except Exception as e:
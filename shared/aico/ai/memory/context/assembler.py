@@ -69,7 +69,8 @@ class ContextAssembler:
         user_id: str,
         current_message: str,
         max_context_items: int = None,
-        conversation_id: str = None
+        conversation_id: str = None,
+        message_id: str = None
     ) -> Dict[str, Any]:
         """
         Assemble comprehensive context from all memory tiers.
@@ -79,6 +80,7 @@ class ContextAssembler:
             current_message: Current message text
             max_context_items: Maximum context items to return
             conversation_id: Optional conversation ID
+            message_id: Optional id of the current message (shares its embedding)
             
         Returns:
             Dictionary with assembled context and metadata
@@ -109,7 +111,8 @@ class ContextAssembler:
                 semantic_items = await self.retrievers.get_semantic_context(
                     user_id,
                     current_message,
-                    limit=10
+                    limit=10,
+                    message_id=message_id
                 )
                 all_items.extend(semantic_items or [])
                 logger.debug(f"Retrieved {len(semantic_items or [])} items from semantic memory")
@@ -93,7 +93,8 @@ class ContextRetrievers:
         self,
         user_id: str,
         query: str,
-        limit: int = 10
+        limit: int = 10,
+        message_id: Optional[str] = None
     ) -> List[ContextItem]:
         """
         Retrieve context from semantic memory.
@@ -102,6 +103,8 @@ class ContextRetrievers:
             user_id: User ID
             query: Query text
             limit: Maximum items to retrieve
+            message_id: Id of the message being answered; its per-message
+                analysis supplies the query embedding
             
         Returns:
             List of context items from semantic memory
@@ -110,18 +113,24 @@ class ContextRetrievers:
             return []
         
         try:
-            # Query semantic memory
-            results = await self.semantic_store.query(user_id, query, limit=limit)
+            # Query semantic memory (hybrid search over conversation segments)
+            results = await self.semantic_store.query_segments(
+                query_text=query,
+                user_id=user_id,
+                max_results=limit,
+                message_id=message_id
+            )
             
             # Convert to ContextItems
             items = []
             for result in results:
+                metadata = result.get('metadata', {})
                 items.append(ContextItem(
                     content=result.get('content', ''),
                     source_tier='semantic',
-                    relevance_score=result.get('score', 0.5),
-                    timestamp=datetime.fromisoformat(result.get('timestamp', datetime.utcnow().isoformat())),
-                    metadata=result.get('metadata', {}),
+                    relevance_score=result.get('hybrid_score', 0.5),
+                    timestamp=datetime.fromisoformat(metadata.get('timestamp', datetime.utcnow().isoformat())),
+                    metadata=metadata,
                     item_type='knowledge'
                 ))
             
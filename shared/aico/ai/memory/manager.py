@@ -57,7 +57,7 @@ Performance & Reliability:
 """
 
 from typing import Dict, List, Optional, Any
-from datetime import datetime
+from datetime import datetime, timezone
 import asyncio
 from dataclasses import dataclass
 
@@ -72,6 +72,7 @@ from .context import ContextAssembler, ContextItem  # Uses context/ subdirectory
 
 # Import knowledge graph components
 from aico.ai.knowledge_graph import (
+    PropertyGraph,
     PropertyGraphStorage,
     MultiPassExtractor,
     EntityResolver,
@@ -430,7 +431,9 @@ class MemoryManager(BaseAIProcessor):
                 idle_detector=self._idle_detector,
                 max_concurrent_users=ams_config.get("max_concurrent_users", 4),
                 max_duration_minutes=ams_config.get("max_duration_minutes", 60),
-                user_sharding_cycle_days=ams_config.get("user_sharding_cycle_days", 7)
+                user_sharding_cycle_days=ams_config.get("user_sharding_cycle_days", 7),
+                replay_batch_size=ams_config.get("replay_batch_size", 100),
+                priority_alpha=ams_config.get("priority_alpha", 0.6)
             )
             print("🧠 [AMS] ✅ Consolidation scheduler initialized")
             logger.info("🧠 [AMS] Consolidation scheduler initialized")
@@ -470,7 +473,8 @@ class MemoryManager(BaseAIProcessor):
                     self._thompson_sampling = ThompsonSamplingSelector(
                         db_connection=self._db_connection,
                         prior_alpha=bandit_config.get("prior_alpha", 1.0),
-                        prior_beta=bandit_config.get("prior_beta", 1.0)
+                        prior_beta=bandit_config.get("prior_beta", 1.0),
+                        cache_ttl_seconds=bandit_config.get("cache_ttl_seconds", 300)
                     )
                     print("🧠 [AMS] ✅ Thompson Sampling selector initialized")
                     logger.info("🧠 [AMS] Thompson Sampling selector initialized")
@@ -664,16 +668,22 @@ class MemoryManager(BaseAIProcessor):
                 processing_time_ms=0.0
             )
     
-    async def store_message(self, user_id: str, conversation_id: str, content: str, role: str) -> bool:
-        """V3 API: Store conversation segments (simplified)"""
+    async def store_message(self, user_id: str, conversation_id: str, content: str, role: str, message_id: Optional[str] = None) -> bool:
+        """
+        V3 API: Store conversation segments (simplified)
+        
+        Passing the turn's message_id lets semantic storage reuse the embedding
+        from the message's shared analysis (see aico.ai.analysis.message_analysis).
+        """
         if not self._initialized:
             await self.initialize()
             
         try:
+            import uuid
+            message_id = message_id or str(uuid.uuid4())
+            
             # Store in working memory (LMDB) - short-term conversation state
             if self._working_store:
-                import uuid
-                message_id = str(uuid.uuid4())
                 message_data = {
                     "message_id": message_id,  # Unique message identifier
                     "user_id": user_id,  # CRITICAL: Add user_id for proper retrieval
@@ -694,7 +704,8 @@ class MemoryManager(BaseAIProcessor):
                             user_id=user_id,
                             conversation_id=conversation_id,
                             role=role,
-                            content=content
+                            content=content,
+                            message_id=message_id
                         )
                     except Exception as e:
                         logger.error(f"Background segment storage failed: {e}")
@@ -718,8 +729,14 @@ class MemoryManager(BaseAIProcessor):
             logger.error(f"Failed to store message: {e}")
             return False
     
-    async def assemble_context(self, user_id: str, current_message: str, conversation_id: str = None) -> Dict[str, Any]:
-        """V2 API: Assemble context from working + semantic memory"""
+    async def assemble_context(self, user_id: str, current_message: str, conversation_id: str = None,
+                               message_id: Optional[str] = None) -> Dict[str, Any]:
+        """
+        V2 API: Assemble context from working + semantic memory.
+        
+        Passing the turn's message_id lets the semantic query reuse the
+        embedding computed for that message (see store_message).
+        """
         import time
         start_time = time.time()
         logger.info(f"🔍 [MEMORY_TIMING] MemoryManager.assemble_context() started")
@@ -741,7 +758,8 @@ class MemoryManager(BaseAIProcessor):
                 user_id=user_id,
                 current_message=current_message,
                 max_context_items=20,
-                conversation_id=conversation_id
+                conversation_id=conversation_id,
+                message_id=message_id
             )
             assembler_duration = time.time() - assembler_start
             logger.info(f"🔍 [MEMORY_TIMING] Context assembler completed in {assembler_duration:.3f}s")
@@ -920,6 +938,13 @@ class MemoryManager(BaseAIProcessor):
                 except Exception as e:
                     logger.error(f"🕸️ [KG] Error disconnecting modelservice: {e}")
             
+            # Flush write-behind Thompson Sampling posteriors
+            if self._thompson_sampling:
+                try:
+                    await asyncio.wait_for(self._thompson_sampling.close(), timeout=5.0)
+                except Exception as e:
+                    logger.error(f"Error flushing Thompson Sampling stats: {e}")
+            
             # Shutdown semantic store (includes request queue and thread pools)
             if self._semantic_store:
                 remaining_time = max(5.0, timeout - (time.time() - start_time))  # Minimum 5s
@@ -946,7 +971,8 @@ class MemoryManager(BaseAIProcessor):
         self, 
         user_id: str, 
         text: str,
-        shared_resolver = None
+        shared_resolver = None,
+        extracted_graph: Optional[PropertyGraph] = None
     ) -> None:
         """
         Background knowledge graph extraction from user message.
@@ -957,6 +983,8 @@ class MemoryManager(BaseAIProcessor):
             shared_resolver: Optional shared EntityResolver for incremental HNSW indexing
                            If None, uses self._kg_resolver (creates new index per message)
                            If provided, reuses HNSW index across messages (2x speedup)
+            extracted_graph: Graph already extracted from text (e.g. by
+                           MultiPassExtractor.extract_batch); skips step 1
         """
         import time
         start_time = time.time()
@@ -972,7 +1000,10 @@ class MemoryManager(BaseAIProcessor):
             extraction_start = time.time()
             logger.info(f"🕸️ [KG] Starting background extraction for user {user_id}")
             
-            new_graph = await self._kg_extractor.extract(text, user_id)
+            if extracted_graph is not None:
+                new_graph = extracted_graph
+            else:
+                new_graph = await self._kg_extractor.extract(text, user_id)
             extraction_time = time.time() - extraction_start
             
             print(f"\n🕸️ [KG] ✅ Extraction complete in {extraction_time:.2f}s")
@@ -988,10 +1019,12 @@ class MemoryManager(BaseAIProcessor):
             print(f"\n [KG]  Step 2: Entity resolution (HNSW-based deduplication)")
             resolution_start = time.time()
             superseded_ids = set()  # Track nodes that should be marked historical
+            existing_graph = None
             try:
-                # Get existing nodes for this user
+                # Get existing graph for this user (nodes for resolution, both for fusion)
                 db_fetch_start = time.time()
-                existing_nodes = await self._kg_storage.get_user_nodes(user_id, current_only=True)
+                existing_graph = await self._kg_storage.get_user_graph(user_id, current_only=True)
+                existing_nodes = existing_graph.nodes
                 db_fetch_time = time.time() - db_fetch_start
                 print(f" [KG]    Found {len(existing_nodes)} existing nodes in DB ({db_fetch_time:.2f}s)")
                 
@@ -1023,13 +1056,29 @@ class MemoryManager(BaseAIProcessor):
                 import traceback
                 traceback.print_exc()
             
-            # 3. Graph fusion - SKIPPED (not critical for initial testing)
-            print(f"\n🕸️ [KG] Step 3: Graph fusion (skipped for now)")
-            
-            # 4. Save to storage (libSQL + ChromaDB with embeddings)
+            # 3. Graph fusion: merge into the existing graph, keeping only what changed
+            print(f"\n🕸️ [KG] Step 3: Graph fusion...")
+            if existing_graph is None:
+                existing_graph = await self._kg_storage.get_user_graph(user_id, current_only=True)
+            changes = await self._kg_fusion.fuse_changes(new_graph, existing_graph)
+            
+            # Existing nodes merged away by entity resolution become historical
+            superseded_at = datetime.now(timezone.utc).isoformat()
+            for node_id in superseded_ids:
+                node = existing_graph.get_node_by_id(node_id)
+                if node is None or node_id in changes.superseded_nodes:
+                    continue
+                changes.updated_nodes.pop(node_id, None)
+                node.is_current = 0
+                node.valid_until = superseded_at
+                node.updated_at = superseded_at
+                changes.superseded_nodes[node_id] = node
+            print(f"🕸️ [KG]    Changes: {changes.summary()}")
+            
+            # 4. Save only the changed nodes and edges (libSQL + ChromaDB with embeddings)
             print(f"\n🕸️ [KG] Step 4: Saving to storage...")
             storage_start = time.time()
-            await self._kg_storage.save_graph(new_graph, superseded_node_ids=superseded_ids)
+            await self._kg_storage.save_changes(changes)
             storage_time = time.time() - storage_start
             
             total_time = time.time() - start_time
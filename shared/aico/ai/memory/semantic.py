@@ -6,6 +6,9 @@ Hybrid search combining semantic similarity (embeddings) and keyword relevance (
 
 Core Functionality:
 - Segment storage: Store conversation chunks with embeddings in ChromaDB
+- Bulk ingestion: Idempotent batched upserts keyed by a deterministic segment id
+- Access statistics (AMS): Retrieval hits buffered in memory and written back in
+  batches; confidence decay is computed at read time from persisted timestamps
 - Hybrid search: RRF fusion of semantic (cosine) + keyword (BM25) ranking
 - Simple integration: Clean interface for memory manager
 
@@ -21,10 +24,10 @@ This store focuses solely on conversational segment retrieval.
 """
 
 import asyncio
+import hashlib
 from typing import Dict, List, Optional, Any
 from datetime import datetime, timedelta
-from dataclasses import dataclass
-import uuid
+from dataclasses import dataclass, field
 import math
 from collections import Counter
 import chromadb
@@ -33,6 +36,8 @@ from chromadb.config import Settings
 from aico.core.config import ConfigurationManager
 from aico.core.paths import AICOPaths
 from aico.core.logging import get_logger
+from aico.ai.utils.vector_executor import get_vector_executor
+from aico.ai.analysis.message_analysis import MessageAnalysis, find_message_analysis
 from .fusion import calculate_rrf_scores, calculate_weighted_scores
 from .temporal import TemporalMetadata
 
@@ -61,6 +66,54 @@ class ConversationSegment:
         }
 
 
+@dataclass
+class SegmentBatchResult:
+    """Outcome of a bulk store_segments call"""
+    stored_ids: List[str] = field(default_factory=list)  # Newly written segments
+    skipped_ids: List[str] = field(default_factory=list)  # Already stored (or duplicated within the batch)
+    failures: List[Dict[str, Any]] = field(default_factory=list)  # {"index", "segment_id", "error"}
+    
+    @property
+    def stored(self) -> int:
+        return len(self.stored_ids)
+    
+    @property
+    def skipped(self) -> int:
+        return len(self.skipped_ids)
+
+
+def make_segment_id(
+    user_id: str,
+    conversation_id: str,
+    role: str,
+    content: str,
+    message_id: Optional[str] = None
+) -> str:
+    """
+    Deterministic segment id, so storing the same message twice is an upsert.
+    
+    Uses the working-memory message id when known, otherwise the content
+    together with its user, conversation and role.
+    """
+    if message_id:
+        key = f"msg\x1f{message_id}"
+    else:
+        key = "\x1f".join(("seg", user_id, conversation_id, role, content))
+    return "seg_" + hashlib.sha256(key.encode("utf-8")).hexdigest()[:32]
+
+
+def _parse_timestamp(value: Any) -> datetime:
+    """Message timestamp as naive UTC datetime (now if missing or unparsable)."""
+    if isinstance(value, datetime):
+        return value
+    if isinstance(value, str) and value:
+        try:
+            return datetime.fromisoformat(value.replace('Z', ''))
+        except ValueError:
+            pass
+    return datetime.utcnow()
+
+
 class SemanticMemoryStore:
     """V3 Semantic Memory Store - Hybrid search with BM25 + semantic"""
     
@@ -70,6 +123,7 @@ class SemanticMemoryStore:
         self._chroma_client = None
         self._collection = None
         self._modelservice = None
+        self._vector_executor = get_vector_executor(config_manager)  # Off-loop ChromaDB calls
         
         # Configuration
         memory_config = self.config.get("core.memory.semantic", {})
@@ -92,6 +146,14 @@ class SemanticMemoryStore:
         self._temporal_enabled = temporal_config.get("enabled", True)
         self._confidence_decay_rate = temporal_config.get("confidence_decay_rate", 0.001)
         
+        # Write-behind access statistics: segment_id -> [hits, last access time]
+        self._access_flush_interval = memory_config.get("access_flush_interval_seconds", 30.0)
+        self._access_buffer_max = memory_config.get("access_buffer_max_segments", 500)
+        self._pending_access: Dict[str, List[Any]] = {}
+        self._access_flush_task: Optional[asyncio.Task] = None
+        self._access_flush_waiting = False  # _access_flush_task is still in its delay
+        self._access_flush_lock = asyncio.Lock()
+        
         # CRITICAL: This log MUST show all three parameters to confirm code is loaded
         logger.info(f"✅ SemanticMemoryStore V3 initialized (fusion={self._fusion_method}, rrf_k={self._rrf_rank_constant}, bm25_min_idf={self._bm25_min_idf}, temporal={self._temporal_enabled})")
         logger.warning(f"🔍 DEBUG: Config values loaded - fusion={self._fusion_method}, rrf_k={self._rrf_rank_constant}, bm25_min_idf={self._bm25_min_idf}")
@@ -138,7 +200,8 @@ class SemanticMemoryStore:
         user_id: str,
         conversation_id: str,
         role: str,
-        content: str
+        content: str,
+        message_id: Optional[str] = None
     ) -> bool:
         """
         Store a conversation segment with embedding.
@@ -148,92 +211,236 @@ class SemanticMemoryStore:
             conversation_id: Conversation identifier
             role: 'user' or 'assistant'
             content: Message content
+            message_id: Working-memory message id (makes re-storing idempotent)
+            
+        Returns:
+            True if stored successfully (or already stored)
+        """
+        result = await self.store_segments([{
+            'user_id': user_id,
+            'conversation_id': conversation_id,
+            'role': role,
+            'content': content,
+            'message_id': message_id
+        }])
+        if result.failures:
+            return False
+        
+        logger.info(f"✅ Stored segment: {role} message ({len(content)} chars)")
+        return True
+    
+    async def store_segments(self, segments: List[Dict[str, Any]]) -> SegmentBatchResult:
+        """
+        Store many conversation segments with one embedding batch and one ChromaDB write.
+        
+        Segment ids are derived from the message (see make_segment_id), so
+        segments that are already stored are skipped before embedding and
+        re-running on the same messages costs a single id lookup.
+        
+        Args:
+            segments: Dicts with user_id, conversation_id, role, content and
+                optionally message_id and timestamp (working-memory message shape)
             
         Returns:
-            True if stored successfully
+            SegmentBatchResult; items that fail are reported without aborting the batch
         """
+        result = SegmentBatchResult()
+        if not segments:
+            return result
+        
         if not self._initialized:
             await self.initialize()
         
         if not self._modelservice:
             logger.warning("ModelService not available - cannot generate embeddings")
-            return False
+            result.failures = [
+                {'index': i, 'segment_id': None, 'error': "ModelService not available"}
+                for i in range(len(segments))
+            ]
+            return result
         
-        try:
-            # Create segment
+        # Build segments with deterministic ids, dropping duplicates within the batch
+        pending: Dict[str, tuple] = {}
+        for index, item in enumerate(segments):
+            content = item.get('content') or ""
+            if not content:
+                result.failures.append({'index': index, 'segment_id': None, 'error': "Empty content"})
+                continue
+            
             segment = ConversationSegment(
-                segment_id=str(uuid.uuid4()),
-                user_id=user_id,
-                conversation_id=conversation_id,
-                role=role,
+                segment_id=make_segment_id(
+                    user_id=item.get('user_id', ""),
+                    conversation_id=item.get('conversation_id', ""),
+                    role=item.get('role', ""),
+                    content=content,
+                    message_id=item.get('message_id')
+                ),
+                user_id=item.get('user_id', ""),
+                conversation_id=item.get('conversation_id', ""),
+                role=item.get('role', ""),
                 content=content,
-                timestamp=datetime.utcnow()
-            )
-            
-            # Generate embedding
-            embedding_result = await self._modelservice.get_embeddings(
-                model=self._embedding_model,
-                prompt=content
+                timestamp=_parse_timestamp(item.get('timestamp'))
             )
-            if not embedding_result.get("success", False):
-                logger.error(f"Failed to generate embedding: {embedding_result.get('error')}")
-                return False
-            
-            embedding = embedding_result.get("data", {}).get("embedding", [])
+            if segment.segment_id in pending:
+                result.skipped_ids.append(segment.segment_id)
+                continue
+            pending[segment.segment_id] = (index, segment)
+        
+        if not pending:
+            return result
+        
+        try:
+            # Skip segments that are already stored
+            existing = await self._vector_executor.get(self._collection, ids=list(pending.keys()), include=[])
+            for segment_id in existing.get('ids', []):
+                if pending.pop(segment_id, None) is not None:
+                    result.skipped_ids.append(segment_id)
+        except Exception as e:
+            logger.warning(f"Failed to look up existing segments, upserting all: {e}")
+        
+        if not pending:
+            logger.info(f"All {result.skipped} segments already stored")
+            return result
+        
+        # One embedding batch for every new segment; messages already embedded
+        # during this turn (e.g. by a context query) reuse that embedding
+        batch = list(pending.values())
+        embeddings = await self._embed_batch(
+            [segment.content for _, segment in batch],
+            analyses=[
+                find_message_analysis(segments[index].get('message_id'), segment.content)
+                for index, segment in batch
+            ]
+        )
+        
+        ids, vectors, documents, metadatas = [], [], [], []
+        for (index, segment), embedding in zip(batch, embeddings):
             if not embedding:
-                logger.error("No embedding returned from modelservice")
-                return False
-            
-            # Create temporal metadata (AMS)
-            temporal_meta = None
-            if self._temporal_enabled:
-                temporal_meta = TemporalMetadata(
-                    created_at=segment.timestamp,
-                    last_updated=segment.timestamp,
-                    last_accessed=segment.timestamp,
-                    access_count=0,
-                    confidence=1.0,
-                    version=1
-                )
-            
-            # Store in ChromaDB with temporal metadata
-            metadata = {
-                'user_id': user_id,
-                'conversation_id': conversation_id,
-                'role': role,
-                'timestamp': segment.timestamp.isoformat()
-            }
-            
-            # Add temporal fields to metadata
-            if temporal_meta:
-                metadata.update({
-                    'created_at': temporal_meta.created_at.isoformat(),
-                    'confidence': temporal_meta.confidence,
-                    'version': temporal_meta.version,
-                    'last_accessed': temporal_meta.last_accessed.isoformat(),
-                    'access_count': temporal_meta.access_count
+                result.failures.append({
+                    'index': index,
+                    'segment_id': segment.segment_id,
+                    'error': "Embedding generation failed"
                 })
-            
-            self._collection.add(
-                ids=[segment.segment_id],
-                embeddings=[embedding],
-                documents=[content],
-                metadatas=[metadata]
+                continue
+            ids.append(segment.segment_id)
+            vectors.append(embedding)
+            documents.append(segment.content)
+            metadatas.append(self._segment_metadata(segment))
+        
+        if ids:
+            try:
+                await self._vector_executor.upsert(
+                    self._collection,
+                    ids=ids,
+                    embeddings=vectors,
+                    documents=documents,
+                    metadatas=metadatas
+                )
+                result.stored_ids.extend(ids)
+            except Exception as e:
+                logger.error(f"Failed to write {len(ids)} segments: {e}")
+                index_by_id = {segment.segment_id: index for index, segment in batch}
+                result.failures.extend(
+                    {'index': index_by_id[segment_id], 'segment_id': segment_id, 'error': str(e)}
+                    for segment_id in ids
+                )
+        
+        logger.info(
+            f"✅ Stored {result.stored} segments "
+            f"({result.skipped} already stored, {len(result.failures)} failed)"
+        )
+        return result
+    
+    async def _embed_batch(
+        self,
+        texts: List[str],
+        analyses: Optional[List[Optional[MessageAnalysis]]] = None
+    ) -> List[Optional[List[float]]]:
+        """
+        Embed texts in one batched request; failed items come back as None.
+        
+        Texts with a per-message analysis get their embedding from it (shared
+        with other consumers of the same message) instead of the batch.
+        """
+        if analyses and any(analyses):
+            shared = [i for i, analysis in enumerate(analyses) if analysis is not None]
+            rest = [i for i, analysis in enumerate(analyses) if analysis is None]
+            shared_task = asyncio.gather(
+                *(analyses[i].embedding(self._modelservice, self._embedding_model) for i in shared),
+                return_exceptions=True
             )
-            
-            logger.info(f"✅ Stored segment: {role} message ({len(content)} chars)")
-            return True
-            
+            rest_embeddings = await self._embed_batch([texts[i] for i in rest]) if rest else []
+            shared_results = await shared_task
+            embeddings: List[Optional[List[float]]] = [None] * len(texts)
+            for i, embedding_result in zip(shared, shared_results):
+                if isinstance(embedding_result, dict) and embedding_result.get("success", False):
+                    embeddings[i] = embedding_result.get("data", {}).get("embedding") or None
+            for i, embedding in zip(rest, rest_embeddings):
+                embeddings[i] = embedding
+            return embeddings
+        
+        try:
+            if hasattr(self._modelservice, "get_embeddings_batch"):
+                batch_result = await self._modelservice.get_embeddings_batch(
+                    model=self._embedding_model,
+                    prompts=texts
+                )
+                if not batch_result.get("success", False):
+                    logger.error(f"Failed to generate embeddings: {batch_result.get('error')}")
+                    return [None] * len(texts)
+                embeddings = batch_result.get("data", {}).get("embeddings", [])
+                return list(embeddings) + [None] * (len(texts) - len(embeddings))
+            
+            embeddings = []
+            for text in texts:
+                embedding_result = await self._modelservice.get_embeddings(
+                    model=self._embedding_model,
+                    prompt=text
+                )
+                if embedding_result.get("success", False):
+                    embeddings.append(embedding_result.get("data", {}).get("embedding") or None)
+                else:
+                    embeddings.append(None)
+            return embeddings
         except Exception as e:
-            logger.error(f"Failed to store segment: {e}")
-            return False
+            logger.error(f"Failed to generate embeddings: {e}")
+            return [None] * len(texts)
+    
+    def _segment_metadata(self, segment: ConversationSegment) -> Dict[str, Any]:
+        """ChromaDB metadata for a segment, including temporal fields (AMS)."""
+        metadata = {
+            'user_id': segment.user_id,
+            'conversation_id': segment.conversation_id,
+            'role': segment.role,
+            'timestamp': segment.timestamp.isoformat()
+        }
+        
+        if self._temporal_enabled:
+            temporal_meta = TemporalMetadata(
+                created_at=segment.timestamp,
+                last_updated=segment.timestamp,
+                last_accessed=segment.timestamp,
+                access_count=0,
+                confidence=1.0,
+                version=1
+            )
+            metadata.update({
+                'created_at': temporal_meta.created_at.isoformat(),
+                'confidence': temporal_meta.confidence,
+                'version': temporal_meta.version,
+                'last_accessed': temporal_meta.last_accessed.isoformat(),
+                'access_count': temporal_meta.access_count
+            })
+        
+        return metadata
     
     async def query_segments(
         self,
         query_text: str,
         user_id: Optional[str] = None,
         max_results: int = None,
-        min_similarity: float = None
+        min_similarity: float = None,
+        message_id: Optional[str] = None
     ) -> List[Dict[str, Any]]:
         """
         Query conversation segments using semantic search.
@@ -243,6 +450,8 @@ class SemanticMemoryStore:
             user_id: Optional user filter
             max_results: Maximum number of results (default: self._max_results)
             min_similarity: Minimum similarity threshold (0-1, default: 0.4 for cosine)
+            message_id: Id of the message being queried with; its per-message
+                analysis supplies (and shares) the query embedding
             
         Returns:
             List of matching segments with metadata
@@ -255,11 +464,15 @@ class SemanticMemoryStore:
             return []
         
         try:
-            # Generate query embedding
-            embedding_result = await self._modelservice.get_embeddings(
-                model=self._embedding_model,
-                prompt=query_text
-            )
+            # Generate query embedding (shared with storing the same message)
+            analysis = find_message_analysis(message_id, query_text)
+            if analysis is not None:
+                embedding_result = await analysis.embedding(self._modelservice, self._embedding_model)
+            else:
+                embedding_result = await self._modelservice.get_embeddings(
+                    model=self._embedding_model,
+                    prompt=query_text
+                )
             if not embedding_result.get("success", False):
                 logger.error(f"Failed to generate query embedding: {embedding_result.get('error')}")
                 return []
@@ -274,9 +487,10 @@ class SemanticMemoryStore:
             
             # Get ALL documents for proper BM25 IDF calculation
             # Note: If user_id filter is set, we get all docs for that user
-            collection_count = self._collection.count()
+            collection_count = await self._vector_executor.count(self._collection)
             
-            results = self._collection.query(
+            results = await self._vector_executor.query(
+                self._collection,
                 query_embeddings=[query_embedding],
                 n_results=collection_count,  # Fetch ALL documents for proper BM25
                 where=where_filter
@@ -340,6 +554,9 @@ class SemanticMemoryStore:
             # Limit results
             segments = segments[:max_results or self._max_results]
             
+            if self._temporal_enabled:
+                self._record_access([segment['segment_id'] for segment in segments])
+            
             logger.info(f"Found {len(segments)} matching segments (hybrid search)")
             return segments
             
@@ -369,7 +586,8 @@ class SemanticMemoryStore:
         
         try:
             # Query all segments for this conversation
-            results = self._collection.get(
+            results = await self._vector_executor.get(
+                self._collection,
                 where={
                     "user_id": user_id,
                     "conversation_id": conversation_id
@@ -401,7 +619,8 @@ class SemanticMemoryStore:
         self,
         user_id: str,
         conversation_id: str,
-        current_message: str
+        current_message: str,
+        message_id: Optional[str] = None
     ) -> Dict[str, Any]:
         """
         Assemble conversation context for LLM.
@@ -410,6 +629,7 @@ class SemanticMemoryStore:
             user_id: User identifier
             conversation_id: Conversation identifier
             current_message: Current user message
+            message_id: Id of the current message (shares its embedding)
             
         Returns:
             Context dictionary with recent and relevant segments
@@ -426,7 +646,8 @@ class SemanticMemoryStore:
             relevant_segments = await self.query_segments(
                 query_text=current_message,
                 user_id=user_id,
-                max_results=3
+                max_results=3,
+                message_id=message_id
             )
             
             # Filter out duplicates (segments already in recent)
@@ -456,7 +677,7 @@ class SemanticMemoryStore:
                 "conversation_id": conversation_id
             }
     
-    def get_stats(self) -> Dict[str, Any]:
+    async def get_stats(self) -> Dict[str, Any]:
         """Get semantic memory statistics"""
         if not self._initialized or not self._collection:
             return {
@@ -465,7 +686,7 @@ class SemanticMemoryStore:
             }
         
         try:
-            count = self._collection.count()
+            count = await self._vector_executor.count(self._collection)
             return {
                 'initialized': True,
                 'total_segments': count,
@@ -483,37 +704,150 @@ class SemanticMemoryStore:
         """
         Apply confidence decay based on time since last access (AMS).
         
+        Computed from the persisted confidence and last_accessed at read time;
+        the access itself is recorded separately and written back by
+        flush_access_stats(), so the stored metadata is never modified here.
+        
         Args:
             metadata: Segment metadata with temporal fields
             
         Returns:
-            Updated metadata with decayed confidence
+            Copy of the metadata with decayed confidence
         """
+        metadata = dict(metadata)
         try:
-            last_accessed_str = metadata.get('last_accessed')
-            if not last_accessed_str:
-                return metadata
-            
-            # Parse last accessed time
-            last_accessed = datetime.fromisoformat(last_accessed_str.replace('Z', ''))
-            
-            # Calculate days since last access
-            now = datetime.utcnow()
-            days_since = (now - last_accessed).total_seconds() / 86400.0
-            
-            # Apply decay
+            last_accessed = datetime.fromisoformat(metadata['last_accessed'].replace('Z', ''))
             current_confidence = metadata.get('confidence', 1.0)
-            decay_factor = (1 - self._confidence_decay_rate) ** days_since
-            new_confidence = current_confidence * decay_factor
-            
-            # Update metadata
-            metadata['confidence'] = max(0.0, min(1.0, new_confidence))
-            metadata['last_accessed'] = now.isoformat()
-            metadata['access_count'] = metadata.get('access_count', 0) + 1
+            new_confidence = self._decayed_confidence(current_confidence, last_accessed, datetime.utcnow())
+            metadata['confidence'] = new_confidence
             
-            logger.debug(f"Confidence decay: {current_confidence:.3f} → {new_confidence:.3f} ({days_since:.1f} days)")
+            logger.debug(f"Confidence decay: {current_confidence:.3f} → {new_confidence:.3f}")
             
         except Exception as e:
             logger.debug(f"Failed to apply confidence decay: {e}")
         
         return metadata
+    
+    def _decayed_confidence(self, confidence: float, since: datetime, now: datetime) -> float:
+        """Confidence after decaying from ``since`` to ``now`` at the configured daily rate."""
+        days_since = max(0.0, (now - since).total_seconds() / 86400.0)
+        decay_factor = (1 - self._confidence_decay_rate) ** days_since
+        return max(0.0, min(1.0, confidence * decay_factor))
+    
+    def _record_access(self, segment_ids: List[str]) -> None:
+        """Buffer retrieval hits; persisted in batches by flush_access_stats()."""
+        if not segment_ids:
+            return
+        
+        now = datetime.utcnow()
+        for segment_id in segment_ids:
+            entry = self._pending_access.get(segment_id)
+            if entry is None:
+                self._pending_access[segment_id] = [1, now]
+            else:
+                entry[0] += 1
+                entry[1] = now
+        
+        if len(self._pending_access) >= self._access_buffer_max:
+            self._schedule_access_flush(delay=0.0)
+        else:
+            self._schedule_access_flush(delay=self._access_flush_interval)
+    
+    def _schedule_access_flush(self, delay: float) -> None:
+        """
+        Start a flush after delay unless one is already scheduled.
+        
+        An immediate flush (delay 0) replaces a flush still waiting out its
+        delay; while an immediate or running flush is pending, nothing new starts.
+        """
+        task = self._access_flush_task
+        if task is not None and not task.done():
+            if delay > 0 or not self._access_flush_waiting:
+                return
+            task.cancel()
+        try:
+            self._access_flush_task = asyncio.get_running_loop().create_task(self._delayed_access_flush(delay))
+            self._access_flush_waiting = delay > 0
+        except RuntimeError:
+            # No running loop (synchronous caller): hits stay buffered until the next flush
+            self._access_flush_task = None
+    
+    async def _delayed_access_flush(self, delay: float) -> None:
+        try:
+            if delay > 0:
+                await asyncio.sleep(delay)
+                self._access_flush_waiting = False
+            await self.flush_access_stats()
+        except asyncio.CancelledError:
+            pass
+    
+    async def flush_access_stats(self) -> int:
+        """
+        Persist buffered access statistics with one batched metadata update.
+        
+        For each hit segment, decay accrued since its persisted last_accessed is
+        folded into confidence, access_count is incremented by the buffered hits
+        and last_accessed moves to the latest hit.
+        
+        Returns:
+            Number of segments updated
+        """
+        async with self._access_flush_lock:
+            if not self._pending_access or not self._collection:
+                return 0
+            
+            pending, self._pending_access = self._pending_access, {}
+            try:
+                updated = await self._vector_executor.run(
+                    self._collection, "access_stats", self._write_access_stats, pending
+                )
+                logger.debug(f"Flushed access statistics for {updated} segments")
+                return updated
+            except Exception as e:
+                logger.warning(f"Failed to flush access statistics, keeping them buffered: {e}")
+                # Merge back so the hits are retried with the next flush
+                for segment_id, (hits, accessed_at) in pending.items():
+                    entry = self._pending_access.setdefault(segment_id, [0, accessed_at])
+                    entry[0] += hits
+                    entry[1] = max(entry[1], accessed_at)
+                return 0
+    
+    def _write_access_stats(self, pending: Dict[str, List[Any]]) -> int:
+        """Read current metadata for the hit segments and write the merged stats (blocking)."""
+        current = self._collection.get(ids=list(pending.keys()), include=["metadatas"])
+        
+        ids, metadatas = [], []
+        for segment_id, metadata in zip(current.get('ids', []), current.get('metadatas', [])):
+            hits, accessed_at = pending[segment_id]
+            metadata = dict(metadata or {})
+            
+            last_accessed_str = metadata.get('last_accessed')
+            if last_accessed_str and 'confidence' in metadata:
+                last_accessed = datetime.fromisoformat(last_accessed_str.replace('Z', ''))
+                metadata['confidence'] = self._decayed_confidence(metadata['confidence'], last_accessed, accessed_at)
+            metadata['last_accessed'] = accessed_at.isoformat()
+            metadata['access_count'] = metadata.get('access_count', 0) + hits
+            
+            ids.append(segment_id)
+            metadatas.append(metadata)
+        
+        if ids:
+            self._collection.update(ids=ids, metadatas=metadatas)
+        return len(ids)
+    
+    async def shutdown(self, timeout: float = 5.0) -> None:
+        """Cancel the pending flush, persist remaining access statistics and wait for queued upserts."""
+        if self._access_flush_task and not self._access_flush_task.done():
+            self._access_flush_task.cancel()
+        try:
+            await asyncio.wait_for(self.flush_access_stats(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning(f"Timed out flushing {len(self._pending_access)} buffered access statistics")
+        try:
+            await asyncio.wait_for(self._vector_executor.drain(), timeout=timeout)
+        except asyncio.TimeoutError:
+            logger.warning("Timed out waiting for coalesced vector upserts to be written")
+    
+    async def cleanup(self) -> None:
+        """Release resources (flushes buffered access statistics)."""
+        await self.shutdown()
@@ -32,6 +32,15 @@ Technologies & Dependencies:
 - AICO ConfigurationManager: Database paths, retention policies, and performance tuning
 - AICO Logging: Structured logging for memory operations and performance monitoring
 
+Key Layout:
+- session_memory: "{conversation_id}:{timestamp}Z" -> message JSON. Timestamps use a
+  fixed-width microsecond format, so key order is chronological within a conversation
+  (keys written by older versions without a fraction are rewritten on startup)
+- session_memory_by_user: "{user_id}:{timestamp}Z:{conversation_id}" -> session_memory key
+- session_memory_counts: "c:{conversation_id}" / "u:{user_id}" -> stored message count
+History pages are read with LMDB cursor range scans between the since/before bounds,
+so a page costs O(page_size) regardless of how deep into the history it is.
+
 Performance Characteristics:
 - Sub-millisecond read/write latency for active session data
 - Automatic background compaction to maintain optimal storage efficiency
@@ -40,9 +49,12 @@ Performance Characteristics:
 """
 
 import lmdb
-from typing import Dict, List, Optional, Any
-from datetime import datetime, timedelta
+import base64
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional, Any, Tuple
+from datetime import datetime, timedelta, timezone
 import json
+import re
 
 from aico.core.config import ConfigurationManager
 from aico.core.logging import get_logger
@@ -51,6 +63,57 @@ from aico.ai.memory.temporal import TemporalMetadata
 
 logger = get_logger("shared", "ai.memory.working")
 
+# Secondary databases maintained alongside session_memory
+USER_INDEX_DB = "session_memory_by_user"
+COUNTS_DB = "session_memory_counts"
+
+# Fixed-width so that lexicographic key order matches chronological order
+# (datetime.isoformat() drops the fraction when microsecond == 0)
+KEY_TIMESTAMP_FORMAT = "%Y-%m-%dT%H:%M:%S.%f"
+
+# "{conversation_id}:{timestamp}Z" - conversation ids may themselves contain ':'
+_MESSAGE_KEY_PATTERN = re.compile(r"^(?P<conversation_id>.*):(?P<timestamp>\d{4}-\d{2}-\d{2}T[\d:.]+)Z$")
+
+# Upper bound for prefix scans: 0xff never occurs in UTF-8 encoded keys
+_PREFIX_END = b"\xff"
+
+
+class InvalidCursorError(ValueError):
+    """Raised when a history continuation cursor is malformed or belongs to another scope."""
+
+
+@dataclass
+class HistoryPage:
+    """One page of message history, newest first."""
+    messages: List[Dict[str, Any]] = field(default_factory=list)
+    next_cursor: Optional[str] = None  # None when there are no older messages
+    total_count: int = 0  # Messages stored for the conversation/user, before since/before bounds
+
+
+def format_key_timestamp(timestamp: datetime) -> str:
+    """Format a datetime as a sortable key timestamp (naive UTC)."""
+    if timestamp.tzinfo is not None:
+        timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+    return timestamp.strftime(KEY_TIMESTAMP_FORMAT)
+
+
+def encode_history_cursor(key: bytes) -> str:
+    """Encode an LMDB key as an opaque, URL-safe continuation cursor."""
+    return base64.urlsafe_b64encode(key).decode("ascii").rstrip("=")
+
+
+def decode_history_cursor(cursor: str) -> bytes:
+    """Decode a continuation cursor back into the LMDB key it points at."""
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        key = base64.urlsafe_b64decode(padded.encode("ascii"))
+        key.decode("utf-8")
+    except (ValueError, UnicodeError) as e:
+        raise InvalidCursorError(f"Malformed history cursor: {e}") from e
+    if not key:
+        raise InvalidCursorError("Empty history cursor")
+    return key
+
 
 class WorkingMemoryStore:
     """
@@ -65,6 +128,7 @@ class WorkingMemoryStore:
         self._db_path = get_lmdb_path(self.config)
         self._named_dbs = self.config.get("core.memory.working.named_databases", [])
         self._ttl_seconds = self.config.get("core.memory.working.ttl_seconds", 2592000)  # Default: 30 days (fallback if config missing)
+        self._db_names = list(dict.fromkeys([*self._named_dbs, "session_memory", USER_INDEX_DB, COUNTS_DB]))
 
     async def initialize(self) -> None:
         """Initialize LMDB environment and open named databases."""
@@ -74,12 +138,15 @@ class WorkingMemoryStore:
         logger.info(f"[DEBUG] WorkingMemoryStore: Initializing at {self._db_path}")
         try:
             initialize_lmdb_env(self.config)
-            self.env = lmdb.open(str(self._db_path), max_dbs=len(self._named_dbs) + 1)
+            self.env = lmdb.open(str(self._db_path), max_dbs=len(self._db_names) + 1)
 
             # Open handles to named databases (create if they don't exist)
-            for db_name in self._named_dbs:
+            for db_name in self._db_names:
                 self.dbs[db_name] = self.env.open_db(db_name.encode('utf-8'), create=True)
 
+            self._initialized = True
+            self._normalize_legacy_keys()
+            self._ensure_indexes()
 
         except Exception as e:
             logger.error(f"Failed to initialize working memory store: {e}")
@@ -100,7 +167,7 @@ class WorkingMemoryStore:
 
             timestamp = datetime.utcnow()
             # Use conversation_id as primary key with timestamp for ordering
-            key_str = f"{conversation_id}:{timestamp.isoformat()}Z"
+            key_str = f"{conversation_id}:{format_key_timestamp(timestamp)}Z"
             key = key_str.encode('utf-8')
 
             # Convert datetime objects to ISO format strings for JSON serialization
@@ -129,7 +196,12 @@ class WorkingMemoryStore:
             }
 
             with self.env.begin(write=True, db=db) as txn:
-                txn.put(key, json.dumps(storage_data).encode('utf-8'))
+                is_new = txn.put(key, json.dumps(storage_data).encode('utf-8'), overwrite=False)
+                if is_new:
+                    self._index_message(txn, key, storage_data, delta=1)
+                else:
+                    # Same conversation and microsecond: replace, counts unchanged
+                    txn.put(key, json.dumps(storage_data).encode('utf-8'))
 
             logger.info(f"💾 [WORKING_MEMORY] ✅ Message stored successfully")
             return True
@@ -140,137 +212,132 @@ class WorkingMemoryStore:
 
     async def retrieve_conversation_history(self, conversation_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Retrieve recent messages for a given conversation_id."""
-        if not self._initialized:
-            await self.initialize()
-
         logger.info(f"🔍 [WORKING_MEMORY] Retrieving history for conversation {conversation_id} (limit: {limit})")
-
-        history = []
         try:
-            db = self.dbs.get("session_memory")
-            if db is None:
-                raise ConnectionError("session_memory database not open.")
-
-            logger.info(f"[DEBUG] WorkingMemoryStore: Retrieving history for conversation {conversation_id}.")
-            with self.env.begin(db=db) as txn:
-                cursor = txn.cursor()
-                # Seek to the start of the desired conversation
-                prefix = f"{conversation_id}:".encode('utf-8')
-                if cursor.set_range(prefix):
-                    for key, value in cursor:
-                        if not key.startswith(prefix):
-                            break  # Moved past the desired conversation
-
-                        data = json.loads(value.decode('utf-8'))
-                        if self._is_expired(data):
-                            # Optional: could delete expired entries here in a separate write txn
-                            continue
-
-                        # Update temporal metadata on access
-                        self._update_temporal_access(data)
-                        history.append(data)
-                        # Don't break early - collect ALL messages for this conversation
-
-            # CRITICAL: Sort by timestamp FIRST, then limit
-            # LMDB iterates in lexicographical key order, not timestamp order
-            history.sort(key=lambda x: x.get("_stored_at"), reverse=True)
-            
-            # Now take the most recent N messages after sorting
-            history = history[:limit]
-            
-            logger.info(f"🔍 [WORKING_MEMORY] ✅ Retrieved {len(history)} messages from conversation history")
-            return history
-
+            page = await self.retrieve_history_page(conversation_id=conversation_id, limit=limit)
+            logger.info(f"🔍 [WORKING_MEMORY] ✅ Retrieved {len(page.messages)} messages from conversation history")
+            return page.messages
         except Exception as e:
             logger.error(f"🔍 [WORKING_MEMORY] ❌ Failed to retrieve conversation history: {e}")
             return []
 
     async def retrieve_user_history(self, user_id: str, limit: int = 50) -> List[Dict[str, Any]]:
         """Retrieve recent messages for a given user_id across all conversations."""
-        if not self._initialized:
-            await self.initialize()
-
         logger.info(f"🔍 [WORKING_MEMORY] Retrieving history for user {user_id} (limit: {limit})")
-
-        history = []
         try:
-            db = self.dbs.get("session_memory")
-            if db is None:
-                raise ConnectionError("session_memory database not open.")
+            page = await self.retrieve_history_page(user_id=user_id, limit=limit)
+            logger.info(f"🔍 [WORKING_MEMORY] ✅ Retrieved {len(page.messages)} messages from user history")
+            return page.messages
+        except Exception as e:
+            logger.error(f"🔍 [WORKING_MEMORY] ❌ Failed to retrieve user history: {e}")
+            return []
 
-            logger.info(f"[DEBUG] WorkingMemoryStore: Retrieving history for user {user_id}.")
-            with self.env.begin(db=db) as txn:
-                cursor = txn.cursor()
-                # Iterate through all keys to find messages for this user
-                # CRITICAL: Collect ALL messages first, then sort, then limit
-                for key, value in cursor:
+    async def retrieve_history_page(
+        self,
+        conversation_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        limit: Optional[int] = 50,
+        cursor: Optional[str] = None,
+        since: Optional[datetime] = None,
+        before: Optional[datetime] = None,
+    ) -> HistoryPage:
+        """
+        Read one page of history, newest first, with a range scan.
+
+        Scoped to a conversation when conversation_id is given, otherwise to
+        all of the user's conversations via the user index. The scan walks
+        backwards from min(before, cursor) and stops at since or after
+        ``limit`` live messages, so deep pages cost the same as the first.
+
+        Args:
+            conversation_id: Conversation to read (takes precedence over user_id)
+            user_id: User whose messages to read across conversations
+            limit: Page size; None reads every message in range
+            cursor: next_cursor from the previous page
+            since: Only messages stored at or after this time
+            before: Only messages stored strictly before this time
+
+        Raises:
+            InvalidCursorError: If the cursor is malformed or from another scope
+        """
+        if not self._initialized:
+            await self.initialize()
+        if conversation_id is None and user_id is None:
+            raise ValueError("conversation_id or user_id is required")
+
+        if conversation_id is not None:
+            prefix = f"{conversation_id}:".encode('utf-8')
+            scan_db = self.dbs["session_memory"]
+            count_key = f"c:{conversation_id}".encode('utf-8')
+        else:
+            prefix = f"{user_id}:".encode('utf-8')
+            scan_db = self.dbs[USER_INDEX_DB]
+            count_key = f"u:{user_id}".encode('utf-8')
+
+        lower = prefix + format_key_timestamp(since).encode('ascii') if since else prefix
+        upper = prefix + format_key_timestamp(before).encode('ascii') if before else prefix + _PREFIX_END
+        if cursor:
+            cursor_key = decode_history_cursor(cursor)
+            if not cursor_key.startswith(prefix):
+                raise InvalidCursorError("History cursor does not belong to this conversation or user")
+            upper = min(upper, cursor_key)
+
+        session_db = self.dbs["session_memory"]
+        page = HistoryPage()
+        last_key = None
+        with self.env.begin() as txn:
+            page.total_count = self._read_count(txn, count_key)
+            for key, value in self._scan_backward(txn, scan_db, prefix, lower, upper):
+                if limit is not None and len(page.messages) >= limit:
+                    # At least one more message in range: hand out a cursor
+                    if last_key is not None:
+                        page.next_cursor = encode_history_cursor(last_key)
+                    break
+                if scan_db is session_db:
+                    # Skip conversations whose id merely starts with this one's ("a" vs "a:b")
+                    match = _MESSAGE_KEY_PATTERN.match(key.decode('utf-8', errors='replace'))
+                    if not match or match.group("conversation_id") != conversation_id:
+                        continue
+                else:
+                    value = txn.get(value, db=session_db)
+                    if value is None:
+                        continue
+                try:
                     data = json.loads(value.decode('utf-8'))
-                    
-                    # Check if message belongs to this user
-                    if data.get('user_id') == user_id:
-                        if self._is_expired(data):
-                            continue
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                if self._is_expired(data):
+                    continue
 
-                        history.append(data)
-                        # Don't break early - collect ALL messages for proper sorting
+                # Update temporal metadata on access
+                self._update_temporal_access(data)
+                page.messages.append(data)
+                last_key = key
 
-            # Sort by timestamp (newest first) THEN limit
-            history.sort(key=lambda x: x.get("_stored_at"), reverse=True)
-            history = history[:limit]  # Take only the most recent N messages after sorting
-            
-            logger.info(f"🔍 [WORKING_MEMORY] ✅ Retrieved {len(history)} messages from user history")
-            return history
+        return page
 
-        except Exception as e:
-            logger.error(f"🔍 [WORKING_MEMORY] ❌ Failed to retrieve user history: {e}")
-            return []
+    def get_message_count(self, conversation_id: Optional[str] = None, user_id: Optional[str] = None) -> int:
+        """Number of messages stored for a conversation or user (O(1) counter read)."""
+        if not self._initialized or self.env is None:
+            return 0
+        if conversation_id is not None:
+            count_key = f"c:{conversation_id}".encode('utf-8')
+        elif user_id is not None:
+            count_key = f"u:{user_id}".encode('utf-8')
+        else:
+            raise ValueError("conversation_id or user_id is required")
+        with self.env.begin() as txn:
+            return self._read_count(txn, count_key)
 
     async def _get_recent_user_messages(self, user_id: str, hours: int = 24) -> List[Dict[str, Any]]:
         """Get recent messages for a user across all threads within the specified time window."""
-        if not self._initialized:
-            await self.initialize()
-
-        recent_messages = []
         cutoff_time = datetime.utcnow() - timedelta(hours=hours)
         logger.debug(f"Cutoff time for recent messages: {cutoff_time} UTC")
-        
-        try:
-            db = self.dbs.get("session_memory")
-            if db is None:
-                raise ConnectionError("session_memory database not open.")
 
-            with self.env.begin(db=db) as txn:
-                cursor = txn.cursor()
-                for key, value in cursor:
-                    try:
-                        data = json.loads(value.decode('utf-8'))
-                        
-                        # Check if message belongs to this user
-                        if data.get('user_id') == user_id:
-                            # Check if message is within time window
-                            timestamp_str = data.get('timestamp')
-                            if timestamp_str:
-                                # Parse timestamp as UTC (remove timezone info for consistent comparison)
-                                if timestamp_str.endswith('Z'):
-                                    timestamp = datetime.fromisoformat(timestamp_str[:-1])
-                                elif '+' in timestamp_str or timestamp_str.endswith('+00:00'):
-                                    timestamp = datetime.fromisoformat(timestamp_str.replace('+00:00', ''))
-                                else:
-                                    # Assume UTC if no timezone info
-                                    timestamp = datetime.fromisoformat(timestamp_str)
-                                
-                                logger.debug(f"Message timestamp: {timestamp} UTC, cutoff: {cutoff_time} UTC")
-                                if timestamp >= cutoff_time:
-                                    recent_messages.append(data)
-                                    logger.debug(f"Message included (within {hours}h window)")
-                                else:
-                                    logger.debug(f"Message excluded (outside {hours}h window)")
-                    except (json.JSONDecodeError, ValueError) as e:
-                        logger.warning(f"Failed to parse message data: {e}")
-                        continue
-
-            logger.debug(f"Found {len(recent_messages)} recent messages for user {user_id} within {hours}h window")
-            return recent_messages
+        try:
+            page = await self.retrieve_history_page(user_id=user_id, limit=None, since=cutoff_time)
+            logger.debug(f"Found {len(page.messages)} recent messages for user {user_id} within {hours}h window")
+            return page.messages
 
         except Exception as e:
             logger.error(f"Failed to get recent user messages: {e}")
@@ -305,19 +372,20 @@ class WorkingMemoryStore:
                     try:
                         data = json.loads(value.decode('utf-8'))
                         if self._is_expired(data):
-                            expired_keys.append(key)
+                            expired_keys.append((key, data))
                     except (json.JSONDecodeError, UnicodeDecodeError):
                         # Invalid data, mark for deletion
-                        expired_keys.append(key)
+                        expired_keys.append((key, {}))
             
             logger.info(f"Checked {total_checked} entries, found {len(expired_keys)} expired")
             
             # Delete expired entries in a write transaction
             if expired_keys:
                 with self.env.begin(db=session_db, write=True) as txn:
-                    for key in expired_keys:
-                        txn.delete(key)
-                        deleted_count += 1
+                    for key, data in expired_keys:
+                        if txn.delete(key):
+                            self._index_message(txn, key, data, delta=-1)
+                            deleted_count += 1
                 
                 logger.info(f"Cleaned up {deleted_count} expired entries from working memory")
             else:
@@ -337,6 +405,106 @@ class WorkingMemoryStore:
             self._initialized = False
             logger.info("Working memory store cleaned up.")
 
+    def _scan_backward(self, txn, db, prefix: bytes, lower: bytes, upper: bytes) -> Iterator[Tuple[bytes, bytes]]:
+        """Yield (key, value) pairs with lower <= key < upper under prefix, largest key first."""
+        cursor = txn.cursor(db=db)
+        if cursor.set_range(upper):
+            positioned = cursor.prev()
+        else:
+            positioned = cursor.last()
+
+        while positioned:
+            key = cursor.key()
+            if key < lower or not key.startswith(prefix):
+                return
+            yield key, cursor.value()
+            positioned = cursor.prev()
+
+    def _index_message(self, txn, key: bytes, data: Dict[str, Any], delta: int) -> None:
+        """Add (delta=1) or remove (delta=-1) a message's user index entry and counters."""
+        match = _MESSAGE_KEY_PATTERN.match(key.decode('utf-8', errors='replace'))
+        if not match:
+            return
+        conversation_id = match.group("conversation_id")
+        counts_db = self.dbs[COUNTS_DB]
+
+        self._add_count(txn, counts_db, f"c:{conversation_id}".encode('utf-8'), delta)
+
+        user_id = data.get("user_id")
+        if user_id:
+            index_key = f"{user_id}:{match.group('timestamp')}Z:{conversation_id}".encode('utf-8')
+            if delta > 0:
+                txn.put(index_key, key, db=self.dbs[USER_INDEX_DB])
+            else:
+                txn.delete(index_key, db=self.dbs[USER_INDEX_DB])
+            self._add_count(txn, counts_db, f"u:{user_id}".encode('utf-8'), delta)
+
+    def _add_count(self, txn, counts_db, count_key: bytes, delta: int) -> None:
+        count = max(0, self._read_count(txn, count_key) + delta)
+        if count:
+            txn.put(count_key, str(count).encode('ascii'), db=counts_db)
+        else:
+            txn.delete(count_key, db=counts_db)
+
+    def _read_count(self, txn, count_key: bytes) -> int:
+        raw = txn.get(count_key, db=self.dbs[COUNTS_DB])
+        return int(raw) if raw else 0
+
+    def _normalize_legacy_keys(self) -> None:
+        """
+        Rewrite keys stored with isoformat() timestamps in the fixed-width format.
+
+        isoformat() drops the fraction when microsecond == 0, and such a key
+        ("...:05Z") sorts after the fixed-width keys of the same second
+        ("...:05.123456Z"), so range scans would return it out of order.
+        """
+        session_db = self.dbs["session_memory"]
+        with self.env.begin() as txn:
+            legacy = []
+            for key in txn.cursor(db=session_db).iternext(keys=True, values=False):
+                match = _MESSAGE_KEY_PATTERN.match(key.decode('utf-8', errors='replace'))
+                if match and "." not in match.group("timestamp"):
+                    legacy.append((key, match))
+            indexed = txn.stat(self.dbs[COUNTS_DB])["entries"] > 0
+        if not legacy:
+            return
+
+        logger.info(f"Normalizing {len(legacy)} working memory keys without a timestamp fraction")
+        with self.env.begin(write=True) as txn:
+            for key, match in legacy:
+                new_key = f"{match.group('conversation_id')}:{match.group('timestamp')}.000000Z".encode('utf-8')
+                value = txn.get(key, db=session_db)
+                if value is None or txn.get(new_key, db=session_db) is not None:
+                    continue
+                try:
+                    data = json.loads(value.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    data = {}
+                txn.delete(key, db=session_db)
+                txn.put(new_key, value, db=session_db)
+                if indexed:
+                    # Counters are unchanged; only the user index entry moves
+                    self._index_message(txn, key, data, delta=-1)
+                    self._index_message(txn, new_key, data, delta=1)
+
+    def _ensure_indexes(self) -> None:
+        """Build the user index and counters for messages stored before they existed."""
+        session_db = self.dbs["session_memory"]
+        with self.env.begin() as txn:
+            stored = txn.stat(session_db)["entries"]
+            counted = txn.stat(self.dbs[COUNTS_DB])["entries"]
+        if stored == 0 or counted > 0:
+            return
+
+        logger.info(f"Building working memory history indexes for {stored} stored messages")
+        with self.env.begin(write=True) as txn:
+            for key, value in txn.cursor(db=session_db):
+                try:
+                    data = json.loads(value.decode('utf-8'))
+                except (json.JSONDecodeError, UnicodeDecodeError):
+                    continue
+                self._index_message(txn, key, data, delta=1)
+
     def _is_expired(self, data: Dict[str, Any]) -> bool:
         """Check if a data entry has expired."""
         expires_at_str = data.get("_expires_at")
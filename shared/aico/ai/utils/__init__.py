@@ -5,8 +5,12 @@ Shared utilities for AI processing across the AICO system.
 """
 
 from .language_detection import detect_language, LanguageDetectionResult
+from .similarity import EmbeddingMatrix, cosine_similarity_matrix, normalize_rows
 
 __all__ = [
     'detect_language',
     'LanguageDetectionResult',
+    'EmbeddingMatrix',
+    'cosine_similarity_matrix',
+    'normalize_rows',
 ]
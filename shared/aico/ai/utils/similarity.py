@@ -0,0 +1,163 @@
+"""
+Vectorized Similarity Kernels
+
+Shared cosine similarity helpers for hot paths that compare one or more
+query embeddings against a fixed set of reference embeddings (intent
+prototypes, label definitions, recent queries).
+
+Reference embeddings are stored pre-normalized in a contiguous float32
+matrix, so scoring a query is a single matrix-vector product instead of a
+Python loop of dot products and norms:
+
+- EmbeddingMatrix.scores():       (N,)   similarities for one query
+- EmbeddingMatrix.top_k():        best k keys for one query
+- EmbeddingMatrix.best_matches(): best key per query for a (M, D) batch
+"""
+
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+_EPSILON = 1e-12
+
+
+def normalize_rows(vectors: Any) -> np.ndarray:
+    """
+    L2-normalize embeddings into a C-contiguous float32 array.
+
+    Accepts a single vector (D,) or a matrix (N, D). Zero vectors stay zero,
+    so their similarity to anything is 0.0 rather than NaN.
+    """
+    array = np.array(vectors, dtype=np.float32, order="C", copy=True, ndmin=1)
+    norms = np.linalg.norm(array, axis=-1, keepdims=True)
+    np.divide(array, np.maximum(norms, _EPSILON), out=array)
+    return array
+
+
+def cosine_similarity_matrix(queries: Any, references: Any) -> np.ndarray:
+    """
+    Cosine similarity between every query and every reference.
+
+    Args:
+        queries: (M, D) or (D,) embeddings
+        references: (N, D) or (D,) embeddings
+
+    Returns:
+        (M, N) similarity matrix (dimensions of 1-D inputs are kept as 1)
+    """
+    q = np.atleast_2d(normalize_rows(queries))
+    r = np.atleast_2d(normalize_rows(references))
+    return q @ r.T
+
+
+class EmbeddingMatrix:
+    """
+    Keyed, pre-normalized embedding matrix for batched cosine top-k.
+
+    Keys keep insertion order; replacing an existing key updates its row in
+    place. The matrix is rebuilt lazily on the first query after a change, so
+    bulk loading costs one stack rather than one copy per insert.
+    """
+
+    def __init__(self, items: Optional[Iterable[Tuple[Hashable, Any]]] = None):
+        self._keys: List[Hashable] = []
+        self._index: Dict[Hashable, int] = {}
+        self._rows: List[np.ndarray] = []
+        self._matrix: Optional[np.ndarray] = None
+
+        if items is not None:
+            for key, vector in items:
+                self.set(key, vector)
+
+    def set(self, key: Hashable, vector: Any) -> None:
+        """Add or replace the embedding for ``key``."""
+        row = normalize_rows(vector).ravel()
+        if self._rows and row.shape != self._rows[0].shape:
+            raise ValueError(
+                f"Embedding dimension mismatch for {key!r}: "
+                f"expected {self._rows[0].shape[0]}, got {row.shape[0]}"
+            )
+
+        if key in self._index:
+            self._rows[self._index[key]] = row
+        else:
+            self._index[key] = len(self._keys)
+            self._keys.append(key)
+            self._rows.append(row)
+        self._matrix = None
+
+    def clear(self) -> None:
+        """Remove all embeddings."""
+        self._keys.clear()
+        self._index.clear()
+        self._rows.clear()
+        self._matrix = None
+
+    @property
+    def keys(self) -> List[Hashable]:
+        """Keys in row order."""
+        return list(self._keys)
+
+    @property
+    def matrix(self) -> np.ndarray:
+        """Normalized (N, D) float32 matrix in key order."""
+        if self._matrix is None:
+            if self._rows:
+                self._matrix = np.ascontiguousarray(np.vstack(self._rows))
+            else:
+                self._matrix = np.empty((0, 0), dtype=np.float32)
+        return self._matrix
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._index
+
+    def scores(self, query: Any) -> np.ndarray:
+        """Cosine similarity of one query against every row, shape (N,)."""
+        if not self._keys:
+            return np.empty(0, dtype=np.float32)
+        return self.matrix @ normalize_rows(query).ravel()
+
+    def score_map(self, query: Any) -> Dict[Hashable, float]:
+        """Cosine similarity of one query against every row, keyed by row key."""
+        return dict(zip(self._keys, self.scores(query).tolist()))
+
+    def top_k(self, query: Any, k: int = 1) -> List[Tuple[Hashable, float]]:
+        """
+        Best ``k`` keys for one query, highest similarity first.
+
+        Uses argpartition so selecting k out of N is O(N) rather than a full sort.
+        """
+        scores = self.scores(query)
+        n = scores.shape[0]
+        if n == 0 or k <= 0:
+            return []
+
+        k = min(k, n)
+        if k < n:
+            candidates = np.argpartition(-scores, k - 1)[:k]
+        else:
+            candidates = np.arange(n)
+        ordered = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return [(self._keys[i], float(scores[i])) for i in ordered]
+
+    def best_matches(self, queries: Sequence[Any]) -> List[Tuple[Optional[Hashable], float]]:
+        """
+        Best key per query for a batch, via one (M, D) x (D, N) product.
+
+        Returns:
+            One (key, similarity) pair per query; (None, 0.0) if the matrix is empty
+        """
+        if len(queries) == 0:
+            return []
+        if not self._keys:
+            return [(None, 0.0)] * len(queries)
+
+        similarities = np.atleast_2d(normalize_rows(queries)) @ self.matrix.T
+        best = similarities.argmax(axis=1)
+        return [
+            (self._keys[j], float(similarities[i, j]))
+            for i, j in enumerate(best.tolist())
+        ]
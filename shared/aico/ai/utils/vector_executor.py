@@ -0,0 +1,287 @@
+"""
+Vector Store Executor
+
+Runs synchronous ChromaDB calls off the event loop for every store that
+shares the embedded ChromaDB client (semantic memory, knowledge graph).
+
+The ChromaDB client is blocking: HNSW queries and SQLite-backed metadata
+writes would otherwise stall the backend event loop that also serves HTTP,
+WebSockets and message bus dispatch. This executor provides:
+
+- A bounded thread pool shared by all collections (one place to size it)
+- Coalescing of concurrent upserts to the same collection into one batched
+  write; if the batch fails, each caller's part is retried on its own so a
+  bad request cannot fail its neighbours
+- Per-operation latency histograms (``collection.operation``) for monitoring
+
+The thread pool is independent of any event loop, so one executor serves
+callers on different loops (e.g. successive asyncio.run calls in the CLI);
+coalesced upserts are only batched with requests from the same loop.
+"""
+
+import asyncio
+import bisect
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, List, Optional, Set, Tuple
+
+from aico.core.logging import get_logger
+
+logger = get_logger("shared", "ai.utils.vector_executor")
+
+# Latency histogram bucket upper bounds in milliseconds (last bucket is +inf)
+LATENCY_BUCKETS_MS: Tuple[float, ...] = (1, 2, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Fixed-bucket latency histogram (thread-safe)."""
+
+    def __init__(self, buckets_ms: Tuple[float, ...] = LATENCY_BUCKETS_MS):
+        self.buckets_ms = buckets_ms
+        self.counts = [0] * (len(buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def observe(self, elapsed_ms: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, elapsed_ms)] += 1
+            self.count += 1
+            self.total_ms += elapsed_ms
+            self.max_ms = max(self.max_ms, elapsed_ms)
+
+    def percentile(self, fraction: float) -> float:
+        """Upper bucket bound below which ``fraction`` of observations fall."""
+        with self._lock:
+            if self.count == 0:
+                return 0.0
+            threshold = fraction * self.count
+            seen = 0
+            for bound, bucket_count in zip(self.buckets_ms, self.counts):
+                seen += bucket_count
+                if seen >= threshold:
+                    return float(bound)
+            return self.max_ms
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            labels = [f"le_{bound:g}ms" for bound in self.buckets_ms] + ["le_inf"]
+            snapshot = {
+                "count": self.count,
+                "avg_ms": self.total_ms / self.count if self.count else 0.0,
+                "max_ms": self.max_ms,
+                "buckets": dict(zip(labels, self.counts)),
+            }
+        snapshot["p50_ms"] = self.percentile(0.5)
+        snapshot["p95_ms"] = self.percentile(0.95)
+        snapshot["p99_ms"] = self.percentile(0.99)
+        return snapshot
+
+
+@dataclass
+class _PendingUpsert:
+    """Upsert requests waiting to be coalesced for one collection on one event loop."""
+    loop: asyncio.AbstractEventLoop
+    collection: Any
+    requests: List[Tuple[Dict[str, List[Any]], asyncio.Future]] = field(default_factory=list)
+    size: int = 0
+    flush_handle: Optional[asyncio.TimerHandle] = None
+
+
+class VectorStoreExecutor:
+    """Bounded thread pool for ChromaDB calls with coalesced upserts and latency metrics."""
+
+    def __init__(self, max_workers: int = 4, coalesce_window_ms: float = 2.0, max_batch_size: int = 256):
+        """
+        Args:
+            max_workers: Threads available for ChromaDB calls
+            coalesce_window_ms: How long an upsert waits for others to join its batch
+            max_batch_size: Flush a coalesced batch early once it reaches this many items
+        """
+        self.max_workers = max_workers
+        self.coalesce_window = coalesce_window_ms / 1000.0
+        self.max_batch_size = max_batch_size
+
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="aico-vector")
+        self._pending: Dict[Tuple[int, int], _PendingUpsert] = {}  # (loop, collection) ids
+        self._flush_tasks: Set[asyncio.Task] = set()  # In-flight coalesced writes, on any loop
+        self._histograms: Dict[str, LatencyHistogram] = {}
+        self._histograms_lock = threading.Lock()
+
+        self.upsert_requests = 0
+        self.upsert_batches = 0
+
+    async def run(self, collection: Any, operation: str, func: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run ``func(*args, **kwargs)`` on the pool, timed as ``<collection>.<operation>``."""
+        metric = f"{getattr(collection, 'name', 'chromadb')}.{operation}"
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._pool, self._timed, metric, func, args, kwargs)
+
+    async def query(self, collection: Any, **kwargs) -> Any:
+        return await self.run(collection, "query", collection.query, **kwargs)
+
+    async def get(self, collection: Any, **kwargs) -> Any:
+        return await self.run(collection, "get", collection.get, **kwargs)
+
+    async def update(self, collection: Any, **kwargs) -> Any:
+        return await self.run(collection, "update", collection.update, **kwargs)
+
+    async def delete(self, collection: Any, **kwargs) -> Any:
+        return await self.run(collection, "delete", collection.delete, **kwargs)
+
+    async def count(self, collection: Any) -> int:
+        return await self.run(collection, "count", collection.count)
+
+    async def upsert(
+        self,
+        collection: Any,
+        ids: List[str],
+        embeddings: Optional[List[Any]] = None,
+        documents: Optional[List[str]] = None,
+        metadatas: Optional[List[Dict[str, Any]]] = None,
+    ) -> None:
+        """
+        Upsert into ``collection``, coalesced with concurrent upserts to the same collection.
+
+        Requests arriving within the coalescing window are written with a single
+        ``collection.upsert`` call. Returns once this request's items are written.
+        """
+        if not ids:
+            return
+
+        columns = {"ids": list(ids), "embeddings": embeddings, "documents": documents, "metadatas": metadatas}
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self.upsert_requests += 1
+
+        key = (id(loop), id(collection))
+        pending = self._pending.get(key)
+        if pending is None:
+            # Batches left behind by closed loops can never flush (their timers are gone)
+            self._pending = {k: p for k, p in self._pending.items() if not p.loop.is_closed()}
+            pending = self._pending[key] = _PendingUpsert(loop=loop, collection=collection)
+            pending.flush_handle = loop.call_later(self.coalesce_window, self._start_flush, key, collection)
+        pending.requests.append((columns, future))
+        pending.size += len(ids)
+
+        if pending.size >= self.max_batch_size:
+            self._start_flush(key, collection)
+
+        await future
+
+    def get_metrics(self) -> Dict[str, Any]:
+        """Latency histograms per ``collection.operation`` and coalescing counters."""
+        with self._histograms_lock:
+            histograms = dict(self._histograms)
+        return {
+            "max_workers": self.max_workers,
+            "upsert_requests": self.upsert_requests,
+            "upsert_batches": self.upsert_batches,
+            "operations": {name: histogram.snapshot() for name, histogram in histograms.items()},
+        }
+
+    async def drain(self) -> None:
+        """Flush this event loop's coalesced upserts now and wait for its in-flight writes."""
+        loop = asyncio.get_running_loop()
+        for key in [k for k, p in self._pending.items() if p.loop is loop]:
+            self._start_flush(key, self._pending[key].collection)
+        tasks = [task for task in self._flush_tasks if task.get_loop() is loop]
+        if tasks:
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+    def shutdown(self, wait: bool = True) -> None:
+        """Stop the thread pool (``drain`` each event loop first to write pending upserts)."""
+        self._pool.shutdown(wait=wait)
+
+    def _timed(self, metric: str, func: Callable[..., Any], args: tuple, kwargs: dict) -> Any:
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            elapsed_ms = (time.perf_counter() - start) * 1000.0
+            with self._histograms_lock:
+                histogram = self._histograms.get(metric)
+                if histogram is None:
+                    histogram = self._histograms[metric] = LatencyHistogram()
+            histogram.observe(elapsed_ms)
+
+    def _start_flush(self, key: Tuple[int, int], collection: Any) -> None:
+        pending = self._pending.pop(key, None)
+        if pending is None:
+            return
+        if pending.flush_handle is not None:
+            pending.flush_handle.cancel()
+        task = pending.loop.create_task(self._flush(collection, pending.requests))
+        self._flush_tasks.add(task)
+        task.add_done_callback(self._flush_tasks.discard)
+
+    async def _flush(self, collection: Any, requests: List[Tuple[Dict[str, List[Any]], asyncio.Future]]) -> None:
+        self.upsert_batches += 1
+        try:
+            await self.run(collection, "upsert", collection.upsert, **_merge_upserts([c for c, _ in requests]))
+            for _, future in requests:
+                if not future.done():
+                    future.set_result(None)
+            return
+        except Exception as e:
+            if len(requests) == 1:
+                if not requests[0][1].done():
+                    requests[0][1].set_exception(e)
+                return
+            logger.warning(f"Coalesced upsert of {len(requests)} requests failed, retrying individually: {e}")
+
+        for columns, future in requests:
+            try:
+                await self.run(collection, "upsert", collection.upsert, **_merge_upserts([columns]))
+                if not future.done():
+                    future.set_result(None)
+            except Exception as e:
+                if not future.done():
+                    future.set_exception(e)
+
+
+def _merge_upserts(requests: List[Dict[str, List[Any]]]) -> Dict[str, Any]:
+    """Concatenate upsert columns; a later write of the same id wins, as with sequential upserts."""
+    positions: Dict[str, int] = {}
+    merged: Dict[str, List[Any]] = {"ids": [], "embeddings": [], "documents": [], "metadatas": []}
+    present = {name for request in requests for name, values in request.items() if values is not None}
+
+    for request in requests:
+        for i, item_id in enumerate(request["ids"]):
+            row = {name: request[name][i] if request.get(name) is not None else None for name in present}
+            if item_id in positions:
+                index = positions[item_id]
+            else:
+                index = positions[item_id] = len(merged["ids"])
+                merged["ids"].append(item_id)
+                for name in present - {"ids"}:
+                    merged[name].append(None)
+            for name in present - {"ids"}:
+                merged[name][index] = row[name]
+
+    return {name: merged[name] for name in present}
+
+
+# Process-wide executor shared by all stores using the embedded ChromaDB client
+_executor: Optional[VectorStoreExecutor] = None
+
+
+def get_vector_executor(config: Any = None) -> VectorStoreExecutor:
+    """
+    Get the process-wide vector store executor.
+
+    Sized from ``core.memory.vector_executor`` when a ConfigurationManager is
+    passed on first use; later calls return the same instance.
+    """
+    global _executor
+    if _executor is None:
+        settings = config.get("core.memory.vector_executor", {}) if config is not None else {}
+        _executor = VectorStoreExecutor(
+            max_workers=settings.get("max_workers", 4),
+            coalesce_window_ms=settings.get("coalesce_window_ms", 2.0),
+            max_batch_size=settings.get("max_batch_size", 256),
+        )
+    return _executor
@@ -4,25 +4,51 @@ AICO Core Module
 
 Provides core functionality for the AICO system including configuration management,
 logging, path resolution, and message bus communication.
+
+Exports are resolved lazily (PEP 562): importing a submodule such as
+``aico.core.config`` does not pull in the message bus (ZeroMQ) or the
+generated protobuf modules until one of those names is actually used.
 """
 
-from .config import ConfigurationManager
-from .logging import get_logger, AICOLogger
-from .paths import AICOPaths
-from .topics import AICOTopics, TopicPermissions
-from .bus import (
-    MessageBusClient, 
-    MessageBusBroker, 
-    create_client,
-    create_broker
-)
-
-# Optional protobuf imports to avoid chicken/egg problem with CLI
-try:
-    from ..proto.aico_core_envelope_pb2 import AicoMessage, MessageMetadata
-except ImportError:
-    # Protobuf files not generated yet - use fallbacks
-    AicoMessage = None
-    MessageMetadata = None
+import importlib
+
+_EXPORTS = {
+    'ConfigurationManager': '.config',
+    'get_logger': '.logging',
+    'AICOLogger': '.logging',
+    'AICOPaths': '.paths',
+    'AICOTopics': '.topics',
+    'TopicPermissions': '.topics',
+    'MessageBusClient': '.bus',
+    'MessageBusBroker': '.bus',
+    'create_client': '.bus',
+    'create_broker': '.bus',
+}
+
+# Optional protobuf exports to avoid chicken/egg problem with CLI
+_OPTIONAL_EXPORTS = {
+    'AicoMessage': '..proto.aico_core_envelope_pb2',
+    'MessageMetadata': '..proto.aico_core_envelope_pb2',
+}
+
+
+def __getattr__(name):
+    if name in _EXPORTS:
+        value = getattr(importlib.import_module(_EXPORTS[name], __name__), name)
+    elif name in _OPTIONAL_EXPORTS:
+        try:
+            value = getattr(importlib.import_module(_OPTIONAL_EXPORTS[name], __name__), name)
+        except ImportError:
+            # Protobuf files not generated yet - use fallbacks
+            value = None
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(list(globals()) + list(_EXPORTS) + list(_OPTIONAL_EXPORTS))
+
 
 __all__ = ['ConfigurationManager', 'get_logger', 'AICOLogger', 'AICOPaths', 'MessageBusClient', 'MessageBusBroker', 'AicoMessage', 'MessageMetadata', 'create_client', 'create_broker']
@@ -3,19 +3,26 @@ AICO Configuration Management System
 
 Provides unified, hierarchical configuration management across all AICO subsystems
 with encryption, validation, and hot reloading capabilities.
+
+Reads are served from an immutable ConfigSnapshot that is swapped atomically
+on reload/set, so a reader never observes a half-loaded configuration. Hot
+paths should hold a precompiled ConfigAccessor (``config.accessor(key)``):
+its key path is split once and its value re-resolved only when the snapshot
+version changes. Components that derive settings from configuration can
+``subscribe`` to be notified after each swap.
 """
 
+import copy
 import json
+import logging
 import os
 import threading
 import yaml
 from pathlib import Path
-from typing import Any, Dict, Optional, List, Union
+from typing import Any, Callable, Dict, Optional, List, Tuple, Union
 from dataclasses import dataclass
 from enum import Enum
 
-import jsonschema
-
 
 class ConfigurationError(Exception):
     """Configuration-related errors."""
@@ -36,6 +43,87 @@ class ConfigSource:
     data: Optional[Dict[str, Any]] = None
 
 
+_MISSING = object()
+
+
+@dataclass(frozen=True)
+class ConfigSnapshot:
+    """
+    One published version of the merged configuration.
+
+    ``data`` is shared with readers and must be treated as read-only; changes
+    go through ConfigurationManager.set/reload, which publish a new snapshot.
+    """
+    version: int
+    data: Dict[str, Any]
+
+    def resolve(self, path: Tuple[str, ...], default: Any = None) -> Any:
+        """Value at a precompiled key path, or ``default`` if any segment is missing."""
+        value = self.data
+        for key in path:
+            if isinstance(value, dict) and key in value:
+                value = value[key]
+            else:
+                return default
+        return value
+
+
+class ConfigAccessor:
+    """
+    Precompiled handle for one configuration key.
+
+    The dotted key is split once; the value (optionally passed through
+    ``cast``) is cached per snapshot version, so a read is one attribute
+    load and an integer comparison until the configuration changes.
+
+    Example:
+        max_results = config.accessor("core.memory.semantic.max_results", 10, cast=int)
+        limit = max_results()  # or max_results.value
+    """
+
+    __slots__ = ("_manager", "key", "path", "default", "cast", "_version", "_value")
+
+    def __init__(self, manager: "ConfigurationManager", key: str, default: Any = None,
+                 cast: Optional[Callable[[Any], Any]] = None):
+        self._manager = manager
+        self.key = key
+        self.path = tuple(key.split('.'))
+        self.default = default
+        self.cast = cast
+        self._version = -1
+        self._value = default
+
+    def __call__(self) -> Any:
+        snapshot = self._manager._snapshot
+        if snapshot is None or snapshot.version != self._version:
+            return self._resolve()
+        return self._value
+
+    @property
+    def value(self) -> Any:
+        return self()
+
+    def _resolve(self) -> Any:
+        snapshot = self._manager.snapshot()
+        value = snapshot.resolve(self.path, _MISSING)
+        if value is _MISSING:
+            value = self.default
+        elif self.cast is not None:
+            try:
+                value = self.cast(value)
+            except (TypeError, ValueError):
+                logging.getLogger("shared.core.config").warning(
+                    f"⚠️ [CONFIG_WARNING] Configuration key '{self.key}' has invalid value {value!r}, using default"
+                )
+                value = self.default
+        self._value = value
+        self._version = snapshot.version
+        return value
+
+    def __repr__(self) -> str:
+        return f"ConfigAccessor({self.key!r})"
+
+
 class ConfigurationManager:
     """
     Unified configuration management for AICO.
@@ -50,7 +138,8 @@ class ConfigurationManager:
     Features:
     - Dot-notation access (e.g., 'api.port', 'personality.traits.openness')
     - Schema validation using JSON Schema
-    - Hot reloading with file watchers
+    - Hot reloading with file watchers (atomic snapshot swap + subscribers)
+    - Precompiled accessors for hot-path reads
     - Encrypted storage for sensitive configuration
     - Audit trail for configuration changes
     
@@ -105,6 +194,13 @@ class ConfigurationManager:
         self.encryption_key: Optional[bytes] = None
         self._instance_initialized = False
         
+        # Published configuration and change notification
+        self._snapshot: Optional[ConfigSnapshot] = None
+        self._snapshot_lock = threading.RLock()
+        self._key_paths: Dict[str, Tuple[str, ...]] = {}
+        self._subscribers: List[Tuple[Callable[[ConfigSnapshot], None], Optional[Tuple[Tuple[str, ...], ...]]]] = []
+        self._loading = False
+        
     def initialize(self, encryption_key: Optional[bytes] = None, lightweight: bool = False) -> None:
         """
         Initialize configuration system.
@@ -119,7 +215,7 @@ class ConfigurationManager:
         self.encryption_key = encryption_key
         self._ensure_directories()
         self._load_schemas()
-        self._load_configurations()
+        self._rebuild_configuration()
         
         # Skip file watchers in lightweight mode (for --help, version, etc.)
         if not lightweight:
@@ -139,11 +235,11 @@ class ConfigurationManager:
         Returns:
             Configuration value or default
         """
-        if not self._instance_initialized:
-            self.initialize()
-            
-        keys = key.split('.')
-        value = self.config_cache
+        snapshot = self._snapshot if self._instance_initialized else self.snapshot()
+        keys = self._key_paths.get(key)
+        if keys is None:
+            keys = self._key_paths[key] = tuple(key.split('.'))
+        value = snapshot.data
         
         for k in keys:
             if isinstance(value, dict) and k in value:
@@ -152,21 +248,68 @@ class ConfigurationManager:
                 # Log when returning default for missing config keys
                 if default == {} and len(keys) > 1:
                     # This is likely a config section that should exist
-                    import logging
                     logger = logging.getLogger("shared.core.config")
                     logger.error(f"🚨 [CONFIG_ERROR] Configuration key '{key}' not found! Returning empty dict.")
-                    logger.error(f"🚨 [CONFIG_ERROR] Available keys at root: {list(self.config_cache.keys()) if isinstance(self.config_cache, dict) else 'Not a dict'}")
+                    logger.error(f"🚨 [CONFIG_ERROR] Available keys at root: {list(snapshot.data.keys()) if isinstance(snapshot.data, dict) else 'Not a dict'}")
                     logger.error(f"🚨 [CONFIG_ERROR] This may cause silent initialization failures!")
                 return default
                 
         # Additional check: warn if returning an empty dict for a config section
         if isinstance(value, dict) and not value and len(keys) > 1:
-            import logging
             logger = logging.getLogger("shared.core.config")
             logger.warning(f"⚠️ [CONFIG_WARNING] Configuration section '{key}' exists but is EMPTY!")
             
         return value
         
+    def accessor(self, key: str, default: Any = None,
+                 cast: Optional[Callable[[Any], Any]] = None) -> ConfigAccessor:
+        """
+        Precompiled accessor for a hot-path configuration key.
+        
+        Args:
+            key: Configuration key in dot notation
+            default: Value returned when the key is missing
+            cast: Optional conversion applied once per configuration version (e.g. int)
+            
+        Returns:
+            Callable handle returning the current value
+        """
+        return ConfigAccessor(self, key, default, cast)
+    
+    def snapshot(self) -> ConfigSnapshot:
+        """Current published configuration snapshot (initializes on first use)."""
+        if self._snapshot is None:
+            self.initialize()
+        return self._snapshot
+    
+    def subscribe(self, callback: Callable[[ConfigSnapshot], None],
+                  keys: Optional[List[str]] = None) -> Callable[[], None]:
+        """
+        Call ``callback(snapshot)`` after each configuration change.
+        
+        Callbacks run synchronously on the thread that changed the
+        configuration (the file watcher thread for hot reloads) and must be
+        quick; exceptions are logged and do not affect other subscribers.
+        
+        Args:
+            callback: Receives the newly published snapshot
+            keys: Only notify when one of these dotted keys changed value
+            
+        Returns:
+            Function that removes the subscription
+        """
+        paths = tuple(tuple(key.split('.')) for key in keys) if keys else None
+        entry = (callback, paths)
+        with self._snapshot_lock:
+            self._subscribers.append(entry)
+        
+        def unsubscribe() -> None:
+            with self._snapshot_lock:
+                if entry in self._subscribers:
+                    self._subscribers.remove(entry)
+        
+        return unsubscribe
+    
     def set(self, key: str, value: Any, persist: bool = True) -> None:
         """
         Set configuration value using dot notation.
@@ -180,17 +323,25 @@ class ConfigurationManager:
             self.initialize()
             
         keys = key.split('.')
-        config = self.config_cache
         
-        # Navigate to parent
-        for k in keys[:-1]:
-            if k not in config:
-                config[k] = {}
-            config = config[k]
+        with self._snapshot_lock:
+            # While loading, the cache is not published yet and is edited in place;
+            # afterwards changes are made on a copy and published as a new snapshot
+            data = self.config_cache if self._loading else copy.deepcopy(self.config_cache)
+            config = data
             
-        # Set value
-        old_value = config.get(keys[-1])
-        config[keys[-1]] = value
+            # Navigate to parent
+            for k in keys[:-1]:
+                if k not in config:
+                    config[k] = {}
+                config = config[k]
+                
+            # Set value
+            old_value = config.get(keys[-1])
+            config[keys[-1]] = value
+            
+            if not self._loading:
+                self._publish(data)
         
         # Log configuration change
         self._log_config_change(key, old_value, value)
@@ -249,6 +400,9 @@ class ConfigurationManager:
         if domain not in self.schemas:
             raise ConfigurationError(f"Unknown configuration domain: {domain}")
             
+        # Imported on first use: validation is rare and jsonschema is slow to import
+        import jsonschema
+        
         try:
             jsonschema.validate(config, self.schemas[domain])
             return True
@@ -256,10 +410,13 @@ class ConfigurationManager:
             raise ConfigurationValidationError(f"Validation failed for domain '{domain}': {e.message}")
             
     def reload(self) -> None:
-        """Reload all configuration from files."""
-        self.config_cache.clear()
-        self.sources.clear()
-        self._load_configurations()
+        """
+        Reload all configuration from files.
+        
+        The new configuration is built aside and published in one swap, so
+        concurrent readers see either the old or the new snapshot.
+        """
+        self._rebuild_configuration()
         
     def export_config(self, domains: Optional[List[str]] = None) -> Dict[str, Any]:
         """
@@ -296,7 +453,10 @@ class ConfigurationManager:
                     self.validate(domain, domain_config)
                     
         # Deep merge imported configuration
-        self._deep_merge(self.config_cache, config)
+        with self._snapshot_lock:
+            data = copy.deepcopy(self.config_cache)
+            self._deep_merge(data, config)
+            self._publish(data)
         self._persist_configuration()
         
     def get_domains(self) -> List[str]:
@@ -343,6 +503,44 @@ class ConfigurationManager:
             except (json.JSONDecodeError, IOError) as e:
                 raise ConfigurationError(f"Failed to load schema '{schema_file}': {e}")
                 
+    def _rebuild_configuration(self) -> None:
+        """Load all sources into a fresh cache and publish it as a new snapshot."""
+        with self._snapshot_lock:
+            previous_cache, previous_sources = self.config_cache, self.sources
+            self.config_cache, self.sources = {}, []
+            self._loading = True
+            try:
+                self._load_configurations()
+            except Exception:
+                self.config_cache, self.sources = previous_cache, previous_sources
+                raise
+            finally:
+                self._loading = False
+            self._publish(self.config_cache)
+    
+    def _publish(self, data: Dict[str, Any]) -> None:
+        """Atomically swap in ``data`` as the current snapshot, then notify subscribers."""
+        with self._snapshot_lock:
+            previous = self._snapshot
+            version = previous.version + 1 if previous is not None else 0
+            self.config_cache = data
+            self._snapshot = current = ConfigSnapshot(version=version, data=data)
+            subscribers = list(self._subscribers)
+        
+        if previous is None:
+            return
+        for callback, paths in subscribers:
+            if paths is not None and all(
+                previous.resolve(path, _MISSING) == current.resolve(path, _MISSING) for path in paths
+            ):
+                continue
+            try:
+                callback(current)
+            except Exception as e:
+                logging.getLogger("shared.core.config").error(
+                    f"🚨 [CONFIG_ERROR] Configuration subscriber {getattr(callback, '__qualname__', callback)} failed: {e}"
+                )
+    
     def _load_configurations(self) -> None:
         """Load configuration from all sources in hierarchy order."""
         # 1. Load defaults
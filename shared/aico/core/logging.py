@@ -14,10 +14,9 @@ import os
 import sys
 import time
 import uuid
-import zmq
-import zmq.asyncio
 import asyncio
-from datetime import datetime
+import importlib.util
+from datetime import datetime, timedelta
 from enum import Enum
 from pathlib import Path
 from typing import Any, Dict, List, Optional, Union
@@ -74,11 +73,8 @@ from typing import TYPE_CHECKING
 if TYPE_CHECKING:
     from aico.core.config import ConfigurationManager
 
-try:
-    import zmq
-    ZMQ_AVAILABLE = True
-except ImportError:
-    ZMQ_AVAILABLE = False
+# zmq itself is imported when the first ZMQ context is created
+ZMQ_AVAILABLE = importlib.util.find_spec("zmq") is not None
 
 
 def _create_timestamp(dt: datetime) -> Timestamp:
@@ -112,6 +108,8 @@ class AICOLogger:
         self.module = module
         self.config = config_manager
         self.transport = transport
+        # Read on every log call, so resolved through a precompiled accessor
+        self._disable_zmq_for = config_manager.accessor("logging.disable_zmq_for", []) if config_manager else None
         # If we have a transport, assume database is ready (CLI mode or ZMQ initialized)
         self._db_ready = transport is not None
         
@@ -290,7 +288,7 @@ class AICOLogger:
         - Built-in safeguard: disable for service.log_consumer by default
         """
         try:
-            disabled_list = self.config.get("logging.disable_zmq_for", []) or []
+            disabled_list = (self._disable_zmq_for() if self._disable_zmq_for else []) or []
         except Exception:
             disabled_list = []
 
@@ -672,11 +670,12 @@ class LogRepository:
         
         where_sql = " AND ".join(where_clauses) if where_clauses else "1=1"
         
+        from aico.data.libsql.partitions import partitioned_source
         sql = f"""
             SELECT id, timestamp, level, subsystem, module, function_name,
                    file_path, line_number, topic, message, user_uuid,
                    session_id, trace_id, extra
-            FROM logs 
+            FROM {partitioned_source(self.db, "logs", since=filters.get("since"))} 
             WHERE {where_sql}
             ORDER BY timestamp DESC 
             LIMIT ?
@@ -716,44 +715,45 @@ class LogRepository:
         
         where_sql = " AND ".join(where_clauses)
         
-        # Get count first
-        count_sql = f"SELECT COUNT(*) FROM logs WHERE {where_sql}"
-        count = self.db.execute(count_sql, params).fetchone()[0]
-        
-        # Delete
-        delete_sql = f"DELETE FROM logs WHERE {where_sql}"
-        self.db.execute(delete_sql, params)
+        # Delete from the base table and every time partition still writable
+        from aico.data.libsql.partitions import writable_tables
+        count = 0
+        for table in writable_tables(self.db, "logs"):
+            count += self.db.execute(f"SELECT COUNT(*) FROM {table} WHERE {where_sql}", params).fetchone()[0]
+            self.db.execute(f"DELETE FROM {table} WHERE {where_sql}", params)
         
         return count
     
     def get_log_stats(self) -> Dict[str, Any]:
         """Get logging statistics"""
+        from aico.data.libsql.partitions import partitioned_source
         stats = {}
+        source = partitioned_source(self.db, "logs")
         
         # Total count
-        stats["total_logs"] = self.db.execute("SELECT COUNT(*) FROM logs").fetchone()[0]
+        stats["total_logs"] = self.db.execute(f"SELECT COUNT(*) FROM {source}").fetchone()[0]
         
         # Count by level
-        level_counts = self.db.execute("""
+        level_counts = self.db.execute(f"""
             SELECT level, COUNT(*) as count 
-            FROM logs 
+            FROM {source} 
             GROUP BY level 
             ORDER BY count DESC
         """).fetchall()
         stats["by_level"] = {row[0]: row[1] for row in level_counts}
         
         # Count by subsystem
-        subsystem_counts = self.db.execute("""
+        subsystem_counts = self.db.execute(f"""
             SELECT subsystem, COUNT(*) as count 
-            FROM logs 
+            FROM {source} 
             GROUP BY subsystem 
             ORDER BY count DESC
         """).fetchall()
         stats["by_subsystem"] = {row[0]: row[1] for row in subsystem_counts}
         
         # Recent activity (last 24h)
-        stats["last_24h"] = self.db.execute("""
-            SELECT COUNT(*) FROM logs 
+        stats["last_24h"] = self.db.execute(f"""
+            SELECT COUNT(*) FROM {source} 
             WHERE timestamp >= datetime('now', '-24 hours')
         """).fetchone()[0]
         
@@ -774,6 +774,11 @@ class LogRetentionManager:
         
         results = {}
         
+        # Drop whole expired time partitions (if partitioning is enabled)
+        from aico.data.libsql.partitions import TimePartitioner
+        partition_cutoff = datetime.utcnow() - timedelta(days=retention_days)
+        results["partitions_dropped"] = len(TimePartitioner(self.db, "logs").drop_expired(partition_cutoff))
+        
         # Delete by age
         cutoff_date = datetime.utcnow().replace(microsecond=0)
         cutoff_date = cutoff_date.replace(day=cutoff_date.day - retention_days)
@@ -0,0 +1,312 @@
+"""
+Time-Partitioned Tables
+
+Optional day/week partitioning for append-only tables (logs, events).
+
+Rows are written to a partition table named after the period that contains
+their timestamp (``logs_d20261018`` for a day, ``logs_w20261012`` for the
+ISO week starting Monday 2026-10-12). Partitions are clones of the base
+table's schema and indexes, so each one stays small and insert/index cost
+does not grow with history. Expiry drops whole partitions instead of
+deleting rows one by one.
+
+The base table is kept and stays writable: writers that do not route through
+a partitioner (and rows written before partitioning was enabled) land there,
+and the RetentionEngine still purges it. Readers use ``partitioned_source``,
+which returns the base table when no partitions exist, or a UNION ALL over
+the base table and only those partitions overlapping the requested time
+range.
+
+Partitions whose period ended ``seal_after_days`` ago are sealed: triggers
+reject any further insert/update/delete, so closed periods are effectively
+read-only. Late rows (older than yesterday) are written to the base table,
+so writers never hit a sealed partition.
+
+Everything lives in the main (encrypted) database; partitions are
+discovered from ``sqlite_master`` by name, so no registry is needed.
+"""
+
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Tuple, Union
+
+from aico.core.logging import get_logger
+
+GRANULARITY_CODES = {"day": "d", "week": "w"}
+_PERIOD_DAYS = {"d": 1, "w": 7}
+
+# Rows older than this many days are written to the base table; sealing must
+# therefore wait at least this long after a period ends
+LATE_WRITE_DAYS = 1
+
+TimeBound = Union[str, datetime, date, None]
+
+
+def partition_period_start(day: date, granularity: str) -> date:
+    """First day of the period containing ``day``."""
+    if granularity == "week":
+        return day - timedelta(days=day.weekday())
+    return day
+
+
+def partition_name(base_table: str, day: date, granularity: str = "day") -> str:
+    """Name of the partition of ``base_table`` holding rows from ``day``."""
+    start = partition_period_start(day, granularity)
+    return f"{base_table}_{GRANULARITY_CODES[granularity]}{start:%Y%m%d}"
+
+
+def list_partitions(db_connection: Any, base_table: str) -> List[Tuple[str, date, date]]:
+    """
+    Existing partitions of ``base_table``, oldest first.
+
+    Returns:
+        (name, period_start, period_end) tuples; period_end is exclusive
+    """
+    pattern = re.compile(rf"^{re.escape(base_table)}_([dw])(\d{{8}})$")
+    rows = db_connection.execute(
+        "SELECT name FROM sqlite_master WHERE type = 'table' AND name LIKE ? ESCAPE '\\'",
+        (f"{base_table}\\_%",)
+    ).fetchall()
+
+    partitions = []
+    for (name,) in rows:
+        match = pattern.match(name)
+        if not match:
+            continue
+        start = datetime.strptime(match.group(2), "%Y%m%d").date()
+        partitions.append((name, start, start + timedelta(days=_PERIOD_DAYS[match.group(1)])))
+    partitions.sort(key=lambda partition: partition[1])
+    return partitions
+
+
+def partitioned_source(db_connection: Any, base_table: str,
+                       since: TimeBound = None, until: TimeBound = None) -> str:
+    """
+    FROM-clause source for reading ``base_table`` across its partitions.
+
+    Returns the base table name when it has no partitions; otherwise a
+    parenthesized UNION ALL of the base table and the partitions overlapping
+    [since, until], aliased as ``base_table`` so existing column references
+    keep working. A bound that is not a date (callers pass free-form filter
+    values through) leaves that side of the range open.
+    """
+    partitions = list_partitions(db_connection, base_table)
+    if not partitions:
+        return base_table
+
+    since_day = _bound_to_date(since)
+    until_day = _bound_to_date(until)
+    selected = [
+        name for name, start, end in partitions
+        if (since_day is None or end > since_day) and (until_day is None or start <= until_day)
+    ]
+
+    columns = _table_columns(db_connection, base_table)
+    selects = [f"SELECT {', '.join(columns)} FROM {base_table}"]
+    for name in selected:
+        partition_columns = set(_table_columns(db_connection, name))
+        projection = ", ".join(column if column in partition_columns else f"NULL AS {column}" for column in columns)
+        selects.append(f"SELECT {projection} FROM {name}")
+    return f"({' UNION ALL '.join(selects)}) AS {base_table}"
+
+
+def writable_tables(db_connection: Any, base_table: str) -> List[str]:
+    """The base table plus its partitions that have not been sealed."""
+    sealed = {
+        row[0] for row in db_connection.execute(
+            "SELECT tbl_name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ? ESCAPE '\\'",
+            (f"{base_table}\\_%\\_readonly\\_insert",)
+        ).fetchall()
+    }
+    return [base_table] + [name for name, _, _ in list_partitions(db_connection, base_table) if name not in sealed]
+
+
+class TimePartitioner:
+    """Routes writes of one base table to per-period partitions and expires them."""
+
+    def __init__(self, db_connection: Any, base_table: str, granularity: str = "day",
+                 time_column: str = "timestamp"):
+        """
+        Args:
+            db_connection: LibSQL connection (execute/commit)
+            base_table: Table whose schema and indexes partitions copy
+            granularity: "day" or "week"
+            time_column: ISO-8601 TEXT column that determines the partition
+        """
+        if granularity not in GRANULARITY_CODES:
+            raise ValueError(f"Unsupported partition granularity: {granularity}")
+        self.db = db_connection
+        self.base_table = base_table
+        self.granularity = granularity
+        self.time_column = time_column
+        self.logger = get_logger("shared", "data.libsql.partitions")
+
+        self._known: set = set()
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_config(cls, db_connection: Any, base_table: str, config_manager: Any) -> Optional["TimePartitioner"]:
+        """
+        Partitioner for ``base_table`` if partitioning is enabled for it in
+        ``core.scheduler.retention.partitioning``, else None.
+        """
+        settings = config_manager.get("core.scheduler.retention.partitioning", {}) or {}
+        if not settings.get("enabled", False) or base_table not in settings.get("tables", []):
+            return None
+        return cls(db_connection, base_table, settings.get("granularity", "day"))
+
+    def table_for(self, timestamp: TimeBound = None) -> str:
+        """
+        Partition table for a row with ``timestamp`` (created on first use).
+
+        Accepts ISO-8601 strings (only the date part is read), datetimes and
+        dates; None means today (UTC). Rows older than yesterday go to the
+        base table, so late writers never hit a sealed partition.
+        """
+        today = datetime.utcnow().date()
+        day = _to_date(timestamp) or today
+        if day < today - timedelta(days=LATE_WRITE_DAYS):
+            return self.base_table
+        name = partition_name(self.base_table, day, self.granularity)
+        if name not in self._known:
+            with self._lock:
+                if name not in self._known:
+                    self._create_partition(name)
+                    self._known.add(name)
+        return name
+
+    def drop_expired(self, cutoff: TimeBound) -> List[str]:
+        """
+        Drop every partition whose whole period lies before ``cutoff``.
+
+        Returns:
+            Names of the dropped partitions
+        """
+        cutoff_day = _to_date(cutoff)
+        dropped = []
+        for name, _, end in list_partitions(self.db, self.base_table):
+            if end > cutoff_day:
+                break
+            self.db.execute(f"DROP TABLE IF EXISTS {name}")
+            self._known.discard(name)
+            dropped.append(name)
+        if dropped:
+            self.db.commit()
+            self.logger.info(f"Dropped {len(dropped)} expired {self.base_table} partitions: {', '.join(dropped)}")
+        return dropped
+
+    def seal_before(self, cutoff: TimeBound) -> List[str]:
+        """
+        Make partitions whose period ended before ``cutoff`` read-only.
+
+        Returns:
+            Names of newly sealed partitions
+        """
+        cutoff_day = _to_date(cutoff)
+        sealed_triggers = {
+            row[0] for row in self.db.execute(
+                "SELECT name FROM sqlite_master WHERE type = 'trigger' AND name LIKE ? ESCAPE '\\'",
+                (f"{self.base_table}\\_%\\_readonly\\_%",)
+            ).fetchall()
+        }
+
+        sealed = []
+        for name, _, end in list_partitions(self.db, self.base_table):
+            if end > cutoff_day:
+                break
+            if f"{name}_readonly_insert" in sealed_triggers:
+                continue
+            for action in ("INSERT", "UPDATE", "DELETE"):
+                self.db.execute(
+                    f"CREATE TRIGGER IF NOT EXISTS {name}_readonly_{action.lower()} "
+                    f"BEFORE {action} ON {name} "
+                    f"BEGIN SELECT RAISE(ABORT, 'partition {name} is sealed'); END"
+                )
+            sealed.append(name)
+        if sealed:
+            self.db.commit()
+            self.logger.info(f"Sealed {len(sealed)} {self.base_table} partitions")
+        return sealed
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Partition names and row counts (oldest first)."""
+        partitions = list_partitions(self.db, self.base_table)
+        return {
+            "base_table": self.base_table,
+            "granularity": self.granularity,
+            "partitions": [
+                {
+                    "name": name,
+                    "period_start": start.isoformat(),
+                    "period_end": end.isoformat(),
+                    "rows": self.db.execute(f"SELECT COUNT(*) FROM {name}").fetchone()[0],
+                }
+                for name, start, end in partitions
+            ],
+        }
+
+    def _create_partition(self, name: str) -> None:
+        row = self.db.execute(
+            "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (self.base_table,)
+        ).fetchone()
+        if not row:
+            raise ValueError(f"Base table {self.base_table} does not exist")
+
+        table_sql = re.sub(
+            rf"^\s*CREATE\s+TABLE\s+(IF\s+NOT\s+EXISTS\s+)?[\"'`\[]?{re.escape(self.base_table)}[\"'`\]]?",
+            f"CREATE TABLE IF NOT EXISTS {name}",
+            row[0],
+            count=1,
+            flags=re.IGNORECASE,
+        )
+        statements = [table_sql]
+
+        index_rows = self.db.execute(
+            "SELECT name, sql FROM sqlite_master WHERE type = 'index' AND tbl_name = ? AND sql IS NOT NULL",
+            (self.base_table,)
+        ).fetchall()
+        for index_name, index_sql in index_rows:
+            statements.append(re.sub(
+                rf"^\s*CREATE\s+(UNIQUE\s+)?INDEX\s+(IF\s+NOT\s+EXISTS\s+)?\S+\s+ON\s+[\"'`\[]?{re.escape(self.base_table)}[\"'`\]]?",
+                lambda m: f"CREATE {m.group(1) or ''}INDEX IF NOT EXISTS {name}_{index_name} ON {name}",
+                index_sql,
+                count=1,
+                flags=re.IGNORECASE,
+            ))
+
+        start = datetime.strptime(name[-8:], "%Y%m%d").date()
+        for statement in statements:
+            self.db.execute(statement)
+        # Seed AUTOINCREMENT from the period start so ids stay unique across
+        # partitions (and above base-table ids): <days since epoch> * 10^9
+        if "AUTOINCREMENT" in table_sql.upper():
+            self.db.execute(
+                "INSERT INTO sqlite_sequence (name, seq) SELECT ?, ? "
+                "WHERE NOT EXISTS (SELECT 1 FROM sqlite_sequence WHERE name = ?)",
+                (name, (start - date(1970, 1, 1)).days * 1_000_000_000, name)
+            )
+        self.db.commit()
+        self.logger.info(f"Created partition {name}")
+
+
+def _table_columns(db_connection: Any, table: str) -> List[str]:
+    return [row[1] for row in db_connection.execute(f"PRAGMA table_info({table})").fetchall()]
+
+
+def _to_date(value: TimeBound) -> Optional[date]:
+    if value is None:
+        return None
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    return datetime.strptime(str(value)[:10], "%Y-%m-%d").date()
+
+
+def _bound_to_date(value: TimeBound) -> Optional[date]:
+    """Like ``_to_date``, but an unparseable bound is treated as no bound."""
+    try:
+        return _to_date(value)
+    except ValueError:
+        return None
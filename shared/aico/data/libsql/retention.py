@@ -0,0 +1,200 @@
+"""
+Chunked Retention Engine
+
+Deletes expired rows in small rowid-ordered batches instead of one unbounded
+DELETE. Each batch is its own short transaction, and the engine sleeps
+between batches, so other writers (conversation persistence, logging) get
+the write lock between batches instead of waiting for the whole purge.
+After purging, the WAL is checkpointed (PASSIVE, never blocks readers) and
+freed pages can optionally be returned with an incremental vacuum.
+
+Batches select victims with ``ORDER BY rowid LIMIT n``: for append-mostly
+tables (logs, events, executions, trajectories) the oldest rows sit at the
+start of the rowid order, so each batch finds its victims immediately even
+where the time column is not indexed.
+
+Example:
+    engine = RetentionEngine(db_connection, batch_size=2000)
+    result = await engine.purge(RetentionPolicy("logs", "timestamp", cutoff))
+"""
+
+import asyncio
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from aico.core.logging import get_logger
+
+
+@dataclass
+class RetentionPolicy:
+    """Which rows of a table have expired."""
+    table: str
+    time_column: str
+    cutoff: str  # Rows with time_column < cutoff are deleted (same format as stored)
+    extra_where: str = ""  # Additional SQL predicate, e.g. "archived = TRUE"
+    extra_params: Tuple[Any, ...] = ()
+
+
+@dataclass
+class RetentionResult:
+    """Outcome and throughput of one purge."""
+    table: str
+    deleted: int = 0
+    batches: int = 0
+    duration_seconds: float = 0.0
+    checkpointed: bool = False
+    vacuumed_pages: int = 0
+    errors: list = field(default_factory=list)
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.deleted / self.duration_seconds if self.duration_seconds > 0 else 0.0
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "table": self.table,
+            "deleted": self.deleted,
+            "batches": self.batches,
+            "duration_seconds": round(self.duration_seconds, 3),
+            "rows_per_second": round(self.rows_per_second, 1),
+            "checkpointed": self.checkpointed,
+            "vacuumed_pages": self.vacuumed_pages,
+            "errors": list(self.errors),
+        }
+
+
+class RetentionEngine:
+    """Batched, yielding deletes of expired rows with WAL checkpoint and optional incremental vacuum."""
+
+    def __init__(
+        self,
+        db_connection,
+        batch_size: int = 2000,
+        pause_seconds: float = 0.05,
+        checkpoint: bool = True,
+        incremental_vacuum_pages: int = 0,
+        progress_callback: Optional[Callable[[RetentionResult], None]] = None,
+        progress_interval_batches: int = 10,
+    ):
+        """
+        Args:
+            db_connection: LibSQL connection (execute/commit)
+            batch_size: Rows deleted per transaction
+            pause_seconds: Sleep between batches so other writers get the lock
+            checkpoint: Run a PASSIVE WAL checkpoint after the purge
+            incremental_vacuum_pages: Pages to free afterwards (0 = skip; needs auto_vacuum=INCREMENTAL)
+            progress_callback: Called with the running result every progress_interval_batches
+            progress_interval_batches: Batches between progress reports
+        """
+        self.db = db_connection
+        self.batch_size = max(1, batch_size)
+        self.pause_seconds = pause_seconds
+        self.checkpoint = checkpoint
+        self.incremental_vacuum_pages = incremental_vacuum_pages
+        self.progress_callback = progress_callback
+        self.progress_interval_batches = max(1, progress_interval_batches)
+        self.logger = get_logger("shared", "data.libsql.retention")
+
+    @classmethod
+    def from_config(cls, db_connection, config: Optional[Dict[str, Any]] = None, **overrides) -> "RetentionEngine":
+        """Build an engine from a ``retention`` config section (core.scheduler.retention)."""
+        config = config or {}
+        settings = {
+            "batch_size": config.get("batch_size", 2000),
+            "pause_seconds": config.get("pause_ms", 50) / 1000.0,
+            "checkpoint": config.get("wal_checkpoint", True),
+            "incremental_vacuum_pages": config.get("incremental_vacuum_pages", 0),
+        }
+        settings.update(overrides)
+        return cls(db_connection, **settings)
+
+    async def purge(self, policy: RetentionPolicy) -> RetentionResult:
+        """
+        Delete all expired rows for ``policy``, one batch at a time.
+
+        Each batch runs in a worker thread and the event loop is yielded to
+        between batches, so neither the loop nor other database writers stall.
+        """
+        result = RetentionResult(table=policy.table)
+        start = time.perf_counter()
+        statement, params = self._batch_statement(policy)
+
+        while True:
+            try:
+                deleted = await asyncio.to_thread(self._delete_batch, statement, params)
+            except Exception as e:
+                result.errors.append(str(e))
+                self.logger.warning(f"Retention batch on {policy.table} failed after {result.deleted} rows: {e}")
+                break
+
+            result.deleted += deleted
+            result.batches += 1
+            result.duration_seconds = time.perf_counter() - start
+            if result.batches % self.progress_interval_batches == 0:
+                self._report_progress(result)
+
+            if deleted < self.batch_size:
+                break
+            await asyncio.sleep(self.pause_seconds)
+
+        if result.deleted:
+            await asyncio.to_thread(self._compact, result)
+
+        result.duration_seconds = time.perf_counter() - start
+        self._report_progress(result)
+        self.logger.info(
+            f"Retention purge of {policy.table}: {result.deleted} rows in {result.batches} batches, "
+            f"{result.duration_seconds:.2f}s ({result.rows_per_second:.0f} rows/s)"
+        )
+        return result
+
+    def _batch_statement(self, policy: RetentionPolicy) -> Tuple[str, Tuple[Any, ...]]:
+        where = f"{policy.time_column} < ?"
+        if policy.extra_where:
+            where += f" AND ({policy.extra_where})"
+        statement = (
+            f"DELETE FROM {policy.table} WHERE rowid IN ("
+            f"SELECT rowid FROM {policy.table} WHERE {where} ORDER BY rowid LIMIT ?)"
+        )
+        return statement, (policy.cutoff, *policy.extra_params, self.batch_size)
+
+    def _delete_batch(self, statement: str, params: Tuple[Any, ...]) -> int:
+        cursor = self.db.execute(statement, params)
+        deleted = getattr(cursor, "rowcount", -1)
+        if deleted is None or deleted < 0:
+            deleted = self.db.execute("SELECT changes()").fetchone()[0]
+        self.db.commit()
+        return deleted
+
+    def _compact(self, result: RetentionResult) -> None:
+        if self.checkpoint:
+            try:
+                self.db.execute("PRAGMA wal_checkpoint(PASSIVE)").fetchall()
+                result.checkpointed = True
+            except Exception as e:
+                result.errors.append(f"checkpoint: {e}")
+
+        if self.incremental_vacuum_pages > 0:
+            try:
+                auto_vacuum = self.db.execute("PRAGMA auto_vacuum").fetchone()[0]
+                if auto_vacuum == 2:  # INCREMENTAL
+                    before = self.db.execute("PRAGMA freelist_count").fetchone()[0]
+                    self.db.execute(f"PRAGMA incremental_vacuum({int(self.incremental_vacuum_pages)})").fetchall()
+                    after = self.db.execute("PRAGMA freelist_count").fetchone()[0]
+                    result.vacuumed_pages = max(0, before - after)
+                else:
+                    self.logger.debug("Skipping incremental vacuum: auto_vacuum is not INCREMENTAL")
+            except Exception as e:
+                result.errors.append(f"incremental_vacuum: {e}")
+
+    def _report_progress(self, result: RetentionResult) -> None:
+        self.logger.debug(
+            f"Retention progress on {result.table}: {result.deleted} rows, {result.batches} batches, "
+            f"{result.rows_per_second:.0f} rows/s"
+        )
+        if self.progress_callback:
+            try:
+                self.progress_callback(result)
+            except Exception as e:
+                self.logger.debug(f"Retention progress callback failed: {e}")
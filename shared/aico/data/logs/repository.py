@@ -3,9 +3,10 @@ Log Repository for database operations
 """
 
 from typing import List, Dict, Any, Optional
-from datetime import datetime, timezone
+from datetime import datetime, timedelta, timezone
 from aico.core.logging import get_logger
 from aico.data import LibSQLConnection
+from aico.data.libsql.partitions import partitioned_source
 
 
 class LogRepository:
@@ -53,9 +54,9 @@ class LogRepository:
                    since: Optional[datetime] = None,
                    until: Optional[datetime] = None,
                    search: Optional[str] = None) -> List[Dict[str, Any]]:
-        """Query logs with filters"""
+        """Query logs with filters (across time partitions, if any)"""
         
-        query = "SELECT * FROM logs WHERE 1=1"
+        query = f"SELECT * FROM {partitioned_source(self.db, 'logs', since, until)} WHERE 1=1"
         params = []
         
         if level:
@@ -113,7 +114,7 @@ class LogRepository:
     def get_log_by_id(self, log_id: str) -> Optional[Dict[str, Any]]:
         """Get specific log entry by ID"""
         try:
-            cursor = self.db.execute("SELECT * FROM logs WHERE id = ?", [log_id])
+            cursor = self.db.execute(f"SELECT * FROM {partitioned_source(self.db, 'logs')} WHERE id = ?", [log_id])
             row = cursor.fetchone()
             
             if row:
@@ -138,22 +139,24 @@ class LogRepository:
     def get_log_stats(self) -> Dict[str, Any]:
         """Get log statistics"""
         try:
+            source = partitioned_source(self.db, 'logs')
+            
             # Total logs
-            cursor = self.db.execute("SELECT COUNT(*) FROM logs")
+            cursor = self.db.execute(f"SELECT COUNT(*) FROM {source}")
             total_logs = cursor.fetchone()[0]
             
             # Logs by level
-            cursor = self.db.execute("""
+            cursor = self.db.execute(f"""
                 SELECT level, COUNT(*) 
-                FROM logs 
+                FROM {source} 
                 GROUP BY level
             """)
             levels = dict(cursor.fetchall())
             
             # Recent logs (last 24 hours)
-            cursor = self.db.execute("""
+            cursor = self.db.execute(f"""
                 SELECT COUNT(*) 
-                FROM logs 
+                FROM {partitioned_source(self.db, 'logs', since=datetime.utcnow() - timedelta(days=1))} 
                 WHERE timestamp >= datetime('now', '-1 day', 'utc')
             """)
             recent_logs = cursor.fetchone()[0]
@@ -203,7 +206,7 @@ class LogRepository:
                    search: Optional[str] = None) -> int:
         """Count logs with filters"""
         
-        query = "SELECT COUNT(*) FROM logs WHERE 1=1"
+        query = f"SELECT COUNT(*) FROM {partitioned_source(self.db, 'logs', since, until)} WHERE 1=1"
         params = []
         
         if level:
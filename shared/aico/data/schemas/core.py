@@ -1063,5 +1063,167 @@ CORE_SCHEMA = register_schema("core", "core", priority=0)({
             "DROP TABLE IF EXISTS ams_behavioral_feedback",
             "ALTER TABLE temp_memory_album_feedback RENAME TO ams_feedback_events",
         ]
+    ),
+    
+    19: SchemaVersion(
+        version=19,
+        name="Materialized Knowledge Graph Statistics",
+        description="Add kg_stats with per-user node/edge counts by label and relation type, maintained by triggers",
+        sql_statements=[
+            # One row per (user, kind, name): kind 'node' -> label, 'edge' -> relation_type,
+            # 'meta' -> 'version' (incremented on every count change). Only current rows are counted.
+            """CREATE TABLE IF NOT EXISTS kg_stats (
+                user_id TEXT NOT NULL,
+                kind TEXT NOT NULL CHECK (kind IN ('node', 'edge', 'meta')),
+                name TEXT NOT NULL,
+                count INTEGER NOT NULL DEFAULT 0,
+                PRIMARY KEY (user_id, kind, name)
+            ) WITHOUT ROWID""",
+            
+            # kg_nodes: count current rows per label
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_node_insert
+            AFTER INSERT ON kg_nodes
+            FOR EACH ROW WHEN NEW.is_current = 1
+            BEGIN
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'node', NEW.label, 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_node_delete
+            AFTER DELETE ON kg_nodes
+            FOR EACH ROW WHEN OLD.is_current = 1
+            BEGIN
+                UPDATE kg_stats SET count = count - 1
+                WHERE user_id = OLD.user_id AND kind = 'node' AND name = OLD.label;
+                DELETE FROM kg_stats
+                WHERE user_id = OLD.user_id AND kind = 'node' AND name = OLD.label AND count <= 0;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (OLD.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_node_update_old
+            AFTER UPDATE OF user_id, label, is_current ON kg_nodes
+            FOR EACH ROW WHEN OLD.is_current = 1
+            BEGIN
+                UPDATE kg_stats SET count = count - 1
+                WHERE user_id = OLD.user_id AND kind = 'node' AND name = OLD.label;
+                DELETE FROM kg_stats
+                WHERE user_id = OLD.user_id AND kind = 'node' AND name = OLD.label AND count <= 0;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (OLD.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_node_update_new
+            AFTER UPDATE OF user_id, label, is_current ON kg_nodes
+            FOR EACH ROW WHEN NEW.is_current = 1
+            BEGIN
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'node', NEW.label, 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            # kg_edges: count current rows per relation_type
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_edge_insert
+            AFTER INSERT ON kg_edges
+            FOR EACH ROW WHEN NEW.is_current = 1
+            BEGIN
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'edge', NEW.relation_type, 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_edge_delete
+            AFTER DELETE ON kg_edges
+            FOR EACH ROW WHEN OLD.is_current = 1
+            BEGIN
+                UPDATE kg_stats SET count = count - 1
+                WHERE user_id = OLD.user_id AND kind = 'edge' AND name = OLD.relation_type;
+                DELETE FROM kg_stats
+                WHERE user_id = OLD.user_id AND kind = 'edge' AND name = OLD.relation_type AND count <= 0;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (OLD.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_edge_update_old
+            AFTER UPDATE OF user_id, relation_type, is_current ON kg_edges
+            FOR EACH ROW WHEN OLD.is_current = 1
+            BEGIN
+                UPDATE kg_stats SET count = count - 1
+                WHERE user_id = OLD.user_id AND kind = 'edge' AND name = OLD.relation_type;
+                DELETE FROM kg_stats
+                WHERE user_id = OLD.user_id AND kind = 'edge' AND name = OLD.relation_type AND count <= 0;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (OLD.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            """CREATE TRIGGER IF NOT EXISTS kg_stats_edge_update_new
+            AFTER UPDATE OF user_id, relation_type, is_current ON kg_edges
+            FOR EACH ROW WHEN NEW.is_current = 1
+            BEGIN
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'edge', NEW.relation_type, 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+                INSERT INTO kg_stats (user_id, kind, name, count) VALUES (NEW.user_id, 'meta', 'version', 1)
+                ON CONFLICT(user_id, kind, name) DO UPDATE SET count = count + 1;
+            END""",
+            
+            # Backfill from existing graph data
+            """INSERT OR REPLACE INTO kg_stats (user_id, kind, name, count)
+            SELECT user_id, 'node', label, COUNT(*) FROM kg_nodes WHERE is_current = 1 GROUP BY user_id, label""",
+            """INSERT OR REPLACE INTO kg_stats (user_id, kind, name, count)
+            SELECT user_id, 'edge', relation_type, COUNT(*) FROM kg_edges WHERE is_current = 1 GROUP BY user_id, relation_type""",
+            """INSERT OR IGNORE INTO kg_stats (user_id, kind, name, count)
+            SELECT DISTINCT user_id, 'meta', 'version', 1 FROM kg_stats""",
+        ],
+        rollback_statements=[
+            "DROP TRIGGER IF EXISTS kg_stats_edge_update_new",
+            "DROP TRIGGER IF EXISTS kg_stats_edge_update_old",
+            "DROP TRIGGER IF EXISTS kg_stats_edge_delete",
+            "DROP TRIGGER IF EXISTS kg_stats_edge_insert",
+            "DROP TRIGGER IF EXISTS kg_stats_node_update_new",
+            "DROP TRIGGER IF EXISTS kg_stats_node_update_old",
+            "DROP TRIGGER IF EXISTS kg_stats_node_delete",
+            "DROP TRIGGER IF EXISTS kg_stats_node_insert",
+            "DROP TABLE IF EXISTS kg_stats",
+        ]
+    ),
+    
+    20: SchemaVersion(
+        version=20,
+        name="Per-User Emotion State",
+        description="Add emotion_user_state keyed by user_id, replacing the single-row emotion_state",
+        sql_statements=[
+            # Current emotional state per user (written behind by the emotion engine)
+            """CREATE TABLE IF NOT EXISTS emotion_user_state (
+                user_id TEXT PRIMARY KEY,
+                timestamp TEXT NOT NULL,
+                subjective_feeling TEXT NOT NULL,
+                mood_valence REAL NOT NULL,
+                mood_arousal REAL NOT NULL,
+                intensity REAL NOT NULL,
+                warmth REAL NOT NULL,
+                energy REAL NOT NULL DEFAULT 0.5,
+                directness REAL NOT NULL,
+                formality REAL NOT NULL,
+                engagement REAL NOT NULL,
+                closeness REAL NOT NULL,
+                care_focus REAL NOT NULL,
+                updated_at TEXT DEFAULT CURRENT_TIMESTAMP
+            ) WITHOUT ROWID""",
+            
+            # Carry over the global state as the 'system' baseline
+            """INSERT OR IGNORE INTO emotion_user_state (user_id, timestamp, subjective_feeling,
+                mood_valence, mood_arousal, intensity, warmth, directness, formality,
+                engagement, closeness, care_focus, updated_at)
+            SELECT user_id, timestamp, subjective_feeling, mood_valence, mood_arousal, intensity,
+                warmth, directness, formality, engagement, closeness, care_focus, updated_at
+            FROM emotion_state WHERE id = 1""",
+        ],
+        rollback_statements=[
+            "DROP TABLE IF EXISTS emotion_user_state",
+        ]
     )
 })
@@ -3,6 +3,9 @@ Transparent file encryption wrapper for AICO.
 
 This module provides EncryptedFile, a drop-in replacement for Python's open()
 function that transparently encrypts and decrypts files using AES-256-GCM.
+
+Files are written in a segmented format (see FileCrypto), so reads, seeks and
+appends work with memory bounded by the segment size rather than file size.
 """
 
 import os
@@ -28,7 +31,8 @@ class EncryptedFile:
     Transparent file encryption wrapper using AES-256-GCM.
     
     Provides a drop-in replacement for Python's open() function with
-    transparent encryption/decryption capabilities.
+    transparent encryption/decryption capabilities. Data is processed in
+    independently authenticated segments of ``chunk_size`` bytes.
     """
     
     def __init__(
@@ -49,7 +53,7 @@ class EncryptedFile:
             mode: File mode ('r', 'w', 'rb', 'wb', 'a', 'ab')
             key_manager: AICOKeyManager instance for key operations
             purpose: Purpose identifier for key derivation
-            chunk_size: Chunk size for streaming operations
+            chunk_size: Plaintext segment size for newly written files
             encoding: Text encoding (for text modes)
             **kwargs: Additional arguments (for compatibility)
         """
@@ -80,13 +84,22 @@ class EncryptedFile:
         self._validate_mode()
         
         # File state
-        self._file_handle = None
+        self._raw = None
         self._crypto = None
-        self._temp_file = None
         self._is_open = False
         self._position = 0
         self._file_size = None
         
+        # Segmented format state
+        self._header = b""
+        self._segment_size = self.chunk_size
+        self._segment_count = 0
+        self._segment_index = 0
+        self._write_buffer = bytearray()
+        self._sealed_tail_size = None  # Plaintext size of an appended file's final segment while still on disk
+        self._cached_index = None
+        self._cached_segment = b""
+        
         # Encryption key (derived lazily)
         self._encryption_key = None
     
@@ -128,10 +141,6 @@ class EncryptedFile:
         """Check if file is opened for reading."""
         return "r" in self.mode
     
-    def _create_temp_file(self) -> io.BytesIO:
-        """Create temporary file for write operations."""
-        return io.BytesIO()
-    
     def open(self):
         """Open the encrypted file."""
         if self._is_open:
@@ -150,50 +159,173 @@ class EncryptedFile:
             return self
             
         except Exception as e:
+            self._close_raw()
             self.logger.error(f"Failed to open encrypted file {self.file_path}: {e}")
             raise
     
     def _open_for_write(self):
-        """Open file for writing (encrypt on close)."""
-        # For write modes, we use a temporary buffer
-        self._temp_file = self._create_temp_file()
-        self._file_handle = self._temp_file
+        """Open file for streaming writes in the segmented format."""
+        self.file_path.parent.mkdir(parents=True, exist_ok=True)
+        self._write_buffer = bytearray()
+        self._segment_index = 0
         
-        # For append mode, first decrypt existing content
-        if "a" in self.mode and self.file_path.exists():
-            try:
-                with open(self.file_path, "rb") as encrypted_file:
-                    decrypted_content = io.BytesIO()
-                    self._crypto.decrypt_file_streaming(encrypted_file, decrypted_content)
-                    
-                    # Write existing content to temp file
-                    decrypted_content.seek(0)
-                    self._temp_file.write(decrypted_content.read())
-                    
-            except Exception as e:
-                self.logger.warning(f"Could not read existing file for append: {e}")
+        if "a" in self.mode and self.file_path.exists() and self.file_path.stat().st_size > 0:
+            self._open_for_append()
+            return
+        
+        self._raw = open(self.file_path, "wb")
+        self._header = self._crypto.create_stream_header(self.chunk_size)
+        self._segment_size = self.chunk_size
+        self._raw.write(self._header)
+    
+    def _open_for_append(self):
+        """
+        Reopen an existing file for appending.
+        
+        Only the final segment is decrypted and rewritten; earlier segments are
+        left untouched. The sealed final segment stays on disk until a full
+        segment of new data is written over it. Appending is not crash-safe:
+        from that point until close() seals the new tail the file has no final
+        segment and reads reject it as truncated. Legacy whole-file encrypted
+        files are migrated to the segmented format once, on their first append.
+        """
+        try:
+            with open(self.file_path, "rb") as existing:
+                version = self._crypto.detect_format_version(existing.read(self._crypto.HEADER_SIZE))
+                existing.seek(0)
+                if version == 1:
+                    legacy_content = io.BytesIO()
+                    self._crypto.decrypt_file_streaming(existing, legacy_content)
+        except (InvalidFileFormatError, DecryptionError) as e:
+            raise CorruptedFileError(f"Cannot append to corrupted encrypted file: {e}") from e
+        
+        if version == 1:
+            self.logger.info(f"Migrating legacy encrypted file to segmented format: {self.file_path}")
+            self._raw = open(self.file_path, "wb")
+            self._header = self._crypto.create_stream_header(self.chunk_size)
+            self._segment_size = self.chunk_size
+            self._raw.write(self._header)
+            self._write_buffer.extend(legacy_content.getvalue())
+            self._flush_segments()
+            return
+        
+        self._raw = open(self.file_path, "r+b")
+        self._header = self._raw.read(self._crypto.STREAM_HEADER_SIZE)
+        try:
+            self._segment_size = self._crypto.parse_stream_header(self._header)
+            total_size = self._raw.seek(0, io.SEEK_END)
+            segment_count, _ = self._crypto.segment_layout(total_size, self._segment_size)
+            last_index = segment_count - 1
+            last_offset = self._crypto.segment_offset(last_index, self._segment_size)
+            self._raw.seek(last_offset)
+            last_plaintext = self._crypto.decrypt_segment(
+                self._header, last_index, self._raw.read(), final=True
+            )
+        except (InvalidFileFormatError, DecryptionError) as e:
+            raise CorruptedFileError(f"Cannot append to corrupted encrypted file: {e}") from e
+        
+        # Keep the sealed final segment until it is overwritten by its re-sealed
+        # successor (as final or not); new segments are never shorter
+        self._raw.seek(last_offset)
+        self._segment_index = last_index
+        self._sealed_tail_size = len(last_plaintext)
+        self._write_buffer.extend(last_plaintext)
     
     def _open_for_read(self):
-        """Open file for reading (decrypt on open)."""
+        """Open file for streaming reads (segments are decrypted on demand)."""
         if not self.file_path.exists():
             raise FileNotFoundError(f"Encrypted file not found: {self.file_path}")
         
         try:
-            # Decrypt entire file to memory for reading
-            with open(self.file_path, "rb") as encrypted_file:
+            self._raw = open(self.file_path, "rb")
+            version = self._crypto.detect_format_version(self._raw.read(self._crypto.HEADER_SIZE))
+            self._raw.seek(0)
+            
+            if version == 1:
+                # Legacy files are a single GCM message; expose them as one segment
                 decrypted_content = io.BytesIO()
-                self._crypto.decrypt_file_streaming(encrypted_file, decrypted_content)
-                
-                # Set up for reading
-                decrypted_content.seek(0)
-                self._file_handle = decrypted_content
-                self._file_size = len(decrypted_content.getvalue())
+                self._crypto.decrypt_file_streaming(self._raw, decrypted_content)
+                self._close_raw()
+                plaintext = decrypted_content.getvalue()
+                self._segment_size = max(len(plaintext), 1)
+                self._segment_count = 1
+                self._file_size = len(plaintext)
+                self._cached_index = 0
+                self._cached_segment = plaintext
+                return
+            
+            self._header = self._raw.read(self._crypto.STREAM_HEADER_SIZE)
+            self._segment_size = self._crypto.parse_stream_header(self._header)
+            total_size = self._raw.seek(0, io.SEEK_END)
+            self._segment_count, self._file_size = self._crypto.segment_layout(
+                total_size, self._segment_size
+            )
                 
         except InvalidFileFormatError as e:
             raise CorruptedFileError(f"Invalid encrypted file format: {e}") from e
         except DecryptionError as e:
             raise CorruptedFileError(f"File decryption failed: {e}") from e
     
+    def _load_segment(self, index: int) -> bytes:
+        """Return the plaintext of segment ``index``, decrypting it if not cached."""
+        if index == self._cached_index:
+            return self._cached_segment
+        
+        sealed_size = self._segment_size + self._crypto.SEGMENT_OVERHEAD
+        self._raw.seek(self._crypto.segment_offset(index, self._segment_size))
+        sealed = self._raw.read(sealed_size)
+        try:
+            plaintext = self._crypto.decrypt_segment(
+                self._header, index, sealed, final=index == self._segment_count - 1
+            )
+        except InvalidFileFormatError as e:
+            raise CorruptedFileError(f"Invalid encrypted file format: {e}") from e
+        except DecryptionError as e:
+            raise CorruptedFileError(f"File decryption failed at segment {index}: {e}") from e
+        
+        self._cached_index = index
+        self._cached_segment = plaintext
+        return plaintext
+    
+    def _read_bytes(self, size: int = -1) -> bytes:
+        """Read plaintext bytes from the current position."""
+        remaining = self._file_size - self._position
+        if size is None or size < 0 or size > remaining:
+            size = remaining
+        if size <= 0:
+            return b""
+        
+        parts = []
+        while size > 0:
+            index, offset = divmod(self._position, self._segment_size)
+            segment = self._load_segment(index)
+            part = segment[offset:offset + size]
+            if not part:
+                break
+            parts.append(part)
+            self._position += len(part)
+            size -= len(part)
+        return b"".join(parts)
+    
+    def _readline_bytes(self, size: int = -1) -> bytes:
+        """Read plaintext bytes up to and including the next newline."""
+        parts = []
+        collected = 0
+        while self._position < self._file_size:
+            index, offset = divmod(self._position, self._segment_size)
+            segment = self._load_segment(index)
+            stop = segment.find(b"\n", offset)
+            stop = len(segment) if stop == -1 else stop + 1
+            if size is not None and size > 0:
+                stop = min(stop, offset + size - collected)
+            part = segment[offset:stop]
+            parts.append(part)
+            collected += len(part)
+            self._position += len(part)
+            if part.endswith(b"\n") or (size is not None and 0 < size <= collected):
+                break
+        return b"".join(parts)
+    
     def read(self, size: int = -1) -> Union[str, bytes]:
         """
         Read data from the encrypted file.
@@ -210,10 +342,10 @@ class EncryptedFile:
         if not self._is_read_mode():
             raise io.UnsupportedOperation("File not opened for reading")
         
-        data = self._file_handle.read(size)
+        data = self._read_bytes(size)
         
         # Convert to text if in text mode
-        if not self._is_binary_mode() and isinstance(data, bytes):
+        if not self._is_binary_mode():
             data = data.decode(self.encoding)
         
         return data
@@ -226,33 +358,10 @@ class EncryptedFile:
         if not self._is_read_mode():
             raise io.UnsupportedOperation("File not opened for reading")
         
-        if self._is_binary_mode():
-            # Binary mode: read until newline byte
-            line = b""
-            while True:
-                char = self._file_handle.read(1)
-                if not char or char == b"\n":
-                    if char:
-                        line += char
-                    break
-                line += char
-                if size > 0 and len(line) >= size:
-                    break
-            return line
-        else:
-            # Text mode: read until newline character
-            line = ""
-            while True:
-                char_bytes = self._file_handle.read(1)
-                if not char_bytes:
-                    break
-                char = char_bytes.decode(self.encoding)
-                line += char
-                if char == "\n":
-                    break
-                if size > 0 and len(line) >= size:
-                    break
-            return line
+        line = self._readline_bytes(size)
+        if not self._is_binary_mode():
+            line = line.decode(self.encoding)
+        return line
     
     def readlines(self) -> list:
         """Read all lines from the encrypted file."""
@@ -271,6 +380,10 @@ class EncryptedFile:
         """
         Write data to the encrypted file.
         
+        Data is buffered until a full segment is available, which is then
+        sealed and written immediately, so memory use stays bounded by the
+        segment size regardless of file size.
+        
         Args:
             data: Data to write (str for text mode, bytes for binary mode)
             
@@ -284,6 +397,7 @@ class EncryptedFile:
             raise io.UnsupportedOperation("File not opened for writing")
         
         # Convert text to bytes if necessary
+        written = len(data)
         if not self._is_binary_mode() and isinstance(data, str):
             data = data.encode(self.encoding)
         elif self._is_binary_mode() and isinstance(data, str):
@@ -291,62 +405,110 @@ class EncryptedFile:
         elif not self._is_binary_mode() and isinstance(data, bytes):
             raise TypeError("Cannot write bytes to text mode file")
         
-        return self._file_handle.write(data)
+        self._write_buffer.extend(data)
+        self._flush_segments()
+        return written
     
     def writelines(self, lines) -> None:
         """Write a list of lines to the encrypted file."""
         for line in lines:
             self.write(line)
     
+    def _flush_segments(self) -> None:
+        """
+        Seal and write all complete non-final segments from the write buffer.
+        
+        At least one byte is always kept back so that the final segment is only
+        sealed on close and carries the final-segment flag.
+        """
+        segment_size = self._segment_size
+        while len(self._write_buffer) > segment_size:
+            segment = bytes(self._write_buffer[:segment_size])
+            del self._write_buffer[:segment_size]
+            self._raw.write(
+                self._crypto.encrypt_segment(self._header, self._segment_index, segment, final=False)
+            )
+            self._segment_index += 1
+            self._sealed_tail_size = None
+    
     def seek(self, offset: int, whence: int = 0) -> int:
-        """Seek to position in the encrypted file."""
+        """
+        Seek to position in the encrypted file.
+        
+        Reads support random access: only the segment containing the target
+        position is decrypted. Writes are sequential, so in write modes only
+        seeks that resolve to the current position are accepted.
+        """
         if not self._is_open:
             self.open()
         
-        return self._file_handle.seek(offset, whence)
+        if whence == io.SEEK_SET:
+            target = offset
+        elif whence == io.SEEK_CUR:
+            target = self.tell() + offset
+        elif whence == io.SEEK_END:
+            target = (self._file_size if self._is_read_mode() else self.tell()) + offset
+        else:
+            raise ValueError(f"Invalid whence: {whence}")
+        
+        if target < 0:
+            raise ValueError(f"Negative seek position {target}")
+        
+        if self._is_write_mode():
+            if target != self.tell():
+                raise io.UnsupportedOperation("Encrypted files only support sequential writes")
+            return target
+        
+        self._position = target
+        return self._position
     
     def tell(self) -> int:
         """Get current position in the encrypted file."""
         if not self._is_open:
             self.open()
         
-        return self._file_handle.tell()
+        if self._is_write_mode():
+            return self._segment_index * self._segment_size + len(self._write_buffer)
+        return self._position
     
     def flush(self) -> None:
-        """Flush write buffers."""
-        if self._is_open and self._file_handle:
-            self._file_handle.flush()
+        """Flush sealed segments to disk (the final segment is written on close)."""
+        if self._is_open and self._raw:
+            self._raw.flush()
+    
+    def _close_raw(self) -> None:
+        """Close the underlying ciphertext handle."""
+        if self._raw:
+            self._raw.close()
+            self._raw = None
     
     def close(self) -> None:
-        """Close the encrypted file and perform encryption if needed."""
+        """Close the encrypted file, sealing the final segment if writing."""
         if not self._is_open:
             return
         
         try:
-            if self._is_write_mode() and self._temp_file:
-                # Encrypt and write to actual file
-                self._temp_file.seek(0)
-                
-                # Ensure parent directory exists
-                self.file_path.parent.mkdir(parents=True, exist_ok=True)
-                
-                with open(self.file_path, "wb") as output_file:
-                    self._crypto.encrypt_file_streaming(self._temp_file, output_file)
-                
+            if self._is_write_mode() and self._raw:
+                self._flush_segments()
+                if self._sealed_tail_size != len(self._write_buffer):
+                    self._raw.write(
+                        self._crypto.encrypt_segment(
+                            self._header, self._segment_index, bytes(self._write_buffer), final=True
+                        )
+                    )
+                    self._raw.truncate()
+                self._write_buffer = bytearray()
+                self._sealed_tail_size = None
                 self.logger.info(f"Encrypted file written: {self.file_path} (purpose: {self.purpose})")
             
-            # Close file handles
-            if self._file_handle:
-                self._file_handle.close()
-                self._file_handle = None
-            
-            if self._temp_file:
-                self._temp_file.close()
-                self._temp_file = None
-            
+            self._close_raw()
+            self._cached_index = None
+            self._cached_segment = b""
             self._is_open = False
             
         except Exception as e:
+            self._close_raw()
+            self._is_open = False
             self.logger.error(f"Error closing encrypted file {self.file_path}: {e}")
             raise EncryptionError(f"Failed to close encrypted file: {e}") from e
     
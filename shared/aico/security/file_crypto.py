@@ -3,6 +3,17 @@ Low-level cryptographic operations for file encryption.
 
 This module provides the core AES-GCM encryption/decryption functionality
 used by the EncryptedFile wrapper class.
+
+Two on-disk formats are supported:
+
+- Version 1 (legacy, magic ``AICO``): a single AES-GCM message covering the
+  whole file. Readable for backwards compatibility, never written anymore.
+- Version 2 (segmented, magic ``AICS``): the plaintext is split into
+  fixed-size segments, each sealed as its own AES-GCM message in the style
+  of the STREAM construction. Every segment authenticates the file header,
+  its segment index and a final-segment flag, so segments cannot be
+  reordered, dropped or truncated without detection. This allows streaming
+  reads, random-access seeks and appends that only rewrite the last segment.
 """
 
 import os
@@ -29,6 +40,15 @@ class FileCrypto:
     # Total overhead per file
     OVERHEAD_SIZE = HEADER_SIZE + SALT_SIZE + NONCE_SIZE + TAG_SIZE
     
+    # Segmented (version 2) format constants
+    STREAM_MAGIC = b"AICS"
+    STREAM_VERSION = 2
+    STREAM_HEADER_FORMAT = ">4sBI16s"  # magic, version, segment size, file id
+    STREAM_HEADER_SIZE = struct.calcsize(STREAM_HEADER_FORMAT)
+    FILE_ID_SIZE = 16
+    SEGMENT_OVERHEAD = NONCE_SIZE + TAG_SIZE
+    MAX_SEGMENT_SIZE = 16 * 1024 * 1024
+    
     def __init__(self, key: bytes, chunk_size: int = 65536):
         """
         Initialize FileCrypto with encryption key.
@@ -206,6 +226,141 @@ class FileCrypto:
         except Exception as e:
             raise DecryptionError(f"File decryption failed: {e}") from e
     
+    # ------------------------------------------------------------------
+    # Segmented (version 2) format
+    # ------------------------------------------------------------------
+    
+    def create_stream_header(self, segment_size: Optional[int] = None) -> bytes:
+        """
+        Create a version 2 file header.
+        
+        Args:
+            segment_size: Plaintext bytes per segment (defaults to chunk_size)
+            
+        Returns:
+            Serialized header (25 bytes)
+        """
+        segment_size = segment_size or self.chunk_size
+        if not 0 < segment_size <= self.MAX_SEGMENT_SIZE:
+            raise ValueError(f"Segment size must be between 1 and {self.MAX_SEGMENT_SIZE} bytes")
+        
+        return struct.pack(
+            self.STREAM_HEADER_FORMAT,
+            self.STREAM_MAGIC,
+            self.STREAM_VERSION,
+            segment_size,
+            os.urandom(self.FILE_ID_SIZE),
+        )
+    
+    def parse_stream_header(self, header_data: bytes) -> int:
+        """
+        Parse a version 2 file header.
+        
+        Args:
+            header_data: First STREAM_HEADER_SIZE bytes of the file
+            
+        Returns:
+            Plaintext segment size recorded in the header
+            
+        Raises:
+            InvalidFileFormatError: If header format is invalid
+        """
+        if len(header_data) < self.STREAM_HEADER_SIZE:
+            raise InvalidFileFormatError("Header too short")
+        
+        magic, version, segment_size, _file_id = struct.unpack(
+            self.STREAM_HEADER_FORMAT, header_data[:self.STREAM_HEADER_SIZE]
+        )
+        if magic != self.STREAM_MAGIC:
+            raise InvalidFileFormatError(f"Invalid magic bytes: {magic}")
+        if version != self.STREAM_VERSION:
+            raise InvalidFileFormatError(f"Unsupported format version: {version}")
+        if not 0 < segment_size <= self.MAX_SEGMENT_SIZE:
+            raise InvalidFileFormatError(f"Invalid segment size: {segment_size}")
+        
+        return segment_size
+    
+    def detect_format_version(self, header_data: bytes) -> int:
+        """
+        Detect the on-disk format version from the leading bytes of a file.
+        
+        Returns:
+            1 for the legacy whole-file format, 2 for the segmented format
+            
+        Raises:
+            InvalidFileFormatError: If the magic bytes are not recognized
+        """
+        magic = header_data[:self.HEADER_SIZE]
+        if magic == self.STREAM_MAGIC:
+            return self.STREAM_VERSION
+        if magic == self.HEADER_MAGIC:
+            return 1
+        raise InvalidFileFormatError(f"Invalid magic bytes: {magic}")
+    
+    @staticmethod
+    def _segment_aad(header: bytes, index: int, final: bool) -> bytes:
+        """Associated data binding a segment to its file, position and finality."""
+        return header + struct.pack(">QB", index, 1 if final else 0)
+    
+    def encrypt_segment(self, header: bytes, index: int, plaintext: bytes, final: bool) -> bytes:
+        """
+        Seal one segment of a version 2 file.
+        
+        Each segment carries its own random nonce so that the last segment can
+        be safely re-sealed on append without ever reusing a (key, nonce) pair.
+        
+        Returns:
+            nonce + ciphertext + 16-byte auth tag
+        """
+        nonce = self.generate_nonce()
+        return nonce + self.encrypt_data(plaintext, nonce, self._segment_aad(header, index, final))
+    
+    def decrypt_segment(self, header: bytes, index: int, sealed: bytes, final: bool) -> bytes:
+        """
+        Open one segment of a version 2 file.
+        
+        Raises:
+            InvalidFileFormatError: If the segment is too short
+            DecryptionError: If authentication fails (tampering, reordering,
+                truncation or wrong key)
+        """
+        if len(sealed) < self.SEGMENT_OVERHEAD:
+            raise InvalidFileFormatError("Segment too short to contain nonce and tag")
+        nonce = sealed[:self.NONCE_SIZE]
+        return self.decrypt_data(sealed[self.NONCE_SIZE:], nonce, self._segment_aad(header, index, final))
+    
+    def segment_layout(self, total_size: int, segment_size: int) -> Tuple[int, int]:
+        """
+        Compute the segment count and plaintext length of a version 2 file.
+        
+        Args:
+            total_size: Size of the encrypted file on disk
+            segment_size: Plaintext segment size from the header
+            
+        Returns:
+            Tuple of (segment_count, plaintext_size)
+            
+        Raises:
+            InvalidFileFormatError: If the size is inconsistent with the format
+        """
+        body_size = total_size - self.STREAM_HEADER_SIZE
+        sealed_size = segment_size + self.SEGMENT_OVERHEAD
+        if body_size < self.SEGMENT_OVERHEAD:
+            raise InvalidFileFormatError("File too short to contain a final segment")
+        
+        full_segments, remainder = divmod(body_size, sealed_size)
+        if remainder == 0:
+            # Last segment is exactly full
+            return full_segments, full_segments * segment_size
+        if remainder < self.SEGMENT_OVERHEAD:
+            raise InvalidFileFormatError("Truncated segment at end of file")
+        
+        return full_segments + 1, full_segments * segment_size + remainder - self.SEGMENT_OVERHEAD
+    
+    def segment_offset(self, index: int, segment_size: int) -> int:
+        """Byte offset of segment ``index`` within a version 2 file."""
+        return self.STREAM_HEADER_SIZE + index * (segment_size + self.SEGMENT_OVERHEAD)
+    
     def verify_file_format(self, file_path: str) -> bool:
         """
         Verify that a file has the correct encrypted format.
@@ -219,7 +374,7 @@ class FileCrypto:
         try:
             with open(file_path, "rb") as f:
                 header_data = f.read(self.HEADER_SIZE)
-                return header_data == self.HEADER_MAGIC
+                return header_data in (self.HEADER_MAGIC, self.STREAM_MAGIC)
         except (OSError, IOError):
             return False
     
@@ -240,6 +395,23 @@ class FileCrypto:
                 total_size = f.tell()
                 f.seek(0)  # Seek back to start
                 
+                if f.read(self.HEADER_SIZE) == self.STREAM_MAGIC:
+                    f.seek(0)
+                    segment_size = self.parse_stream_header(f.read(self.STREAM_HEADER_SIZE))
+                    segment_count, payload_size = self.segment_layout(total_size, segment_size)
+                    return {
+                        "algorithm": "AES-256-GCM",
+                        "key_size": 256,
+                        "format_version": self.STREAM_VERSION,
+                        "file_size": total_size,
+                        "payload_size": payload_size,
+                        "overhead_size": total_size - payload_size,
+                        "segment_size": segment_size,
+                        "segment_count": segment_count,
+                        "is_encrypted": True
+                    }
+                f.seek(0)
+                
                 # Read header
                 header_data = f.read(self.HEADER_SIZE + self.SALT_SIZE + self.NONCE_SIZE)
                 if len(header_data) < self.HEADER_SIZE + self.SALT_SIZE + self.NONCE_SIZE:
@@ -253,6 +425,7 @@ class FileCrypto:
                 return {
                     "algorithm": "AES-256-GCM",
                     "key_size": 256,
+                    "format_version": 1,
                     "file_size": total_size,
                     "payload_size": payload_size,
                     "overhead_size": self.OVERHEAD_SIZE,
@@ -3,14 +3,23 @@ Transport Security Layer for AICO
 
 Provides libsodium-based encryption for HTTP/WebSocket communication
 extending the existing transport security architecture to frontend-backend.
+
+Payload options are negotiated per session during the handshake: clients
+that announce transport capabilities get payloads compressed before
+encryption (deflate, or zstd when the optional ``zstandard`` package is
+installed, optionally with a preset dictionary) and may use binary framing
+that sends raw ciphertext instead of base64 inside a JSON envelope. Clients
+that announce nothing keep the original format.
 """
 
 import os
 import json
 import time
 import base64
-from typing import Dict, Any, Optional, Tuple, Union
-from dataclasses import dataclass
+import hashlib
+import zlib
+from typing import Dict, Any, List, Optional, Tuple, Union
+from dataclasses import dataclass, field
 from nacl.public import PrivateKey, PublicKey, Box
 from nacl.signing import SigningKey, VerifyKey
 from nacl.secret import SecretBox
@@ -22,6 +31,238 @@ from aico.core.logging import get_logger
 from aico.security.key_manager import AICOKeyManager
 from .exceptions import EncryptionError, DecryptionError
 
+try:
+    import zstandard
+    ZSTD_AVAILABLE = True
+except ImportError:
+    zstandard = None
+    ZSTD_AVAILABLE = False
+
+
+# Payload framing
+FRAMING_JSON = "json"      # {"encrypted": true, "payload": "<base64 ciphertext>"}
+FRAMING_BINARY = "binary"  # Raw ciphertext body
+BINARY_CONTENT_TYPE = "application/vnd.aico.encrypted"
+# Streamed binary responses: frames of 4-byte big-endian length + ciphertext
+BINARY_STREAM_CONTENT_TYPE = "application/vnd.aico.encrypted-stream"
+
+# Stream nonces: random per-stream prefix followed by a 64-bit chunk counter
+_STREAM_NONCE_PREFIX_SIZE = Box.NONCE_SIZE - 8
+
+# Codec byte prefixed to the plaintext of negotiated sessions
+_CODEC_NONE = 0
+_CODEC_DEFLATE = 1
+_CODEC_ZSTD = 2
+_CODEC_IDS = {"none": _CODEC_NONE, "deflate": _CODEC_DEFLATE, "zstd": _CODEC_ZSTD}
+
+
+def supported_compression() -> List[str]:
+    """Compression codecs available in this process, most preferred first."""
+    return ["zstd", "deflate"] if ZSTD_AVAILABLE else ["deflate"]
+
+
+def compression_dictionary_id(dictionary: bytes) -> str:
+    """Identifier both peers use to agree on a preset compression dictionary."""
+    return hashlib.sha256(dictionary).hexdigest()[:16]
+
+
+@dataclass
+class TransportOptions:
+    """
+    Per-session payload options agreed during the handshake.
+    
+    The default instance describes a legacy session: plaintext is the bare
+    JSON document and payloads travel base64-encoded in a JSON envelope.
+    """
+    negotiated: bool = False           # Plaintext carries a codec byte
+    compression: str = "none"          # "none", "deflate" or "zstd"
+    compression_threshold: int = 1024  # Smaller payloads are sent uncompressed
+    framing: str = FRAMING_JSON
+    dictionary: Optional[bytes] = None
+    max_payload_size: int = 16 * 1024 * 1024  # Decompression limit
+    _compressor: Any = field(default=None, init=False, repr=False)
+    _decompressor: Any = field(default=None, init=False, repr=False)
+    
+    @classmethod
+    def negotiate(
+        cls,
+        capabilities: Dict[str, Any],
+        compression_enabled: bool = True,
+        compression_threshold: int = 1024,
+        binary_framing: bool = True,
+        dictionary: Optional[bytes] = None,
+        max_payload_size: int = 16 * 1024 * 1024
+    ) -> 'TransportOptions':
+        """
+        Server side: pick options from a client's announced capabilities.
+        
+        Capabilities: {"compression": [...], "framing": [...], "dictionaries": [ids]}
+        """
+        offered = capabilities.get("compression") or []
+        compression = "none"
+        if compression_enabled:
+            compression = next((codec for codec in supported_compression() if codec in offered), "none")
+        
+        framing = FRAMING_JSON
+        if binary_framing and FRAMING_BINARY in (capabilities.get("framing") or []):
+            framing = FRAMING_BINARY
+        
+        if dictionary is not None and compression_dictionary_id(dictionary) not in (capabilities.get("dictionaries") or []):
+            dictionary = None
+        
+        return cls(
+            negotiated=True,
+            compression=compression,
+            compression_threshold=compression_threshold,
+            framing=framing,
+            dictionary=dictionary if compression != "none" else None,
+            max_payload_size=max_payload_size
+        )
+    
+    @classmethod
+    def from_dict(
+        cls,
+        data: Dict[str, Any],
+        dictionary: Optional[bytes] = None,
+        max_payload_size: int = 16 * 1024 * 1024
+    ) -> 'TransportOptions':
+        """Client side: adopt the options returned in the handshake response."""
+        compression = data.get("compression", "none")
+        if compression not in _CODEC_IDS or (compression == "zstd" and not ZSTD_AVAILABLE):
+            raise EncryptionError(f"Unsupported transport compression: {compression}")
+        
+        dictionary_id = data.get("dictionary_id")
+        if dictionary_id:
+            if dictionary is None or compression_dictionary_id(dictionary) != dictionary_id:
+                raise EncryptionError("Compression dictionary mismatch")
+        else:
+            dictionary = None
+        
+        return cls(
+            negotiated=True,
+            compression=compression,
+            compression_threshold=data.get("compression_threshold", 1024),
+            framing=data.get("framing", FRAMING_JSON),
+            dictionary=dictionary,
+            max_payload_size=max_payload_size
+        )
+    
+    @staticmethod
+    def capabilities(binary_framing: bool = True, dictionary: Optional[bytes] = None) -> Dict[str, Any]:
+        """Client side: capabilities to announce in the handshake."""
+        capabilities = {
+            "compression": supported_compression(),
+            "framing": [FRAMING_BINARY, FRAMING_JSON] if binary_framing else [FRAMING_JSON]
+        }
+        if dictionary is not None:
+            capabilities["dictionaries"] = [compression_dictionary_id(dictionary)]
+        return capabilities
+    
+    def to_dict(self) -> Dict[str, Any]:
+        """Agreed options as returned in the handshake response."""
+        result = {
+            "compression": self.compression,
+            "compression_threshold": self.compression_threshold,
+            "framing": self.framing
+        }
+        if self.dictionary is not None:
+            result["dictionary_id"] = compression_dictionary_id(self.dictionary)
+        return result
+    
+    def encode(self, data: bytes) -> bytes:
+        """Plaintext for encryption: optionally compressed, codec-prefixed if negotiated."""
+        if not self.negotiated:
+            return data
+        
+        if self.compression != "none" and len(data) >= self.compression_threshold:
+            compressed = self._compress(data)
+            if len(compressed) < len(data):
+                return bytes((_CODEC_IDS[self.compression],)) + compressed
+        
+        return bytes((_CODEC_NONE,)) + data
+    
+    def decode(self, plaintext: bytes) -> bytes:
+        """Inverse of encode()."""
+        if not self.negotiated:
+            return plaintext
+        if not plaintext:
+            raise DecryptionError("Empty payload")
+        
+        codec, body = plaintext[0], plaintext[1:]
+        if codec == _CODEC_NONE:
+            return body
+        if codec == _CODEC_DEFLATE:
+            decompressor = zlib.decompressobj(zdict=self.dictionary) if self.dictionary else zlib.decompressobj()
+            data = decompressor.decompress(body, self.max_payload_size)
+            if decompressor.unconsumed_tail:
+                raise DecryptionError("Decompressed payload exceeds size limit")
+            return data
+        if codec == _CODEC_ZSTD and ZSTD_AVAILABLE:
+            if self._decompressor is None:
+                dict_data = zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+                self._decompressor = zstandard.ZstdDecompressor(dict_data=dict_data)
+            try:
+                return self._decompressor.decompress(body, max_output_size=self.max_payload_size)
+            except zstandard.ZstdError as e:
+                raise DecryptionError(f"Invalid compressed payload: {e}")
+        raise DecryptionError(f"Unsupported payload codec: {codec}")
+    
+    def _compress(self, data: bytes) -> bytes:
+        if self.compression == "zstd":
+            if self._compressor is None:
+                dict_data = zstandard.ZstdCompressionDict(self.dictionary) if self.dictionary else None
+                self._compressor = zstandard.ZstdCompressor(level=3, dict_data=dict_data)
+            return self._compressor.compress(data)
+        
+        compressor = (
+            zlib.compressobj(zlib.Z_DEFAULT_COMPRESSION, zdict=self.dictionary)
+            if self.dictionary else zlib.compressobj()
+        )
+        return compressor.compress(data) + compressor.flush()
+
+
+class StreamEncryptor:
+    """
+    Encrypts the chunks of one streamed response.
+    
+    Nonces come from a random per-stream prefix and a chunk counter instead
+    of fresh randomness per chunk, so each chunk costs a single AEAD
+    operation. Ciphertexts carry their nonce like encrypt_bytes() output and
+    are decrypted with SecureTransportChannel.decrypt_bytes().
+    """
+    
+    def __init__(self, box: Box, transport: 'TransportOptions'):
+        self._box = box
+        self._transport = transport
+        self._prefix = os.urandom(_STREAM_NONCE_PREFIX_SIZE)
+        self._counter = 0
+    
+    def encrypt(self, data: bytes) -> bytes:
+        """Encrypt one chunk of serialized bytes; returns nonce + ciphertext."""
+        nonce = self._prefix + self._counter.to_bytes(8, "big")
+        self._counter += 1
+        return bytes(self._box.encrypt(self._transport.encode(data), nonce))
+    
+    def frame(self, data: bytes) -> bytes:
+        """Encrypt one chunk as a length-prefixed binary stream frame."""
+        ciphertext = self.encrypt(data)
+        return len(ciphertext).to_bytes(4, "big") + ciphertext
+    
+    @property
+    def chunk_count(self) -> int:
+        return self._counter
+
+
+def iter_stream_frames(buffer: bytearray):
+    """Pop complete length-prefixed frames from buffer, leaving any partial frame."""
+    while len(buffer) >= 4:
+        size = int.from_bytes(buffer[:4], "big")
+        if len(buffer) < 4 + size:
+            break
+        frame = bytes(buffer[4:4 + size])
+        del buffer[:4 + size]
+        yield frame
+
 
 @dataclass
 class ComponentIdentity:
@@ -99,6 +340,9 @@ class SecureTransportChannel:
         self.session_established = False
         self.session_timestamp = 0
         
+        # Payload options (legacy format until negotiated)
+        self.transport = TransportOptions()
+        
         # Configuration
         self.session_timeout = 3600  # 1 hour
         self.handshake_timeout = 30  # 30 seconds
@@ -279,8 +523,18 @@ class SecureTransportChannel:
             self.logger.error(f"Session key establishment failed: {e}")
             raise EncryptionError(f"Failed to establish session: {e}")
     
-    def encrypt_json_payload(self, payload: Dict[str, Any]) -> str:
-        """Encrypt JSON payload for transport"""
+    def negotiate_transport(self, capabilities: Dict[str, Any], **preferences) -> TransportOptions:
+        """Server side: agree on payload options from the client's capabilities."""
+        self.transport = TransportOptions.negotiate(capabilities, **preferences)
+        return self.transport
+    
+    def set_transport_options(self, agreed: Dict[str, Any], dictionary: Optional[bytes] = None) -> TransportOptions:
+        """Client side: apply the payload options from the handshake response."""
+        self.transport = TransportOptions.from_dict(agreed, dictionary=dictionary)
+        return self.transport
+    
+    def encrypt_bytes(self, data: bytes) -> bytes:
+        """Encrypt serialized payload bytes; returns raw ciphertext (nonce included)."""
         if not self.session_established or not self.session_box:
             raise EncryptionError("No established session for encryption")
         
@@ -289,21 +543,23 @@ class SecureTransportChannel:
             raise EncryptionError("Session expired")
         
         try:
-            # Serialize JSON payload
-            json_data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
-            
-            # Encrypt with session box
-            encrypted = self.session_box.encrypt(json_data)
-            
-            # Return base64 encoded ciphertext
-            return base64.b64encode(encrypted).decode()
-            
+            return bytes(self.session_box.encrypt(self.transport.encode(data)))
         except Exception as e:
             self.logger.error(f"Payload encryption failed: {e}")
             raise EncryptionError(f"Failed to encrypt payload: {e}")
     
-    def decrypt_json_payload(self, encrypted_payload: str) -> Dict[str, Any]:
-        """Decrypt JSON payload from transport"""
+    def stream_encryptor(self) -> StreamEncryptor:
+        """Encryptor for the chunks of one streamed response."""
+        if not self.session_established or not self.session_box:
+            raise EncryptionError("No established session for encryption")
+        
+        if not self.is_session_valid():
+            raise EncryptionError("Session expired")
+        
+        return StreamEncryptor(self.session_box, self.transport)
+    
+    def decrypt_bytes(self, ciphertext: bytes) -> bytes:
+        """Decrypt raw ciphertext into the serialized payload bytes."""
         if not self.session_established or not self.session_box:
             raise DecryptionError("No established session for decryption")
         
@@ -312,15 +568,26 @@ class SecureTransportChannel:
             raise DecryptionError("Session expired")
         
         try:
-            # Decode base64
+            return self.transport.decode(self.session_box.decrypt(ciphertext))
+        except Exception as e:
+            self.logger.error(f"Payload decryption failed: {e}")
+            raise DecryptionError(f"Failed to decrypt payload: {e}")
+    
+    def encrypt_json_payload(self, payload: Dict[str, Any]) -> str:
+        """Encrypt JSON payload for transport"""
+        json_data = json.dumps(payload, separators=(',', ':')).encode('utf-8')
+        return base64.b64encode(self.encrypt_bytes(json_data)).decode()
+    
+    def decrypt_json_payload(self, encrypted_payload: str) -> Dict[str, Any]:
+        """Decrypt JSON payload from transport"""
+        try:
             encrypted_data = base64.b64decode(encrypted_payload)
-            
-            # Decrypt with session box
-            decrypted = self.session_box.decrypt(encrypted_data)
-            
-            # Parse JSON
+        except Exception as e:
+            raise DecryptionError(f"Failed to decrypt payload: {e}")
+        
+        decrypted = self.decrypt_bytes(encrypted_data)
+        try:
             return json.loads(decrypted.decode('utf-8'))
-            
         except Exception as e:
             self.logger.error(f"Payload decryption failed: {e}")
             raise DecryptionError(f"Failed to decrypt payload: {e}")
@@ -341,6 +608,7 @@ class SecureTransportChannel:
         self.session_box = None
         self.session_established = False
         self.session_timestamp = 0
+        self.transport = TransportOptions()
         
         self.logger.debug("Session reset")
 
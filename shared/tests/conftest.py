@@ -0,0 +1,14 @@
+"""
+Shared test configuration.
+
+Many aico modules create their loggers at import time, which requires the
+logging system to be initialized before test modules are collected.
+"""
+
+from aico.core.config import ConfigurationManager
+from aico.core.logging import get_logger, initialize_logging
+
+try:
+    get_logger("shared", "tests")
+except RuntimeError:
+    initialize_logging(ConfigurationManager(), service_name="shared")
@@ -0,0 +1,159 @@
+"""
+Unit tests for change-set based knowledge graph fusion.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+from aico.ai.knowledge_graph.entity_resolution import ResolutionResult
+from aico.ai.knowledge_graph.fusion import GraphFusion
+from aico.ai.knowledge_graph.models import Edge, Node, PropertyGraph
+from aico.ai.memory.manager import MemoryManager
+
+
+class _Config:
+    def get(self, key, default=None):
+        return {"fusion_max_concurrent_llm": 2}
+
+
+class _Modelservice:
+    """Fake LLM: every conflict is temporal when it involves a city."""
+
+    def __init__(self):
+        self.in_flight = 0
+        self.peak = 0
+
+    async def generate_completion(self, prompt, **kwargs):
+        self.in_flight += 1
+        self.peak = max(self.peak, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+        if "temporal change" in prompt:
+            return {"text": json.dumps({"is_temporal": "city" in prompt})}
+        return {"text": json.dumps({"resolved_properties": {"name": "resolved"}})}
+
+
+def _node(**properties):
+    return Node.create("user", "PERSON", properties, 0.5, "source")
+
+
+@pytest.fixture
+def existing():
+    nodes = [_node(name=f"person {i}", age=i) for i in range(50)]
+    nodes.append(_node(name="home", city="SF"))
+    edges = [Edge.create("user", nodes[0].id, nodes[1].id, "KNOWS", {}, 0.5, "source")]
+    return PropertyGraph(nodes=nodes, edges=edges)
+
+
+def _copy(node, **properties):
+    return Node(**{**node.to_dict(), "properties": {**node.properties, **properties}})
+
+
+class TestGraphFusion:
+    """Test cases for GraphFusion.fuse_changes."""
+
+    def test_change_set_contains_only_changes(self, existing):
+        """Test that untouched existing items are not part of the change set."""
+        fusion = GraphFusion(_Modelservice(), _Config())
+        merged = _copy(existing.nodes[3], hobby="chess")
+        fresh = _node(name="new friend")
+        new_graph = PropertyGraph(
+            nodes=[merged, fresh],
+            edges=[Edge.create("user", merged.id, fresh.id, "KNOWS", {}, 0.5, "source")]
+        )
+
+        changes = asyncio.run(fusion.fuse_changes(new_graph, existing))
+
+        assert set(changes.updated_nodes) == {existing.nodes[3].id}
+        assert set(changes.added_nodes) == {fresh.id}
+        assert len(changes.added_edges) == 1
+        assert changes.reembed_ids == {existing.nodes[3].id}
+        assert len(changes) == 3
+
+    def test_temporal_update_supersedes(self, existing):
+        """Test that a temporal conflict supersedes the node and re-points new edges."""
+        fusion = GraphFusion(_Modelservice(), _Config())
+        home = existing.nodes[-1]
+        moved = _copy(home, city="NYC")
+        edge = Edge.create("user", existing.nodes[0].id, moved.id, "LIVES_IN", {}, 0.5, "source")
+
+        changes = asyncio.run(fusion.fuse_changes(PropertyGraph(nodes=[moved], edges=[edge]), existing))
+
+        assert set(changes.superseded_nodes) == {home.id}
+        assert home.is_current == 0
+        (successor,) = changes.added_nodes.values()
+        assert successor.canonical_id == home.canonical_id
+        assert edge.target_id == successor.id
+
+        fused = changes.apply_to(existing)
+        assert fused.get_node_by_id(home.id).is_current == 0
+        assert len(fused.nodes) == len(existing.nodes) + 1
+
+    def test_llm_calls_are_capped(self, existing):
+        """Test that concurrent conflict resolutions respect the LLM concurrency cap."""
+        modelservice = _Modelservice()
+        fusion = GraphFusion(modelservice, _Config())
+        conflicting = [_copy(node, age=100 + i) for i, node in enumerate(existing.nodes[:10])]
+
+        changes = asyncio.run(fusion.fuse_changes(PropertyGraph(nodes=conflicting), existing))
+
+        assert len(changes.updated_nodes) == 10
+        assert modelservice.peak == 2
+
+
+class _Storage:
+    """Fake PropertyGraphStorage recording written change sets."""
+
+    def __init__(self, graph):
+        self.graph = graph
+        self.saved = []
+
+    async def get_user_graph(self, user_id, current_only=True):
+        return self.graph
+
+    async def save_changes(self, changes):
+        self.saved.append(changes)
+
+
+class _Extractor:
+    def __init__(self, graph):
+        self.graph = graph
+
+    async def extract(self, text, user_id):
+        return self.graph
+
+
+class _Resolver:
+    """Fake EntityResolver reporting fixed superseded node ids."""
+
+    def __init__(self, superseded_ids):
+        self.superseded_ids = superseded_ids
+
+    async def resolve(self, graph, user_id, existing_nodes):
+        return ResolutionResult(resolved_graph=graph, superseded_node_ids=set(self.superseded_ids))
+
+
+class TestFusionWritePath:
+    """Test cases for the memory manager's extract-fuse-save pipeline."""
+
+    def test_only_changes_are_saved(self, existing):
+        """Test that extraction writes the fusion change set, including resolver-superseded nodes."""
+        merged = _copy(existing.nodes[3], hobby="chess")
+        duplicate = existing.nodes[4]
+        storage = _Storage(existing)
+
+        manager = MemoryManager.__new__(MemoryManager)
+        manager._kg_extractor = _Extractor(PropertyGraph(nodes=[merged]))
+        manager._kg_resolver = _Resolver({duplicate.id, "never-stored"})
+        manager._kg_fusion = GraphFusion(_Modelservice(), _Config())
+        manager._kg_storage = storage
+
+        asyncio.run(manager._extract_knowledge_graph_with_resolver("user", "text"))
+
+        (changes,) = storage.saved
+        assert set(changes.updated_nodes) == {merged.id}
+        assert set(changes.superseded_nodes) == {duplicate.id}
+        assert duplicate.is_current == 0 and duplicate.valid_until
+        assert len(changes) == 2
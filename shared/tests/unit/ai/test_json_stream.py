@@ -0,0 +1,164 @@
+"""
+Unit tests for incremental parsing of streamed LLM JSON output.
+"""
+
+import asyncio
+
+from aico.ai.knowledge_graph.entity_resolution import EntityResolver
+from aico.ai.knowledge_graph.json_stream import IncrementalJsonParser, stream_json_completion
+from aico.ai.knowledge_graph.models import Node, PropertyGraph
+
+
+def _feed_in_chunks(parser, text, size=3):
+    items = []
+    for start in range(0, len(text), size):
+        items.extend(parser.feed(text[start:start + size]))
+    parser.close()
+    return items
+
+
+class _Config:
+    def get(self, key, default=None):
+        return {"entity_resolution": {"similarity_threshold": 0.75}, "llm_timeout_seconds": 5.0}
+
+
+class _StreamingModelservice:
+    """Fake modelservice streaming matching decisions slowly and merges quickly."""
+
+    def __init__(self):
+        self.events = []
+        self.closed = 0
+
+    async def generate_embeddings(self, texts):
+        return {"embeddings": [[1.0, 0.0, 0.0, 0.1] if "Alice" in t else [0.0, 1.0, 0.1, 0.0] for t in texts]}
+
+    async def stream_completion(self, prompt, **kwargs):
+        try:
+            if prompt.startswith("Determine which pairs"):
+                yield '```json\n[{"pair_id": 0, "is_duplicate": true, "reasoning": "same person"},'
+                await asyncio.sleep(0.05)
+                self.events.append("second decision")
+                yield ' {"pair_id": 1, "is_duplicate": false, "reasoning": "different"}]\n```'
+                self.events.append("generation continued")
+                yield "\nBoth pairs were compared by name and context."
+            else:
+                self.events.append("merge")
+                yield '{"merged_properties": {"name": "Alice Smith"}, "aliases": ["Alice S."]}'
+                self.events.append("generation continued")
+                yield " The merged entity keeps the full name."
+        finally:
+            self.closed += 1
+
+
+class TestIncrementalJsonParser:
+    """Test cases for IncrementalJsonParser."""
+
+    def test_items_are_emitted_as_objects_close(self):
+        """Test keyed items from a fenced wrapper object, including escaped quotes."""
+        parser = IncrementalJsonParser()
+        text = (
+            'Here you go:\n```json\n{"relationships": [{"source": "Ann", "target": "Acme {HQ}", '
+            '"relation_type": "WORKS_AT", "properties": {"role": "CTO \\"x\\""}}], '
+            '"new_entities": [{"label": "TOPIC", "name": "chess"}]}\n```'
+        )
+
+        first = parser.feed(text[:text.index("], ")])
+        rest = _feed_in_chunks(parser, text[text.index("], "):])
+
+        assert [(item.key, item.value["target"]) for item in first] == [("relationships", "Acme {HQ}")]
+        assert [(item.key, item.value["name"]) for item in rest] == [("new_entities", "chess")]
+        assert set(parser.values[0]) == {"relationships", "new_entities"}
+        assert not parser.malformed and not parser.truncated
+
+    def test_ndjson_arrays_and_malformed_output(self):
+        """Test bare objects, top-level arrays and resynchronization after broken JSON."""
+        parser = IncrementalJsonParser()
+        items = _feed_in_chunks(parser, '{"a": 1}\n[{"pair_id": 0}, {"pair_id": 1}]\n{"b": [1}]\n{"c": 2}\n{"d": ')
+
+        assert [item.value for item in items] == [{"a": 1}, {"pair_id": 0}, {"pair_id": 1}, {"c": 2}]
+        assert all(item.key is None for item in items)
+        assert parser.malformed and parser.truncated
+
+
+class _ChunkedModelservice:
+    """Fake modelservice streaming a fixed completion in small chunks."""
+
+    def __init__(self, text, size=4):
+        self.text = text
+        self.size = size
+
+    async def stream_completion(self, prompt, **kwargs):
+        for start in range(0, len(self.text), self.size):
+            yield self.text[start:start + self.size]
+
+
+class TestStreamJsonCompletion:
+    """Test cases for stream_json_completion and its consumers."""
+
+    def test_stray_brace_in_prose_does_not_stop_generation(self):
+        """Test that malformed text before the answer is skipped and later breakage still stops."""
+        prose = 'Checking each {pair}: [{"pair_id": 0}, {"pair_id": 1}, {"pair_id": 2}]'
+
+        result = asyncio.run(stream_json_completion(_ChunkedModelservice(prose), "Pairs", expected_items=3))
+
+        assert [item.value["pair_id"] for item in result.items] == [0, 1, 2]
+        assert result.malformed and result.stopped_early
+
+        broken = '[{"pair_id": 0}, {"pair_id": 1 x}, {"pair_id": 2}]'
+        result = asyncio.run(stream_json_completion(_ChunkedModelservice(broken), "Pairs", expected_items=3))
+
+        assert [item.value["pair_id"] for item in result.items] == [0]
+        assert result.malformed and result.stopped_early
+
+    def test_stops_generation_at_first_value(self):
+        """Test that trailing output is not waited for once the value is complete."""
+        modelservice = _StreamingModelservice()
+
+        result = asyncio.run(stream_json_completion(modelservice, "Merge these", stop_on_first_value=True))
+
+        assert result.streamed and result.stopped_early
+        assert result.value["aliases"] == ["Alice S."]
+        assert modelservice.events == ["merge"]
+        assert modelservice.closed == 1
+
+    def test_resolver_merges_while_matching_streams(self):
+        """Test that a confirmed independent pair is merged before matching has finished."""
+        modelservice = _StreamingModelservice()
+        resolver = EntityResolver(modelservice, _Config(), dim=4, max_elements=16)
+        existing = [Node.create("user", "PERSON", {"name": n}, 0.9, "old") for n in ("Alice Smith", "Bob")]
+        new = [Node.create("user", "PERSON", {"name": n}, 0.8, "new") for n in ("Alice S.", "Robert")]
+
+        result = asyncio.run(resolver.resolve(PropertyGraph(nodes=new), "user", existing))
+
+        assert modelservice.events == ["merge", "second decision"]
+        assert modelservice.closed == 2
+        assert result.superseded_node_ids == {existing[0].id}
+        assert sorted(node.properties["name"] for node in result.resolved_graph.nodes) == ["Alice Smith", "Robert"]
+
+    def test_failed_merge_cancels_early_merges(self):
+        """Test that early merges still running are cancelled when another group's merge fails."""
+        resolver = EntityResolver(_StreamingModelservice(), _Config(), dim=4, max_elements=16)
+        bad, other, alice, alias = (
+            Node.create("user", "PERSON", {"name": n}, 0.8, "new") for n in ("bad", "Bad", "Alice", "Alice S.")
+        )
+
+        async def merge(group):
+            if group[0] is bad:
+                raise RuntimeError("merge failed")
+            await asyncio.sleep(10)
+
+        resolver._merge_node_group = merge
+
+        async def run():
+            early = asyncio.create_task(merge([alice, alias]))
+            try:
+                await resolver._merge_duplicates(
+                    PropertyGraph(nodes=[bad, alice]), [(bad, other), (alice, alias)],
+                    {frozenset((alice.id, alias.id)): early}
+                )
+            except RuntimeError:
+                pass
+            await asyncio.sleep(0)
+            return early.cancelled()
+
+        assert asyncio.run(run())
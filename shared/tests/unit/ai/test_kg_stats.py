@@ -0,0 +1,97 @@
+"""
+Unit tests for materialized knowledge graph statistics (kg_stats).
+"""
+
+import pytest
+
+from aico.ai.knowledge_graph.stats import (
+    read_global_stats,
+    read_graph_stats,
+    rebuild_graph_stats,
+    verify_graph_stats,
+)
+from aico.data.schemas.core import CORE_SCHEMA
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute(
+        "CREATE TABLE kg_nodes (id TEXT PRIMARY KEY, user_id TEXT, label TEXT, is_current INTEGER DEFAULT 1)"
+    )
+    sqlite_db.execute(
+        "CREATE TABLE kg_edges (id TEXT PRIMARY KEY, user_id TEXT, relation_type TEXT, is_current INTEGER DEFAULT 1)"
+    )
+    # Existing graph data picked up by the migration backfill
+    sqlite_db.execute("INSERT INTO kg_nodes (id, user_id, label) VALUES ('n0', 'u1', 'PERSON')")
+    for statement in CORE_SCHEMA[19].sql_statements:
+        sqlite_db.execute(statement)
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def _add_node(db, node_id, user_id, label, is_current=1):
+    db.execute(
+        "INSERT INTO kg_nodes (id, user_id, label, is_current) VALUES (?, ?, ?, ?)",
+        (node_id, user_id, label, is_current)
+    )
+
+
+class TestKgStatsTriggers:
+    """Test cases for the trigger-maintained kg_stats counts."""
+
+    def test_backfill_and_inserts_are_counted(self, db):
+        """Test that backfilled and newly inserted current rows are counted."""
+        _add_node(db, "n1", "u1", "PERSON")
+        _add_node(db, "n2", "u1", "PLACE")
+        _add_node(db, "n3", "u1", "PLACE", is_current=0)
+        db.execute("INSERT INTO kg_edges (id, user_id, relation_type) VALUES ('e1', 'u1', 'LIVES_IN')")
+
+        stats = read_graph_stats(db, "u1")
+
+        assert stats["node_types"] == {"PERSON": 2, "PLACE": 1}
+        assert stats["edge_types"] == {"LIVES_IN": 1}
+        assert stats["total_nodes"] == 3 and stats["total_edges"] == 1
+
+    def test_superseding_and_deleting_adjust_counts(self, db):
+        """Test that retiring a version and deleting rows decrement their counts."""
+        _add_node(db, "n1", "u1", "PLACE")
+        version = read_graph_stats(db, "u1")["version"]
+
+        db.execute("UPDATE kg_nodes SET is_current = 0 WHERE id = 'n1'")
+        db.execute("DELETE FROM kg_nodes WHERE id = 'n0'")
+
+        stats = read_graph_stats(db, "u1")
+        assert stats["node_types"] == {}
+        assert stats["version"] == version + 2
+        assert verify_graph_stats(db) == []
+
+    def test_users_are_kept_apart(self, db):
+        """Test that per-user reads only see that user's counts and global stats sum them."""
+        _add_node(db, "n1", "u2", "PERSON")
+
+        assert read_graph_stats(db, "u2")["node_types"] == {"PERSON": 1}
+        global_stats = read_global_stats(db)
+        assert global_stats["node_types"] == {"PERSON": 2}
+        assert global_stats["users"] == 2
+
+
+class TestKgStatsMaintenance:
+    """Test cases for verify_graph_stats and rebuild_graph_stats."""
+
+    def test_verify_reports_and_rebuild_repairs_drift(self, db):
+        """Test that drifted counts are reported and rebuilt with a version bump."""
+        db.execute("UPDATE kg_stats SET count = 7 WHERE user_id = 'u1' AND kind = 'node' AND name = 'PERSON'")
+        db.execute("INSERT INTO kg_stats (user_id, kind, name, count) VALUES ('u1', 'edge', 'STALE', 3)")
+        version = read_graph_stats(db, "u1")["version"]
+
+        drift = verify_graph_stats(db, "u1")
+        assert [(d["kind"], d["name"], d["stored"], d["actual"]) for d in drift] == [
+            ("node", "PERSON", 7, 1),
+            ("edge", "STALE", 3, 0),
+        ]
+
+        assert rebuild_graph_stats(db, "u1") == 1
+        stats = read_graph_stats(db, "u1")
+        assert stats["node_types"] == {"PERSON": 1} and stats["edge_types"] == {}
+        assert stats["version"] == version + 1
+        assert verify_graph_stats(db) == []
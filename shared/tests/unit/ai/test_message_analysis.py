@@ -0,0 +1,185 @@
+"""
+Unit tests for the per-message analysis cache.
+"""
+
+import asyncio
+
+from aico.ai.analysis.message_analysis import (
+    SENTIMENT_KEY,
+    MessageAnalysis,
+    MessageAnalysisRegistry,
+    get_message_analysis,
+)
+from aico.ai.memory import semantic
+from aico.ai.memory.context.retrievers import ContextRetrievers
+from aico.ai.memory.semantic import SemanticMemoryStore
+
+
+class _Modelservice:
+    """Fake modelservice counting requests per endpoint."""
+
+    def __init__(self, fail_first: bool = False):
+        self.calls = {"embeddings": 0, "sentiment": 0, "ner": 0}
+        self.fail_first = fail_first
+
+    async def get_embeddings(self, model, prompt):
+        self.calls["embeddings"] += 1
+        await asyncio.sleep(0.01)
+        if self.fail_first and self.calls["embeddings"] == 1:
+            return {"success": False, "error": "busy"}
+        return {"success": True, "data": {"embedding": [float(len(prompt)), float(len(model))]}}
+
+    async def get_sentiment_analysis(self, text):
+        self.calls["sentiment"] += 1
+        await asyncio.sleep(0.01)
+        return {"success": True, "data": {"sentiment": "positive", "confidence": 0.9}}
+
+    async def get_ner_entities(self, text, entity_types=None):
+        self.calls["ner"] += 1
+        return {"success": True, "data": {"entities": {"PERSON": ["Alice"]}}}
+
+
+class TestMessageAnalysis:
+    """Test cases for MessageAnalysis and its registry."""
+
+    def test_concurrent_requests_share_one_call(self):
+        """Test that concurrent consumers await a single in-flight request per signal."""
+        modelservice = _Modelservice()
+        analysis = MessageAnalysis("msg-1", "Alice moved to Berlin")
+
+        async def run():
+            return await asyncio.gather(
+                analysis.embedding(modelservice, "paraphrase-multilingual"),
+                analysis.embedding(modelservice, "paraphrase-multilingual"),
+                analysis.embedding(modelservice, "intent_classification"),
+                analysis.sentiment(modelservice),
+                analysis.sentiment(modelservice),
+                analysis.entities(modelservice),
+                analysis.entities(modelservice),
+            )
+
+        results = asyncio.run(run())
+
+        assert results[0] is results[1]
+        assert results[0] != results[2]
+        assert modelservice.calls == {"embeddings": 2, "sentiment": 1, "ner": 1}
+        assert analysis.peek(SENTIMENT_KEY)["data"]["sentiment"] == "positive"
+
+    def test_failures_are_not_memoized(self):
+        """Test that a failed response reaches current waiters but is retried later."""
+        modelservice = _Modelservice(fail_first=True)
+        analysis = MessageAnalysis("msg-1", "hello")
+
+        async def run():
+            first = await asyncio.gather(
+                analysis.embedding(modelservice, "m"),
+                analysis.embedding(modelservice, "m"),
+            )
+            second = await analysis.embedding(modelservice, "m")
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert [result["success"] for result in first] == [False, False]
+        assert second["success"] is True
+        assert modelservice.calls["embeddings"] == 2
+
+    def test_cancelled_caller_does_not_cancel_others(self):
+        """Test that cancelling the first caller leaves the shared computation running."""
+        modelservice = _Modelservice()
+        analysis = MessageAnalysis("msg-1", "hello")
+
+        async def run():
+            first = asyncio.create_task(analysis.sentiment(modelservice))
+            second = asyncio.create_task(analysis.sentiment(modelservice))
+            await asyncio.sleep(0)
+            first.cancel()
+            return first, await second
+
+        first, second = asyncio.run(run())
+
+        assert first.cancelled()
+        assert second["success"] is True
+        assert modelservice.calls["sentiment"] == 1
+        assert analysis.peek(SENTIMENT_KEY) is second
+
+    def test_registry_is_bounded(self):
+        """Test lookup by message id, text mismatch and LRU eviction."""
+        registry = MessageAnalysisRegistry(max_entries=2)
+        first = registry.get_or_create("a", "one")
+
+        assert registry.get_or_create("a", "one") is first
+        assert registry.get_or_create("a", "changed") is not first
+
+        registry.get_or_create("b", "two")
+        registry.get_or_create("c", "three")
+
+        assert registry.get("a") is None
+        assert len(registry) == 2
+
+
+class _Config:
+    def get(self, key, default=None):
+        if key == "core.memory.semantic":
+            return {"min_similarity": 0.1}  # RRF scores of a tiny collection stay low
+        return default
+
+
+class _Collection:
+    """ChromaDB stand-in holding one stored segment."""
+
+    name = "conversation_segments"
+
+    def __init__(self):
+        self.rows = {"old": ("Alice moved to Berlin last year", {"user_id": "u1", "timestamp": "2026-01-01T00:00:00"})}
+
+    def count(self):
+        return len(self.rows)
+
+    def query(self, query_embeddings, n_results, where=None):
+        ids = list(self.rows)[:n_results]
+        return {
+            "ids": [ids],
+            "documents": [[self.rows[i][0] for i in ids]],
+            "metadatas": [[self.rows[i][1] for i in ids]],
+            "distances": [[0.05 for _ in ids]],
+        }
+
+    def get(self, ids=None, include=None):
+        return {"ids": [i for i in ids if i in self.rows]}
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        for i, item_id in enumerate(ids):
+            self.rows[item_id] = (documents[i], metadatas[i])
+
+
+class TestTurnEmbeddingSharing:
+    """Test cases for context retrieval and storage sharing one turn's embedding."""
+
+    def test_context_query_and_storage_embed_once(self, tmp_path, monkeypatch):
+        """Test that the semantic context query and segment storage of a turn embed the message once."""
+        monkeypatch.setattr(semantic.AICOPaths, "get_semantic_memory_path", classmethod(lambda cls: tmp_path))
+        modelservice = _Modelservice()
+        store = SemanticMemoryStore(_Config())
+        store._collection = _Collection()
+        store._initialized = True
+        store.set_modelservice(modelservice)
+        retrievers = ContextRetrievers(None, None, store, None)
+        text = "Where did Alice move to?"
+        get_message_analysis("turn-sharing-1", text)
+
+        async def run():
+            items = await retrievers.get_semantic_context("u1", text, limit=3, message_id="turn-sharing-1")
+            result = await store.store_segments([{
+                "user_id": "u1", "conversation_id": "c1", "role": "user",
+                "content": text, "message_id": "turn-sharing-1",
+            }])
+            return items, result
+
+        items, result = asyncio.run(run())
+
+        assert modelservice.calls["embeddings"] == 1
+        assert result.stored == 1
+        assert [item.content for item in items] == ["Alice moved to Berlin last year"]
+        assert items[0].source_tier == "semantic"
+        assert items[0].timestamp.year == 2026
@@ -0,0 +1,106 @@
+"""
+Unit tests for adaptive gleaning, response caching and batching in MultiPassExtractor.
+"""
+
+import asyncio
+import json
+
+from aico.ai.knowledge_graph.extractor import MultiPassExtractor
+
+
+class _Config:
+    def __init__(self, **settings):
+        self.settings = settings
+
+    def get(self, key, default=None):
+        return self.settings
+
+
+class _Modelservice:
+    """Fake GLiNER + LLM: the first word of a text is a person living in Berlin."""
+
+    def __init__(self):
+        self.prompts = []
+
+    async def extract_entities(self, text, labels, threshold):
+        return {"entities": {"PERSON": [{"text": text.split()[0], "confidence": 0.9}]}}
+
+    async def generate_completion(self, prompt, **kwargs):
+        self.prompts.append(prompt)
+        if prompt.startswith("Review the text"):
+            # Every gleaning pass repeats a known entity and finds one new topic
+            gleanings = sum(p.startswith("Review the text") for p in self.prompts)
+            return {"text": json.dumps({
+                "new_entities": [{"label": "PERSON", "name": "alice"}, {"label": "TOPIC", "name": f"topic {gleanings}"}],
+                "new_relationships": []
+            })}
+        if "numbered messages" in prompt:
+            return {"text": json.dumps({
+                "relationships": [
+                    {"message": 1, "source": "Bob", "relation_type": "lives in", "target": "Berlin"},
+                    {"message": 2, "source": "Carol", "relation_type": "WORKS_AT", "target": "Acme"}
+                ],
+                "new_entities": [{"message": 7, "label": "TOPIC", "name": "unattributed"}]
+            })}
+        name = prompt.split("Text: ")[1].split()[0]
+        return {"text": json.dumps({
+            "relationships": [{"source": name, "relation_type": "LIVES_IN", "target": "Berlin"}],
+            "new_entities": []
+        })}
+
+
+class TestMultiPassExtractor:
+    """Test cases for MultiPassExtractor efficiency features."""
+
+    def test_gleaning_stops_when_passes_stop_paying_off(self):
+        """Test that gleaning stops after a pass with too few new items."""
+        modelservice = _Modelservice()
+        extractor = MultiPassExtractor(modelservice, _Config(max_gleanings=5, gleaning_min_new_items=2))
+
+        graph = asyncio.run(extractor.extract("Alice moved to Berlin", "user"))
+
+        gleaning_prompts = [p for p in modelservice.prompts if p.startswith("Review the text")]
+        assert len(gleaning_prompts) == 1
+        assert "- PERSON: Alice" in gleaning_prompts[0]
+        assert "- Alice -[LIVES_IN]-> Berlin" in gleaning_prompts[0]
+        assert sorted(node.properties["name"] for node in graph.nodes) == ["Alice", "Berlin", "topic 1"]
+
+    def test_gleaning_token_budget(self):
+        """Test that no further pass starts once the token budget would be exceeded."""
+        modelservice = _Modelservice()
+        extractor = MultiPassExtractor(
+            modelservice, _Config(max_gleanings=5, gleaning_min_new_items=1, gleaning_token_budget=200)
+        )
+
+        asyncio.run(extractor.extract("Alice moved to Berlin", "user"))
+
+        assert 1 <= sum(p.startswith("Review the text") for p in modelservice.prompts) < 5
+
+    def test_responses_are_cached(self):
+        """Test that extracting the same text again is served from the response cache."""
+        modelservice = _Modelservice()
+        extractor = MultiPassExtractor(modelservice, _Config(max_gleanings=0))
+
+        first = asyncio.run(extractor.extract("Alice moved to Berlin", "user"))
+        second = asyncio.run(extractor.extract("Alice moved to Berlin", "user"))
+
+        assert len(modelservice.prompts) == 1
+        assert len(first.edges) == len(second.edges) == 1
+        assert extractor.get_cache_stats()["hits"] == 1
+
+    def test_short_messages_share_one_prompt(self):
+        """Test batched extraction with per-message attribution and individual long messages."""
+        modelservice = _Modelservice()
+        extractor = MultiPassExtractor(
+            modelservice, _Config(max_gleanings=0, batch_max_messages=8, batch_message_max_chars=50)
+        )
+        texts = ["Bob moved to Berlin", "Carol joined Acme", "Dave likes tea", "Erin " + "talks " * 20]
+
+        graphs = asyncio.run(extractor.extract_batch(texts, "user"))
+
+        assert sum("numbered messages" in p for p in modelservice.prompts) == 1
+        assert len(modelservice.prompts) == 2  # One batched prompt + the long message
+        assert [len(graph.edges) for graph in graphs] == [1, 1, 0, 1]
+        assert graphs[0].edges[0].relation_type == "LIVES_IN"
+        assert graphs[1].edges[0].source_text == "Carol joined Acme"
+        assert [node.properties["name"] for node in graphs[2].nodes] == ["Dave"]
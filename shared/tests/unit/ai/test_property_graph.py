@@ -0,0 +1,75 @@
+"""
+Unit tests for the indexed PropertyGraph container.
+"""
+
+import pytest
+
+from aico.ai.knowledge_graph.models import Edge, Node, PropertyGraph
+
+
+def _node(name, label="PERSON"):
+    return Node.create("user", label, {"name": name}, 0.8, "source")
+
+
+@pytest.fixture
+def graph():
+    alice, bob, acme = _node("Alice"), _node("Bob"), _node("Acme", label="ORGANIZATION")
+    return PropertyGraph(
+        nodes=[alice, bob, acme],
+        edges=[
+            Edge.create("user", alice.id, bob.id, "KNOWS", {}, 0.8, "source"),
+            Edge.create("user", alice.id, acme.id, "WORKS_AT", {}, 0.8, "source"),
+        ]
+    )
+
+
+class TestPropertyGraph:
+    """Test cases for PropertyGraph indexes."""
+
+    def test_lookups(self, graph):
+        """Test id, name, label, relation type, signature and adjacency lookups."""
+        alice = graph.find_node_by_name("alice")
+        bob = graph.find_node_by_name("BOB")
+
+        assert graph.get_node_by_id(alice.id) is alice
+        assert graph.get_node_by_canonical_id(alice.canonical_id) is alice
+        assert [node.id for node in graph.get_nodes_by_label("PERSON")] == [alice.id, bob.id]
+        assert len(graph.get_edges_by_type("KNOWS")) == 1
+        assert graph.find_edge(alice.id, "KNOWS", bob.id).target_id == bob.id
+        assert len(graph.get_edges_for_node(alice.id, direction="outgoing")) == 2
+        assert len(graph.get_edges_for_node(bob.id, direction="outgoing")) == 0
+        assert len(graph.get_edges_for_node(bob.id)) == 1
+
+    def test_replace_reindexes_mutated_node(self, graph):
+        """Test that replacing a node mutated in place moves its index entries."""
+        alice = graph.find_node_by_name("Alice")
+        alice.properties["name"] = "Alicia"
+        alice.label = "CONTACT"
+        graph.replace_node(alice)
+
+        assert graph.find_node_by_name("Alice") is None
+        assert graph.find_node_by_name("alicia") is alice
+        assert graph.get_nodes_by_label("CONTACT") == [alice]
+        assert len(graph.nodes) == 3
+
+    def test_remove_node_removes_incident_edges(self, graph):
+        """Test that removing a node also drops its edges and adjacency."""
+        alice = graph.find_node_by_name("Alice")
+        bob = graph.find_node_by_name("Bob")
+
+        assert graph.remove_node(alice.id) is alice
+        assert alice.id not in graph
+        assert graph.edges == []
+        assert graph.get_edges_for_node(bob.id) == []
+        assert graph.remove_node(alice.id) is None
+
+    def test_merge_and_serialization(self, graph):
+        """Test that merge replaces by ID and to_dict keeps the list form."""
+        other = PropertyGraph(nodes=[graph.nodes[0], _node("Carol")])
+        graph.merge(other)
+
+        data = graph.to_dict()
+        assert set(data) == {"nodes", "edges"}
+        assert [node["properties"]["name"] for node in data["nodes"]] == ["Alice", "Bob", "Acme", "Carol"]
+        assert len(data["edges"]) == 2
+        assert len(graph) == 6
@@ -0,0 +1,206 @@
+"""
+Unit tests for prioritized experience replay and its sum tree.
+"""
+
+import asyncio
+import random
+from collections import Counter
+from datetime import datetime, timedelta
+
+import pytest
+
+from aico.ai.memory.consolidation.replay import ExperienceReplay, PrioritySumTree
+from aico.ai.memory.consolidation.scheduler import ConsolidationScheduler
+from aico.ai.memory.semantic import SegmentBatchResult
+
+
+class _WorkingStore:
+    """Fake working memory returning a fixed history."""
+
+    def __init__(self, messages):
+        self.messages = messages
+
+    async def retrieve_user_history(self, user_id, limit=100):
+        return self.messages[:limit]
+
+
+class _SemanticStore:
+    """Fake semantic memory recording stored segments."""
+
+    def __init__(self):
+        self.batches = []
+
+    async def store_segments(self, segments):
+        self.batches.append(segments)
+        return SegmentBatchResult(stored_ids=[s["message_id"] for s in segments])
+
+
+class _Connection:
+    def execute(self, *args):
+        pass
+
+    def commit(self):
+        pass
+
+
+class TestPrioritySumTree:
+    """Test cases for PrioritySumTree."""
+
+    def test_seeded_sampling_is_deterministic(self):
+        """Test that equal seeds draw equal keys in equal order."""
+        tree = PrioritySumTree.from_items((f"e{i}", float(i + 1)) for i in range(20))
+
+        first = tree.sample(8, random.Random(7))
+        second = tree.sample(8, random.Random(7))
+
+        assert first == second
+        assert len(set(first)) == 8
+
+    def test_sampling_without_replacement_restores_weights(self):
+        """Test that drawing every key returns each once and leaves weights intact."""
+        tree = PrioritySumTree.from_items([("a", 1.0), ("b", 2.0), ("c", 0.5)])
+
+        drawn = tree.sample(10, random.Random(1))
+
+        assert sorted(drawn) == ["a", "b", "c"]
+        assert tree.total == pytest.approx(3.5)
+        assert tree.get("b") == 2.0
+
+    def test_draws_follow_weights(self):
+        """Test that single draws are proportional to weight."""
+        tree = PrioritySumTree.from_items([("low", 1.0), ("high", 9.0)])
+        rng = random.Random(42)
+
+        counts = Counter(tree.sample(1, rng)[0] for _ in range(2000))
+
+        assert 0.85 < counts["high"] / 2000 < 0.95
+
+    def test_zero_weight_keys_are_never_drawn(self):
+        """Test that keys with weight zero are skipped."""
+        tree = PrioritySumTree.from_items([("a", 0.0), ("b", 1.0), ("c", 0.0)])
+
+        assert tree.sample(3, random.Random(3)) == ["b"]
+
+    def test_priority_updates(self):
+        """Test that update and remove maintain the total incrementally."""
+        tree = PrioritySumTree(capacity=4)
+        tree.update("a", 1.0)
+        tree.update("b", 2.0)
+        tree.update("a", 5.0)
+
+        assert tree.total == pytest.approx(7.0)
+
+        tree.remove("b")
+        assert "b" not in tree
+        assert tree.total == pytest.approx(5.0)
+        assert tree.sample(2, random.Random(0)) == ["a"]
+
+        with pytest.raises(ValueError):
+            tree.update("a", -1.0)
+
+    def test_grow_keeps_keys_and_weights(self):
+        """Test that inserting past capacity grows the tree in place."""
+        tree = PrioritySumTree(capacity=2)
+        for i in range(9):
+            tree.update(i, float(i))
+
+        assert len(tree) == 9
+        assert tree.total == pytest.approx(sum(range(9)))
+        assert [tree.get(i) for i in range(9)] == [float(i) for i in range(9)]
+
+        tree.remove(3)
+        tree.update(9, 1.0)
+        assert tree.total == pytest.approx(sum(range(9)) - 3 + 1)
+        assert sorted(tree.sample(20, random.Random(5))) == [1, 2, 4, 5, 6, 7, 8, 9]
+
+
+class TestExperienceReplay:
+    """Test cases for the incremental replay buffer."""
+
+    def test_seeded_buffer_sampling_is_deterministic(self):
+        """Test that equally seeded buffers draw the same experiences."""
+        def draw(seed):
+            replay = ExperienceReplay(batch_size=5, seed=seed)
+            now = datetime.utcnow()
+            for i in range(30):
+                replay.add_experience(f"e{i}", timestamp=now - timedelta(days=i))
+            return [p.experience_id for p in replay.sample_buffer()]
+
+        assert draw(11) == draw(11)
+        assert len(draw(11)) == 5
+
+    def test_feedback_raises_priority(self):
+        """Test that record_feedback updates an experience's weight in place."""
+        replay = ExperienceReplay(priority_alpha=1.0, seed=0)
+        old = datetime.utcnow() - timedelta(days=30)
+        replay.add_experience("plain", timestamp=old)
+        replay.add_experience("rated", timestamp=old)
+
+        before = replay._buffer_tree.get("rated")
+        priority = replay.record_feedback("rated")
+
+        assert priority.feedback_bonus == 1.0
+        assert replay._buffer_tree.get("rated") == pytest.approx(before + 1.0)
+        assert replay.record_feedback("missing") is None
+
+        replay.remove_experience("plain")
+        assert replay.buffered_ids() == ["rated"]
+
+
+class TestReplayConsolidation:
+    """Test cases for replay-driven consolidation in ConsolidationScheduler."""
+
+    def test_consolidates_replay_batch_and_drains_buffer(self):
+        """Test that each run consolidates one replay batch until the buffer is empty."""
+        now = datetime.utcnow()
+        messages = [
+            {"message_id": f"m{i}", "role": "user", "content": f"message {i}",
+             "timestamp": (now - timedelta(days=i)).isoformat() + "+00:00"}
+            for i in range(5)
+        ]
+        scheduler = ConsolidationScheduler(replay_batch_size=2, seed=3)
+        semantic = _SemanticStore()
+
+        async def run():
+            results = []
+            for _ in range(3):
+                results.append(await scheduler.consolidate_user_memories(
+                    "user-1", _WorkingStore(messages), semantic, _Connection()
+                ))
+            return results
+
+        results = asyncio.run(run())
+
+        assert [r["messages_selected"] for r in results] == [2, 2, 1]
+        stored = [s["message_id"] for batch in semantic.batches for s in batch]
+        assert sorted(stored) == [f"m{i}" for i in range(5)]
+        assert scheduler._replay_buffers["user-1"].buffer_size == 0
+
+    def test_messages_gone_from_working_memory_leave_buffer(self):
+        """Test that buffered messages no longer retrieved are dropped."""
+        scheduler = ConsolidationScheduler(replay_batch_size=1, seed=0)
+        first = [{"message_id": "old", "content": "a"}, {"message_id": "kept", "content": "b"}]
+
+        async def run():
+            await scheduler.consolidate_user_memories("u", _WorkingStore(first), _SemanticStore(), _Connection())
+            await scheduler.consolidate_user_memories(
+                "u", _WorkingStore([{"message_id": "new", "content": "c"}]), _SemanticStore(), _Connection()
+            )
+
+        asyncio.run(run())
+
+        assert scheduler._replay_buffers["u"].buffered_ids() == []
+
+    def test_messages_without_id_keep_their_priority_key(self):
+        """Test that id-less messages are keyed by conversation and timestamp, not fetch position."""
+        scheduler = ConsolidationScheduler(replay_batch_size=0, seed=0)
+        first = {"conversation_id": "c", "timestamp": "2026-10-18T10:00:00", "content": "a"}
+        second = {"conversation_id": "c", "timestamp": "2026-10-18T11:00:00", "content": "b"}
+        anonymous = {"content": "no identity"}
+
+        scheduler._select_for_replay("u", [first, anonymous, second])
+        scheduler._select_for_replay("u", [second, first])
+
+        assert sorted(scheduler._replay_buffers["u"].buffered_ids()) == [
+            "c:2026-10-18T10:00:00", "c:2026-10-18T11:00:00"
+        ]
@@ -0,0 +1,264 @@
+"""
+Unit tests for bulk segment storage and write-behind access statistics in semantic memory.
+"""
+
+import asyncio
+from datetime import datetime, timedelta
+
+import pytest
+
+from aico.ai.memory import semantic
+from aico.ai.memory.semantic import SemanticMemoryStore, make_segment_id
+
+
+class _Config:
+    def get(self, key, default=None):
+        return default
+
+
+class _Collection:
+    """In-memory stand-in for a ChromaDB collection."""
+
+    name = "conversation_segments"
+
+    def __init__(self):
+        self.rows = {}
+        self.upserts = 0
+
+    def get(self, ids=None, include=None):
+        found = [i for i in ids if i in self.rows]
+        return {"ids": found, "metadatas": [self.rows[i]["metadata"] for i in found]}
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        self.upserts += 1
+        for i, item_id in enumerate(ids):
+            self.rows[item_id] = {"document": documents[i], "metadata": metadatas[i]}
+
+    def update(self, ids, metadatas):
+        for item_id, metadata in zip(ids, metadatas):
+            self.rows[item_id]["metadata"] = metadata
+
+    def count(self):
+        return len(self.rows)
+
+
+class _Modelservice:
+    """Fake modelservice embedding texts in batches; texts in ``failing`` get no embedding."""
+
+    def __init__(self, failing=()):
+        self.failing = set(failing)
+        self.batches = []
+
+    async def get_embeddings_batch(self, model, prompts):
+        self.batches.append(list(prompts))
+        return {
+            "success": True,
+            "data": {"embeddings": [None if p in self.failing else [1.0, 0.0] for p in prompts]},
+        }
+
+
+@pytest.fixture
+def store(tmp_path, monkeypatch):
+    monkeypatch.setattr(semantic.AICOPaths, "get_semantic_memory_path", classmethod(lambda cls: tmp_path))
+    store = SemanticMemoryStore(_Config())
+    store._collection = _Collection()
+    store._initialized = True
+    return store
+
+
+def _message(content, message_id=None, role="user"):
+    return {
+        "user_id": "u1",
+        "conversation_id": "c1",
+        "role": role,
+        "content": content,
+        "message_id": message_id,
+        "timestamp": "2026-01-02T03:04:05Z",
+    }
+
+
+class TestSegmentIds:
+    """Test cases for make_segment_id."""
+
+    def test_ids_are_deterministic(self):
+        """Test that equal inputs give equal ids and the message id takes precedence."""
+        assert make_segment_id("u", "c", "user", "hi") == make_segment_id("u", "c", "user", "hi")
+        assert make_segment_id("u", "c", "user", "hi") != make_segment_id("u", "c", "assistant", "hi")
+        assert make_segment_id("u", "c", "user", "hi", "m1") == make_segment_id("x", "y", "assistant", "other", "m1")
+
+
+class TestStoreSegments:
+    """Test cases for SemanticMemoryStore.store_segments."""
+
+    def test_restoring_same_messages_is_skipped(self, store):
+        """Test that a second run finds every segment stored and embeds nothing."""
+        modelservice = _Modelservice()
+        store.set_modelservice(modelservice)
+        messages = [_message("first", "m1"), _message("second", "m2")]
+
+        async def run():
+            return await store.store_segments(messages), await store.store_segments(messages)
+
+        first, second = asyncio.run(run())
+
+        assert first.stored == 2 and first.skipped == 0
+        assert second.stored == 0 and second.skipped == 2
+        assert modelservice.batches == [["first", "second"]]
+        assert store._collection.upserts == 1
+
+    def test_duplicates_within_batch_are_embedded_once(self, store):
+        """Test that repeated messages in one call are skipped after the first."""
+        modelservice = _Modelservice()
+        store.set_modelservice(modelservice)
+
+        result = asyncio.run(store.store_segments([_message("same"), _message("same"), _message("other")]))
+
+        assert result.stored == 2
+        assert result.skipped_ids == [make_segment_id("u1", "c1", "user", "same")]
+        assert modelservice.batches == [["same", "other"]]
+
+    def test_item_failures_do_not_abort_batch(self, store):
+        """Test that empty content and failed embeddings are reported per item."""
+        store.set_modelservice(_Modelservice(failing={"broken"}))
+
+        result = asyncio.run(store.store_segments([_message(""), _message("broken", "m2"), _message("fine", "m3")]))
+
+        assert result.stored_ids == [make_segment_id("", "", "", "", "m3")]
+        assert [(f["index"], f["error"]) for f in result.failures] == [
+            (0, "Empty content"),
+            (1, "Embedding generation failed"),
+        ]
+        assert store._collection.count() == 1
+
+    def test_metadata_keeps_message_timestamp(self, store):
+        """Test that stored metadata uses the message time for temporal fields."""
+        store.set_modelservice(_Modelservice())
+
+        result = asyncio.run(store.store_segments([_message("hello", "m1")]))
+
+        metadata = store._collection.rows[result.stored_ids[0]]["metadata"]
+        assert metadata["timestamp"] == "2026-01-02T03:04:05"
+        assert metadata["last_accessed"] == metadata["created_at"] == metadata["timestamp"]
+        assert metadata["access_count"] == 0
+
+    def test_missing_modelservice_fails_every_item(self, store):
+        """Test that nothing is stored without a modelservice."""
+        result = asyncio.run(store.store_segments([_message("a"), _message("b")]))
+
+        assert result.stored == 0
+        assert [f["index"] for f in result.failures] == [0, 1]
+
+
+class TestAccessStats:
+    """Test cases for buffered access statistics."""
+
+    def _store_one(self, store, last_accessed):
+        store._collection.rows["s1"] = {
+            "document": "text",
+            "metadata": {"confidence": 1.0, "last_accessed": last_accessed.isoformat(), "access_count": 2},
+        }
+
+    def test_hits_are_merged_into_one_update(self, store):
+        """Test that buffered hits add up and decay is folded in on flush."""
+        stored_at = datetime.utcnow() - timedelta(days=10)
+        self._store_one(store, stored_at)
+
+        async def run():
+            store._record_access(["s1"])
+            store._record_access(["s1", "unknown"])
+            updated = await store.flush_access_stats()
+            await store.shutdown()
+            return updated
+
+        assert asyncio.run(run()) == 1
+        metadata = store._collection.rows["s1"]["metadata"]
+        assert metadata["access_count"] == 4
+        assert datetime.fromisoformat(metadata["last_accessed"]) > stored_at
+        assert metadata["confidence"] == pytest.approx((1 - store._confidence_decay_rate) ** 10, rel=1e-3)
+        assert store._pending_access == {}
+
+    def test_failed_flush_keeps_hits(self, store):
+        """Test that hits survive a failed write and merge with newer ones."""
+        self._store_one(store, datetime.utcnow())
+        write = store._write_access_stats
+
+        def failing_write(pending):
+            raise RuntimeError("collection unavailable")
+
+        async def run():
+            store._record_access(["s1"])
+            store._write_access_stats = failing_write
+            assert await store.flush_access_stats() == 0
+            store._record_access(["s1"])
+            store._write_access_stats = write
+            await store.shutdown()
+
+        asyncio.run(run())
+
+        assert store._collection.rows["s1"]["metadata"]["access_count"] == 4
+
+    def test_full_buffer_flushes_immediately(self, store):
+        """Test that reaching the buffer limit starts a flush without the interval."""
+        self._store_one(store, datetime.utcnow())
+        store._access_buffer_max = 1
+
+        async def run():
+            store._record_access(["s1"])
+            await asyncio.wait_for(store._access_flush_task, timeout=5)
+
+        asyncio.run(run())
+
+        assert store._collection.rows["s1"]["metadata"]["access_count"] == 3
+
+    def test_full_buffer_starts_one_flush(self, store):
+        """Test that hits arriving while an immediate flush is pending do not start more flushes."""
+        self._store_one(store, datetime.utcnow())
+        store._access_buffer_max = 1
+        flushes = []
+        write = store._write_access_stats
+
+        def counting_write(pending):
+            flushes.append(dict(pending))
+            return write(pending)
+
+        store._write_access_stats = counting_write
+
+        async def run():
+            for _ in range(5):
+                store._record_access(["s1"])
+            scheduled = asyncio.all_tasks() - {asyncio.current_task()}
+            await asyncio.wait_for(store._access_flush_task, timeout=5)
+            return scheduled
+
+        scheduled = asyncio.run(run())
+
+        assert scheduled == {store._access_flush_task}
+        assert [pending["s1"][0] for pending in flushes] == [5]
+        assert store._collection.rows["s1"]["metadata"]["access_count"] == 7
+
+    def test_immediate_flush_replaces_delayed_flush(self, store):
+        """Test that a full buffer cancels the waiting delayed flush instead of adding a task."""
+        self._store_one(store, datetime.utcnow())
+        store._access_flush_interval = 60
+
+        async def run():
+            store._record_access(["s1"])
+            delayed = store._access_flush_task
+            store._access_buffer_max = 1
+            store._record_access(["s1"])
+            await asyncio.wait_for(store._access_flush_task, timeout=5)
+            await asyncio.sleep(0)
+            return delayed
+
+        delayed = asyncio.run(run())
+
+        assert delayed.cancelled() or delayed.done()
+        assert store._access_flush_task is not delayed
+        assert store._collection.rows["s1"]["metadata"]["access_count"] == 4
+
+    def test_record_without_loop_stays_buffered(self, store):
+        """Test that synchronous callers only buffer hits."""
+        store._record_access(["s1"])
+
+        assert store._pending_access["s1"][0] == 1
+        assert store._access_flush_task is None
@@ -0,0 +1,71 @@
+"""
+Unit tests for vectorized similarity kernels.
+"""
+
+import numpy as np
+import pytest
+
+from aico.ai.utils.similarity import EmbeddingMatrix, cosine_similarity_matrix
+
+
+def _loop_cosine(a, b):
+    return float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+class TestEmbeddingMatrix:
+    """Test cases for EmbeddingMatrix."""
+    
+    @pytest.fixture
+    def references(self):
+        rng = np.random.default_rng(42)
+        return {f"key_{i}": rng.standard_normal(32) for i in range(8)}
+    
+    def test_scores_match_loop(self, references):
+        """Test that batched scores equal per-item cosine similarity."""
+        matrix = EmbeddingMatrix(references.items())
+        query = np.random.default_rng(7).standard_normal(32)
+        
+        scores = matrix.score_map(query)
+        for key, ref in references.items():
+            assert scores[key] == pytest.approx(_loop_cosine(query, ref), abs=1e-5)
+    
+    def test_top_k_ordering(self, references):
+        """Test that top_k returns the highest similarities in order."""
+        matrix = EmbeddingMatrix(references.items())
+        query = references["key_3"] + 0.01
+        
+        top = matrix.top_k(query, k=3)
+        assert top[0][0] == "key_3"
+        assert [s for _, s in top] == sorted((s for _, s in top), reverse=True)
+        assert len(matrix.top_k(query, k=100)) == len(references)
+    
+    def test_best_matches_batch(self, references):
+        """Test best match per query for a batch of queries."""
+        matrix = EmbeddingMatrix(references.items())
+        queries = [references["key_1"], references["key_5"].tolist()]
+        
+        matches = matrix.best_matches(queries)
+        assert [key for key, _ in matches] == ["key_1", "key_5"]
+        assert matches[0][1] == pytest.approx(1.0, abs=1e-5)
+    
+    def test_replace_and_zero_vectors(self, references):
+        """Test in-place replacement and zero-vector handling."""
+        matrix = EmbeddingMatrix(references.items())
+        matrix.set("key_0", np.zeros(32))
+        
+        assert len(matrix) == len(references)
+        assert matrix.score_map(np.ones(32))["key_0"] == 0.0
+        assert EmbeddingMatrix().top_k(np.ones(32)) == []
+    
+    def test_dimension_mismatch(self, references):
+        """Test that mixing embedding dimensions is rejected."""
+        matrix = EmbeddingMatrix(references.items())
+        with pytest.raises(ValueError):
+            matrix.set("other", np.ones(16))
+    
+    def test_cosine_similarity_matrix_shape(self):
+        """Test pairwise similarity matrix shape and values."""
+        a = np.eye(3)
+        result = cosine_similarity_matrix(a, a[:2])
+        assert result.shape == (3, 2)
+        assert np.allclose(result, np.eye(3)[:, :2])
@@ -0,0 +1,139 @@
+"""
+Unit tests for the cached, write-behind Thompson Sampling selector.
+"""
+
+import asyncio
+
+import pytest
+
+from aico.ai.memory.behavioral.thompson_sampling import ThompsonSamplingSelector
+
+CONTEXT = {"intent": "question", "sentiment": "neutral", "time_of_day": "morning"}
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute(
+        """CREATE TABLE context_skill_stats (
+            user_id TEXT NOT NULL,
+            context_bucket INTEGER NOT NULL,
+            skill_id TEXT NOT NULL,
+            alpha REAL DEFAULT 1.0,
+            beta REAL DEFAULT 1.0,
+            last_updated_at TIMESTAMP,
+            PRIMARY KEY (user_id, context_bucket, skill_id)
+        )"""
+    )
+    return sqlite_db
+
+
+def _stored(db, user_id, context_bucket, skill_id):
+    row = db.execute(
+        "SELECT alpha, beta FROM context_skill_stats WHERE user_id = ? AND context_bucket = ? AND skill_id = ?",
+        (user_id, context_bucket, skill_id)
+    ).fetchone()
+    return tuple(row) if row else None
+
+
+def _external_upsert(db, user_id, context_bucket, skill_id, alpha, beta):
+    """Write posteriors the way the nightly batch task does."""
+    db.execute(
+        """INSERT INTO context_skill_stats (user_id, context_bucket, skill_id, alpha, beta)
+           VALUES (?, ?, ?, ?, ?)
+           ON CONFLICT(user_id, context_bucket, skill_id)
+           DO UPDATE SET alpha = excluded.alpha, beta = excluded.beta""",
+        (user_id, context_bucket, skill_id, alpha, beta)
+    )
+    db.commit()
+
+
+class TestThompsonSamplingSelector:
+    """Test cases for ThompsonSamplingSelector caching and persistence."""
+
+    def test_flush_adds_to_external_updates(self, db):
+        """Test that flushed feedback increments rows written by another writer."""
+        selector = ThompsonSamplingSelector(db, flush_interval_seconds=60)
+        bucket = selector._hash_context(CONTEXT)
+
+        async def run():
+            await selector.update_from_feedback("u1", "skill", CONTEXT, 1)
+            await selector.update_from_feedback("u1", "skill", CONTEXT, -1)
+            await selector.update_from_feedback("u1", "skill", CONTEXT, 1)
+            _external_upsert(db, "u1", bucket, "skill", 10.0, 4.0)
+            written = await selector.flush()
+            await selector.close()
+            return written
+
+        assert asyncio.run(run()) == 1
+        assert _stored(db, "u1", bucket, "skill") == (12.0, 5.0)
+
+    def test_flush_inserts_new_rows_from_prior(self, db):
+        """Test that a first update creates the row at prior plus feedback."""
+        selector = ThompsonSamplingSelector(db, prior_alpha=2.0, prior_beta=1.0)
+        bucket = selector._hash_context(CONTEXT)
+
+        async def run():
+            await selector.update_from_feedback("u1", "skill", CONTEXT, 1)
+            await selector.close()
+
+        asyncio.run(run())
+
+        assert _stored(db, "u1", bucket, "skill") == (3.0, 1.0)
+
+    def test_invalidate_reloads_and_keeps_pending_updates(self, db):
+        """Test that invalidated users reload stored rows with unflushed feedback on top."""
+        selector = ThompsonSamplingSelector(db, flush_interval_seconds=60)
+        bucket = selector._hash_context(CONTEXT)
+
+        async def run():
+            await selector.update_from_feedback("u1", "skill", CONTEXT, 1)
+            _external_upsert(db, "u1", bucket, "skill", 20.0, 2.0)
+
+            cached = (await selector._get_user_posteriors("u1"))[(bucket, "skill")]
+            selector.invalidate("u1")
+            reloaded = (await selector._get_user_posteriors("u1"))[(bucket, "skill")]
+            await selector.close()
+            return cached, reloaded
+
+        cached, reloaded = asyncio.run(run())
+
+        assert cached == [2.0, 1.0]
+        assert reloaded == [21.0, 2.0]
+        assert _stored(db, "u1", bucket, "skill") == (21.0, 2.0)
+
+    def test_expired_cache_is_reloaded(self, db):
+        """Test that posteriors older than the TTL are reloaded from the database."""
+        selector = ThompsonSamplingSelector(db, cache_ttl_seconds=0)
+
+        async def run():
+            first = await selector._get_user_posteriors("u1")
+            _external_upsert(db, "u1", 0, "skill", 5.0, 3.0)
+            second = await selector._get_user_posteriors("u1")
+            return first, second
+
+        first, second = asyncio.run(run())
+
+        assert first == {}
+        assert second == {(0, "skill"): [5.0, 3.0]}
+
+    def test_failed_flush_keeps_updates(self, db):
+        """Test that updates survive a failed write and merge with newer feedback."""
+        selector = ThompsonSamplingSelector(db, flush_interval_seconds=60)
+        bucket = selector._hash_context(CONTEXT)
+        write = selector._write_posteriors
+
+        def failing_write(rows):
+            raise RuntimeError("database is locked")
+
+        async def run():
+            await selector.update_from_feedback("u1", "skill", CONTEXT, 1)
+            selector._write_posteriors = failing_write
+            with pytest.raises(RuntimeError):
+                await selector.flush()
+            await selector.update_from_feedback("u1", "skill", CONTEXT, 1)
+            selector._write_posteriors = write
+            await selector.close()
+
+        asyncio.run(run())
+
+        assert _stored(db, "u1", bucket, "skill") == (3.0, 1.0)
@@ -0,0 +1,148 @@
+"""
+Unit tests for the shared ChromaDB executor.
+"""
+
+import asyncio
+
+import pytest
+
+from aico.ai.utils.vector_executor import VectorStoreExecutor, _merge_upserts
+
+
+class _Collection:
+    """Fake ChromaDB collection recording upsert calls."""
+
+    name = "fake"
+
+    def __init__(self, bad_ids=()):
+        self.bad_ids = set(bad_ids)
+        self.calls = []
+        self.rows = {}
+
+    def upsert(self, ids, embeddings=None, documents=None, metadatas=None):
+        self.calls.append(list(ids))
+        if self.bad_ids & set(ids):
+            raise ValueError("bad embedding")
+        for i, item_id in enumerate(ids):
+            self.rows[item_id] = documents[i] if documents else None
+
+    def count(self):
+        return len(self.rows)
+
+
+@pytest.fixture
+def executor():
+    executor = VectorStoreExecutor(max_workers=2, coalesce_window_ms=20.0)
+    yield executor
+    executor.shutdown()
+
+
+class TestVectorStoreExecutor:
+    """Test cases for VectorStoreExecutor."""
+
+    def test_concurrent_upserts_are_coalesced(self, executor):
+        """Test that upserts within the window are written with one call."""
+        collection = _Collection()
+
+        async def run():
+            await asyncio.gather(*(
+                executor.upsert(collection, ids=[f"id{i}"], documents=[f"doc {i}"]) for i in range(5)
+            ))
+            return await executor.count(collection)
+
+        assert asyncio.run(run()) == 5
+        assert len(collection.calls) == 1
+        assert executor.upsert_requests == 5
+        assert executor.upsert_batches == 1
+        assert executor.get_metrics()["operations"]["fake.upsert"]["count"] == 1
+
+    def test_failed_batch_retries_requests_individually(self, executor):
+        """Test that one bad request fails alone while its neighbours are written."""
+        collection = _Collection(bad_ids={"bad"})
+
+        async def run():
+            return await asyncio.gather(
+                executor.upsert(collection, ids=["a"], documents=["a"]),
+                executor.upsert(collection, ids=["bad"], documents=["x"]),
+                executor.upsert(collection, ids=["b"], documents=["b"]),
+                return_exceptions=True,
+            )
+
+        results = asyncio.run(run())
+
+        assert results[0] is None and results[2] is None
+        assert isinstance(results[1], ValueError)
+        assert sorted(collection.rows) == ["a", "b"]
+        assert collection.calls[0] == ["a", "bad", "b"]
+
+    def test_full_batch_flushes_before_window(self):
+        """Test that reaching max_batch_size writes without waiting for the timer."""
+        executor = VectorStoreExecutor(max_workers=1, coalesce_window_ms=60_000.0, max_batch_size=2)
+        collection = _Collection()
+
+        async def run():
+            await asyncio.wait_for(
+                asyncio.gather(
+                    executor.upsert(collection, ids=["a"]),
+                    executor.upsert(collection, ids=["b"]),
+                ),
+                timeout=5,
+            )
+
+        try:
+            asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert collection.calls == [["a", "b"]]
+
+    def test_executor_serves_successive_event_loops(self, executor):
+        """Test that the shared executor keeps working after its first loop closes."""
+        collection = _Collection()
+
+        async def abandon():
+            # Leave a pending batch behind when the loop shuts down
+            asyncio.get_running_loop().create_task(executor.upsert(collection, ids=["lost"]))
+
+        async def write(item_id):
+            await asyncio.wait_for(executor.upsert(collection, ids=[item_id]), timeout=5)
+
+        asyncio.run(abandon())
+        asyncio.run(write("first"))
+        asyncio.run(write("second"))
+
+        assert "first" in collection.rows and "second" in collection.rows
+        assert all(not pending.loop.is_closed() for pending in executor._pending.values())
+
+    def test_drain_writes_pending_batches(self):
+        """Test that drain flushes queued upserts and waits for their writes."""
+        executor = VectorStoreExecutor(max_workers=1, coalesce_window_ms=60_000.0)
+        collection = _Collection()
+
+        async def run():
+            writer = asyncio.create_task(executor.upsert(collection, ids=["a"]))
+            await asyncio.sleep(0)
+            await asyncio.wait_for(executor.drain(), timeout=5)
+            assert writer.done()
+            return executor._flush_tasks
+
+        try:
+            in_flight = asyncio.run(run())
+        finally:
+            executor.shutdown()
+
+        assert collection.calls == [["a"]]
+        assert in_flight == set() and executor._pending == {}
+
+
+class TestMergeUpserts:
+    """Test cases for coalesced upsert column merging."""
+
+    def test_later_write_of_same_id_wins(self):
+        """Test that duplicate ids keep their first position and last value."""
+        merged = _merge_upserts([
+            {"ids": ["a", "b"], "embeddings": None, "documents": ["a1", "b1"], "metadatas": None},
+            {"ids": ["a"], "embeddings": None, "documents": ["a2"], "metadatas": None},
+        ])
+
+        assert merged == {"ids": ["a", "b"], "documents": ["a2", "b1"]}
@@ -0,0 +1,156 @@
+"""
+Unit tests for cursor-paged working memory history over LMDB range reads.
+"""
+
+import asyncio
+import json
+
+import pytest
+
+import aico.ai.memory.working as working
+from aico.ai.memory.working import InvalidCursorError, WorkingMemoryStore
+
+
+class _Config:
+    def __init__(self, ttl_seconds=3600):
+        self.values = {"core.memory.working.ttl_seconds": ttl_seconds}
+
+    def get(self, key, default=None):
+        return self.values.get(key, default)
+
+
+@pytest.fixture
+def make_store(tmp_path, monkeypatch):
+    monkeypatch.setattr(working, "get_lmdb_path", lambda config: tmp_path / "working")
+    monkeypatch.setattr(working, "initialize_lmdb_env", lambda config: None)
+    stores = []
+
+    def make(ttl_seconds=3600):
+        store = WorkingMemoryStore(_Config(ttl_seconds))
+        stores.append(store)
+        return store
+
+    yield make
+    for store in stores:
+        asyncio.run(store.cleanup())
+
+
+async def _store(store, conversation_id, user_id, count, start=0):
+    for i in range(start, start + count):
+        await store.store_message(conversation_id, {"user_id": user_id, "content": f"{conversation_id}-{i}"})
+        await asyncio.sleep(0.001)  # Distinct key timestamps
+
+
+class TestWorkingMemoryHistory:
+    """Test cases for WorkingMemoryStore history pages."""
+
+    def test_cursor_pages_cover_history_newest_first(self, make_store):
+        """Test that following next_cursor walks the whole conversation without overlap."""
+        store = make_store()
+
+        async def run():
+            await _store(store, "conv", "u1", 7)
+            pages = []
+            cursor = None
+            while True:
+                page = await store.retrieve_history_page(conversation_id="conv", limit=3, cursor=cursor)
+                pages.append(page)
+                cursor = page.next_cursor
+                if cursor is None:
+                    return pages
+
+        pages = asyncio.run(run())
+
+        assert [len(p.messages) for p in pages] == [3, 3, 1]
+        contents = [m["content"] for p in pages for m in p.messages]
+        assert contents == [f"conv-{i}" for i in range(6, -1, -1)]
+        assert all(p.total_count == 7 for p in pages)
+
+    def test_conversation_prefix_does_not_leak(self, make_store):
+        """Test that conversation 'a' excludes messages of conversation 'a:b'."""
+        store = make_store()
+
+        async def run():
+            await _store(store, "a", "u1", 2)
+            await _store(store, "a:b", "u1", 2)
+            return await store.retrieve_history_page(conversation_id="a", limit=10)
+
+        page = asyncio.run(run())
+
+        assert [m["content"] for m in page.messages] == ["a-1", "a-0"]
+        assert page.total_count == 2
+
+    def test_user_history_spans_conversations(self, make_store):
+        """Test that user pages interleave conversations in time order and count per user."""
+        store = make_store()
+
+        async def run():
+            await _store(store, "c1", "u1", 1)
+            await _store(store, "c2", "u1", 1)
+            await _store(store, "c3", "u2", 1)
+            await _store(store, "c1", "u1", 1, start=1)
+            history = await store.retrieve_user_history("u1", limit=10)
+            return history, store.get_message_count(user_id="u1"), store.get_message_count(conversation_id="c1")
+
+        history, user_count, conversation_count = asyncio.run(run())
+
+        assert [m["content"] for m in history] == ["c1-1", "c2-0", "c1-0"]
+        assert user_count == 3
+        assert conversation_count == 2
+
+    def test_cursor_from_other_scope_is_rejected(self, make_store):
+        """Test that a cursor for one conversation cannot be used for another."""
+        store = make_store()
+
+        async def run():
+            await _store(store, "c1", "u1", 3)
+            await _store(store, "c2", "u1", 1)
+            page = await store.retrieve_history_page(conversation_id="c1", limit=1)
+            with pytest.raises(InvalidCursorError):
+                await store.retrieve_history_page(conversation_id="c2", cursor=page.next_cursor)
+            with pytest.raises(InvalidCursorError):
+                await store.retrieve_history_page(conversation_id="c1", cursor="!!")
+
+        asyncio.run(run())
+
+    def test_cleanup_expired_updates_counts(self, make_store):
+        """Test that purging expired messages also removes their index entries and counts."""
+        store = make_store(ttl_seconds=-1)
+
+        async def run():
+            await _store(store, "conv", "u1", 3)
+            deleted = await store.cleanup_expired()
+            page = await store.retrieve_history_page(user_id="u1", limit=10)
+            return deleted, page
+
+        deleted, page = asyncio.run(run())
+
+        assert deleted == 3
+        assert page.messages == []
+        assert page.total_count == 0
+        assert store.get_message_count(conversation_id="conv") == 0
+
+    def test_legacy_keys_are_normalized_on_startup(self, make_store):
+        """Test that keys without a timestamp fraction are rewritten so scans stay in order."""
+        store = make_store()
+        asyncio.run(store.initialize())
+        # Written by older versions: isoformat() without a fraction sorts after ".123456"
+        with store.env.begin(write=True) as txn:
+            for key, content in ((b"conv:2026-10-18T10:00:05Z", "first"), (b"conv:2026-10-18T10:00:05.500000Z", "second")):
+                data = {"user_id": "u1", "content": content}
+                txn.put(key, json.dumps(data).encode("utf-8"), db=store.dbs["session_memory"])
+                store._index_message(txn, key, data, delta=1)
+        asyncio.run(store.cleanup())
+
+        reopened = make_store()
+
+        async def run():
+            by_conversation = await reopened.retrieve_history_page(conversation_id="conv")
+            by_user = await reopened.retrieve_history_page(user_id="u1")
+            return by_conversation, by_user
+
+        by_conversation, by_user = asyncio.run(run())
+
+        assert [m["content"] for m in by_conversation.messages] == ["second", "first"]
+        assert [m["content"] for m in by_user.messages] == ["second", "first"]
+        assert by_user.total_count == 2
@@ -0,0 +1,86 @@
+"""
+Unit tests for configuration snapshots, accessors and subscribers.
+"""
+
+import pytest
+import yaml
+
+from aico.core.config import ConfigurationManager
+
+
+@pytest.fixture
+def config(tmp_path):
+    """Isolated ConfigurationManager over a temporary config directory."""
+    defaults = tmp_path / "defaults"
+    defaults.mkdir()
+    (defaults / "core.yaml").write_text(yaml.safe_dump({
+        "logging": {"levels": {"default": "INFO"}},
+        "memory": {"semantic": {"max_results": 10}},
+    }))
+
+    ConfigurationManager.reset_singleton()
+    manager = ConfigurationManager(config_dir=tmp_path)
+    manager.initialize(lightweight=True)
+    yield manager
+    ConfigurationManager.reset_singleton()
+
+
+class TestConfigSnapshots:
+    """Test cases for snapshot-backed configuration reads."""
+
+    def test_accessor_follows_changes(self, config):
+        """Test that an accessor returns the current value after set and reload."""
+        max_results = config.accessor("core.memory.semantic.max_results", 5, cast=int)
+        assert max_results() == 10
+
+        config.set("core.memory.semantic.max_results", "25", persist=False)
+        assert max_results() == 25
+        assert max_results.value == 25
+
+        config.reload()
+        assert max_results() == 10
+
+    def test_accessor_default_for_missing_key(self, config):
+        """Test that missing keys and uncastable values fall back to the default."""
+        assert config.accessor("core.memory.missing", "fallback")() == "fallback"
+
+        config.set("core.memory.semantic.max_results", "many", persist=False)
+        assert config.accessor("core.memory.semantic.max_results", 3, cast=int)() == 3
+
+    def test_set_publishes_new_snapshot(self, config):
+        """Test that set swaps in a new snapshot instead of mutating the old one."""
+        before = config.snapshot()
+        config.set("core.logging.levels.default", "DEBUG", persist=False)
+        after = config.snapshot()
+
+        assert after.version == before.version + 1
+        assert before.resolve(("core", "logging", "levels", "default")) == "INFO"
+        assert after.resolve(("core", "logging", "levels", "default")) == "DEBUG"
+
+    def test_subscribers_filtered_by_key(self, config):
+        """Test that keyed subscribers are only notified when their keys change."""
+        all_changes, level_changes = [], []
+        config.subscribe(lambda snapshot: all_changes.append(snapshot.version))
+        unsubscribe = config.subscribe(
+            lambda snapshot: level_changes.append(snapshot.version),
+            keys=["core.logging.levels.default"]
+        )
+
+        config.set("core.memory.semantic.max_results", 11, persist=False)
+        config.set("core.logging.levels.default", "DEBUG", persist=False)
+        assert len(all_changes) == 2
+        assert level_changes == [config.snapshot().version]
+
+        unsubscribe()
+        config.reload()
+        assert len(all_changes) == 3
+        assert len(level_changes) == 1
+
+    def test_failing_subscriber_does_not_block_others(self, config):
+        """Test that an exception in one subscriber does not affect the rest."""
+        notified = []
+        config.subscribe(lambda snapshot: 1 / 0)
+        config.subscribe(lambda snapshot: notified.append(snapshot.version))
+
+        config.set("core.memory.semantic.max_results", 12, persist=False)
+        assert notified == [config.snapshot().version]
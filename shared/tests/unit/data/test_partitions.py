@@ -0,0 +1,159 @@
+"""
+Unit tests for time-partitioned tables.
+"""
+
+import sqlite3
+from datetime import date, datetime, timedelta
+
+import pytest
+
+from aico.data.libsql.partitions import (
+    TimePartitioner,
+    list_partitions,
+    partition_name,
+    partitioned_source,
+    writable_tables,
+)
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute(
+        "CREATE TABLE logs (id INTEGER PRIMARY KEY AUTOINCREMENT, timestamp TEXT NOT NULL, message TEXT)"
+    )
+    sqlite_db.execute("CREATE INDEX idx_logs_timestamp ON logs(timestamp)")
+    sqlite_db.execute("CREATE UNIQUE INDEX idx_logs_message ON logs(message)")
+    sqlite_db.commit()
+    return sqlite_db
+
+
+def _insert(db, table, timestamp, message):
+    db.execute(f"INSERT INTO {table} (timestamp, message) VALUES (?, ?)", (timestamp, message))
+
+
+def _create(db, partitioner, day):
+    """Create the partition for ``day`` directly (table_for routes old days to the base table)."""
+    name = partition_name(partitioner.base_table, day, partitioner.granularity)
+    partitioner._create_partition(name)
+    return name
+
+
+class TestPartitionNames:
+    """Test cases for partition naming."""
+
+    def test_week_partitions_start_on_monday(self):
+        """Test that days of one ISO week share the Monday-dated partition."""
+        assert partition_name("logs", date(2026, 10, 18)) == "logs_d20261018"
+        assert partition_name("logs", date(2026, 10, 18), "week") == "logs_w20261012"
+        assert partition_name("logs", date(2026, 10, 12), "week") == "logs_w20261012"
+
+
+class TestTimePartitioner:
+    """Test cases for TimePartitioner."""
+
+    def test_partition_clones_schema_and_indexes(self, db):
+        """Test that a partition copies the base table's columns and indexes."""
+        partitioner = TimePartitioner(db, "logs")
+        name = partitioner.table_for(datetime.utcnow())
+
+        columns = [row[1] for row in db.execute(f"PRAGMA table_info({name})").fetchall()]
+        indexes = {row[1]: row[2] for row in db.execute(f"PRAGMA index_list({name})").fetchall()}
+
+        assert columns == ["id", "timestamp", "message"]
+        assert indexes == {f"{name}_idx_logs_timestamp": 0, f"{name}_idx_logs_message": 1}
+
+    def test_autoincrement_is_seeded_from_period_start(self, db):
+        """Test that ids in a partition start above its period's seed."""
+        partitioner = TimePartitioner(db, "logs")
+        day = date(2026, 10, 18)
+        name = _create(db, partitioner, day)
+        _insert(db, name, "2026-10-18T10:00:00", "hello")
+
+        seed = (day - date(1970, 1, 1)).days * 1_000_000_000
+        assert db.execute(f"SELECT id FROM {name}").fetchone()[0] == seed + 1
+
+        # Recreating an existing partition keeps its sequence
+        partitioner._create_partition(name)
+        _insert(db, name, "2026-10-18T11:00:00", "again")
+        assert db.execute(f"SELECT MAX(id) FROM {name}").fetchone()[0] == seed + 2
+
+    def test_late_writes_go_to_base_table(self, db):
+        """Test that rows older than yesterday are routed to the base table."""
+        partitioner = TimePartitioner(db, "logs")
+        today = datetime.utcnow().date()
+
+        assert partitioner.table_for(today) == partition_name("logs", today)
+        assert partitioner.table_for(today - timedelta(days=1)) == partition_name("logs", today - timedelta(days=1))
+        assert partitioner.table_for(today - timedelta(days=2)) == "logs"
+        assert partitioner.table_for((today - timedelta(days=30)).isoformat() + "T00:00:00Z") == "logs"
+        assert [p[0] for p in list_partitions(db, "logs")] == [
+            partition_name("logs", today - timedelta(days=1)),
+            partition_name("logs", today),
+        ]
+
+    def test_source_prunes_partitions_outside_range(self, db):
+        """Test that reads union the base table with overlapping partitions only."""
+        partitioner = TimePartitioner(db, "logs")
+        assert partitioned_source(db, "logs") == "logs"
+
+        for day in (1, 2, 3):
+            name = _create(db, partitioner, date(2026, 10, day))
+            _insert(db, name, f"2026-10-0{day}T12:00:00", f"day {day}")
+        _insert(db, "logs", "2026-09-01T12:00:00", "base")
+
+        source = partitioned_source(db, "logs", since="2026-10-02", until="2026-10-02T23:59:59")
+        assert "logs_d20261001" not in source and "logs_d20261003" not in source
+
+        rows = db.execute(f"SELECT message FROM {source} ORDER BY timestamp").fetchall()
+        assert [row[0] for row in rows] == ["base", "day 2"]
+
+        everything = partitioned_source(db, "logs")
+        assert db.execute(f"SELECT COUNT(*) FROM {everything}").fetchone()[0] == 4
+
+    def test_source_keeps_all_partitions_for_free_form_bound(self, db):
+        """Test that a bound that is not a date reads every partition instead of raising."""
+        partitioner = TimePartitioner(db, "logs")
+        for day in (1, 2):
+            _create(db, partitioner, date(2026, 10, day))
+
+        source = partitioned_source(db, "logs", since="yesterday")
+
+        assert "logs_d20261001" in source and "logs_d20261002" in source
+
+    def test_sealed_partitions_reject_writes(self, db):
+        """Test that sealing makes closed partitions read-only and skips them as writable."""
+        partitioner = TimePartitioner(db, "logs")
+        old = _create(db, partitioner, date(2026, 10, 1))
+        recent = _create(db, partitioner, date(2026, 10, 5))
+
+        assert partitioner.seal_before("2026-10-03") == [old]
+        assert partitioner.seal_before("2026-10-03") == []
+
+        with pytest.raises(sqlite3.DatabaseError, match="sealed"):
+            _insert(db, old, "2026-10-01T12:00:00", "late")
+        _insert(db, recent, "2026-10-05T12:00:00", "fine")
+        assert writable_tables(db, "logs") == ["logs", recent]
+
+    def test_drop_expired_removes_whole_periods(self, db):
+        """Test that only partitions ending on or before the cutoff are dropped."""
+        partitioner = TimePartitioner(db, "logs", granularity="week")
+        first = _create(db, partitioner, date(2026, 10, 5))
+        second = _create(db, partitioner, date(2026, 10, 12))
+
+        assert partitioner.drop_expired("2026-10-15") == [first]
+        assert [p[0] for p in list_partitions(db, "logs")] == [second]
+        assert partitioner.drop_expired("2026-10-15") == []
+
+    def test_from_config_requires_enabled_table(self, db):
+        """Test that a partitioner is only built for enabled, listed tables."""
+        class _Config:
+            def __init__(self, settings):
+                self.settings = settings
+
+            def get(self, key, default=None):
+                return self.settings
+
+        enabled = {"enabled": True, "tables": ["logs"], "granularity": "week"}
+        assert TimePartitioner.from_config(db, "logs", _Config(enabled)).granularity == "week"
+        assert TimePartitioner.from_config(db, "events", _Config(enabled)) is None
+        assert TimePartitioner.from_config(db, "logs", _Config({"tables": ["logs"]})) is None
@@ -0,0 +1,121 @@
+"""
+Unit tests for the chunked retention engine.
+"""
+
+import asyncio
+import sqlite3
+
+import pytest
+
+from aico.data.libsql.retention import RetentionEngine, RetentionPolicy
+
+
+@pytest.fixture
+def db(sqlite_db):
+    sqlite_db.execute("PRAGMA journal_mode=WAL").fetchall()
+    sqlite_db.execute("CREATE TABLE logs (id INTEGER PRIMARY KEY, timestamp TEXT, level TEXT)")
+    return sqlite_db
+
+
+def _insert_logs(db, count, day, level="INFO"):
+    db.execute_many(
+        "INSERT INTO logs (timestamp, level) VALUES (?, ?)",
+        [(f"2026-01-{day:02d}T00:00:{i % 60:02d}", level) for i in range(count)]
+    )
+
+
+def _remaining(db):
+    return db.execute("SELECT timestamp, level FROM logs ORDER BY id").fetchall()
+
+
+class TestRetentionEngine:
+    """Test cases for RetentionEngine.purge."""
+
+    def test_purges_in_batches_and_keeps_rows_inside_window(self, db):
+        """Test that expired rows go in batch_size chunks and newer rows survive."""
+        _insert_logs(db, 25, day=1)
+        _insert_logs(db, 5, day=20)
+        _insert_logs(db, 10, day=2)
+        db.commits = 0
+        engine = RetentionEngine(db, batch_size=10, pause_seconds=0)
+
+        result = asyncio.run(engine.purge(RetentionPolicy("logs", "timestamp", "2026-01-10")))
+
+        assert result.deleted == 35
+        assert result.batches == 4  # 10 + 10 + 10 + 5
+        assert db.commits == 4
+        assert result.checkpointed
+        assert result.errors == []
+        assert [row[0][:10] for row in _remaining(db)] == ["2026-01-20"] * 5
+
+    def test_exact_multiple_of_batch_size_ends_with_empty_batch(self, db):
+        """Test that a full final batch is followed by one empty batch and then stops."""
+        _insert_logs(db, 20, day=1)
+        engine = RetentionEngine(db, batch_size=10, pause_seconds=0)
+
+        result = asyncio.run(engine.purge(RetentionPolicy("logs", "timestamp", "2026-01-10")))
+
+        assert (result.deleted, result.batches) == (20, 3)
+        assert _remaining(db) == []
+
+    def test_nothing_expired_skips_compaction(self, db):
+        """Test that a purge without victims runs one batch and no checkpoint."""
+        _insert_logs(db, 3, day=20)
+        engine = RetentionEngine(db, batch_size=10, pause_seconds=0)
+
+        result = asyncio.run(engine.purge(RetentionPolicy("logs", "timestamp", "2026-01-10")))
+
+        assert (result.deleted, result.batches, result.checkpointed) == (0, 1, False)
+        assert len(_remaining(db)) == 3
+
+    def test_extra_predicate_limits_victims(self, db):
+        """Test that extra_where keeps expired rows it does not match."""
+        _insert_logs(db, 4, day=1, level="DEBUG")
+        _insert_logs(db, 2, day=1, level="ERROR")
+        engine = RetentionEngine(db, batch_size=3, pause_seconds=0)
+        policy = RetentionPolicy("logs", "timestamp", "2026-01-10", extra_where="level = ?", extra_params=("DEBUG",))
+
+        result = asyncio.run(engine.purge(policy))
+
+        assert (result.deleted, result.batches) == (4, 2)
+        assert {row[1] for row in _remaining(db)} == {"ERROR"}
+
+    def test_failed_batch_stops_purge(self, db):
+        """Test that an error is recorded and earlier batches stay committed."""
+        _insert_logs(db, 15, day=1)
+        engine = RetentionEngine(db, batch_size=5, pause_seconds=0)
+        delete_batch = engine._delete_batch
+        calls = []
+
+        def failing_delete(statement, params):
+            calls.append(statement)
+            if len(calls) == 2:
+                raise sqlite3.OperationalError("database is locked")
+            return delete_batch(statement, params)
+
+        engine._delete_batch = failing_delete
+
+        result = asyncio.run(engine.purge(RetentionPolicy("logs", "timestamp", "2026-01-10")))
+
+        assert result.deleted == 5
+        assert result.errors == ["database is locked"]
+        assert len(_remaining(db)) == 10
+
+    def test_progress_reported_every_interval(self, db):
+        """Test that progress callbacks fire per interval and once at the end."""
+        _insert_logs(db, 9, day=1)
+        reports = []
+        engine = RetentionEngine(
+            db, batch_size=2, pause_seconds=0, progress_interval_batches=2,
+            progress_callback=lambda result: reports.append(result.deleted),
+        )
+
+        asyncio.run(engine.purge(RetentionPolicy("logs", "timestamp", "2026-01-10")))
+
+        assert reports == [4, 8, 9]
+
+    def test_from_config_reads_retention_section(self, db):
+        """Test that config values (pause in ms) map onto engine settings."""
+        engine = RetentionEngine.from_config(db, {"batch_size": 500, "pause_ms": 20, "wal_checkpoint": False})
+
+        assert (engine.batch_size, engine.pause_seconds, engine.checkpoint) == (500, 0.02, False)
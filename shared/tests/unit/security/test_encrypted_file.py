@@ -10,6 +10,7 @@ from pathlib import Path
 from aico.core.config import ConfigurationManager
 from aico.security.key_manager import AICOKeyManager
 from aico.security.encrypted_file import EncryptedFile, open_encrypted
+from aico.security.file_crypto import FileCrypto
 from aico.security.exceptions import (
     EncryptionError,
     DecryptionError,
@@ -335,3 +336,102 @@ class TestEncryptedFile:
         with EncryptedFile(test_file, "r", key_manager=key_manager, purpose="config") as f:
             data = f.read()
             assert data == "Configuration test data"
+
+    def test_segmented_random_access(self, temp_dir, key_manager):
+        """Test seeking across segment boundaries."""
+        test_file = temp_dir / "segments.enc"
+        test_data = bytes(range(256)) * 40  # 10KB over 1KB segments
+        
+        with EncryptedFile(test_file, "wb", key_manager=key_manager, purpose="segments", chunk_size=1024) as f:
+            f.write(test_data)
+        
+        with EncryptedFile(test_file, "rb", key_manager=key_manager, purpose="segments") as f:
+            f.seek(1020)
+            assert f.read(10) == test_data[1020:1030]
+            f.seek(-5, 2)
+            assert f.read() == test_data[-5:]
+            f.seek(4096)
+            assert f.read(2048) == test_data[4096:6144]
+        
+        info = EncryptedFile(test_file, "rb", key_manager=key_manager, purpose="segments").get_encryption_info()
+        assert info["format_version"] == 2
+        assert info["segment_count"] == 10
+        assert info["payload_size"] == len(test_data)
+    
+    def test_append_rewrites_only_last_segment(self, temp_dir, key_manager):
+        """Test that appends leave earlier segments untouched."""
+        test_file = temp_dir / "append_segments.enc"
+        
+        with EncryptedFile(test_file, "wb", key_manager=key_manager, purpose="append", chunk_size=1024) as f:
+            f.write(b"a" * 2500)
+        
+        before = test_file.read_bytes()
+        untouched = FileCrypto.STREAM_HEADER_SIZE + 2 * (1024 + FileCrypto.SEGMENT_OVERHEAD)
+        
+        with EncryptedFile(test_file, "ab", key_manager=key_manager, purpose="append") as f:
+            assert f.tell() == 2500
+            f.write(b"b" * 1000)
+        
+        assert test_file.read_bytes()[:untouched] == before[:untouched]
+        
+        with EncryptedFile(test_file, "rb", key_manager=key_manager, purpose="append") as f:
+            assert f.read() == b"a" * 2500 + b"b" * 1000
+
+    def test_interrupted_append_keeps_file_readable(self, temp_dir, key_manager):
+        """Test that the sealed final segment survives an unclosed append that did not fill a segment."""
+        test_file = temp_dir / "append_crash.enc"
+
+        with EncryptedFile(test_file, "wb", key_manager=key_manager, purpose="append", chunk_size=1024) as f:
+            f.write(b"a" * 2500)
+        before = test_file.read_bytes()
+
+        # Process dies after buffering new data but before close
+        f = EncryptedFile(test_file, "ab", key_manager=key_manager, purpose="append")
+        f.open()
+        f.write(b"b" * 100)
+        f.flush()
+        f._close_raw()
+
+        assert test_file.read_bytes() == before
+        with EncryptedFile(test_file, "rb", key_manager=key_manager, purpose="append") as f:
+            assert f.read() == b"a" * 2500
+
+        # An append without new data leaves the file as it was
+        with EncryptedFile(test_file, "ab", key_manager=key_manager, purpose="append"):
+            pass
+        assert test_file.read_bytes() == before
+
+    def test_truncation_detection(self, temp_dir, key_manager):
+        """Test that dropping trailing segments is detected."""
+        test_file = temp_dir / "truncated.enc"
+        
+        with EncryptedFile(test_file, "wb", key_manager=key_manager, purpose="truncate", chunk_size=1024) as f:
+            f.write(b"x" * 4000)
+        
+        # Cut the file at a segment boundary, removing the final segment
+        data = test_file.read_bytes()
+        test_file.write_bytes(data[:FileCrypto.STREAM_HEADER_SIZE + 2 * (1024 + FileCrypto.SEGMENT_OVERHEAD)])
+        
+        with pytest.raises(CorruptedFileError):
+            with EncryptedFile(test_file, "rb", key_manager=key_manager, purpose="truncate") as f:
+                f.read()
+    
+    def test_legacy_format_compatibility(self, temp_dir, key_manager):
+        """Test that legacy whole-file encrypted files remain readable and appendable."""
+        import io
+        test_file = temp_dir / "legacy.enc"
+        
+        reader = EncryptedFile(test_file, "r", key_manager=key_manager, purpose="legacy")
+        crypto = FileCrypto(reader._get_encryption_key())
+        with open(test_file, "wb") as out:
+            crypto.encrypt_file_streaming(io.BytesIO(b"Legacy line\n"), out)
+        
+        with EncryptedFile(test_file, "r", key_manager=key_manager, purpose="legacy") as f:
+            assert f.read() == "Legacy line\n"
+        
+        with EncryptedFile(test_file, "a", key_manager=key_manager, purpose="legacy") as f:
+            f.write("New line\n")
+        
+        assert test_file.read_bytes()[:4] == FileCrypto.STREAM_MAGIC
+        with EncryptedFile(test_file, "r", key_manager=key_manager, purpose="legacy") as f:
+            assert f.readlines() == ["Legacy line\n", "New line\n"]
@@ -0,0 +1,101 @@
+"""
+Unit tests for negotiated transport payload options.
+"""
+
+import base64
+import json
+
+import pytest
+
+from aico.security.exceptions import DecryptionError, EncryptionError
+from aico.security.transport import (
+    FRAMING_BINARY,
+    ComponentIdentity,
+    SecureTransportChannel,
+    TransportOptions,
+    iter_stream_frames,
+)
+
+PAYLOAD = {"messages": [{"role": "user", "content": "hello " * 200}]}
+
+
+def _session():
+    """Client and server channels with an established session."""
+    client = SecureTransportChannel(ComponentIdentity.generate("client"), None)
+    server = SecureTransportChannel(ComponentIdentity.generate("server"), None)
+    response = server.process_handshake_request(client.create_handshake_request())
+    client.process_handshake_response(response)
+    return client, server
+
+
+def _negotiate(client, server, dictionary=None, **preferences):
+    capabilities = TransportOptions.capabilities(dictionary=dictionary)
+    agreed = server.negotiate_transport(capabilities, dictionary=dictionary, **preferences).to_dict()
+    client.set_transport_options(json.loads(json.dumps(agreed)), dictionary=dictionary)
+    return agreed
+
+
+class TestTransportOptions:
+    """Test cases for payload compression and framing."""
+
+    def test_legacy_format_unchanged(self):
+        """Test that sessions without negotiation keep the bare JSON plaintext."""
+        client, server = _session()
+        ciphertext = client.encrypt_json_payload(PAYLOAD)
+
+        assert server.decrypt_json_payload(ciphertext) == PAYLOAD
+        assert server.session_box.decrypt(base64.b64decode(ciphertext)).startswith(b"{")
+
+    def test_negotiated_compression(self):
+        """Test that large payloads are compressed and small ones are not."""
+        client, server = _session()
+        agreed = _negotiate(client, server)
+        body = json.dumps(PAYLOAD).encode()
+
+        ciphertext = client.encrypt_bytes(body)
+        small = client.encrypt_bytes(b'{"ok":true}')
+
+        assert agreed["framing"] == FRAMING_BINARY
+        assert agreed["compression"] != "none"
+        assert len(ciphertext) < len(body) // 4
+        assert server.decrypt_bytes(ciphertext) == body
+        assert server.decrypt_bytes(small) == b'{"ok":true}'
+        assert server.decrypt_json_payload(client.encrypt_json_payload(PAYLOAD)) == PAYLOAD
+
+    def test_dictionary_must_match(self):
+        """Test that a dictionary id the client does not hold is rejected."""
+        client, server = _session()
+        agreed = server.negotiate_transport(
+            TransportOptions.capabilities(dictionary=b"server dictionary"),
+            dictionary=b"server dictionary"
+        ).to_dict()
+
+        assert "dictionary_id" in agreed
+        with pytest.raises(EncryptionError):
+            client.set_transport_options(agreed, dictionary=b"other dictionary")
+
+        _negotiate(client, server, dictionary=b'{"messages":[{"role":"user","content":"')
+        assert server.decrypt_bytes(client.encrypt_bytes(json.dumps(PAYLOAD).encode())) == json.dumps(PAYLOAD).encode()
+
+    def test_decompression_limit(self):
+        """Test that payloads expanding beyond max_payload_size are rejected."""
+        client, server = _session()
+        _negotiate(client, server, max_payload_size=1024)
+
+        with pytest.raises(DecryptionError):
+            server.decrypt_bytes(client.encrypt_bytes(b"0" * 100_000))
+
+    def test_stream_chunks(self):
+        """Test that streamed chunks use distinct counter nonces and decrypt individually."""
+        client, server = _session()
+        _negotiate(client, server)
+        stream = server.stream_encryptor()
+        lines = [json.dumps({"type": "chunk", "content": f"token {i}"}).encode() for i in range(3)]
+
+        ciphertexts = [stream.encrypt(line) for line in lines]
+        buffer = bytearray(b"".join(stream.frame(line) for line in lines) + b"\x00\x00")
+
+        assert len({ciphertext[:24] for ciphertext in ciphertexts}) == 3
+        assert [client.decrypt_bytes(ciphertext) for ciphertext in ciphertexts] == lines
+        assert [client.decrypt_bytes(frame) for frame in iter_stream_frames(buffer)] == lines
+        assert buffer == b"\x00\x00"